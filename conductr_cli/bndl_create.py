@@ -16,7 +16,7 @@ from conductr_cli.bndl_utils import \
     zip_extract_with_dates
 from conductr_cli.bundle_validation import validate_bundle_conf
 from conductr_cli.constants import BNDL_PEEK_SIZE, IO_CHUNK_SIZE, SHAZAR_TIMESTAMP_MIN
-from conductr_cli.shazar_main import dir_to_zip, write_with_digest
+from conductr_cli.shazar_main import dir_to_zip, write_incremental_zip, zip_writer, DigestWriter
 from io import BufferedReader, BytesIO
 from pyhocon import ConfigException, ConfigFactory, HOCONConverter
 import arrow
@@ -54,7 +54,14 @@ def bndl_create(args):
             with open(args.source, 'rb') as source_in:
                 args.format = detect_format_stream(source_in.read(BNDL_PEEK_SIZE))
 
-    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    incremental = vars(args).get('incremental') and args.use_shazar
+    if incremental and not args.output:
+        log.error('bndl: --incremental requires an output file')
+
+        return 2
+
+    # An incremental bundle replaces the output once complete, as the previous bundle is read meanwhile
+    output = open(args.output, 'wb') if args.output and not incremental else sys.stdout.buffer
 
     temp_dir = tempfile.mkdtemp()
     input_dir = temp_dir
@@ -253,17 +260,23 @@ def bndl_create(args):
                 runtime_conf_fileobj.write(runtime_conf_data)
 
         if args.use_shazar:
-            with tempfile.NamedTemporaryFile() as zip_file_data:
-                with zipfile.ZipFile(zip_file_data, 'w') as zip_file:
-                    bundle_conf_zinfo = zipfile.ZipInfo(filename=bundle_conf_name, date_time=time.localtime(mtime)[:6])
+            def write_bundle(bundle_output, index=None, previous=None):
+                digest_writer = DigestWriter(bundle_output)
+
+                with zipfile.ZipFile(digest_writer, 'w') as zip_file, \
+                        zip_writer(zip_file, args, index, previous) as writer:
+                    bundle_conf_zinfo = zipfile.ZipInfo(filename=bundle_conf_name,
+                                                        date_time=time.localtime(mtime)[:6])
                     bundle_conf_zinfo.external_attr = 0o644 << 16
-                    zip_file.writestr(bundle_conf_zinfo, bundle_conf_data)
-                    dir_to_zip(input_dir, zip_file, archive_name, mtime)
+                    writer.writestr(bundle_conf_zinfo, bundle_conf_data)
+                    dir_to_zip(input_dir, writer, archive_name, mtime)
 
-                zip_file_data.flush()
-                zip_file_data.seek(0)
+                digest_writer.write_digest()
 
-                write_with_digest(zip_file_data, output)
+            if incremental:
+                write_incremental_zip(args.output, write_bundle)
+            else:
+                write_bundle(output)
         else:
             with tarfile.open(fileobj=output, mode='w|') as tar:
                 info = tarfile.TarInfo(name=bundle_conf_name)
@@ -1,12 +1,17 @@
 from conductr_cli.bndl_utils import DigestReaderWriter, file_write_bytes
+from conductr_cli.constants import DOCKER_VERIFIED_LAYERS_FILE_NAME, IO_CHUNK_SIZE
 import gzip
 import hashlib
 import json
 import os
+import re
 import shutil
 import tempfile
 
 
+SHA256_HEX_DIGEST = re.compile('^[0-9a-f]{64}$')
+
+
 def docker_parse_image_name(name):
     """
     Parses a docker image name into a tuple containing the name and tag. Examples:
@@ -188,12 +193,15 @@ def docker_unpack(destination, data, is_dir, maybe_name, maybe_tag):
 
         file_write_bytes(os.path.join(destination, 'oci-layout'), '{"imageLayoutVersion": "1.0.0"}'.encode('UTF-8'))
 
+        # Only the layers of a layout marked by the docker resolver are taken to have the digest they're named after
+        layers_verified = is_dir and os.path.isfile(os.path.join(data, DOCKER_VERIFIED_LAYERS_FILE_NAME))
+
         layers_to_digests = {}
         symlinks = {}
         digests = {}
         sizes = {}
 
-        def handle_entry(name, fileobj, isdir, isfile, issym, top):
+        def handle_entry(name, fileobj, isdir, isfile, issym, top, path=None):
             parent_dir = os.path.dirname(name)
             immediate_parent_dir = os.path.basename(parent_dir)
 
@@ -232,6 +240,43 @@ def docker_unpack(destination, data, is_dir, maybe_name, maybe_tag):
                     layers_to_digests[os.path.join(immediate_parent_dir, file_name)] = dest_file_hexdigest
 
                 os.renames(dest_path, '{}/blobs/sha256/{}'.format(destination, dest_file_hexdigest))
+            elif isfile and file_name == 'layer.tar.gz':
+                # Layers which are already compressed, e.g. as fetched from a registry by the docker resolver, are
+                # OCI layers as they are. They're linked into the blobs rather than copied where possible, and a
+                # layer named after its digest in a layout marked as verified by the docker resolver isn't read.
+
+                if path is None:
+                    dest_path = os.path.join(temp_dir, 'layers', parent_dir, 'data')
+
+                    with open(dest_path, 'wb') as dest_file:
+                        dest_file_digest = DigestReaderWriter(dest_file)
+                        shutil.copyfileobj(fileobj, dest_file_digest)
+
+                    dest_file_hexdigest = dest_file_digest.digest_out.hexdigest()
+                    dest_file_size = dest_file_digest.size_out
+                elif layers_verified and SHA256_HEX_DIGEST.match(immediate_parent_dir):
+                    dest_file_hexdigest = immediate_parent_dir
+                    dest_file_size = os.path.getsize(path)
+                else:
+                    digest = hashlib.sha256()
+                    for chunk in iter(lambda: fileobj.read(IO_CHUNK_SIZE), b''):
+                        digest.update(chunk)
+
+                    dest_file_hexdigest = digest.hexdigest()
+                    dest_file_size = os.path.getsize(path)
+
+                sizes[dest_file_hexdigest] = dest_file_size
+                layers_to_digests[os.path.join(immediate_parent_dir, file_name)] = dest_file_hexdigest
+
+                blob_path = '{}/blobs/sha256/{}'.format(destination, dest_file_hexdigest)
+
+                if path is None:
+                    os.renames(dest_path, blob_path)
+                elif not os.path.exists(blob_path):
+                    try:
+                        os.link(path, blob_path)
+                    except OSError:
+                        shutil.copyfile(path, blob_path)
             else:
                 with open(os.path.join(temp_dir, 'layers', parent_dir, file_name), 'wb') as dest:
                     shutil.copyfileobj(fileobj, dest)
@@ -242,7 +287,7 @@ def docker_unpack(destination, data, is_dir, maybe_name, maybe_tag):
                     name = os.path.join(base, file)
 
                     with open(name, 'rb') as fileobj:
-                        handle_entry(name, fileobj, isdir=False, isfile=True, issym=False, top=data)
+                        handle_entry(name, fileobj, isdir=False, isfile=True, issym=False, top=data, path=name)
         else:
             for entry in data:
                 if entry.isfile():
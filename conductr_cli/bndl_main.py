@@ -1,4 +1,4 @@
-from conductr_cli import logging_setup
+from conductr_cli import logging_setup, shazar_main
 from conductr_cli.endpoint import Endpoint, AmbigousBindProtocolError
 from conductr_cli.bndl_create import bndl_create
 from conductr_cli.bndl_utils import ApplicationType, BndlFormat
@@ -536,6 +536,8 @@ def build_parser():
                         dest='use_shazar',
                         action='store_false')
 
+    shazar_main.add_zip_arguments(parser)
+
     parser.add_argument('-o', '--output',
                         nargs='?',
                         help='The target output file\n'
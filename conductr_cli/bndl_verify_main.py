@@ -0,0 +1,68 @@
+from conductr_cli import bundle_utils, logging_setup
+from conductr_cli.exceptions import BundleDigestMismatchError
+import argcomplete
+import argparse
+import logging
+import sys
+
+
+def run(argv=None):
+    parser = build_parser()
+    argcomplete.autocomplete(parser)
+    args = parser.parse_args(argv)
+
+    logging_setup.configure_logging(args)
+
+    sys.exit(args.func(args))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bndl-verify',
+                                     description='Verify the content of bundles against their digest trailers')
+
+    parser.add_argument('-q',
+                        help='Print the names of the verified bundles only',
+                        default=False,
+                        dest='quiet',
+                        action='store_true')
+
+    parser.add_argument('bundles',
+                        help='The paths to the bundle files',
+                        metavar='BUNDLE',
+                        nargs='+')
+
+    parser.set_defaults(func=verify)
+
+    return parser
+
+
+def verify(args):
+    """
+    Verifies each of the bundles against its digest trailer. Returns the exit code, i.e. `0` if all of the bundles
+    have been verified or `1` if any of them has no digest or a digest that doesn't match its content.
+    """
+    log = logging.getLogger(__name__)
+
+    exit_code = 0
+
+    for bundle in args.bundles:
+        try:
+            digest = bundle_utils.verify_digest(bundle)
+        except BundleDigestMismatchError as e:
+            log.error('{}: FAILED expected {}, actual {}'.format(bundle, e.expected_digest, e.actual_digest))
+            exit_code = 1
+        except OSError as e:
+            log.error('{}: {}'.format(bundle, e.strerror))
+            exit_code = 1
+        else:
+            if digest is None:
+                log.error('{}: FAILED no digest to verify'.format(bundle))
+                exit_code = 1
+            else:
+                algorithm, hex_digest = digest
+                if log.is_info_enabled():
+                    log.info('{}: OK {}/{}'.format(bundle, algorithm, hex_digest))
+                else:
+                    log.quiet(bundle)
+
+    return exit_code
@@ -0,0 +1,226 @@
+"""Run, stop and unload of several bundles within a single `conduct` command.
+
+The bundles are given as several bundle ids or names, or are selected by name prefix, role or tag. The requests are
+sent through a bounded pool of workers, and the bundles are then waited upon together using a single subscription to
+the bundle events along with one progress line for all of them.
+"""
+from conductr_cli import bundle_installation, bundle_scale, bundle_utils, conduct_url, control_protocol, sse_hub
+from conductr_cli.exceptions import WaitTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from requests.exceptions import HTTPError
+import copy
+import logging
+
+
+# The maximum number of bundle requests sent at a time.
+DEFAULT_BULK_PARALLELISM = 8
+
+
+def is_bulk(args):
+    """
+    Returns `True` if the command addresses more than the single bundle given by `args.bundle`, i.e. if further
+    bundles are given or selected by name prefix, role or tag.
+    """
+    return bool(vars(args).get('bundles')) or has_selector(args)
+
+
+def has_selector(args):
+    return any(vars(args).get(selector) for selector in ['name_prefix', 'role', 'tag'])
+
+
+def is_selected(bundle, args):
+    attributes = bundle['attributes']
+    name_prefix = vars(args).get('name_prefix')
+    role = vars(args).get('role')
+    tag = vars(args).get('tag')
+
+    return (not name_prefix or attributes['bundleName'].startswith(name_prefix)) and \
+        (not role or role in attributes.get('roles', [])) and \
+        (not tag or tag in attributes.get('tags', []))
+
+
+def select_bundles(args):
+    """
+    Returns the given bundle ids or names, followed by the ids of the bundles which match all of the selectors.
+    """
+    bundles = ([args.bundle] if vars(args).get('bundle') else []) + (vars(args).get('bundles') or [])
+
+    if has_selector(args):
+        bundles += [bundle['bundleId'] for bundle in control_protocol.get_bundles(args) if is_selected(bundle, args)]
+
+    selected_bundles = []
+    for bundle in bundles:
+        if bundle not in selected_bundles:
+            selected_bundles.append(bundle)
+    return selected_bundles
+
+
+def run(args):
+    return apply(args, control_protocol.run_bundle, 'run', is_run_scale_met, 'started')
+
+
+def stop(args):
+    return apply(args, control_protocol.stop_bundle, 'stop', is_stop_scale_met, 'stopped')
+
+
+def unload(args):
+    return apply(args, control_protocol.unload_bundle, 'unload', is_uninstalled, 'unloaded')
+
+
+def apply(args, send_request, request_name, is_done, condition_name):
+    log = logging.getLogger(__name__)
+
+    bundles = select_bundles(args)
+    if not bundles:
+        log.error('No bundles to {}'.format(request_name))
+        return False
+
+    bundle_ids, failed_bundles = send_requests(args, bundles, send_request, request_name)
+    log.info('Bundle {} request sent for {} of {} bundles.'.format(request_name, len(bundle_ids), len(bundles)))
+
+    if bundle_ids and not args.no_wait:
+        failed_bundles += wait_for_bundles(bundle_ids, is_done, condition_name, args)
+
+    if not args.disable_instructions:
+        log.info('Print ConductR info with: {} info{}'.format(args.command, args.cli_parameters))
+
+    if not log.is_info_enabled() and log.is_quiet_enabled():
+        for bundle_id in bundle_ids:
+            if bundle_id not in failed_bundles:
+                log.quiet(bundle_id)
+
+    return not failed_bundles
+
+
+def send_requests(args, bundles, send_request, request_name):
+    """
+    Sends the request for each of the bundles using at most `args.parallelism` workers.
+    Returns the ids of the bundles which have accepted the request, and the bundles which have not.
+    """
+    log = logging.getLogger(__name__)
+
+    def send_bundle_request(bundle):
+        bundle_args = copy.copy(args)
+        bundle_args.bundle = bundle
+        return send_request(bundle_args)['bundleId']
+
+    parallelism = vars(args).get('parallelism') or DEFAULT_BULK_PARALLELISM
+    with ThreadPoolExecutor(max_workers=min(parallelism, len(bundles))) as executor:
+        futures = [(bundle, executor.submit(send_bundle_request, bundle)) for bundle in bundles]
+
+    bundle_ids = []
+    failed_bundles = []
+    for bundle, future in futures:
+        try:
+            bundle_ids.append(future.result())
+        except HTTPError as e:
+            log.error('Unable to {} bundle {}: {} {}'.format(request_name, bundle, e.response.status_code,
+                                                             e.response.reason))
+            failed_bundles.append(bundle)
+
+    return bundle_ids, failed_bundles
+
+
+def is_run_scale_met(bundle, args):
+    bundle_execution_count, has_error = bundle_scale.scale_of(bundle, wait_for_is_active=True)
+    if has_error:
+        return None
+    return bundle_execution_count == args.scale
+
+
+def is_stop_scale_met(bundle, args):
+    bundle_execution_count, _ = bundle_scale.scale_of(bundle, wait_for_is_active=False)
+    return bundle_execution_count == 0
+
+
+def is_uninstalled(bundle, args):
+    installation_count = len(bundle['bundleInstallations']) if bundle and 'bundleInstallations' in bundle else 0
+    return bundle_installation.is_uninstalled(installation_count)
+
+
+def wait_for_bundles(bundle_ids, is_done, condition_name, args):
+    """
+    Waits for all of the given bundles to satisfy `is_done`, which returns `True` once the bundle is done, `False`
+    while it is pending, or `None` if the bundle has an error. Errors are ignored for the first
+    `bundle_scale.IGNORE_ERROR_FIRST_SECONDS` to allow the bundles to correct themselves.
+
+    A single subscription to the bundle events is shared by all of the bundles, and the state of all pending bundles
+    is retrieved with one request whenever any of them has changed.
+    Returns the bundles which have an error.
+    """
+    log = logging.getLogger(__name__)
+    start_time = datetime.now()
+
+    pending_bundles = list(bundle_ids)
+    failed_bundles = []
+
+    def update_pending_bundles():
+        elapsed = (datetime.now() - start_time).total_seconds()
+        ignore_error = elapsed <= bundle_scale.IGNORE_ERROR_FIRST_SECONDS
+
+        bundles = {bundle['bundleId']: bundle for bundle in control_protocol.get_bundles(args)}
+        for bundle_id in list(pending_bundles):
+            done = is_done(bundles.get(bundle_id), args)
+            if done:
+                pending_bundles.remove(bundle_id)
+            elif done is None and not ignore_error:
+                pending_bundles.remove(bundle_id)
+                failed_bundles.append(bundle_id)
+
+    def progress_message():
+        return '{} of {} bundles {}'.format(len(bundle_ids) - len(pending_bundles) - len(failed_bundles),
+                                            len(bundle_ids), condition_name)
+
+    update_pending_bundles()
+    if pending_bundles:
+        sse_heartbeat_count_after_event = 0
+
+        last_log_message = progress_message()
+        log.progress(last_log_message, flush=False)
+
+        bundle_events_url = conduct_url.url('bundles/events', args)
+        sse_events = sse_hub.subscribe(args.dcos_mode, conduct_url.conductr_host(args), bundle_events_url,
+                                       auth=args.conductr_auth, verify=args.server_verification_file)
+        for event in sse_events:
+            # Events of bundles which are not waited upon can't change the state of the pending bundles
+            if event.event:
+                event_bundle_id = bundle_utils.get_event_bundle_id(event)
+                if event_bundle_id is not None and event_bundle_id not in pending_bundles:
+                    continue
+
+            sse_heartbeat_count_after_event += 1
+
+            elapsed = (datetime.now() - start_time).total_seconds()
+            if elapsed > args.wait_timeout:
+                log.progress(last_log_message, flush=True)
+                raise WaitTimeoutError('{} waiting to be {}'.format(', '.join(pending_bundles), condition_name))
+
+            # Check for the pending bundles every 3 heartbeats from the last received event.
+            if event.event or (sse_heartbeat_count_after_event % 3 == 0):
+                if event.event:
+                    sse_heartbeat_count_after_event = 0
+
+                update_pending_bundles()
+
+                if not pending_bundles:
+                    log.progress(progress_message(), flush=True)
+                    break
+                elif not last_log_message.startswith(progress_message()):
+                    # Reprint previous message with flush to go to next line
+                    log.progress(last_log_message, flush=True)
+                    last_log_message = progress_message()
+                else:
+                    last_log_message = '{}.'.format(last_log_message)
+                log.progress(last_log_message, flush=False)
+        else:
+            log.progress(last_log_message, flush=True)
+            raise WaitTimeoutError('{} waiting to be {}'.format(', '.join(pending_bundles), condition_name))
+
+    for bundle_id in failed_bundles:
+        log.error('Bundle {} has error'.format(bundle_id))
+
+    if not failed_bundles:
+        log.info('All {} bundles {}'.format(len(bundle_ids), condition_name))
+
+    return failed_bundles
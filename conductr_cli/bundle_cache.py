@@ -0,0 +1,260 @@
+"""Content-addressable store of the files within the bundle and configuration resolve cache directories.
+
+Each cached file is stored once as an object named after the sha-256 of its content. The cached files themselves are
+hard links to their objects, so the same bundle resolved into several cache directories, or by several resolvers,
+only takes up its space once. Where a hard link can't be created, e.g. across file systems, the object is a copy.
+
+The index file of the store records the size and last use of each object along with the cached files linking to it.
+Once the objects exceed the quota of the store, the least recently used objects are evicted together with their
+cached files. The index is updated while holding the lock file of the store, so that concurrent commands don't
+lose each other's updates.
+"""
+from conductr_cli.constants import DEFAULT_CACHE_STORE_DIR, IO_CHUNK_SIZE
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+INDEX_FILE_NAME = 'index.json'
+LOCK_FILE_NAME = 'index.lock'
+OBJECTS_DIR_NAME = 'objects'
+
+
+def store_dir(args):
+    return vars(args).get('cache_store_dir') or DEFAULT_CACHE_STORE_DIR
+
+
+def object_path(store, digest):
+    return os.path.join(store, OBJECTS_DIR_NAME, digest[:2], digest)
+
+
+def file_digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(IO_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@contextmanager
+def locked(store):
+    """
+    Holds the exclusive lock of the store, waiting for any other command holding it.
+    """
+    os.makedirs(store, mode=0o700, exist_ok=True)
+    with open(os.path.join(store, LOCK_FILE_NAME), 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_index(store):
+    """
+    Returns the index of the store, i.e. the `objects` keyed by digest with their `size` and `last_used` time, and the
+    cached files as `paths` keyed by absolute path with the digest of their object.
+    """
+    try:
+        with open(os.path.join(store, INDEX_FILE_NAME), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {'objects': {}, 'paths': {}}
+
+
+def save_index(store, index):
+    # Replace the index as a whole so that a concurrent command never reads a partially written index
+    os.makedirs(store, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=store, prefix='{}.'.format(INDEX_FILE_NAME))
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump(index, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(store, INDEX_FILE_NAME))
+
+
+def add(store, paths):
+    """
+    Adds the given cached files to the store, replacing each file with a link to an existing object of the same
+    content. Files which are already linked to their object are only marked as used.
+    Returns the digests of the files.
+    """
+    with locked(store):
+        index = load_index(store)
+        digests = [add_path(store, index, os.path.abspath(path)) for path in paths]
+        save_index(store, index)
+    return digests
+
+
+def add_path(store, index, path):
+    digest = index['paths'].get(path)
+    if digest is None or not is_linked(store, digest, path):
+        digest = file_digest(path)
+        stored_object = object_path(store, digest)
+        if os.path.exists(stored_object):
+            link(stored_object, path)
+        else:
+            os.makedirs(os.path.dirname(stored_object), mode=0o700, exist_ok=True)
+            try:
+                os.link(path, stored_object)
+            except OSError:
+                shutil.copyfile(path, stored_object)
+        index['paths'][path] = digest
+
+    entry = index['objects'].setdefault(digest, {'size': os.path.getsize(object_path(store, digest))})
+    entry['last_used'] = time.time()
+    return digest
+
+
+def is_linked(store, digest, path):
+    stored_object = object_path(store, digest)
+    return os.path.exists(path) and os.path.exists(stored_object) and os.path.samefile(path, stored_object)
+
+
+def link(stored_object, path):
+    """
+    Replaces the file at `path` with a hard link to the given object. The file is kept as it is if the link can't be
+    created.
+    """
+    tmp_path = '{}.link'.format(path)
+    try:
+        os.link(stored_object, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def paths_of(index, digest):
+    return sorted([path for path, path_digest in index['paths'].items() if path_digest == digest])
+
+
+def remove_object(store, index, digest):
+    for path in paths_of(index, digest):
+        if os.path.exists(path):
+            os.remove(path)
+        del index['paths'][path]
+
+    stored_object = object_path(store, digest)
+    if os.path.exists(stored_object):
+        os.remove(stored_object)
+
+    return index['objects'].pop(digest, None)
+
+
+def evict(store, quota, keep=()):
+    """
+    Evicts the least recently used objects until the objects take up no more than `quota` bytes. The objects of the
+    given `keep` digests are not evicted.
+    Returns the digests and sizes of the evicted objects.
+    """
+    with locked(store):
+        index = load_index(store)
+        evicted = evict_index(store, index, quota, keep)
+        if evicted:
+            save_index(store, index)
+    return evicted
+
+
+def evict_index(store, index, quota, keep=()):
+    total_size = sum(entry['size'] for entry in index['objects'].values())
+    least_recently_used = sorted(index['objects'].items(), key=lambda item: item[1].get('last_used', 0))
+
+    evicted = []
+    for digest, entry in least_recently_used:
+        if total_size <= quota:
+            break
+        elif digest not in keep:
+            remove_object(store, index, digest)
+            total_size -= entry['size']
+            evicted.append((digest, entry['size']))
+
+    return evicted
+
+
+def gc(store, quota):
+    """
+    Removes the cached files which are no longer in place from the index, along with the objects which aren't used by
+    any cached file. The remaining objects are then evicted down to the `quota`.
+    Returns the digests and sizes of the removed objects.
+    """
+    with locked(store):
+        index = load_index(store)
+
+        for path in list(index['paths']):
+            if not os.path.exists(path):
+                del index['paths'][path]
+
+        used_digests = set(index['paths'].values())
+        removed = [(digest, remove_object(store, index, digest)['size'])
+                   for digest in list(index['objects']) if digest not in used_digests]
+
+        # Objects left behind by an interrupted command aren't known to the index
+        objects_dir = os.path.join(store, OBJECTS_DIR_NAME)
+        for dir_path, _, file_names in os.walk(objects_dir):
+            for file_name in file_names:
+                if file_name not in index['objects']:
+                    file_path = os.path.join(dir_path, file_name)
+                    removed.append((file_name, os.path.getsize(file_path)))
+                    os.remove(file_path)
+
+        removed += evict_index(store, index, quota)
+
+        save_index(store, index)
+
+    return removed
+
+
+def verify(store):
+    """
+    Verifies the content of each object against its digest. Objects which are missing or corrupted are removed along
+    with their cached files, so that they are resolved again when next used.
+    Returns the digests of the objects which have been removed.
+    """
+    with locked(store):
+        index = load_index(store)
+
+        removed = []
+        for digest in list(index['objects']):
+            stored_object = object_path(store, digest)
+            if not os.path.exists(stored_object) or file_digest(stored_object) != digest:
+                remove_object(store, index, digest)
+                removed.append(digest)
+
+        if removed:
+            save_index(store, index)
+
+    return removed
+
+
+def entries(store):
+    """
+    Returns the objects of the store as dicts of `digest`, `size`, `last_used` and `paths`, the most recently used
+    object first.
+    """
+    index = load_index(store)
+    return sorted([{'digest': digest,
+                    'size': entry['size'],
+                    'last_used': entry.get('last_used', 0),
+                    'paths': paths_of(index, digest)}
+                   for digest, entry in index['objects'].items()],
+                  key=lambda entry: entry['last_used'],
+                  reverse=True)
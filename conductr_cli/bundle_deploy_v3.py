@@ -1,4 +1,4 @@
-from conductr_cli import conduct_url, conduct_request, sse_client
+from conductr_cli import conduct_url, conduct_request, sse_hub
 from conductr_cli.bundle_deploy import display_bundle_id
 from conductr_cli.exceptions import ContinuousDeliveryError, WaitTimeoutError
 from datetime import datetime
@@ -123,8 +123,8 @@ def wait_for_deployment_complete(deployment_batch_id, args):
         sse_heartbeat_count_after_event = 0
 
         deployment_events_url = conduct_url.url('deployments/events', args)
-        sse_events = sse_client.get_events(args.dcos_mode, conduct_url.conductr_host(args), deployment_events_url,
-                                           auth=args.conductr_auth, verify=args.server_verification_file)
+        sse_events = sse_hub.subscribe(args.dcos_mode, conduct_url.conductr_host(args), deployment_events_url,
+                                       auth=args.conductr_auth, verify=args.server_verification_file)
         for event in sse_events:
             sse_heartbeat_count_after_event += 1
 
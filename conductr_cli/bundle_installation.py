@@ -3,15 +3,13 @@ from __future__ import unicode_literals
 import logging
 from datetime import datetime
 
-from conductr_cli import conduct_url, sse_client, control_protocol
+from conductr_cli import bundle_utils, conduct_url, sse_hub, control_protocol
 from conductr_cli.exceptions import WaitTimeoutError
 
 
 def count_installations(bundle_id, args):
-    bundles = control_protocol.get_bundles(args)
-    matching_bundles = [bundle for bundle in bundles if bundle['bundleId'] == bundle_id]
-    if matching_bundles:
-        matching_bundle = matching_bundles[0]
+    matching_bundle = control_protocol.get_bundle(args, bundle_id)
+    if matching_bundle:
         if 'bundleInstallations' in matching_bundle:
             return len(matching_bundle['bundleInstallations'])
 
@@ -40,15 +38,19 @@ def wait_for_condition(bundle_id, condition, condition_name, args):
 
         log.info('Bundle {} waiting to be {}'.format(bundle_id, condition_name))
         bundle_events_url = conduct_url.url('bundles/events', args)
-        sse_events = sse_client.get_events(args.dcos_mode, conduct_url.conductr_host(args), bundle_events_url,
-                                           auth=args.conductr_auth, verify=args.server_verification_file)
+        sse_events = sse_hub.subscribe(args.dcos_mode, conduct_url.conductr_host(args), bundle_events_url,
+                                       auth=args.conductr_auth, verify=args.server_verification_file)
         for event in sse_events:
-            sse_heartbeat_count_after_event += 1
-
             elapsed = (datetime.now() - start_time).total_seconds()
             if elapsed > args.wait_timeout:
                 raise WaitTimeoutError('Bundle {} waiting to be {}'.format(bundle_id, condition_name))
 
+            # Events of other bundles can't change the state of this bundle
+            if event.event and bundle_utils.is_other_bundle_event(event, bundle_id):
+                continue
+
+            sse_heartbeat_count_after_event += 1
+
             # Check for installed bundles every 3 heartbeats from the last received event.
             if event.event or (sse_heartbeat_count_after_event % 3 == 0):
                 if event.event:
@@ -1,5 +1,5 @@
 from __future__ import unicode_literals
-from conductr_cli import conduct_events, conduct_logs, conduct_url, sse_client, control_protocol
+from conductr_cli import bundle_utils, conduct_events, conduct_logs, conduct_url, sse_hub, control_protocol
 from conductr_cli.exceptions import BundleScaleError, WaitTimeoutError
 from datetime import datetime
 from requests import HTTPError
@@ -10,14 +10,16 @@ IGNORE_ERROR_FIRST_SECONDS = 10  # The number of seconds where bundle error will
 
 
 def get_scale(bundle_id, wait_for_is_active, args):
-    bundles = control_protocol.get_bundles(args)
-    matching_bundles = [bundle for bundle in bundles if bundle['bundleId'] == bundle_id]
-    if matching_bundles:
-        matching_bundle = matching_bundles[0]
-        has_error = matching_bundle['hasError']
-        if 'bundleExecutions' in matching_bundle:
+    matching_bundle = control_protocol.get_bundle(args, bundle_id)
+    return scale_of(matching_bundle, wait_for_is_active)
+
+
+def scale_of(bundle, wait_for_is_active):
+    if bundle:
+        has_error = bundle['hasError']
+        if 'bundleExecutions' in bundle:
             started_executions = [bundle_execution
-                                  for bundle_execution in matching_bundle['bundleExecutions']
+                                  for bundle_execution in bundle['bundleExecutions']
                                   if not wait_for_is_active or bundle_execution['isStarted']]
             return len(started_executions), has_error
 
@@ -38,17 +40,21 @@ def wait_for_scale(bundle_id, expected_scale, wait_for_is_active, args):
 
         log.info('Bundle {} waiting to reach expected scale {}'.format(bundle_id, expected_scale))
         bundle_events_url = conduct_url.url('bundles/events', args)
-        sse_events = sse_client.get_events(args.dcos_mode, conduct_url.conductr_host(args), bundle_events_url,
-                                           auth=args.conductr_auth, verify=args.server_verification_file)
+        sse_events = sse_hub.subscribe(args.dcos_mode, conduct_url.conductr_host(args), bundle_events_url,
+                                       auth=args.conductr_auth, verify=args.server_verification_file)
         last_scale = -1
         last_log_message = None
         for event in sse_events:
-            sse_heartbeat_count_after_event += 1
-
             elapsed = (datetime.now() - start_time).total_seconds()
             if elapsed > args.wait_timeout:
                 raise WaitTimeoutError('Bundle {} waiting to reach expected scale {}'.format(bundle_id, expected_scale))
 
+            # Events of other bundles can't change the scale of this bundle
+            if event.event and bundle_utils.is_other_bundle_event(event, bundle_id):
+                continue
+
+            sse_heartbeat_count_after_event += 1
+
             # Check for bundle scale every 3 heartbeats from the last received event.
             if event.event or (sse_heartbeat_count_after_event % 3 == 0):
                 if event.event:
@@ -1,13 +1,47 @@
 from conductr_cli.constants import DIGEST_TRAIL_SIZE, IO_CHUNK_SIZE
+from conductr_cli.exceptions import BundleDigestMismatchError
+import hashlib
+import json
+import io
 import os
-import tempfile
 from zipfile import ZipFile
 
 
+# The hash algorithms of the digest trailers, keyed by the name used within the trailer.
+DIGEST_ALGORITHMS = {
+    'sha-256': hashlib.sha256
+}
+
+
 def short_id(bundle_id):
     return '-'.join([part[:7] for part in bundle_id.split('-')])
 
 
+def is_other_bundle_event(event, bundle_id):
+    """
+    Returns `True` if the data of the given SSE event identifies a bundle other than the given `bundle_id`.
+    Events without bundle identifying data can't be excluded, and as such `False` is returned.
+    """
+    event_bundle_id = get_event_bundle_id(event)
+    return event_bundle_id is not None and event_bundle_id != bundle_id
+
+
+def get_event_bundle_id(event):
+    """
+    Returns the id of the bundle identified by the data of the given SSE event, or `None` if there is no such data.
+    """
+    if event.data:
+        try:
+            data = json.loads(event.data)
+        except ValueError:
+            return None
+
+        if isinstance(data, dict) and 'bundleId' in data:
+            return data['bundleId']
+
+    return None
+
+
 def conf(bundle_path):
     bundle_zip = ZipFile(bundle_path)
     bundle_configurations = [bundle_zip.read(name) for name in bundle_zip.namelist() if name.endswith('bundle.conf')]
@@ -19,40 +53,66 @@ def digest_extract_and_open(path):
     Inspects a given `path` for a digest marker at the end of the file and returns
     an open file object that will not include the digest.
 
+    The file object returned for a file with a digest is a `BoundedFile` which ends where the digest starts, so the
+    bundle is read directly from the given `path` rather than being copied beforehand. The content is verified against
+    the digest as it is read, raising `BundleDigestMismatchError` once the end of a corrupted file is reached.
+
     :param path:
     :return: file object without digest, possible digest
     """
 
     input = open(path, 'rb')
-    input.seek(
-        -DIGEST_TRAIL_SIZE,
-        os.SEEK_END
-    )
+    file_size = os.fstat(input.fileno()).st_size
+    trail_offset = max(0, file_size - DIGEST_TRAIL_SIZE)
+    input.seek(trail_offset)
     digest, trailer_starts, trailer_len = digest_calculate(input.read())
     input.seek(0)
 
-    if trailer_len > 0:
-        output = tempfile.NamedTemporaryFile()
-        reader = DigestedRead(input)
-        done = False
+    if digest is not None:
+        return BoundedFile(input, trail_offset + trailer_starts, digest), digest
+    else:
+        return input, None
+
 
-        while not done:
-            chunk = reader.read(IO_CHUNK_SIZE)
+def verify_digest(path):
+    """
+    Verifies the content of the file at the given `path` against its digest trailer.
 
-            if chunk:
-                output.write(chunk)
-            else:
-                done = True
+    :param path:
+    :return: the digest, or `None` if the file has no digest trailer
+    :raises BundleDigestMismatchError: if the content doesn't match the digest
+    """
+    open_file, digest = digest_extract_and_open(path)
+    with open_file:
+        if digest is not None:
+            while open_file.read(IO_CHUNK_SIZE):
+                pass
 
-        output.seek(0)
+    return digest
 
-        return output, digest
-    else:
-        return input, None
+
+def digest_hash(digest):
+    """
+    Returns a new hash object of the algorithm of the given digest, i.e. a `(algorithm, hex digest)` tuple.
+    """
+    algorithm, _ = digest
+    return DIGEST_ALGORITHMS[algorithm]()
+
+
+def digest_verify(file_name, digest, content_hash):
+    """
+    Raises `BundleDigestMismatchError` if the given hash object doesn't match the given digest.
+    """
+    algorithm, expected_hex_digest = digest
+    actual_hex_digest = content_hash.hexdigest()
+    if actual_hex_digest != expected_hex_digest:
+        raise BundleDigestMismatchError(file_name,
+                                        '{}/{}'.format(algorithm, expected_hex_digest),
+                                        '{}/{}'.format(algorithm, actual_hex_digest))
 
 
 def digest_calculate(data):
-    digests = ['sha-256']
+    digests = DIGEST_ALGORITHMS.keys()
     digest = None
     trailer_starts = None
     trailer_bytes = []
@@ -77,12 +137,20 @@ def digest_calculate(data):
 
 
 class DigestedRead(object):
-    def __init__(self, r):
+    """
+    Reads a stream which may end with a digest trailer, emitting the content without the trailer. The content is hashed
+    as it is emitted, and once the stream is exhausted `digest` holds the trailing digest, if any. If `verify` is
+    enabled, the final read raises `BundleDigestMismatchError` if the content doesn't match the digest.
+    """
+    def __init__(self, r, verify=False, name=None):
         self.reader = r
         self.digest = None
         self.buffer = b''
         self.done = False
         self.emitted = 0
+        self.verify = verify
+        self.name = name if name is not None else getattr(r, 'name', None)
+        self.sha256 = hashlib.sha256()
 
     def read(self, num_bytes):
         if self.done:
@@ -99,6 +167,7 @@ class DigestedRead(object):
                     self.buffer = self.buffer[-DIGEST_TRAIL_SIZE:]
 
                     self.emitted += len(data)
+                    self.sha256.update(data)
 
                     return data
                 else:
@@ -112,7 +181,137 @@ class DigestedRead(object):
                 return_value = self.buffer if digest is None else self.buffer[0:trailer_starts]
 
                 self.emitted += len(return_value)
+                self.sha256.update(return_value)
 
                 self.buffer = b''
 
+                if self.verify and digest is not None:
+                    digest_verify(self.name, digest, self.sha256)
+
                 return return_value
+
+
+class DigestedWrite(object):
+    """
+    Hashes the content of a file as it is written chunk by chunk, e.g. as it is downloaded, so that the file can be
+    verified against its digest trailer, if any, without being read back. The last `DIGEST_TRAIL_SIZE` bytes are held
+    back until the end of the file, as they may hold the trailer. `size` is the number of bytes written so far.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hashes = {algorithm: hash_algorithm() for algorithm, hash_algorithm in DIGEST_ALGORITHMS.items()}
+        self.tail = b''
+        self.size = 0
+
+    def update(self, chunk):
+        self.size += len(chunk)
+        self.tail += chunk
+
+        if len(self.tail) > DIGEST_TRAIL_SIZE:
+            data = self.tail[:-DIGEST_TRAIL_SIZE]
+            self.tail = self.tail[-DIGEST_TRAIL_SIZE:]
+
+            for content_hash in self.hashes.values():
+                content_hash.update(data)
+
+    def verify(self, file_name):
+        """
+        Verifies the content written against its digest trailer.
+
+        :return: the digest, or `None` if the content has no digest trailer
+        :raises BundleDigestMismatchError: if the content doesn't match the digest
+        """
+        digest, trailer_starts, _ = digest_calculate(self.tail)
+
+        if digest is None or trailer_starts is None:
+            return None
+
+        content_hash = self.hashes[digest[0]].copy()
+        content_hash.update(self.tail[:trailer_starts])
+        digest_verify(file_name, digest, content_hash)
+
+        return digest
+
+
+class BoundedFile(io.RawIOBase):
+    """
+    Read-only view of the first `length` bytes of an open binary file, e.g. the content of a bundle preceding its
+    digest trailer. Reads are passed through to the underlying file, which is closed along with this view.
+
+    The `len` property is the length of the view, which is used in place of the size of the underlying file when the
+    view is streamed as a part of a `MultipartEncoder`.
+
+    If a `digest` is given, the content is hashed while it is read from start to end, and reaching the end raises
+    `BundleDigestMismatchError` if the content doesn't match the digest. Seeking back to the start restarts the hash,
+    whereas the content is not verified once it has been read out of order.
+    """
+    def __init__(self, file, length, digest=None):
+        self.file = file
+        self.length = length
+        self.position = 0
+        self.digest = digest
+        self.digest_hash = digest_hash(digest) if digest is not None else None
+        self.hashed_position = 0
+
+    @property
+    def name(self):
+        return self.file.name
+
+    @property
+    def len(self):
+        return self.length
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.length - self.position)
+        if size <= 0:
+            return 0
+
+        with memoryview(buffer) as view:
+            read_size = self.file.readinto(view[:size])
+
+            if self.digest_hash is not None and self.position == self.hashed_position:
+                self.digest_hash.update(view[:read_size])
+                self.hashed_position += read_size
+
+                if self.hashed_position == self.length:
+                    digest_verify(self.name, self.digest, self.digest_hash)
+
+        self.position += read_size
+        return read_size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self.position + offset
+        elif whence == io.SEEK_END:
+            position = self.length + offset
+        else:
+            raise ValueError('Invalid whence ({})'.format(whence))
+
+        if position < 0:
+            raise ValueError('Negative seek position {}'.format(position))
+
+        if position == 0 and self.digest is not None:
+            self.digest_hash = digest_hash(self.digest)
+            self.hashed_position = 0
+
+        self.position = position
+        self.file.seek(min(position, self.length))
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def close(self):
+        if not self.closed:
+            self.file.close()
+        super().close()
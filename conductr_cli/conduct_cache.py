@@ -0,0 +1,76 @@
+from conductr_cli import bundle_cache, screen_utils, validation
+from conductr_cli.bytes_util import natural_size
+import logging
+
+
+def cache_ls(args):
+    """`conduct cache ls` command"""
+
+    log = logging.getLogger(__name__)
+
+    entries = bundle_cache.entries(bundle_cache.store_dir(args))
+
+    data = [
+        {
+            'digest': 'DIGEST',
+            'size': 'SIZE',
+            'last_used': 'LAST USED',
+            'paths': 'FILES'
+        }
+    ]
+    for entry in entries:
+        data.append({
+            'digest': entry['digest'] if args.long_ids else entry['digest'][:7],
+            'size': natural_size(entry['size'], binary=True),
+            'last_used': validation.format_timestamp(entry['last_used'], args),
+            'paths': ', '.join(entry['paths'])
+        })
+
+    padding = 2
+    column_widths = dict(screen_utils.calc_column_widths(data), **{'padding': ' ' * padding})
+
+    for row in data:
+        log.screen('''\
+{digest: <{digest_width}}{padding}\
+{size: >{size_width}}{padding}\
+{last_used: <{last_used_width}}{padding}\
+{paths: <{paths_width}}{padding}'''.format(**dict(row, **column_widths)).rstrip())
+
+    log.screen('Total of {} in {} objects, quota of {}'.format(
+        natural_size(sum(entry['size'] for entry in entries), binary=True),
+        len(entries),
+        natural_size(args.cache_quota, binary=True)))
+
+    return True
+
+
+def cache_gc(args):
+    """`conduct cache gc` command"""
+
+    log = logging.getLogger(__name__)
+
+    removed = bundle_cache.gc(bundle_cache.store_dir(args), args.cache_quota)
+
+    for digest, size in removed:
+        log.verbose('Removed {} of {}'.format(digest, natural_size(size, binary=True)))
+
+    log.info('Removed {} objects, freeing {}'.format(len(removed),
+                                                     natural_size(sum(size for _, size in removed), binary=True)))
+
+    return True
+
+
+def cache_verify(args):
+    """`conduct cache verify` command"""
+
+    log = logging.getLogger(__name__)
+
+    removed = bundle_cache.verify(bundle_cache.store_dir(args))
+
+    for digest in removed:
+        log.error('Object {} is corrupted and has been removed along with its cached files'.format(digest))
+
+    if not removed:
+        log.info('All cached objects verified')
+
+    return not removed
@@ -12,6 +12,7 @@ DEFAULT_WAIT_TIMEOUT = 180  # seconds
 @validation.handle_no_file
 @validation.handle_bad_zip
 @validation.handle_malformed_bundle
+@validation.handle_bundle_digest_mismatch_error
 @validation.handle_bundle_resolution_error
 @validation.handle_wait_timeout_error
 @validation.handle_conduct_load_read_timeout_error
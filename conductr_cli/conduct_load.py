@@ -1,6 +1,6 @@
 from pyhocon import ConfigFactory, ConfigTree
 from pyhocon.exceptions import ConfigMissingException
-from conductr_cli import bndl_main, bundle_utils, constants, screen_utils, validation
+from conductr_cli import bndl_main, bundle_cache, bundle_utils, constants, screen_utils, validation
 from conductr_cli.exceptions import MalformedBundleError, InsecureFilePermissions
 from conductr_cli import resolver, bundle_installation
 from conductr_cli.constants import DEFAULT_BUNDLE_RESOLVE_CACHE_DIR, \
@@ -9,7 +9,6 @@ from conductr_cli.bndl_utils import BndlFormat
 from functools import partial
 from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
 
-import glob
 import io
 import os
 import stat
@@ -48,9 +47,6 @@ BNDL_ARGS = {
 # it cannot be detected from the configuration
 BNDL_ARGS_WITH_COMPONENT = ['endpoint_dicts', 'start_command_dicts', 'volume_dicts']
 
-# The number of old bundle versions to keep when performing housekeeping, apart from the recently loaded bundle.
-KEEP_BUNDLE_VERSIONS = 1
-
 
 @validation.handle_connection_error
 @validation.handle_http_error
@@ -58,6 +54,7 @@ KEEP_BUNDLE_VERSIONS = 1
 @validation.handle_no_file
 @validation.handle_bad_zip
 @validation.handle_malformed_bundle
+@validation.handle_bundle_digest_mismatch_error
 @validation.handle_bundle_resolution_error
 @validation.handle_wait_timeout_error
 @validation.handle_conduct_load_read_timeout_error
@@ -114,6 +111,9 @@ def load_v1(args):
     # if configuration_file and os.path.exists(configuration_file):
     #    os.remove(configuration_file)
 
+    if vars(args).get('verify'):
+        verify_digests(log, bundle_file, configuration_file)
+
     log.info('Loading bundle to ConductR..')
     multipart = create_multipart(log, files)
     response_json = load_bundle(args, multipart)
@@ -123,7 +123,7 @@ def load_v1(args):
     if not args.no_wait:
         bundle_installation.wait_for_installation(response_json['bundleId'], args)
 
-    cleanup_old_bundles(bundle_resolve_cache_dir, bundle_file_name, excluded=bundle_file)
+    cache_resolved_files(args, bundle_file, configuration_file)
 
     log.info('Bundle loaded.')
     if not args.disable_instructions:
@@ -281,6 +281,9 @@ def load_v2(args):
     # if configuration_file and os.path.exists(configuration_file):
     #     os.remove(configuration_file)
 
+    if vars(args).get('verify'):
+        verify_digests(log, bundle_file, configuration_file)
+
     log.info('Loading bundle to ConductR..')
     multipart = create_multipart(log, files)
 
@@ -291,7 +294,7 @@ def load_v2(args):
     if not args.no_wait:
         bundle_installation.wait_for_installation(response_json['bundleId'], args)
 
-    cleanup_old_bundles(bundle_resolve_cache_dir, bundle_file_name, excluded=bundle_file)
+    cache_resolved_files(args, bundle_file, configuration_file)
 
     log.info('Bundle loaded.')
     if not args.disable_instructions:
@@ -307,10 +310,7 @@ def load_v2(args):
 
 
 def open_bundle(bundle_file_name, bundle_file, bundle_conf):
-    # The spec allows streaming from end to end but to reduce simplicity of implementation
-    # for now we use a temp file. It is possible someday to increase efficiency here by
-    # implementing a streaming zip library and http chunked responses to load this data right
-    # into ConductR.
+    # The bundle is streamed from the given file up to its digest trailer, if any, without being copied.
 
     bundle_open_file, digest = bundle_utils.digest_extract_and_open(bundle_file)
 
@@ -328,6 +328,14 @@ def open_bundle(bundle_file_name, bundle_file, bundle_conf):
     return bundle_file_name, bundle_open_file
 
 
+def verify_digests(log, *files):
+    for file in files:
+        if file is not None:
+            log.info('Verifying {}..'.format(file))
+            if bundle_utils.verify_digest(file) is None:
+                log.warning('{} has no digest to verify'.format(file))
+
+
 def create_multipart(log, files):
     encoder = MultipartEncoder(files)
     return MultipartEncoderMonitor(encoder, conduct_load_progress_monitor(log))
@@ -361,26 +369,20 @@ def string_io(input_text):
     return io.StringIO(input_text)
 
 
-def cleanup_old_bundles(cache_dir, bundle_file_name, excluded):
-    bundle_name_parts = bundle_file_name.split('-')
-    # Remove digest, keeping only bundle name and tag
-    bundle_name = '-'.join(bundle_name_parts[:-1])
-
-    # List of bundle files having the same name and tag, sorted from oldest to latest.
-    # This list excludes the file specified as `excluded`, and normally the `excluded` file is the recently loaded
-    # bundle.
-    older_bundle_files = sorted([
-        file
-        for file in glob.glob('{}/*.zip'.format(cache_dir))
-        if os.path.isfile(file) and
-        os.path.basename(file).startswith(bundle_name) and
-        not is_same_path(file, excluded)
-    ], key=lambda f: os.path.getmtime(f))
-
-    bundle_files_to_delete = older_bundle_files[:(-1 * KEEP_BUNDLE_VERSIONS)]
-    for file in bundle_files_to_delete:
-        os.remove(file)
-
-
-def is_same_path(a, b):
-    return os.path.abspath(a) == os.path.abspath(b)
+def cache_resolved_files(args, *files):
+    """
+    Adds the given files which have been resolved into the bundle or configuration cache directories to the cache
+    store, and then evicts the least recently used cached files exceeding the quota of the store.
+    The given files are kept regardless of the quota. Directories, such as the images resolved from Docker, aren't
+    stored.
+    """
+    cache_dirs = [os.path.abspath(args.bundle_resolve_cache_dir), os.path.abspath(args.configuration_resolve_cache_dir)]
+    cached_files = [file for file in files
+                    if file is not None and os.path.dirname(os.path.abspath(file)) in cache_dirs and
+                    not os.path.isdir(file)]
+
+    if cached_files:
+        store = bundle_cache.store_dir(args)
+        quota = vars(args).get('cache_quota') or validation.argparse_size(constants.DEFAULT_CACHE_QUOTA)
+        digests = bundle_cache.add(store, cached_files)
+        bundle_cache.evict(store, quota, keep=digests)
@@ -1,16 +1,18 @@
 import argcomplete
 import argparse
 from conductr_cli import \
-    bndl_main, conduct_agents, conduct_deploy, conduct_info, conduct_load, conduct_members, conduct_run, \
+    bndl_main, bundle_bulk, conduct_agents, conduct_deploy, conduct_info, conduct_load, conduct_members, conduct_run, \
     conduct_service_names, conduct_stop, conduct_unload, version, conduct_logs, conduct_events, conduct_acls, \
     conduct_dcos, conduct_load_license, host, logging_setup, conduct_url, custom_settings, conductr_backup, \
-    conductr_restore
+    conductr_restore, conduct_cache, conduct_prefetch, resolver, validation
+from conductr_cli import http as conductr_http
+from conductr_cli.bundle_bulk import DEFAULT_BULK_PARALLELISM
 from conductr_cli.constants import \
     DEFAULT_SCHEME, DEFAULT_PORT, DEFAULT_BASE_PATH, \
     DEFAULT_API_VERSION, DEFAULT_DCOS_SERVICE, DEFAULT_CLI_SETTINGS_DIR, \
     DEFAULT_CUSTOM_SETTINGS_FILE, DEFAULT_CUSTOM_PLUGINS_DIR, DEFAULT_BUNDLE_RESOLVE_CACHE_DIR, \
     DEFAULT_CONFIGURATION_RESOLVE_CACHE_DIR, DEFAULT_WAIT_TIMEOUT, DEFAULT_OFFLINE_MODE, DEFAULT_LICENSE_DOWNLOAD_URL, \
-    LOGS_POLL_PERIOD_SECONDS
+    LOGS_POLL_PERIOD_SECONDS, DEFAULT_CACHE_STORE_DIR, DEFAULT_CACHE_QUOTA
 
 from dcos import config, constants
 
@@ -130,6 +132,21 @@ def add_configuration_resolve_cache_dir(sub_parser):
                             dest='configuration_resolve_cache_dir')
 
 
+def add_cache_store_args(sub_parser):
+    sub_parser.add_argument('--cache-store-dir',
+                            help='Directory where the content of the resolve cache directories is stored\n'
+                                 'Defaults to {}'.format(DEFAULT_CACHE_STORE_DIR),
+                            default=DEFAULT_CACHE_STORE_DIR,
+                            dest='cache_store_dir')
+    sub_parser.add_argument('--cache-quota',
+                            type=validation.argparse_size,
+                            help='The size the cached bundles and configurations may take up, e.g. 500M or 10G\n'
+                                 'The least recently used are removed once the quota is exceeded\n'
+                                 'Defaults to {}'.format(DEFAULT_CACHE_QUOTA),
+                            default=DEFAULT_CACHE_QUOTA,
+                            dest='cache_quota')
+
+
 def add_disable_instructions(sub_parser):
     sub_parser.add_argument('--disable-instructions',
                             help='Disables further instruction output after the command has been succeeded\n'
@@ -168,6 +185,45 @@ def add_no_wait(sub_parser):
                             action='store_true')
 
 
+def add_bundle_selection(sub_parser):
+    sub_parser.add_argument('bundle',
+                            nargs='?',
+                            help='The ID or name of the bundle\n'
+                                 'Further bundles may be given, or selected with --name-prefix, --role and --tag')
+    sub_parser.add_argument('bundles',
+                            nargs='*',
+                            help=argparse.SUPPRESS)
+    sub_parser.add_argument('--name-prefix',
+                            help='Selects the bundles whose name starts with the given prefix',
+                            default=None,
+                            dest='name_prefix')
+    sub_parser.add_argument('--role',
+                            help='Selects the bundles with the given role',
+                            default=None,
+                            dest='role')
+    sub_parser.add_argument('--tag',
+                            help='Selects the bundles with the given tag',
+                            default=None,
+                            dest='tag')
+    sub_parser.add_argument('--parallelism',
+                            help='The maximum number of bundle requests sent at a time when several bundles are given\n'
+                                 'Defaults to {}'.format(DEFAULT_BULK_PARALLELISM),
+                            type=int,
+                            default=DEFAULT_BULK_PARALLELISM,
+                            dest='parallelism')
+    # The bundle can only be omitted along with a selector, which is validated once the arguments are parsed
+    sub_parser.set_defaults(bundle_selection_parser=sub_parser)
+
+
+def validate_bundle_selection(args):
+    """
+    Exits with the usage of the command if it selects bundles, but neither a bundle nor a selector is given.
+    """
+    bundle_selection_parser = vars(args).pop('bundle_selection_parser', None)
+    if bundle_selection_parser and not args.bundle and not bundle_bulk.has_selector(args):
+        bundle_selection_parser.error('the following arguments are required: bundle')
+
+
 def add_dcos_mode_args(sub_parser, dcos_mode):
     if not dcos_mode:
         add_scheme_host_ip_port_and_base_path(sub_parser)
@@ -209,6 +265,16 @@ def add_offline_mode(sub_parser):
                                  'False if --offline flag not specified and environment variable not set')
 
 
+def add_refresh_metadata(sub_parser):
+    sub_parser.add_argument('--refresh-metadata',
+                            default=False,
+                            dest='refresh_metadata',
+                            action='store_true',
+                            help='Discards the cached bundle metadata, e.g. the versions resolved from Bintray,\n'
+                                 'so that it is fetched again\n'
+                                 'Defaults to False')
+
+
 def add_default_arguments(sub_parser, dcos_mode):
     add_dcos_mode_args(sub_parser, dcos_mode)
     add_verbose(sub_parser)
@@ -284,11 +350,20 @@ def build_parser(dcos_mode):
                              default=None,
                              help='The optional configuration for the bundle')
     add_offline_mode(load_parser)
+    add_refresh_metadata(load_parser)
     add_default_arguments(load_parser, dcos_mode)
     add_bundle_resolve_cache_dir(load_parser)
     add_configuration_resolve_cache_dir(load_parser)
+    add_cache_store_args(load_parser)
     add_wait_timeout(load_parser)
     add_no_wait(load_parser)
+    load_parser.add_argument('--verify',
+                             help='Verifies the bundle and configuration against their digests before loading\n'
+                                  'The digests are always verified while loading, failing once the upload completes\n'
+                                  'Defaults to False',
+                             default=False,
+                             dest='verify',
+                             action='store_true')
     bndl_main.add_conf_arguments(load_parser)
     load_parser.set_defaults(func=conduct_load.load)
 
@@ -305,8 +380,7 @@ def build_parser(dcos_mode):
     run_parser.add_argument('--affinity',
                             default=None,
                             help='The optional ID of the bundle to run alongside with (v2.0 onwards)')
-    run_parser.add_argument('bundle',
-                            help='The ID of the bundle')
+    add_bundle_selection(run_parser)
     add_default_arguments(run_parser, dcos_mode)
     add_wait_timeout(run_parser)
     add_no_wait(run_parser)
@@ -323,8 +397,7 @@ def build_parser(dcos_mode):
     stop_parser = subparsers.add_parser('stop',
                                         help='Stop a bundle',
                                         formatter_class=argparse.RawTextHelpFormatter)
-    stop_parser.add_argument('bundle',
-                             help='The ID of the bundle')
+    add_bundle_selection(stop_parser)
     add_default_arguments(stop_parser, dcos_mode)
     add_wait_timeout(stop_parser)
     add_no_wait(stop_parser)
@@ -341,8 +414,7 @@ def build_parser(dcos_mode):
     unload_parser = subparsers.add_parser('unload',
                                           help='Unload a bundle',
                                           formatter_class=argparse.RawTextHelpFormatter)
-    unload_parser.add_argument('bundle',
-                               help='The ID of the bundle')
+    add_bundle_selection(unload_parser)
     add_default_arguments(unload_parser, dcos_mode)
     add_wait_timeout(unload_parser)
     add_no_wait(unload_parser)
@@ -420,6 +492,7 @@ def build_parser(dcos_mode):
     add_custom_settings_file(deploy_parser)
     add_custom_plugins_dir(deploy_parser)
     add_offline_mode(deploy_parser)
+    add_refresh_metadata(deploy_parser)
     add_bundle_resolve_cache_dir(deploy_parser)
     add_configuration_resolve_cache_dir(deploy_parser)
     add_wait_timeout(deploy_parser, wait_timeout=conduct_deploy.DEFAULT_WAIT_TIMEOUT)
@@ -517,6 +590,64 @@ def build_parser(dcos_mode):
 
     add_default_arguments(restore_parser, dcos_mode)
     restore_parser.set_defaults(func=conductr_restore.restore)
+
+    # Sub-parser for `prefetch` sub-command
+    prefetch_parser = subparsers.add_parser('prefetch',
+                                            help='Resolve bundles and configurations into the cache, '
+                                                 'e.g. to load them in offline mode later on',
+                                            formatter_class=argparse.RawTextHelpFormatter)
+    prefetch_parser.add_argument('bundles',
+                                 nargs='*',
+                                 default=[],
+                                 help='The bundles to prefetch')
+    prefetch_parser.add_argument('--manifest',
+                                 default=None,
+                                 dest='manifest',
+                                 help='A file listing further bundles to prefetch, one per line, each optionally '
+                                      'followed by its configuration\n'
+                                      'Blank lines and lines starting with # are skipped')
+    prefetch_parser.add_argument('--parallelism',
+                                 help='The maximum number of bundles resolved at a time\n'
+                                      'Defaults to {}'.format(DEFAULT_BULK_PARALLELISM),
+                                 type=int,
+                                 default=DEFAULT_BULK_PARALLELISM,
+                                 dest='parallelism')
+    add_default_arguments(prefetch_parser, dcos_mode)
+    add_bundle_resolve_cache_dir(prefetch_parser)
+    add_configuration_resolve_cache_dir(prefetch_parser)
+    add_cache_store_args(prefetch_parser)
+    prefetch_parser.set_defaults(func=conduct_prefetch.prefetch)
+
+    # Sub-parser for `cache` sub-command
+    cache_parser = subparsers.add_parser('cache',
+                                         help='Manage the cache of resolved bundles and configurations',
+                                         formatter_class=argparse.RawTextHelpFormatter)
+    cache_subparsers = cache_parser.add_subparsers(title='cache commands',
+                                                   help='Use one of the following cache sub commands:')
+
+    cache_ls_parser = cache_subparsers.add_parser('ls',
+                                                  help='List the cached bundles and configurations',
+                                                  formatter_class=argparse.RawTextHelpFormatter)
+    add_long_ids(cache_ls_parser)
+    add_date_args(cache_ls_parser)
+    cache_ls_parser.set_defaults(func=conduct_cache.cache_ls)
+
+    cache_gc_parser = cache_subparsers.add_parser('gc',
+                                                  help='Remove unused objects and evict the least recently used '
+                                                       'objects exceeding the quota',
+                                                  formatter_class=argparse.RawTextHelpFormatter)
+    cache_gc_parser.set_defaults(func=conduct_cache.cache_gc)
+
+    cache_verify_parser = cache_subparsers.add_parser('verify',
+                                                      help='Verify the cached objects against their digests, removing '
+                                                           'those which are corrupted',
+                                                      formatter_class=argparse.RawTextHelpFormatter)
+    cache_verify_parser.set_defaults(func=conduct_cache.cache_verify)
+
+    for cache_command_parser in [cache_ls_parser, cache_gc_parser, cache_verify_parser]:
+        add_verbose(cache_command_parser)
+        add_quiet_flag(cache_command_parser)
+        add_cache_store_args(cache_command_parser)
     return parser
 
 
@@ -579,6 +710,7 @@ def run(_args=[], configure_logging=True):
     parser = build_parser(dcos_mode)
     argcomplete.autocomplete(parser)
     args = parser.parse_args(_args)
+    validate_bundle_selection(args)
     args.dcos_mode = dcos_mode
     if not vars(args).get('func'):
         if vars(args).get('dcos_info'):
@@ -589,7 +721,7 @@ def run(_args=[], configure_logging=True):
     else:
         # Offline functions are the functions which do not require network to run, e.g. `conduct version` or
         # `conduct setup-dcos`.
-        offline_functions = ['version', 'setup']
+        offline_functions = ['version', 'setup', 'cache_ls', 'cache_gc', 'cache_verify']
 
         # Only setup network related args (i.e. host, bundle resolvers, basic auth, etc) for functions which requires
         # connectivity to ConductR.
@@ -602,6 +734,7 @@ def run(_args=[], configure_logging=True):
 
             # DC/OS provides the location of ConductR...
             if dcos_mode:
+                conductr_http.pool_dcos_requests()
                 args.command = 'dcos conduct'
                 dcos_url = urlparse(config.get_config_val('core.dcos_url'))
                 args.scheme = dcos_url.scheme
@@ -630,6 +763,9 @@ def run(_args=[], configure_logging=True):
             args.cli_parameters = get_cli_parameters(args)
             args.custom_settings = custom_settings.load_from_file(args)
 
+            if vars(args).get('refresh_metadata'):
+                resolver.refresh_metadata(args.custom_settings, args.offline_mode)
+
             args.conductr_auth = custom_settings.load_conductr_credentials(args)
 
             # Ensure HTTPS is used if authentication is configured
@@ -653,5 +789,6 @@ def run(_args=[], configure_logging=True):
             logging_setup.configure_logging(args)
 
         is_completed_without_error = args.func(args)
+
         if not is_completed_without_error:
             sys.exit(1)
@@ -0,0 +1,123 @@
+from conductr_cli import conduct_load, resolver, validation
+from conductr_cli.bundle_bulk import DEFAULT_BULK_PARALLELISM
+from conductr_cli.bytes_util import natural_size
+from conductr_cli.conduct_load import validate_cache_dir_permissions
+from conductr_cli.exceptions import BintrayResolutionError, BundleResolutionError
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import time
+
+
+@validation.handle_insecure_file_permissions
+def prefetch(args):
+    """`conduct prefetch` command"""
+
+    log = logging.getLogger(__name__)
+
+    entries = [(bundle, None) for bundle in args.bundles]
+    if args.manifest:
+        entries += load_manifest(args.manifest)
+
+    if not entries:
+        log.error('No bundles to prefetch')
+        return False
+
+    validate_cache_dir_permissions(args.bundle_resolve_cache_dir, args.configuration_resolve_cache_dir, log)
+
+    # Each bundle and configuration is resolved once however many entries list it, so that no two workers download
+    # into the same file
+    entries = list(OrderedDict.fromkeys(entries))
+    bundles = list(OrderedDict.fromkeys(bundle for bundle, _ in entries))
+    configurations = list(OrderedDict.fromkeys(configuration for _, configuration in entries
+                                               if configuration is not None))
+
+    start_time = time.time()
+    parallelism = vars(args).get('parallelism') or DEFAULT_BULK_PARALLELISM
+    with ThreadPoolExecutor(max_workers=min(parallelism, len(bundles) + len(configurations))) as executor:
+        bundle_futures = [(bundle, executor.submit(prefetch_file, resolver.resolve_bundle,
+                                                   args.custom_settings, args.bundle_resolve_cache_dir, bundle))
+                          for bundle in bundles]
+        configuration_futures = [(configuration, executor.submit(prefetch_file, resolver.resolve_bundle_configuration,
+                                                                 args.custom_settings,
+                                                                 args.configuration_resolve_cache_dir,
+                                                                 configuration))
+                                 for configuration in configurations]
+
+    files = []
+    failed_bundles = results(bundle_futures, files)
+    failed_configurations = results(configuration_futures, files)
+    failed_entries = [(bundle, configuration) for bundle, configuration in entries
+                      if bundle in failed_bundles or configuration in failed_configurations]
+    elapsed = max(time.time() - start_time, 0.001)
+
+    conduct_load.cache_resolved_files(args, *files)
+
+    total_size = sum(file_size(file) for file in files)
+    log.info('Prefetched {} of {} bundles, {} in {:.1f}s ({}/s)'.format(
+        len(entries) - len(failed_entries), len(entries),
+        natural_size(total_size, binary=True), elapsed, natural_size(total_size / elapsed, binary=True)))
+
+    return not failed_entries
+
+
+def results(futures, files):
+    """
+    Appends the files resolved by the given futures to `files`, logging the error of each future which failed.
+    Returns the uris of the futures which failed.
+    """
+    log = logging.getLogger(__name__)
+
+    failed_uris = set()
+    for uri, future in futures:
+        try:
+            files.append(future.result())
+        except BundleResolutionError as e:
+            log.error(e.value)
+            failed_uris.add(uri)
+        except BintrayResolutionError as e:
+            log.error(e.message)
+            failed_uris.add(uri)
+        except Exception as e:
+            # Any other failure, e.g. of a download, is reported without aborting the prefetch of the other uris
+            log.error('Unable to prefetch {}: {}'.format(uri, e))
+            failed_uris.add(uri)
+    return failed_uris
+
+
+def prefetch_file(resolve, custom_settings, cache_dir, uri):
+    """
+    Resolves the given bundle or configuration uri into the given resolve cache directory using `resolve`.
+    Returns the resolved file.
+    """
+    log = logging.getLogger(__name__)
+
+    _, file = resolve(custom_settings, cache_dir, uri)
+
+    log.verbose('Prefetched {} ({})'.format(uri, natural_size(file_size(file), binary=True)))
+    return file
+
+
+def load_manifest(manifest):
+    """
+    Returns the bundles of the given manifest file along with their configuration, or `None` if they have none.
+    Each line of the manifest lists a bundle, optionally followed by its configuration. Blank lines and lines
+    starting with `#` are skipped.
+    """
+    entries = []
+    with open(manifest, 'r', encoding='utf-8') as file:
+        for line in file:
+            fields = line.split()
+            if fields and not fields[0].startswith('#'):
+                entries.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return entries
+
+
+def file_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(dir_path, file_name))
+                   for dir_path, _, file_names in os.walk(path)
+                   for file_name in file_names)
+    else:
+        return os.path.getsize(path)
@@ -1,5 +1,5 @@
+from conductr_cli import http as conductr_http
 from dcos import http
-import requests
 
 
 def delete(dcos_mode, host, url, **kwargs):
@@ -7,7 +7,7 @@ def delete(dcos_mode, host, url, **kwargs):
     if dcos_mode:
         return http.delete(url, **kwargs)
     else:
-        return requests.delete(url, **kwargs)
+        return conductr_http.session(url).delete(url, **kwargs)
 
 
 def get(dcos_mode, host, url, **kwargs):
@@ -15,7 +15,7 @@ def get(dcos_mode, host, url, **kwargs):
     if dcos_mode:
         return http.get(url, **kwargs)
     else:
-        return requests.get(url, **kwargs)
+        return conductr_http.session(url).get(url, **kwargs)
 
 
 def post(dcos_mode, host, url, **kwargs):
@@ -23,7 +23,7 @@ def post(dcos_mode, host, url, **kwargs):
     if dcos_mode:
         return http.post(url, **kwargs)
     else:
-        return requests.post(url, **kwargs)
+        return conductr_http.session(url).post(url, **kwargs)
 
 
 def put(dcos_mode, host, url, **kwargs):
@@ -31,7 +31,7 @@ def put(dcos_mode, host, url, **kwargs):
     if dcos_mode:
         return http.put(url, **kwargs)
     else:
-        return requests.put(url, **kwargs)
+        return conductr_http.session(url).put(url, **kwargs)
 
 
 def enrich_args(host, **kwargs):
@@ -1,4 +1,4 @@
-from conductr_cli import bundle_utils, bundle_scale, validation, control_protocol
+from conductr_cli import bundle_bulk, bundle_utils, bundle_scale, validation, control_protocol
 import logging
 
 
@@ -15,6 +15,9 @@ def run(args):
         log.error('Affinity feature is only available for v1.1 onwards of ConductR')
         return
 
+    if bundle_bulk.is_bulk(args):
+        return bundle_bulk.run(args)
+
     response_json = control_protocol.run_bundle(args)
 
     bundle_id = response_json['bundleId'] if args.long_ids else bundle_utils.short_id(response_json['bundleId'])
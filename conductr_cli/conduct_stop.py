@@ -1,4 +1,4 @@
-from conductr_cli import bundle_utils, validation, bundle_scale
+from conductr_cli import bundle_bulk, bundle_utils, validation, bundle_scale
 import logging
 
 from conductr_cli.control_protocol import stop_bundle
@@ -10,6 +10,9 @@ from conductr_cli.control_protocol import stop_bundle
 def stop(args):
     """`conduct stop` command"""
 
+    if bundle_bulk.is_bulk(args):
+        return bundle_bulk.stop(args)
+
     log = logging.getLogger(__name__)
     response_json = stop_bundle(args)
 
@@ -1,4 +1,4 @@
-from conductr_cli import validation, bundle_installation, control_protocol
+from conductr_cli import bundle_bulk, validation, bundle_installation, control_protocol
 import logging
 
 
@@ -7,6 +7,9 @@ import logging
 def unload(args):
     """`conduct unload` command"""
 
+    if bundle_bulk.is_bulk(args):
+        return bundle_bulk.unload(args)
+
     log = logging.getLogger(__name__)
 
     response_json = control_protocol.unload_bundle(args)
@@ -17,7 +17,8 @@ from conductr_cli.conduct_info_inspect import filter_bundles_by_id_or_name
 from conductr_cli.conduct_url import conductr_host
 from conductr_cli.exceptions import ConductBackupError
 from conductr_cli.http import DEFAULT_HTTP_TIMEOUT
-from conductr_cli.shazar_main import dir_to_zip, write_with_digest
+from conductr_cli.shazar_main import dir_to_zip, DigestWriter
+from conductr_cli.zip_writer import ZipWriter
 
 
 @validation.handle_connection_error
@@ -72,13 +73,11 @@ def compress_backup(output_path, backup_directory):
         sys.exit(2)
 
     output_file = open(output_path, 'wb') if output_path else sys.stdout.buffer
-    with tempfile.NamedTemporaryFile() as zip_file_data:
-        with zipfile.ZipFile(zip_file_data, 'w') as zip_file:
-            dir_to_zip(backup_directory, zip_file, '.', None)
-        zip_file_data.flush()
-        zip_file_data.seek(0)
+    digest_writer = DigestWriter(output_file)
+    with zipfile.ZipFile(digest_writer, 'w') as zip_file, ZipWriter(zip_file) as writer:
+        dir_to_zip(backup_directory, writer, '.', None)
 
-        write_with_digest(zip_file_data, output_file)
+    digest_writer.write_digest()
     output_file.flush()
 
 
@@ -9,6 +9,7 @@ import logging
 
 import sys
 
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 from conductr_cli import control_protocol, bundle_utils, validation, conduct_load, bundle_scale
@@ -16,6 +17,10 @@ from conductr_cli.bundle_core_info import BundleCoreInfo
 from conductr_cli.exceptions import ConductRestoreError
 
 
+# The maximum number of bundles being waited on at a time.
+MAX_CONCURRENT_SCALE_WAITS = 8
+
+
 @validation.handle_connection_error
 @validation.handle_http_error
 @validation.handle_wait_timeout_error
@@ -38,6 +43,7 @@ def restore(args):
     bundles_info = sorted(BundleCoreInfo.from_bundles(json.loads(bundles_json)), key=lambda b: b.start_time)
 
     restore_errors = []
+    scale_waits = []
     for bundle_info in bundles_info:
         new_bundle_id = None
         log.info('Restoring bundle : {}.'.format(bundle_info.bundle_name))
@@ -55,11 +61,24 @@ def restore(args):
                 if affinity == new_bundle_id:
                     affinity = None
 
-                scale_bundle(args, new_bundle_id, bundle_info.scale, affinity)
-                log.info('Scaled {} to : {}.'.format(new_bundle_id, bundle_info.scale))
+                wait_for_scale = scale_bundle(args, new_bundle_id, bundle_info.scale, affinity)
+                scale_waits.append((bundle_info, new_bundle_id, wait_for_scale))
         except:
             restore_errors.append('{} could not be scaled.'.format(bundle_info.bundle_name))
 
+    # The bundles are scaled concurrently, sharing a single subscription to the bundle events
+    if scale_waits:
+        with ThreadPoolExecutor(max_workers=min(len(scale_waits), MAX_CONCURRENT_SCALE_WAITS)) as executor:
+            scale_futures = [(bundle_info, bundle_id, executor.submit(wait_for_scale))
+                             for bundle_info, bundle_id, wait_for_scale in scale_waits]
+
+        for bundle_info, bundle_id, scale_future in scale_futures:
+            try:
+                scale_future.result()
+                log.info('Scaled {} to : {}.'.format(bundle_id, bundle_info.scale))
+            except:
+                restore_errors.append('{} could not be scaled.'.format(bundle_info.bundle_name))
+
     for error in restore_errors:
         log.error(error)
 
@@ -113,6 +132,9 @@ def process_bundle(args, restore_directory, bundle_info: BundleCoreInfo):
 
 
 def scale_bundle(args, bundle_id, scale, affinity):
+    """
+    Requests the bundle to be scaled, returning a function which waits until the requested scale is reached.
+    """
     modified_args = copy.deepcopy(args)
     modified_args.wait_timeout = 60
     modified_args.bundle = bundle_id
@@ -124,7 +146,10 @@ def scale_bundle(args, bundle_id, scale, affinity):
 
     response_json = control_protocol.run_bundle(modified_args)
 
-    bundle_scale.wait_for_scale(response_json['bundleId'], scale, wait_for_is_active=True, args=modified_args)
+    def wait_for_scale():
+        bundle_scale.wait_for_scale(response_json['bundleId'], scale, wait_for_is_active=True, args=modified_args)
+
+    return wait_for_scale
 
 
 def compatible_bundle(bundle_infos, bundle_name, compatibility_version):
@@ -28,6 +28,8 @@ DEFAULT_BUNDLE_RESOLVE_CACHE_DIR = os.getenv('CONDUCTR_BUNDLE_RESOLVE_CACHE_DIR'
 DEFAULT_CONFIGURATION_RESOLVE_CACHE_DIR = os.getenv('CONDUCTR_CONFIGURATION_RESOLVE_CACHE_DIR',
                                                     '{}/configuration'
                                                     .format(DEFAULT_RESOLVE_CACHE_DIR))
+DEFAULT_CACHE_STORE_DIR = os.getenv('CONDUCTR_CACHE_STORE_DIR', '{}/store'.format(DEFAULT_RESOLVE_CACHE_DIR))
+DEFAULT_CACHE_QUOTA = os.getenv('CONDUCTR_CACHE_QUOTA', '10G')
 DEFAULT_CUSTOM_SETTINGS_FILE = os.getenv('CONDUCTR_CUSTOM_SETTINGS_FILE',
                                          '{}/settings.conf'.format(DEFAULT_CLI_SETTINGS_DIR))
 DEFAULT_CUSTOM_PLUGINS_DIR = os.getenv('CONDUCTR_CUSTOM_PLUGINS_DIR',
@@ -85,3 +87,7 @@ SHAZAR_TIMESTAMP_MIN = 315705599
 MAGIC_NUMBER_TAR = b'ustar'
 MAGIC_NUMBER_TAR_OFFSET = 257
 MAGIC_NUMBERS_ZIP = [b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08']
+
+# Marks a docker image layout whose layers the docker resolver laid out in directories named after their verified
+# digests, so that bndl takes those digests without hashing the layers again
+DOCKER_VERIFIED_LAYERS_FILE_NAME = '.verified-layers'
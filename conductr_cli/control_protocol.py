@@ -7,6 +7,12 @@ from conductr_cli.conduct_url import conductr_host
 from conductr_cli.http import DEFAULT_HTTP_TIMEOUT
 
 
+# The ConductR bundles urls whose single bundle url is known to provide the bundle state as JSON, and those whose single
+# bundle url doesn't, requiring the state of all the bundles to be fetched instead.
+SINGLE_BUNDLE_STATE_SUPPORTED = set()
+SINGLE_BUNDLE_STATE_UNSUPPORTED = set()
+
+
 def load_bundle(args, multipart_files):
     log = logging.getLogger(__name__)
 
@@ -101,6 +107,49 @@ def get_bundles(args):
     return json.loads(response.text)
 
 
+def get_bundle(args, bundle_id):
+    """
+    Returns the state of the bundle with the given id, or `None` if the bundle is not loaded.
+
+    Only the state of the given bundle is requested, avoiding the transfer of the state of all the bundles in the
+    cluster. Until ConductR is known to provide the state of a single bundle, a bundle which is not found is looked
+    up in the state of all the bundles instead. Whether it is provided is remembered for the remainder of the CLI
+    invocation.
+    """
+    bundles_url = conduct_url.url('bundles', args)
+    if bundles_url in SINGLE_BUNDLE_STATE_UNSUPPORTED:
+        return find_bundle(get_bundles(args), bundle_id)
+
+    url = conduct_url.url('bundles/{}'.format(quote_plus(bundle_id)), args)
+    # The response is streamed so the body is not read unless it is JSON, i.e. not the bundle file itself.
+    response = conduct_request.get(args.dcos_mode, conductr_host(args), url, auth=args.conductr_auth,
+                                   verify=args.server_verification_file, timeout=DEFAULT_HTTP_TIMEOUT, stream=True,
+                                   headers={'Accept': 'application/json'})
+    try:
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code == 200 and content_type.startswith('application/json'):
+            bundle = json.loads(response.text)
+            if isinstance(bundle, dict) and bundle.get('bundleId') == bundle_id:
+                SINGLE_BUNDLE_STATE_SUPPORTED.add(bundles_url)
+                return bundle
+    finally:
+        response.close()
+
+    if response.status_code == 404 and bundles_url in SINGLE_BUNDLE_STATE_SUPPORTED:
+        return None
+
+    bundle = find_bundle(get_bundles(args), bundle_id)
+    # A bundle which is not loaded is expected to be not found, otherwise the single bundle state is not supported.
+    if response.status_code != 404 or bundle is not None:
+        SINGLE_BUNDLE_STATE_UNSUPPORTED.add(bundles_url)
+    return bundle
+
+
+def find_bundle(bundles, bundle_id):
+    matching_bundles = [bundle for bundle in bundles if bundle['bundleId'] == bundle_id]
+    return matching_bundles[0] if matching_bundles else None
+
+
 def unload_bundle(args):
     log = logging.getLogger(__name__)
     path = 'bundles/{}'.format(args.bundle)
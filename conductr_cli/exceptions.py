@@ -39,6 +39,14 @@ class BundleResolutionError(Exception):
         return repr(self.value)
 
 
+class ResolutionCancelledError(Exception):
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return repr(self.value)
+
+
 class MalformedBundleUriError(Exception):
     def __init__(self, value):
         self.value = value
@@ -283,3 +291,14 @@ class ConductRestoreError(Exception):
 
     def __str__(self):
         return repr(self.message)
+
+
+class BundleDigestMismatchError(Exception):
+    def __init__(self, file_name, expected_digest, actual_digest):
+        self.file_name = file_name
+        self.expected_digest = expected_digest
+        self.actual_digest = actual_digest
+
+    def __str__(self):
+        return repr('{} has digest {} but its content has digest {}'.format(self.file_name, self.expected_digest,
+                                                                            self.actual_digest))
@@ -1 +1,65 @@
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+import os
+import requests
+import threading
+
+
 DEFAULT_HTTP_TIMEOUT = 5
+
+# The maximum number of keep-alive connections retained per host. Streaming responses such as SSE hold on to their
+# connection until they are closed, so this must allow for the event stream plus the requests made while waiting, as
+# well as for the concurrent downloads of `conduct prefetch` along with their segments.
+DEFAULT_HTTP_POOL_SIZE = int(os.getenv('CONDUCTR_HTTP_POOL_SIZE', 32))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def session_key(url):
+    parsed = urlparse(url)
+    return parsed.scheme, parsed.netloc
+
+
+def session(url):
+    """
+    Returns the keep-alive session for the scheme, host and port of the given url.
+    The session is created on first use and reused for the rest of the CLI invocation, so subsequent requests to the
+    same host share pooled TCP (and TLS) connections rather than establishing a new one per request.
+    """
+    key = session_key(url)
+    with _sessions_lock:
+        if key not in _sessions:
+            new_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DEFAULT_HTTP_POOL_SIZE)
+            new_session.mount('http://', adapter)
+            new_session.mount('https://', adapter)
+            _sessions[key] = new_session
+        return _sessions[key]
+
+
+def close_sessions():
+    with _sessions_lock:
+        for existing_session in _sessions.values():
+            existing_session.close()
+        _sessions.clear()
+
+
+class PooledRequests:
+    """
+    Stand-in for the `requests` module which sends `requests.request(...)` calls through the pooled sessions.
+    The DC/OS http library sends its requests using `requests.request(...)`, and as such this is installed in its
+    place so requests made in DC/OS mode also reuse connections.
+    """
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    @staticmethod
+    def request(method, url, **kwargs):
+        return session(url).request(method, url, **kwargs)
+
+
+def pool_dcos_requests():
+    from dcos import http as dcos_http
+    if not isinstance(dcos_http.requests, PooledRequests):
+        dcos_http.requests = PooledRequests()
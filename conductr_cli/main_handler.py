@@ -1,3 +1,4 @@
+from conductr_cli import http as conductr_http
 import logging
 import logging.handlers
 import os
@@ -45,6 +46,9 @@ def run(callback):
         exception_log.error('Failure running the following command: {}'.format(sys.argv), exc_info=True)
 
         sys.exit(1)
+    finally:
+        # Nested commands, e.g. the bundles started by `sandbox run`, share the pooled connections
+        conductr_http.close_sessions()
 
 
 def enforce_cwd_exists():
@@ -4,12 +4,18 @@ from conductr_cli.resolvers import \
     resolvers_util, s3_resolver
 import importlib
 import logging
+import os
+import queue
+import threading
 
 
 # Try to resolve from local file system before we attempting resolution using bintray
 DEFAULT_RESOLVERS = [stdin_resolver, uri_resolver, bintray_resolver, docker_resolver, s3_resolver]
 OFFLINE_RESOLVERS = [stdin_resolver, offline_resolver, docker_offline_resolver]
 
+# Probes the supported resolvers concurrently rather than one after the other, still preferring them in chain order.
+CONCURRENT_RESOLUTION = os.getenv('CONDUCTR_CONCURRENT_RESOLUTION', '').lower() in ('1', 'true', 'yes')
+
 
 def resolve_bundle(custom_settings, cache_dir, uri, offline_mode=False):
     log = logging.getLogger(__name__)
@@ -22,8 +28,9 @@ def resolve_bundle(custom_settings, cache_dir, uri, offline_mode=False):
     if supported_resolvers:
         log.info('Resolving bundle using [{}]'.format(get_resolver_names(supported_resolvers)))
 
-        for resolver in supported_resolvers:
-            is_cached, bundle_file_name, cached_bundle, error = resolver.load_bundle_from_cache(cache_dir, uri)
+        cache_results = resolver_results(supported_resolvers,
+                                         lambda resolver: resolver.load_bundle_from_cache(cache_dir, uri))
+        for resolver, (is_cached, bundle_file_name, cached_bundle, error) in cache_results:
 
             if error:
                 cache_resolution_errors.append((resolver, error))
@@ -31,8 +38,9 @@ def resolve_bundle(custom_settings, cache_dir, uri, offline_mode=False):
             if is_cached:
                 return bundle_file_name, cached_bundle
 
-        for resolver in supported_resolvers:
-            is_resolved, bundle_file_name, bundle_file, error = resolver.resolve_bundle(cache_dir, uri)
+        results = resolver_results(supported_resolvers,
+                                   lambda resolver: resolver.resolve_bundle(cache_dir, uri))
+        for resolver, (is_resolved, bundle_file_name, bundle_file, error) in results:
 
             if error:
                 bundle_resolution_errors.append((resolver, error))
@@ -56,9 +64,10 @@ def resolve_bundle_configuration(custom_settings, cache_dir, uri, offline_mode=F
     if supported_resolvers:
         log.info('Resolving bundle configuration using [{}]'.format(get_resolver_names(supported_resolvers)))
 
-        for resolver in supported_resolvers:
-            is_cached, bundle_configuration_file_name, cached_bundle, error = \
-                resolver.load_bundle_configuration_from_cache(cache_dir, uri)
+        cache_results = resolver_results(supported_resolvers,
+                                         lambda resolver: resolver.load_bundle_configuration_from_cache(cache_dir,
+                                                                                                        uri))
+        for resolver, (is_cached, bundle_configuration_file_name, cached_bundle, error) in cache_results:
 
             if error:
                 cache_resolution_errors.append((resolver, error))
@@ -66,9 +75,9 @@ def resolve_bundle_configuration(custom_settings, cache_dir, uri, offline_mode=F
             if is_cached:
                 return bundle_configuration_file_name, cached_bundle
 
-        for resolver in supported_resolvers:
-            is_resolved, bundle_configuration_file_name, bundle_configuration_file, error = \
-                resolver.resolve_bundle_configuration(cache_dir, uri)
+        results = resolver_results(supported_resolvers,
+                                   lambda resolver: resolver.resolve_bundle_configuration(cache_dir, uri))
+        for resolver, (is_resolved, bundle_configuration_file_name, bundle_configuration_file, error) in results:
 
             if error:
                 bundle_resolution_errors.append((resolver, error))
@@ -91,8 +100,8 @@ def resolve_bundle_version(custom_settings, uri, offline_mode=False):
     if supported_resolvers:
         log.info('Resolving bundle version using [{}]'.format(get_resolver_names(supported_resolvers)))
 
-        for resolver in supported_resolvers:
-            resolved_version, error = resolver.resolve_bundle_version(uri)
+        results = resolver_results(supported_resolvers, lambda resolver: resolver.resolve_bundle_version(uri))
+        for resolver, (resolved_version, error) in results:
 
             if error:
                 bundle_resolution_errors.append((resolver, error))
@@ -116,6 +125,61 @@ def continuous_delivery_uri(custom_settings, resolved_version, offline_mode=Fals
     raise ContinuousDeliveryError('Unable to form Continuous Delivery uri using {}'.format(resolved_version))
 
 
+def resolver_results(resolvers, resolve):
+    """
+    Yields each resolver along with the result of calling `resolve` with it, in the order of the resolvers.
+
+    The resolvers are called one after the other unless concurrent resolution is enabled, in which case they are all
+    called at once. The result of a resolver is then yielded as soon as it and the resolvers ahead of it are done, so
+    the caller can settle for the first successful resolver without waiting for those after it. The resolutions still
+    running once the caller stops consuming the results are cancelled: their downloads stop at their next chunk, and
+    their partial downloads are resumed or replaced by the next resolution.
+
+    :param resolvers: the resolvers in order of priority
+    :param resolve: the function returning the result of a resolver
+    :return: generator of tuples of resolver and result
+    """
+    if not CONCURRENT_RESOLUTION or len(resolvers) < 2:
+        for resolver in resolvers:
+            yield resolver, resolve(resolver)
+    else:
+        cancelled = threading.Event()
+
+        def run(resolver, outcome):
+            resolvers_util.resolution.cancelled = cancelled
+            try:
+                outcome.put((True, resolve(resolver)))
+            except Exception as e:
+                outcome.put((False, e))
+
+        # The threads are daemons so that a cancelled resolution doesn't hold up the exit of the CLI
+        outcomes = []
+        for resolver in resolvers:
+            outcome = queue.Queue(maxsize=1)
+            threading.Thread(target=run, args=(resolver, outcome), daemon=True).start()
+            outcomes.append((resolver, outcome))
+
+        try:
+            for resolver, outcome in outcomes:
+                is_completed, result = outcome.get()
+                if is_completed:
+                    yield resolver, result
+                else:
+                    raise result
+        finally:
+            cancelled.set()
+
+
+def refresh_metadata(custom_settings, offline_mode=False):
+    """
+    Discards the metadata cached by the resolvers of the chain, e.g. the versions resolved from Bintray, so that it is
+    fetched again. Only the resolvers which cache metadata provide `refresh_metadata()`.
+    """
+    for resolver in resolver_chain(custom_settings, offline_mode):
+        if hasattr(resolver, 'refresh_metadata'):
+            resolver.refresh_metadata()
+
+
 def resolver_chain(custom_settings, offline_mode):
     log = logging.getLogger(__name__)
     if custom_settings is not None and 'resolvers' in custom_settings:
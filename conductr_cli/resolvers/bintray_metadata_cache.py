@@ -0,0 +1,79 @@
+"""Persistent cache of the versions resolved from the Bintray API.
+
+Versions are keyed by the org, repo, package, tag and digest they were resolved from. A version resolved from both a
+tag and a digest is immutable, so it is kept until the cache is refreshed. A version resolved from a tag alone, or
+the latest version of a package, may move on as new versions are published, so it is only kept for a limited time.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+# Guards the cache file against concurrent updates from the threads of the same process.
+_lock = threading.Lock()
+
+
+def version_key(org, repo, package_name, tag, digest):
+    return '/'.join([org, repo, package_name, tag or '', digest or ''])
+
+
+def load(path):
+    """
+    Returns the cache stored at `path`, i.e. the `versions` keyed by `version_key` with their resolved `version` and
+    their `expires_at` time, which is `None` for immutable versions.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {'versions': {}}
+
+
+def save(path, cache):
+    # The cache is replaced as a whole so that a concurrent command never reads a partially written cache
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='{}.'.format(os.path.basename(path)))
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_expired(entry, now):
+    return entry['expires_at'] is not None and entry['expires_at'] <= now
+
+
+def get_version(path, key):
+    """
+    Returns the cached version for the given key, or `None` if there is no such version or it has expired.
+    """
+    with _lock:
+        entry = load(path)['versions'].get(key)
+
+    if entry is not None and not is_expired(entry, time.time()):
+        return entry['version']
+    else:
+        return None
+
+
+def put_version(path, key, version, ttl):
+    """
+    Caches the version resolved for the given key for `ttl` seconds, or until the cache is refreshed if `ttl` is
+    `None`, dropping the versions which have expired in the meantime.
+    """
+    with _lock:
+        now = time.time()
+        cache = load(path)
+        cache['versions'] = {key: entry for key, entry in cache['versions'].items() if not is_expired(entry, now)}
+        cache['versions'][key] = {
+            'version': version,
+            'expires_at': now + ttl if ttl is not None else None
+        }
+        save(path, cache)
+
+
+def clear(path):
+    with _lock:
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,9 +1,10 @@
+from conductr_cli.constants import DEFAULT_CLI_SETTINGS_DIR
 from conductr_cli.exceptions import MalformedBundleUriError, BintrayResolutionError, \
     BintrayCredentialsNotFoundError, MalformedBintrayCredentialsError
-from conductr_cli.resolvers import uri_resolver
+from conductr_cli.resolvers import bintray_metadata_cache, uri_resolver
 from conductr_cli.resolvers.resolvers_util import is_local_file
 from conductr_cli.resolvers.schemes import SCHEME_BUNDLE
-from conductr_cli import bundle_shorthand
+from conductr_cli import bundle_shorthand, http
 from requests.exceptions import HTTPError, ConnectionError
 import json
 import logging
@@ -21,6 +22,10 @@ BINTRAY_CONDUCTR_COMMERCIAL_REPO = 'commercial-releases'
 BINTRAY_CONDUCTR_GENERIC_REPO = 'generic'
 BINTRAY_CONDUCTR_CORE_PACKAGE_NAME = 'ConductR-Universal'
 BINTRAY_CONDUCTR_AGENT_PACKAGE_NAME = 'ConductR-Agent-Universal'
+BINTRAY_METADATA_CACHE_FILE_PATH = '{}/bintray-metadata.json'.format(DEFAULT_CLI_SETTINGS_DIR)
+
+# The number of seconds the latest version of a package, or the latest version of a tag, is cached for.
+BINTRAY_METADATA_TTL = int(os.getenv('CONDUCTR_BINTRAY_METADATA_TTL', 300))
 
 
 def supported_schemes():
@@ -139,6 +144,10 @@ def resolve_bundle_version(uri):
         return None, e
 
 
+def refresh_metadata():
+    bintray_metadata_cache.clear(BINTRAY_METADATA_CACHE_FILE_PATH)
+
+
 def continuous_delivery_uri(resolved_version):
     if resolved_version and \
             'resolver' in resolved_version and \
@@ -194,6 +203,27 @@ def load_bintray_credentials(raise_error=True, disable_instructions=False):
 
 def bintray_resolve_version(bintray_auth, org, repo, package_name,
                             tag=None, digest=None):
+    """
+    Resolves the version from the metadata cache, or from the Bintray API when it isn't cached.
+    A version given by both its tag and digest is immutable, so it is cached until the metadata is refreshed.
+    """
+    log = logging.getLogger(__name__)
+
+    key = bintray_metadata_cache.version_key(org, repo, package_name, tag, digest)
+    resolved_version = bintray_metadata_cache.get_version(BINTRAY_METADATA_CACHE_FILE_PATH, key)
+    if resolved_version:
+        log.debug('Using cached Bintray metadata for {}'.format(key))
+        return resolved_version
+
+    resolved_version = bintray_fetch_version(bintray_auth, org, repo, package_name, tag, digest)
+    if resolved_version:
+        ttl = None if tag is not None and digest is not None else BINTRAY_METADATA_TTL
+        bintray_metadata_cache.put_version(BINTRAY_METADATA_CACHE_FILE_PATH, key, resolved_version, ttl)
+
+    return resolved_version
+
+
+def bintray_fetch_version(bintray_auth, org, repo, package_name, tag, digest):
     if tag is None and digest is None:
         # Get latest version
         package_endpoint = '{}/packages/{}/{}/{}'.format(BINTRAY_API_BASE_URL, org, repo, package_name)
@@ -292,9 +322,9 @@ def get_json(auth, uri):
     realm, username, password = auth if auth else (None, None, None)
 
     if username is not None and password is not None:
-        response = requests.get(uri, auth=(username, password))
+        response = http.session(uri).get(uri, auth=(username, password))
     else:
-        response = requests.get(uri)
+        response = http.session(uri).get(uri)
     response.raise_for_status()
     return json.loads(response.text)
 
@@ -1,13 +1,14 @@
-import time
 from collections import OrderedDict
-from conductr_cli import screen_utils
-from conductr_cli.constants import IO_CHUNK_SIZE
-from conductr_cli.exceptions import DockerImageMalformedError
+from concurrent.futures import ThreadPoolExecutor
+from conductr_cli.constants import DEFAULT_CLI_SETTINGS_DIR, DOCKER_VERIFIED_LAYERS_FILE_NAME, IO_CHUNK_SIZE
+from conductr_cli.exceptions import BundleDigestMismatchError, DockerImageMalformedError
+from conductr_cli.resolvers import docker_token_cache
+from conductr_cli.resolvers.resolvers_util import DownloadProgress, DOWNLOAD_INTERRUPTED_ERRORS
 from conductr_cli.resolvers.schemes import SCHEME_BUNDLE
 from functools import partial
 from requests.auth import HTTPBasicAuth
 from urllib.parse import urlencode
-import gzip
+import glob
 import hashlib
 import logging
 import os
@@ -16,11 +17,23 @@ import re
 import requests
 import shutil
 import tempfile
+import threading
 import www_authenticate
 
 
 DOCKER_CREDENTIAL_FILE_PATH = '{}/.lightbend/docker.credentials'.format(os.path.expanduser('~'))
 DOCKER_PROPERTIES_RE = re.compile('^(\S+)\s*=\s*([\S]+)$')
+DOCKER_TOKEN_CACHE_FILE_PATH = '{}/docker-tokens.json'.format(DEFAULT_CLI_SETTINGS_DIR)
+REGISTRY_REPOSITORY_URL_RE = re.compile('^https?://([^/]+)/v2/(.+)/(?:manifests|blobs)/')
+
+# The maximum number of blobs downloaded from the registry at a time.
+DEFAULT_BLOB_DOWNLOAD_PARALLELISM = 4
+
+# The number of times the download of a blob is attempted when the connection is lost.
+BLOB_DOWNLOAD_ATTEMPTS = 3
+
+# Guards the tokens shared by the concurrent blob downloads, so that only one of them fetches a new token.
+_token_lock = threading.Lock()
 
 
 def supported_schemes():
@@ -28,14 +41,15 @@ def supported_schemes():
 
 
 def get_with_token(ns, url, headers=None, raw=False, try_new_token=True):
-    if not hasattr(get_with_token, 'latest_token'):
-        get_with_token.latest_token = None
+    repository = repository_of(url)
+    challenge = docker_token_cache.get_challenge(DOCKER_TOKEN_CACHE_FILE_PATH, repository)
+    token = cached_or_new_token(ns, challenge) if challenge is not None else None
 
     try:
         new_headers = headers.copy() if headers is not None else {}
 
-        if get_with_token.latest_token is not None:
-            new_headers['Authorization'] = 'Bearer {}'.format(get_with_token.latest_token)
+        if token is not None:
+            new_headers['Authorization'] = 'Bearer {}'.format(token)
 
         response = requests.get(url, stream=raw, headers=new_headers)
         response.raise_for_status()
@@ -46,108 +60,244 @@ def get_with_token(ns, url, headers=None, raw=False, try_new_token=True):
         return response
     except requests.exceptions.HTTPError as error:
         if error.response.status_code == 401 and 'Www-Authenticate' in error.response.headers and try_new_token:
-            credentials = load_docker_credentials(ns)
-            auth_info = www_authenticate.parse(error.response.headers['Www-Authenticate'])
+            challenge = parse_challenge(error.response.headers['Www-Authenticate'])
+            docker_token_cache.put_challenge(DOCKER_TOKEN_CACHE_FILE_PATH, repository, challenge)
+            cached_or_new_token(ns, challenge, rejected_token=token)
+
+            return get_with_token(ns, url, headers, raw, try_new_token=False)
+        else:
+            raise error
 
-            token_params = {
-                'service': auth_info['bearer']['service'],
-                'scope': auth_info['bearer']['scope'],
-                'client_id': 'Lightbend ConductR'
-            }
 
-            if credentials is not None:
-                token_params['account'] = credentials[0]
-                auth = HTTPBasicAuth(credentials[0], credentials[1])
-            else:
-                auth = None
+def repository_of(url):
+    """
+    Returns the registry and repository of a registry API url, e.g. `registry.hub.docker.com/library/alpine`, which
+    identify the challenge presented by the registry for the url.
+    """
+    match = REGISTRY_REPOSITORY_URL_RE.match(url)
+    return '{}/{}'.format(match.group(1), match.group(2)) if match else url
 
-            token_url = '{}?{}'.format(auth_info['bearer']['realm'], urlencode(token_params))
 
-            token_response = requests.get(token_url, auth=auth)
-            token_response.raise_for_status()
-            token_content = json.loads(token_response.text)
+def parse_challenge(www_authenticate_header):
+    auth_info = www_authenticate.parse(www_authenticate_header)
 
-            get_with_token.latest_token = token_content['token']
+    return {
+        'realm': auth_info['bearer']['realm'],
+        'service': auth_info['bearer']['service'],
+        'scope': auth_info['bearer']['scope']
+    }
 
-            return get_with_token(ns, url, headers, raw, try_new_token=False)
-        else:
-            raise error
+
+def cached_or_new_token(ns, challenge, rejected_token=None):
+    """
+    Returns the cached token of the given challenge, fetching a new token if it isn't cached, has expired or has
+    been rejected by the registry.
+    """
+    with _token_lock:
+        # Another download may have fetched a new token in the meantime, in which case it is used instead
+        token = docker_token_cache.get_token(DOCKER_TOKEN_CACHE_FILE_PATH, challenge)
+
+        if token is None or token == rejected_token:
+            token, expires_in = fetch_token(ns, challenge)
+            docker_token_cache.put_token(DOCKER_TOKEN_CACHE_FILE_PATH, challenge, token, expires_in)
+
+        return token
+
+
+def fetch_token(ns, challenge):
+    credentials = load_docker_credentials(ns)
+
+    token_params = {
+        'service': challenge['service'],
+        'scope': challenge['scope'],
+        'client_id': 'Lightbend ConductR'
+    }
+
+    if credentials is not None:
+        token_params['account'] = credentials[0]
+        auth = HTTPBasicAuth(credentials[0], credentials[1])
+    else:
+        auth = None
+
+    token_url = '{}?{}'.format(challenge['realm'], urlencode(token_params))
+
+    token_response = requests.get(token_url, auth=auth)
+    token_response.raise_for_status()
+    token_content = json.loads(token_response.text)
+
+    return token_content['token'], token_content.get('expires_in')
 
 
 def fetch_blobs(cache_dir, url, ns, image, blobs, offline_mode):
+    """
+    Returns the cache files of the given blobs keyed by their digest, downloading the blobs which aren't cached yet
+    using at most `DEFAULT_BLOB_DOWNLOAD_PARALLELISM` concurrent downloads. Returns `None` in offline mode if any of
+    the blobs isn't cached.
+    """
     log = logging.getLogger(__name__)
-    files = {}
-    needs_retrieving = []
-    downloaded_size = 0
-    total_size = 0
+    files = OrderedDict()
+    needs_retrieving = OrderedDict()
 
     for blob in blobs:
-        blob['cache_file'] = os.path.join(cache_dir, 'docker-blob-{}'.format(re.sub('\\W', '_', blob['digest'])))
-        blob['cache_file_temp'] = '{}.tmp'.format(blob['cache_file'])
+        cache_file = os.path.join(cache_dir, 'docker-blob-{}'.format(re.sub('\\W', '_', blob['digest'])))
+        files[blob['digest']] = cache_file
 
-        if not os.path.isfile(blob['cache_file']):
-            needs_retrieving.append(strip_digest(blob['digest']))
-            total_size += blob['size']
+        if not os.path.isfile(cache_file):
+            needs_retrieving[blob['digest']] = blob
 
     if len(needs_retrieving) > 0:
+        if offline_mode:
+            return None
+
         log.info('Retrieving Docker layers:')
-        for layer in needs_retrieving:
-            log.info('    {}'.format(layer))
+        for digest in needs_retrieving:
+            log.info('    {}'.format(strip_digest(digest)))
 
-    for blob in blobs:
-        cache_file = os.path.join(cache_dir, 'docker-blob-{}'.format(re.sub('\\W', '_', blob['digest'])))
-        cache_file_temp = '{}.tmp'.format(cache_file)
+        progress = DownloadProgress(log, sum(blob['size'] for blob in needs_retrieving.values()))
 
-        if not os.path.isfile(cache_file):
-            if offline_mode:
-                return None
+        with ThreadPoolExecutor(max_workers=min(DEFAULT_BLOB_DOWNLOAD_PARALLELISM, len(needs_retrieving))) as executor:
+            futures = [executor.submit(fetch_blob, files[digest], url, ns, image, blob, progress)
+                       for digest, blob in needs_retrieving.items()]
 
-            prev_time = 0.0
+        for future in futures:
+            future.result()
 
-            full_url = 'https://{}/v2/{}/{}/blobs/{}'.format(url, ns, image, blob['digest'])
-            response = get_with_token(url, full_url, raw=True)
-            with open(cache_file_temp, 'wb') as cache_fileobj:
-                for chunk in iter(partial(response.raw.read, IO_CHUNK_SIZE), b''):
-                    cache_fileobj.write(chunk)
+    return files
 
-                    if log.is_progress_enabled():
-                        downloaded_size += len(chunk)
-                        percent = (downloaded_size * 1.0) / total_size
-                        download_complete = percent >= 1.0
-                        now_time = time.time()
-                        if download_complete or now_time - prev_time >= 0.1:
-                            progress_bar_text = screen_utils.progress_bar(percent)
-                            log.progress(progress_bar_text, flush=download_complete)
-                            prev_time = now_time
 
-            os.rename(cache_file_temp, cache_file)
+def fetch_blob(cache_file, url, ns, image, blob, progress):
+    """
+    Downloads the given blob into a temporary file, which is renamed to `cache_file` once its content matches the
+    digest of the blob. A temporary file left behind by an interrupted download is resumed rather than downloaded
+    again, and an interrupted download is resumed up to `BLOB_DOWNLOAD_ATTEMPTS` times.
+    """
+    cache_file_temp = '{}.tmp'.format(cache_file)
+    full_url = 'https://{}/v2/{}/{}/blobs/{}'.format(url, ns, image, blob['digest'])
+    algorithm, expected_hex_digest = blob['digest'].split(':', 1)
+
+    for attempt in range(1, BLOB_DOWNLOAD_ATTEMPTS + 1):
+        try:
+            content_hash = download_blob(url, full_url, cache_file_temp, algorithm, blob['size'], progress,
+                                         is_resumed_download=attempt == 1)
+            break
+        except DOWNLOAD_INTERRUPTED_ERRORS:
+            if attempt == BLOB_DOWNLOAD_ATTEMPTS:
+                raise
+
+    if content_hash.hexdigest() != expected_hex_digest:
+        os.remove(cache_file_temp)
+        raise BundleDigestMismatchError(full_url, blob['digest'], '{}:{}'.format(algorithm, content_hash.hexdigest()))
+
+    os.replace(cache_file_temp, cache_file)
+
+
+def download_blob(url, full_url, cache_file_temp, algorithm, size, progress, is_resumed_download):
+    """
+    Downloads a blob into `cache_file_temp`, hashing its content as it is written. If the file already holds part of
+    the blob, the remainder is requested with a `Range` request. The content of a download resumed from an earlier run
+    is added to the progress, whereas the content of an earlier attempt of this run has already been.
+    Returns the hash of the content.
+    """
+    content_hash = hashlib.new(algorithm)
+    offset = 0
+
+    if os.path.isfile(cache_file_temp):
+        if os.path.getsize(cache_file_temp) <= size:
+            with open(cache_file_temp, 'rb') as cache_fileobj:
+                for chunk in iter(partial(cache_fileobj.read, IO_CHUNK_SIZE), b''):
+                    content_hash.update(chunk)
+                    offset += len(chunk)
+
+            if is_resumed_download:
+                progress.update(offset)
+        else:
+            os.remove(cache_file_temp)
 
-        files[blob['digest']] = cache_file
+    if offset == size:
+        return content_hash
 
-    return files
+    response = get_with_token(url, full_url, headers={'Range': 'bytes={}-'.format(offset)} if offset > 0 else None,
+                              raw=True)
+
+    if offset > 0 and response.status_code != 206:
+        # The registry doesn't support ranges, and as such the blob is downloaded from the start
+        content_hash = hashlib.new(algorithm)
+        offset = 0
+
+    with open(cache_file_temp, 'ab' if offset > 0 else 'wb') as cache_fileobj:
+        for chunk in iter(partial(response.raw.read, IO_CHUNK_SIZE), b''):
+            cache_fileobj.write(chunk)
+            content_hash.update(chunk)
+            progress.update(len(chunk))
+
+    return content_hash
 
 
 def fetch_manifest(cache_dir, url, ns, image, manifest, offline_mode):
-    full_url = 'https://{}/v2/{}/{}/manifests/{}'.format(url, ns, image, manifest)
-    full_url_digest = hashlib.sha256(full_url.encode('UTF-8')).hexdigest()
-    cache_file = os.path.join(cache_dir, 'docker-manifest-{}'.format(full_url_digest))
+    """
+    Returns the manifest of the given image along with its digest. The cached manifest is revalidated against the
+    registry by its digest, so that an unchanged manifest is answered by a 304 without being downloaded again. Returns
+    `(None, None)` in offline mode if the manifest isn't cached.
+    """
+    cache_file = manifest_cache_file(cache_dir, url, ns, image, manifest)
+    digest_file = '{}.digest'.format(cache_file)
+
+    if os.path.isfile(digest_file) and os.path.isfile(cache_file):
+        with open(digest_file, 'r') as digest_fileobj:
+            cached_digest = digest_fileobj.read().strip()
+    elif os.path.isfile(cache_file):
+        # Manifests cached before their digest was recorded are named by the digest of their content
+        with open(cache_file, 'rb') as cache_fileobj:
+            cached_digest = 'sha256:{}'.format(hashlib.sha256(cache_fileobj.read()).hexdigest())
+    else:
+        cached_digest = None
 
     if offline_mode:
         if os.path.isfile(cache_file):
             with open(cache_file, 'r') as cache_fileobj:
-                return json.load(cache_fileobj)
+                return json.load(cache_fileobj), cached_digest
         else:
-            return None
+            return None, None
     else:
-        response = get_with_token(url,
-                                  full_url,
-                                  headers={'Accept': 'application/vnd.docker.distribution.manifest.v2+json'})
+        headers = {'Accept': 'application/vnd.docker.distribution.manifest.v2+json'}
+
+        if cached_digest is not None:
+            headers['If-None-Match'] = '"{}"'.format(cached_digest)
+
+        response = get_with_token(url, manifest_url(url, ns, image, manifest), headers=headers)
         response.raise_for_status()
 
+        if response.status_code == 304:
+            with open(cache_file, 'r') as cache_fileobj:
+                return json.load(cache_fileobj), cached_digest
+
+        digest = response.headers.get('Docker-Content-Digest') or \
+            'sha256:{}'.format(hashlib.sha256(response.content).hexdigest())
+
         with open(cache_file, 'w', encoding="utf-8") as cache_fileobj:
             cache_fileobj.write(response.text)
 
-        return json.loads(response.text)
+        with open(digest_file, 'w', encoding="utf-8") as digest_fileobj:
+            digest_fileobj.write(digest)
+
+        return json.loads(response.text), digest
+
+
+def manifest_url(url, ns, image, manifest):
+    return 'https://{}/v2/{}/{}/manifests/{}'.format(url, ns, image, manifest)
+
+
+def manifest_cache_file(cache_dir, url, ns, image, manifest):
+    full_url_digest = hashlib.sha256(manifest_url(url, ns, image, manifest).encode('UTF-8')).hexdigest()
+    return os.path.join(cache_dir, 'docker-manifest-{}'.format(full_url_digest))
+
+
+def link_or_copy(source, destination):
+    if not os.path.exists(destination):
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
 
 
 def strip_digest(value):
@@ -183,87 +333,115 @@ def resolve_bundle(cache_dir, uri, auth=None):
 def do_resolve_bundle(cache_dir, uri, auth, offline_mode):
     (provided_url, url), (provided_ns, ns), (provided_image, image), (provided_tag, tag) = parse_uri(uri)
 
-    temp_dir = tempfile.mkdtemp()
-
     try:
-        manifest = fetch_manifest(cache_dir, url, ns, image, tag, offline_mode)
+        manifest, manifest_digest = fetch_manifest(cache_dir, url, ns, image, tag, offline_mode)
 
         if manifest is None:
             return False, None, None, DockerImageMalformedError('{} - unable to find manifest'.format(uri))
         elif 'config' not in manifest or 'layers' not in manifest:
             return False, None, None, DockerImageMalformedError('{} - 1.0 manifests are not supported'.format(uri))
 
+        # The image is laid out once per manifest digest, so that resolving an unchanged image again doesn't involve
+        # any of its blobs
+
+        image_dir = image_cache_dir(cache_dir, uri, manifest_digest)
+
+        if os.path.isdir(image_dir):
+            return True, None, image_dir, None
+
         files = fetch_blobs(cache_dir, url, ns, image, [manifest['config']] + manifest['layers'], offline_mode)
 
         if files is None:
             return False, None, None, None
 
-        shutil.copyfile(
-            files[manifest['config']['digest']],
-            os.path.join(temp_dir, strip_digest(manifest['config']['digest']) + '.json')
-        )
-
-        layers = []
-        layer_digests = []
-
-        for layer in manifest['layers']:
-            layer_file = files[layer['digest']]
-            digest = hashlib.sha256()
-            base_layer_digest = strip_digest(layer['digest'])
-            layer_digests.append(base_layer_digest)
-            base_layer_name = os.path.join(base_layer_digest, 'layer.tar')
-            file_name = os.path.join(temp_dir, base_layer_name)
-            os.makedirs(os.path.dirname(file_name))
-
-            with open(file_name, 'wb') as layer_out_file, open(layer_file, 'rb') as layer_in_file:
-                if layer['mediaType'].endswith('.gzip'):
-                    with gzip.GzipFile(fileobj=layer_in_file.raw, mode='rb') as gzip_file:
-                        for chunk in iter(partial(gzip_file.read, IO_CHUNK_SIZE), b''):
-                            layer_out_file.write(chunk)
-                            digest.update(chunk)
-                else:
-                    for chunk in iter(partial(layer_in_file.read, IO_CHUNK_SIZE), b''):
-                        layer_out_file.write(chunk)
-                        digest.update(chunk)
-
-            layers.append(base_layer_name)
-
-        manifests_tag = []
-        repositories = {}
-
-        if provided_url is not None and provided_ns is not None and tag is not None:
-            manifests_tag.append('{}/{}/{}:{}'.format(provided_url, provided_ns, image, tag))
-
-            if len(layer_digests) > 0:
-                repositories['{}/{}/{}'.format(provided_url, provided_ns, image)] = {tag: layer_digests[-1]}
-        elif provided_ns is not None and tag is not None:
-            manifests_tag.append('{}/{}:{}'.format(provided_ns, image, tag))
-
-            if len(layer_digests) > 0:
-                repositories['{}/{}'.format(provided_ns, image)] = {tag: layer_digests[-1]}
-        elif tag is not None:
-            manifests_tag.append('{}:{}'.format(image, tag))
-
-            if len(layer_digests) > 0:
-                repositories[image] = {tag: layer_digests[-1]}
-
-        manifests = [OrderedDict([
-            ('Config', '{}.json'.format(strip_digest(manifest['config']['digest']))),
-            ('RepoTags', manifests_tag),
-            ('Layers', layers)
-        ])]
-
-        with open(os.path.join(temp_dir, 'manifest.json'), 'w', encoding="utf-8") as manifest_fileobj:
-            manifest_fileobj.write(json.dumps(manifests))
-
-        with open(os.path.join(temp_dir, 'repositories'), 'w', encoding="utf-8") as repositories_fileobj:
-            repositories_fileobj.write(json.dumps(repositories))
-
-        return True, None, temp_dir, None
+        # The layout is created next to the cached blobs so that its layers can be linked to them
+        temp_dir = tempfile.mkdtemp(dir=cache_dir, prefix='docker-image-')
+
+        try:
+            write_image_layout(temp_dir, manifest, files, provided_url, provided_ns, image, tag)
+
+            # The layouts of previous manifests of the same image are no longer needed
+            for stale_image_dir in glob.glob('{}-*'.format(image_cache_dir(cache_dir, uri, None))):
+                shutil.rmtree(stale_image_dir, ignore_errors=True)
+
+            os.rename(temp_dir, image_dir)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        return True, None, image_dir, None
     except Exception as e:
         return False, None, None, e
 
 
+def write_image_layout(image_dir, manifest, files, provided_url, provided_ns, image, tag):
+    """
+    Lays out the image as `docker save` does, with the layers as they were fetched from the registry.
+    """
+    shutil.copyfile(
+        files[manifest['config']['digest']],
+        os.path.join(image_dir, strip_digest(manifest['config']['digest']) + '.json')
+    )
+
+    layers = []
+    layer_digests = []
+
+    for layer in manifest['layers']:
+        # The layers are passed on to bndl as fetched from the registry, so compressed layers become the blobs of
+        # the OCI image without being decompressed and compressed again.
+
+        base_layer_digest = strip_digest(layer['digest'])
+        layer_digests.append(base_layer_digest)
+        base_layer_name = os.path.join(base_layer_digest,
+                                       'layer.tar.gz' if layer['mediaType'].endswith('.gzip') else 'layer.tar')
+        file_name = os.path.join(image_dir, base_layer_name)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        link_or_copy(files[layer['digest']], file_name)
+
+        layers.append(base_layer_name)
+
+    manifests_tag = []
+    repositories = {}
+
+    if provided_url is not None and provided_ns is not None and tag is not None:
+        manifests_tag.append('{}/{}/{}:{}'.format(provided_url, provided_ns, image, tag))
+
+        if len(layer_digests) > 0:
+            repositories['{}/{}/{}'.format(provided_url, provided_ns, image)] = {tag: layer_digests[-1]}
+    elif provided_ns is not None and tag is not None:
+        manifests_tag.append('{}/{}:{}'.format(provided_ns, image, tag))
+
+        if len(layer_digests) > 0:
+            repositories['{}/{}'.format(provided_ns, image)] = {tag: layer_digests[-1]}
+    elif tag is not None:
+        manifests_tag.append('{}:{}'.format(image, tag))
+
+        if len(layer_digests) > 0:
+            repositories[image] = {tag: layer_digests[-1]}
+
+    manifests = [OrderedDict([
+        ('Config', '{}.json'.format(strip_digest(manifest['config']['digest']))),
+        ('RepoTags', manifests_tag),
+        ('Layers', layers)
+    ])]
+
+    with open(os.path.join(image_dir, 'manifest.json'), 'w', encoding="utf-8") as manifest_fileobj:
+        manifest_fileobj.write(json.dumps(manifests))
+
+    with open(os.path.join(image_dir, 'repositories'), 'w', encoding="utf-8") as repositories_fileobj:
+        repositories_fileobj.write(json.dumps(repositories))
+
+    # The layers were verified against their digests as they were fetched
+    open(os.path.join(image_dir, DOCKER_VERIFIED_LAYERS_FILE_NAME), 'w').close()
+
+
+def image_cache_dir(cache_dir, uri, manifest_digest):
+    uri_digest = hashlib.sha256(uri.encode('UTF-8')).hexdigest()
+    image_dir = os.path.join(cache_dir, 'docker-image-{}'.format(uri_digest))
+
+    return image_dir if manifest_digest is None else '{}-{}'.format(image_dir, strip_digest(manifest_digest))
+
+
 def load_bundle_from_cache(cache_dir, uri):
     return False, None, None, None
 
@@ -0,0 +1,94 @@
+"""Persistent cache of the bearer tokens issued by Docker registries.
+
+Tokens are keyed by the realm, service and scope of the challenge they were issued for, so that pulls from different
+repositories don't replace each other's tokens. Each token is kept until its `expires_in` elapses. The challenge
+of each repository is recorded as well, so that a later pull from the same repository can present a cached token,
+or fetch a new one, without first being refused by the registry.
+
+The cache holds credentials, so its file is only readable and writable by the user.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+# The lifetime of a token whose response doesn't specify `expires_in`, as per the Docker token specification.
+DEFAULT_EXPIRES_IN = 60
+
+# Tokens are considered expired this number of seconds early, so that they don't expire while a request is in flight.
+EXPIRY_MARGIN = 10
+
+# Guards the cache file against concurrent updates from the threads of the same process.
+_lock = threading.Lock()
+
+
+def token_key(challenge):
+    return ' '.join([challenge['realm'], challenge['service'], challenge['scope']])
+
+
+def load(path):
+    """
+    Returns the cache stored at `path`, i.e. the `tokens` keyed by `token_key` with their `token` and `expires_at`
+    time, and the `challenges` keyed by repository with their `realm`, `service` and `scope`.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {'tokens': {}, 'challenges': {}}
+
+
+def save(path, cache):
+    # The temporary file is created with 0600 permissions, and replaces the cache as a whole so that a concurrent
+    # command never reads a partially written cache
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='{}.'.format(os.path.basename(path)))
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump(cache, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_challenge(path, repository):
+    """
+    Returns the challenge last presented by the registry for the given repository, or `None` if it isn't known.
+    """
+    with _lock:
+        return load(path)['challenges'].get(repository)
+
+
+def get_token(path, challenge):
+    """
+    Returns the cached token for the given challenge, or `None` if there is no such token or it has expired.
+    """
+    with _lock:
+        entry = load(path)['tokens'].get(token_key(challenge))
+
+    if entry is not None and entry['expires_at'] - EXPIRY_MARGIN > time.time():
+        return entry['token']
+    else:
+        return None
+
+
+def put_challenge(path, repository, challenge):
+    with _lock:
+        cache = load(path)
+        if cache['challenges'].get(repository) != challenge:
+            cache['challenges'][repository] = challenge
+            save(path, cache)
+
+
+def put_token(path, challenge, token, expires_in):
+    """
+    Caches the token issued for the given challenge, dropping the tokens which have expired in the meantime.
+    """
+    with _lock:
+        now = time.time()
+        cache = load(path)
+        cache['tokens'] = {key: entry for key, entry in cache['tokens'].items() if entry['expires_at'] > now}
+        cache['tokens'][token_key(challenge)] = {
+            'token': token,
+            'expires_at': now + (expires_in if expires_in is not None else DEFAULT_EXPIRES_IN)
+        }
+        save(path, cache)
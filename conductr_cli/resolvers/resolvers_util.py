@@ -1,9 +1,22 @@
 from urllib.parse import urlparse
-from conductr_cli import bundle_shorthand
-from conductr_cli.exceptions import MalformedBundleUriError
+from conductr_cli import bundle_shorthand, screen_utils
+from conductr_cli.exceptions import MalformedBundleUriError, ResolutionCancelledError
 from conductr_cli.resolvers.schemes import SCHEME_BUNDLE, SCHEME_FILE, SCHEME_STDIN
+from requests.packages.urllib3.exceptions import ProtocolError, ReadTimeoutError
 import os
+import requests
 import sys
+import threading
+import time
+
+
+# The errors of a lost connection, raised either when making a request or when reading the content of its response.
+DOWNLOAD_INTERRUPTED_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                               requests.exceptions.Timeout, ProtocolError, ReadTimeoutError)
+
+# The resolution run by the current thread. Its `cancelled` event, if any, is set once the resolution is no longer
+# needed, e.g. when another resolver which runs concurrently has already resolved the bundle.
+resolution = threading.local()
 
 
 def is_local_file(uri, require_bundle_conf):
@@ -98,3 +111,33 @@ def detect_scheme_from_path(uri):
     :return: file scheme if uri is present on the local file system, otherwise `None`
     """
     return SCHEME_FILE if os.path.exists(uri) else None
+
+
+class DownloadProgress(object):
+    """
+    A single progress bar of several concurrent downloads, or of the parts of a download, which is updated as each
+    of them receives data.
+    The downloads are stopped with a `ResolutionCancelledError` once the resolution which started them is cancelled.
+    """
+    def __init__(self, log, total_size):
+        self.log = log
+        self.total_size = total_size
+        self.downloaded_size = 0
+        self.prev_time = 0.0
+        self.lock = threading.Lock()
+        self.cancelled = getattr(resolution, 'cancelled', None)
+
+    def update(self, size):
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise ResolutionCancelledError('The resolution has been cancelled')
+
+        if self.log.is_progress_enabled():
+            with self.lock:
+                self.downloaded_size += size
+                percent = (self.downloaded_size * 1.0) / self.total_size if self.total_size > 0 else 1.0
+                download_complete = percent >= 1.0
+                now_time = time.time()
+                if download_complete or now_time - self.prev_time >= 0.1:
+                    progress_bar_text = screen_utils.progress_bar(percent)
+                    self.log.progress(progress_bar_text, flush=download_complete)
+                    self.prev_time = now_time
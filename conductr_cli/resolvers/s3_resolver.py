@@ -1,16 +1,32 @@
-from conductr_cli import screen_utils
 from conductr_cli.exceptions import S3InvalidArtefactError, S3MalformedUrlError
+from conductr_cli.resolvers.resolvers_util import DownloadProgress
 from conductr_cli.resolvers.schemes import SCHEME_S3
+from boto3.s3.transfer import S3Transfer, TransferConfig
 from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
+from s3transfer.manager import TransferManager
 from urllib.parse import urlparse
 import boto3
+import hashlib
+import json
 import logging
 import os
 import shutil
-import time
 
 
-DATA_READ_CHUNK_SIZE = 128
+# The size of the ranges in which artefacts are downloaded, and the number of ranges downloaded at a time.
+S3_DOWNLOAD_PART_SIZE = int(os.getenv('CONDUCTR_S3_DOWNLOAD_PART_SIZE', 8 * 1024 * 1024))
+S3_DOWNLOAD_CONCURRENCY = int(os.getenv('CONDUCTR_S3_DOWNLOAD_CONCURRENCY', 10))
+
+# The directory within the cache dir holding the S3 metadata of the cached artefacts.
+S3_METADATA_DIR_NAME = '.s3'
+
+
+class ConditionalTransferManager(TransferManager):
+    """
+    The S3 transfer manager, also allowing downloads to be made conditional on the ETag of the object. The condition is
+    passed on to the GET of each part.
+    """
+    ALLOWED_DOWNLOAD_ARGS = TransferManager.ALLOWED_DOWNLOAD_ARGS + ['IfMatch']
 
 
 def supported_schemes():
@@ -57,6 +73,10 @@ def resolve_s3_object(cache_dir, uri):
 
 
 def resolve_s3_object_from_cache(cache_dir, uri):
+    """
+    Returns the cached artefact of the given S3 object, provided it was downloaded from the same bucket and key and
+    the object hasn't changed since, as revalidated by a HEAD request conditional on its ETag.
+    """
     log = logging.getLogger(__name__)
 
     if not is_s3_url(uri):
@@ -65,14 +85,80 @@ def resolve_s3_object_from_cache(cache_dir, uri):
     bucket_name, s3_key_name = s3_bucket_and_key_from_uri(uri)
     if s3_key_name:
         artefact_name = os.path.basename(s3_key_name)
-        cached_artefact = os.path.join(cache_dir, artefact_name)
-        if os.path.exists(cached_artefact):
-            log.info('Retrieving from cache {}'.format(cached_artefact))
-            return True, artefact_name, cached_artefact, None
+        cached_file_name = cache_file_name(bucket_name, s3_key_name)
+        cached_artefact = os.path.join(cache_dir, cached_file_name)
+        metadata = load_metadata(cache_dir, cached_file_name)
+        if is_cached_object(metadata, bucket_name, s3_key_name, cached_artefact):
+            try:
+                if is_unchanged(create_s3_client(), metadata):
+                    log.info('Retrieving from cache {}'.format(cached_artefact))
+                    return True, artefact_name, cached_artefact, None
+            except (ClientError, NoCredentialsError) as e:
+                return False, None, None, e
 
     return False, None, None, None
 
 
+def is_cached_object(metadata, bucket_name, s3_key_name, cached_artefact):
+    return metadata is not None and \
+        metadata['bucket'] == bucket_name and \
+        metadata['key'] == s3_key_name and \
+        metadata['etag'] is not None and \
+        os.path.exists(cached_artefact) and \
+        os.path.getsize(cached_artefact) == metadata['size']
+
+
+def is_unchanged(client, metadata):
+    try:
+        client.head_object(Bucket=metadata['bucket'], Key=metadata['key'], IfNoneMatch=metadata['etag'])
+        return False
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == '304':
+            return True
+        else:
+            raise
+
+
+def cache_file_name(bucket_name, s3_key_name):
+    """
+    Returns the name of the cached artefact of the given S3 object, i.e. its base name suffixed with a digest of its
+    bucket and key so that objects of the same name in other buckets or directories are cached apart.
+    """
+    root, ext = os.path.splitext(os.path.basename(s3_key_name))
+    key_digest = hashlib.sha256('{}/{}'.format(bucket_name, s3_key_name).encode('utf-8')).hexdigest()[:16]
+    return '{}-{}{}'.format(root, key_digest, ext)
+
+
+def metadata_file(cache_dir, artefact_file_name):
+    return os.path.join(cache_dir, S3_METADATA_DIR_NAME, '{}.json'.format(artefact_file_name))
+
+
+def load_metadata(cache_dir, artefact_file_name):
+    """
+    Returns the `bucket`, `key`, `etag`, `size` and `version_id` of the S3 object the given artefact was downloaded
+    from, or `None` if they aren't known.
+    """
+    try:
+        with open(metadata_file(cache_dir, artefact_file_name), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_metadata(cache_dir, artefact_file_name, metadata):
+    path = metadata_file(cache_dir, artefact_file_name)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(metadata, file, indent=2, sort_keys=True)
+
+
+def remove_metadata(cache_dir, artefact_file_name):
+    try:
+        os.remove(metadata_file(cache_dir, artefact_file_name))
+    except FileNotFoundError:
+        pass
+
+
 def s3_bucket_and_key_from_uri(uri):
     if is_s3_url(uri):
         parsed = urlparse(uri)
@@ -93,21 +179,34 @@ def download_from_s3(cache_dir, bucket_name, s3_key_name):
     log = logging.getLogger(__name__)
     client = create_s3_client()
     try:
-        artefact = client.get_object(Bucket=bucket_name, Key=s3_key_name)
+        artefact = client.head_object(Bucket=bucket_name, Key=s3_key_name)
 
         validate_artefact(artefact)
 
         artefact_file_name = os.path.basename(s3_key_name)
-        cached_file = os.path.join(cache_dir, artefact_file_name)
+        cached_file_name = cache_file_name(bucket_name, s3_key_name)
+        cached_file = os.path.join(cache_dir, cached_file_name)
         cached_file_tmp = '{}.tmp'.format(cached_file)
 
         artefact_size = artefact['ContentLength']
-        artefact_data = artefact['Body']
 
         log.info('Retrieving {}://{}{}'.format(SCHEME_S3, bucket_name, s3_key_name))
-        save_artefact_data_to_file(artefact_size, artefact_data, cached_file_tmp)
+        download_artefact_to_file(client, bucket_name, s3_key_name, artefact_size, cached_file_tmp,
+                                  artefact.get('VersionId'), artefact.get('ETag'))
         shutil.move(cached_file_tmp, cached_file)
 
+        # The ETag only describes the downloaded file if each part was fetched from the object of the HEAD.
+        if download_conditions(artefact.get('VersionId'), artefact.get('ETag')) is not None:
+            save_metadata(cache_dir, cached_file_name, {
+                'bucket': bucket_name,
+                'key': s3_key_name,
+                'etag': artefact.get('ETag'),
+                'size': artefact_size,
+                'version_id': artefact.get('VersionId')
+            })
+        else:
+            remove_metadata(cache_dir, cached_file_name)
+
         return True, artefact_file_name, cached_file, None
     except (ClientError, S3InvalidArtefactError) as e:
         return False, None, None, e
@@ -122,43 +221,45 @@ def validate_artefact(artefact):
         raise S3InvalidArtefactError('Unable to find \'ContentType\' in the S3 artefact metadata')
     elif artefact['ContentType'] != 'application/zip':
         raise S3InvalidArtefactError('Invalid content type \'{}\''.format(artefact['ContentType']))
-    elif 'Body' not in artefact:
-        raise S3InvalidArtefactError('Unable to find artefact data')
 
 
-def save_artefact_data_to_file(artefact_size, artefact_data, file_path):
-    try:
-        log = logging.getLogger(__name__)
-
-        parent_dir = os.path.abspath(os.path.join(file_path, os.pardir))
-        if not os.path.exists(parent_dir):
-            os.makedirs(parent_dir, mode=0o700)
-
-        if os.path.exists(file_path):
-            os.remove(file_path)
-
-        with open(file_path, mode='bw') as f:
-            downloaded_size = 0
-            prev_time = time.time()
-
-            while downloaded_size < artefact_size:
-                chunk = artefact_data.read(DATA_READ_CHUNK_SIZE)
-                chunk_length = len(chunk)
-                downloaded_size += chunk_length
-                if chunk_length > 0:
-                    f.write(chunk)
-
-                now_time = time.time()
-                upload_complete = downloaded_size >= artefact_size
-                if upload_complete or now_time - prev_time >= 0.1:
-                    percent = 1.0 if upload_complete else downloaded_size * 1.0 / artefact_size
-                    progress_bar_text = screen_utils.progress_bar(percent)
-                    log.progress(progress_bar_text, flush=upload_complete)
-                    prev_time = now_time
-
-        return file_path
-    finally:
-        artefact_data.close()
+def download_artefact_to_file(client, bucket_name, s3_key_name, artefact_size, file_path, version_id=None,
+                              etag=None):
+    """
+    Downloads the artefact using the S3 transfer manager, i.e. as ranged GETs of `S3_DOWNLOAD_PART_SIZE` bytes of which
+    `S3_DOWNLOAD_CONCURRENCY` are downloaded at a time. Given the `version_id` of an object in a versioned bucket, the
+    parts are all downloaded from that version even if the object is updated meanwhile. Otherwise, given its `etag`,
+    the download fails rather than mixing the parts of an object updated meanwhile.
+    """
+    log = logging.getLogger(__name__)
+
+    parent_dir = os.path.abspath(os.path.join(file_path, os.pardir))
+    if not os.path.exists(parent_dir):
+        os.makedirs(parent_dir, mode=0o700)
+
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+    transfer_config = TransferConfig(multipart_threshold=S3_DOWNLOAD_PART_SIZE,
+                                     multipart_chunksize=S3_DOWNLOAD_PART_SIZE,
+                                     max_concurrency=S3_DOWNLOAD_CONCURRENCY)
+    progress = DownloadProgress(log, artefact_size)
+
+    with S3Transfer(manager=ConditionalTransferManager(client, transfer_config)) as transfer:
+        transfer.download_file(bucket_name, s3_key_name, file_path,
+                               extra_args=download_conditions(version_id, etag),
+                               callback=progress.update)
+
+    return file_path
+
+
+def download_conditions(version_id, etag):
+    if version_id is not None:
+        return {'VersionId': version_id}
+    elif etag is not None:
+        return {'IfMatch': etag}
+    else:
+        return None
 
 
 def create_s3_client():
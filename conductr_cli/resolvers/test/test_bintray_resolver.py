@@ -7,9 +7,25 @@ from conductr_cli.exceptions import MalformedBundleUriError, BintrayResolutionEr
 from requests.exceptions import HTTPError, ConnectionError
 import io
 import os
+import shutil
+import tempfile
 from unittest.mock import call, patch, MagicMock, Mock
 
 
+def setUpModule():  # noqa
+    # The versions resolved by the tests are cached away from the user's metadata cache
+    global metadata_cache_dir, metadata_cache_patch
+    metadata_cache_dir = tempfile.mkdtemp()
+    metadata_cache_patch = patch('conductr_cli.resolvers.bintray_resolver.BINTRAY_METADATA_CACHE_FILE_PATH',
+                                 os.path.join(metadata_cache_dir, 'bintray-metadata.json'))
+    metadata_cache_patch.start()
+
+
+def tearDownModule():  # noqa
+    metadata_cache_patch.stop()
+    shutil.rmtree(metadata_cache_dir)
+
+
 class TestResolveBundle(TestCase):
     bintray_auth = ('realm', 'username', 'password')
     bintray_no_auth = (None, None, None)
@@ -565,6 +581,9 @@ class TestLoadBundleConfigurationFromCache(TestCase):
 class TestBintrayResolveVersion(TestCase):
     bintray_auth = ('Bintray', 'username', 'password')
 
+    def setUp(self):  # noqa
+        bintray_resolver.refresh_metadata()
+
     def test_success(self):
         bintray_files_endpoint_response = [
             {
@@ -648,6 +667,9 @@ class TestBintrayResolveVersion(TestCase):
 class TestBintrayResolveVersionLatest(TestCase):
     bintray_auth = ('Bintray', 'username', 'password')
 
+    def setUp(self):  # noqa
+        bintray_resolver.refresh_metadata()
+
     def test_success(self):
         package_endpoint_response = {
             'latest_version': 'v1-023f9da22'
@@ -779,6 +801,9 @@ class TestBintrayResolveVersionLatest(TestCase):
 class TestBintrayResolveVersionLatestCompatibilityVersion(TestCase):
     bintray_auth = ('Bintray', 'username', 'password')
 
+    def setUp(self):  # noqa
+        bintray_resolver.refresh_metadata()
+
     def test_success(self):
         bintray_attributes_endpoint_response = [
             {
@@ -840,6 +865,84 @@ class TestBintrayResolveVersionLatestCompatibilityVersion(TestCase):
             'https://api.bintray.com/packages/typesafe/bundle/reactive-maps-frontend/attributes?names=latest-v1')
 
 
+class TestBintrayResolveVersionMetadataCache(TestCase):
+    bintray_auth = ('Bintray', 'username', 'password')
+
+    bintray_attributes_endpoint_response = [
+        {
+            'name': 'latest-v1',
+            'type': 'version',
+            'values': ['v1-023f9da22']
+        }
+    ]
+
+    bintray_files_endpoint_response = [
+        {
+            'owner': 'typesafe',
+            'repo': 'bundle',
+            'package': 'reactive-maps-frontend',
+            'version': 'v1-023f9da22',
+            'path': 'download/path.zip'
+        }
+    ]
+
+    def setUp(self):  # noqa
+        bintray_resolver.refresh_metadata()
+
+    def resolve_version(self, get_json_mock, tag, digest=None, now=1000):
+        with patch('conductr_cli.resolvers.bintray_resolver.get_json', get_json_mock), \
+                patch('time.time', MagicMock(return_value=now)):
+            return bintray_resolver.bintray_resolve_version(self.bintray_auth,
+                                                            'typesafe', 'bundle', 'reactive-maps-frontend',
+                                                            tag=tag, digest=digest)
+
+    def test_cached_version(self):
+        get_json_mock = MagicMock(side_effect=[self.bintray_attributes_endpoint_response,
+                                               self.bintray_files_endpoint_response])
+        resolved_version = self.resolve_version(get_json_mock, 'v1')
+
+        get_json_mock = MagicMock()
+        self.assertEqual(resolved_version, self.resolve_version(get_json_mock, 'v1', now=1000 + 60))
+        self.assertEqual(resolved_version, self.resolve_version(get_json_mock, 'v1', '023f9da22', now=1000 + 60))
+        get_json_mock.assert_not_called()
+
+    def test_tag_expired(self):
+        get_json_mock = MagicMock(side_effect=[self.bintray_attributes_endpoint_response,
+                                               self.bintray_files_endpoint_response])
+        self.resolve_version(get_json_mock, 'v1')
+
+        get_json_mock = MagicMock(return_value=self.bintray_attributes_endpoint_response)
+        self.resolve_version(get_json_mock, 'v1', now=1000 + bintray_resolver.BINTRAY_METADATA_TTL)
+
+        # Only the latest version of the tag is fetched again, its digest is immutable
+        get_json_mock.assert_called_once_with(
+            self.bintray_auth,
+            'https://api.bintray.com/packages/typesafe/bundle/reactive-maps-frontend/attributes?names=latest-v1')
+
+    def test_digest_never_expires(self):
+        get_json_mock = MagicMock(return_value=self.bintray_files_endpoint_response)
+        resolved_version = self.resolve_version(get_json_mock, 'v1', '023f9da22')
+
+        get_json_mock = MagicMock()
+        self.assertEqual(resolved_version, self.resolve_version(get_json_mock, 'v1', '023f9da22', now=1000 + 86400))
+        get_json_mock.assert_not_called()
+
+    def test_refresh_metadata(self):
+        get_json_mock = MagicMock(return_value=self.bintray_files_endpoint_response)
+        self.resolve_version(get_json_mock, 'v1', '023f9da22')
+
+        bintray_resolver.refresh_metadata()
+
+        self.resolve_version(get_json_mock, 'v1', '023f9da22')
+        self.assertEqual(2, get_json_mock.call_count)
+
+    def test_version_not_found_not_cached(self):
+        get_json_mock = MagicMock(return_value=[])
+        self.assertIsNone(self.resolve_version(get_json_mock, 'v1'))
+        self.assertIsNone(self.resolve_version(get_json_mock, 'v1'))
+        self.assertEqual(2, get_json_mock.call_count)
+
+
 class TestResolveBundleVersion(TestCase):
     bintray_auth = ('realm', 'username', 'password')
 
@@ -1075,7 +1178,8 @@ class TestGetJson(TestCase):
         response_mock.text = '[1,2,3]'
 
         requests_get_mock = MagicMock(return_value=response_mock)
-        with patch('requests.get', requests_get_mock):
+        http_session_mock = MagicMock(return_value=Mock(get=requests_get_mock))
+        with patch('conductr_cli.http.session', http_session_mock):
             result = bintray_resolver.get_json(self.auth, 'http://site.com')
             self.assertEqual([1, 2, 3], result)
 
@@ -1089,7 +1193,8 @@ class TestGetJson(TestCase):
         response_mock.text = '[1,2,3]'
 
         requests_get_mock = MagicMock(return_value=response_mock)
-        with patch('requests.get', requests_get_mock):
+        http_session_mock = MagicMock(return_value=Mock(get=requests_get_mock))
+        with patch('conductr_cli.http.session', http_session_mock):
             result = bintray_resolver.get_json(None, 'http://site.com')
             self.assertEqual([1, 2, 3], result)
 
@@ -1103,7 +1208,8 @@ class TestGetJson(TestCase):
         response_mock.text = '[1,2,3]'
 
         requests_get_mock = MagicMock(return_value=response_mock)
-        with patch('requests.get', requests_get_mock):
+        http_session_mock = MagicMock(return_value=Mock(get=requests_get_mock))
+        with patch('conductr_cli.http.session', http_session_mock):
             result = bintray_resolver.get_json(('realm', None, 'password'), 'http://site.com')
             self.assertEqual([1, 2, 3], result)
 
@@ -1117,7 +1223,8 @@ class TestGetJson(TestCase):
         response_mock.text = '[1,2,3]'
 
         requests_get_mock = MagicMock(return_value=response_mock)
-        with patch('requests.get', requests_get_mock):
+        http_session_mock = MagicMock(return_value=Mock(get=requests_get_mock))
+        with patch('conductr_cli.http.session', http_session_mock):
             result = bintray_resolver.get_json(('realm', 'username', None), 'http://site.com')
             self.assertEqual([1, 2, 3], result)
 
@@ -1,7 +1,17 @@
-from conductr_cli.resolvers import docker_resolver
+from conductr_cli.constants import DOCKER_VERIFIED_LAYERS_FILE_NAME
+from conductr_cli import logging_setup
+from conductr_cli.resolvers import docker_resolver, docker_token_cache
 from conductr_cli.resolvers.schemes import SCHEME_BUNDLE
 from unittest import TestCase
+from conductr_cli.exceptions import BundleDigestMismatchError
+from requests.exceptions import HTTPError
+from requests.packages.urllib3.exceptions import ProtocolError
 from unittest.mock import call, patch, MagicMock
+import hashlib
+import io
+import json
+import os
+import shutil
 import tempfile
 
 
@@ -84,23 +94,348 @@ class TestLoadCredentials(TestCase):
 
 
 class TestFetchManifest(TestCase):
+    manifest = b'{"schemaVersion": 2}'
+    digest = 'sha256:{}'.format(hashlib.sha256(b'{"schemaVersion": 2}').hexdigest())
+
+    def setUp(self):  # noqa
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.cache_dir, 'docker-manifest-624ab327c0f6bb1039ca629a2c1ec806514b9194c30491'
+                                                       'c02e9800254c73d998')
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.cache_dir)
+
+    def fetch_manifest(self, offline_mode, get_with_token_mock=MagicMock()):
+        with patch('conductr_cli.resolvers.docker_resolver.get_with_token', get_with_token_mock):
+            return docker_resolver.fetch_manifest(self.cache_dir, 'registry.hub.docker.com', 'library', 'alpine', '3.5',
+                                                  offline_mode)
 
     def test_offline_mode(self):
-        mock_is_file = MagicMock(return_value=True)
-        mock_json_load = MagicMock(return_value='1234')
-        mock_open = MagicMock(return_value=MagicMock())
-
-        with \
-                patch('os.path.isfile', mock_is_file), \
-                patch('json.load', mock_json_load), \
-                patch('builtins.open', mock_open):
-            self.assertEqual(
-                docker_resolver.fetch_manifest('/tmp', 'registry.hub.docker.com', 'library', 'alpine', '3.5', True),
-                '1234'
-            )
-
-        mock_is_file.assert_called_once_with('/tmp/docker-manifest-624ab327c0f6bb1039ca62'
-                                             '9a2c1ec806514b9194c30491c02e9800254c73d998')
+        with open(self.cache_file, 'wb') as file:
+            file.write(self.manifest)
+
+        self.assertEqual(({'schemaVersion': 2}, self.digest), self.fetch_manifest(True))
+
+    def test_offline_mode_not_cached(self):
+        self.assertEqual((None, None), self.fetch_manifest(True))
+
+    def test_fetch(self):
+        get_with_token_mock = MagicMock(return_value=MagicMock(status_code=200,
+                                                               text=self.manifest.decode('UTF-8'),
+                                                               headers={'Docker-Content-Digest': 'sha256:abc'}))
+
+        self.assertEqual(({'schemaVersion': 2}, 'sha256:abc'), self.fetch_manifest(False, get_with_token_mock))
+
+        get_with_token_mock.assert_called_once_with(
+            'registry.hub.docker.com',
+            'https://registry.hub.docker.com/v2/library/alpine/manifests/3.5',
+            headers={'Accept': 'application/vnd.docker.distribution.manifest.v2+json'})
+
+        with open('{}.digest'.format(self.cache_file), 'r') as file:
+            self.assertEqual('sha256:abc', file.read())
+
+    def test_not_modified(self):
+        with open(self.cache_file, 'wb') as file:
+            file.write(self.manifest)
+        with open('{}.digest'.format(self.cache_file), 'w') as file:
+            file.write('sha256:abc')
+
+        get_with_token_mock = MagicMock(return_value=MagicMock(status_code=304))
+
+        self.assertEqual(({'schemaVersion': 2}, 'sha256:abc'), self.fetch_manifest(False, get_with_token_mock))
+
+        get_with_token_mock.assert_called_once_with(
+            'registry.hub.docker.com',
+            'https://registry.hub.docker.com/v2/library/alpine/manifests/3.5',
+            headers={'Accept': 'application/vnd.docker.distribution.manifest.v2+json',
+                     'If-None-Match': '"sha256:abc"'})
+
+
+class TestFetchBlobs(TestCase):
+    def setUp(self):  # noqa
+        self.cache_dir = tempfile.mkdtemp()
+        logging_setup.configure_logging(MagicMock(), MagicMock())
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.cache_dir)
+
+    def blob_response(self, data, status_code=200):
+        return MagicMock(raw=io.BytesIO(data), status_code=status_code)
+
+    def blob(self, data):
+        return {'digest': 'sha256:{}'.format(hashlib.sha256(data).hexdigest()), 'size': len(data)}
+
+    def blob_url(self, blob):
+        return 'https://registry.hub.docker.com/v2/library/alpine/blobs/{}'.format(blob['digest'])
+
+    def cache_file(self, blob):
+        return os.path.join(self.cache_dir, 'docker-blob-{}'.format(blob['digest'].replace(':', '_')))
+
+    def fetch_blobs(self, blobs, get_with_token_mock):
+        with patch('conductr_cli.resolvers.docker_resolver.get_with_token', get_with_token_mock):
+            return docker_resolver.fetch_blobs(self.cache_dir, 'registry.hub.docker.com', 'library', 'alpine',
+                                               blobs, False)
+
+    def test_fetch_blobs(self):
+        config, layer1, layer2 = self.blob(b'config'), self.blob(b'layer1'), self.blob(b'layer2')
+        with open(self.cache_file(layer2), 'wb') as file:
+            file.write(b'layer2')
+
+        responses = {
+            self.blob_url(config): b'config',
+            self.blob_url(layer1): b'layer1'
+        }
+        get_with_token_mock = MagicMock(side_effect=lambda ns, url, headers, raw: self.blob_response(responses[url]))
+
+        files = self.fetch_blobs([config, layer1, layer2, layer1], get_with_token_mock)
+
+        self.assertEqual([config['digest'], layer1['digest'], layer2['digest']], list(files.keys()))
+        self.assertEqual(2, get_with_token_mock.call_count)
+
+        for blob, data in [(config, b'config'), (layer1, b'layer1'), (layer2, b'layer2')]:
+            self.assertEqual(self.cache_file(blob), files[blob['digest']])
+            with open(files[blob['digest']], 'rb') as file:
+                self.assertEqual(data, file.read())
+
+        self.assertEqual(sorted([os.path.basename(self.cache_file(blob)) for blob in [config, layer1, layer2]]),
+                         sorted(os.listdir(self.cache_dir)))
+
+    def test_fetch_blobs_digest_mismatch(self):
+        layer = self.blob(b'layer')
+        get_with_token_mock = MagicMock(return_value=self.blob_response(b'reyal'))
+
+        self.assertRaises(BundleDigestMismatchError, self.fetch_blobs, [layer], get_with_token_mock)
+
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    def test_fetch_blobs_resume(self):
+        layer = self.blob(b'0123456789')
+        with open('{}.tmp'.format(self.cache_file(layer)), 'wb') as file:
+            file.write(b'01234')
+
+        get_with_token_mock = MagicMock(return_value=self.blob_response(b'56789', status_code=206))
+
+        files = self.fetch_blobs([layer], get_with_token_mock)
+
+        get_with_token_mock.assert_called_once_with('registry.hub.docker.com', self.blob_url(layer),
+                                                    headers={'Range': 'bytes=5-'}, raw=True)
+        with open(files[layer['digest']], 'rb') as file:
+            self.assertEqual(b'0123456789', file.read())
+
+    def test_fetch_blobs_resume_not_supported(self):
+        layer = self.blob(b'0123456789')
+        with open('{}.tmp'.format(self.cache_file(layer)), 'wb') as file:
+            file.write(b'01234')
+
+        get_with_token_mock = MagicMock(return_value=self.blob_response(b'0123456789'))
+
+        files = self.fetch_blobs([layer], get_with_token_mock)
+
+        with open(files[layer['digest']], 'rb') as file:
+            self.assertEqual(b'0123456789', file.read())
+
+    def test_fetch_blobs_retry_interrupted(self):
+        layer = self.blob(b'0123456789')
+
+        class InterruptedRaw(io.BytesIO):
+            def read(self, size=-1):
+                data = super().read(5)
+                if not data:
+                    raise ProtocolError('Connection broken')
+                return data
+
+        get_with_token_mock = MagicMock(side_effect=[
+            MagicMock(raw=InterruptedRaw(b'01234'), status_code=200),
+            self.blob_response(b'56789', status_code=206)
+        ])
+
+        files = self.fetch_blobs([layer], get_with_token_mock)
+
+        self.assertEqual(call('registry.hub.docker.com', self.blob_url(layer), headers={'Range': 'bytes=5-'},
+                              raw=True),
+                         get_with_token_mock.call_args)
+        with open(files[layer['digest']], 'rb') as file:
+            self.assertEqual(b'0123456789', file.read())
+
+    def test_fetch_blobs_offline_mode(self):
+        get_with_token_mock = MagicMock()
+
+        with patch('conductr_cli.resolvers.docker_resolver.get_with_token', get_with_token_mock):
+            self.assertIsNone(docker_resolver.fetch_blobs(self.cache_dir, 'registry.hub.docker.com', 'library',
+                                                          'alpine', [{'digest': 'sha256:config', 'size': 6}], True))
+
+        get_with_token_mock.assert_not_called()
+
+    def test_fetch_blobs_failure(self):
+        get_with_token_mock = MagicMock(side_effect=HTTPError(response=MagicMock(status_code=404)))
+
+        with patch('conductr_cli.resolvers.docker_resolver.get_with_token', get_with_token_mock):
+            self.assertRaises(HTTPError, docker_resolver.fetch_blobs, self.cache_dir, 'registry.hub.docker.com',
+                              'library', 'alpine', [self.blob(b'config')], False)
+
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+
+class TestResolveBundle(TestCase):
+    def setUp(self):  # noqa
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.cache_dir)
+
+    def cache_file(self, name, data):
+        path = os.path.join(self.cache_dir, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def resolve_bundle(self, manifest, fetch_blobs_mock, manifest_digest='sha256:manifest'):
+        with patch('conductr_cli.resolvers.docker_resolver.fetch_manifest',
+                   MagicMock(return_value=(manifest, manifest_digest))), \
+                patch('conductr_cli.resolvers.docker_resolver.fetch_blobs', fetch_blobs_mock):
+            return docker_resolver.resolve_bundle(self.cache_dir, 'lightbend/conductr:1.0')
+
+    def test_resolve_bundle(self):
+        manifest = {
+            'config': {'digest': 'sha256:config', 'size': 2},
+            'layers': [
+                {'digest': 'sha256:layer1', 'mediaType': 'application/vnd.docker.image.rootfs.diff.tar.gzip'},
+                {'digest': 'sha256:layer2', 'mediaType': 'application/vnd.docker.image.rootfs.diff.tar'}
+            ]
+        }
+        files = {
+            'sha256:config': self.cache_file('config', b'{}'),
+            'sha256:layer1': self.cache_file('layer1', b'gzip'),
+            'sha256:layer2': self.cache_file('layer2', b'tar')
+        }
+
+        is_resolved, bundle_file_name, temp_dir, error = self.resolve_bundle(manifest, MagicMock(return_value=files))
+
+        try:
+            self.assertEqual((True, None, None), (is_resolved, bundle_file_name, error))
+
+            self.assertTrue(os.path.samefile(files['sha256:layer1'], os.path.join(temp_dir, 'layer1', 'layer.tar.gz')))
+            self.assertTrue(os.path.samefile(files['sha256:layer2'], os.path.join(temp_dir, 'layer2', 'layer.tar')))
+
+            with open(os.path.join(temp_dir, 'manifest.json'), 'r') as file:
+                self.assertEqual(
+                    [{
+                        'Config': 'config.json',
+                        'RepoTags': ['lightbend/conductr:1.0'],
+                        'Layers': ['layer1/layer.tar.gz', 'layer2/layer.tar']
+                    }],
+                    json.load(file))
+
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, DOCKER_VERIFIED_LAYERS_FILE_NAME)))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_resolve_bundle_unchanged_manifest(self):
+        manifest = {'config': {'digest': 'sha256:config', 'size': 2}, 'layers': []}
+        fetch_blobs_mock = MagicMock(return_value={'sha256:config': self.cache_file('config', b'{}')})
+
+        _, _, image_dir, _ = self.resolve_bundle(manifest, fetch_blobs_mock)
+        fetch_blobs_mock.reset_mock()
+
+        self.assertEqual((True, None, image_dir, None), self.resolve_bundle(manifest, fetch_blobs_mock))
+        fetch_blobs_mock.assert_not_called()
+
+    def test_resolve_bundle_changed_manifest(self):
+        manifest = {'config': {'digest': 'sha256:config', 'size': 2}, 'layers': []}
+        fetch_blobs_mock = MagicMock(return_value={'sha256:config': self.cache_file('config', b'{}')})
+
+        _, _, previous_image_dir, _ = self.resolve_bundle(manifest, fetch_blobs_mock)
+        _, _, image_dir, _ = self.resolve_bundle(manifest, fetch_blobs_mock, manifest_digest='sha256:changed')
+
+        self.assertEqual(2, fetch_blobs_mock.call_count)
+        self.assertNotEqual(previous_image_dir, image_dir)
+        self.assertFalse(os.path.exists(previous_image_dir))
+        self.assertTrue(os.path.isdir(image_dir))
+
+
+class TestGetWithToken(TestCase):
+    url = 'https://registry/v2/lightbend/conductr/manifests/latest'
+    challenge = {'realm': 'https://auth/token', 'service': 'registry', 'scope': 'repository:lightbend/conductr:pull'}
+    www_authenticate = 'Bearer realm="https://auth/token",service="registry",scope="repository:lightbend/conductr:pull"'
+
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.token_cache_file = os.path.join(self.tmpdir, 'docker-tokens.json')
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def get_with_token(self, get_mock, fetch_token_mock, *urls):
+        with patch('conductr_cli.resolvers.docker_resolver.DOCKER_TOKEN_CACHE_FILE_PATH', self.token_cache_file), \
+                patch('requests.get', get_mock), \
+                patch('conductr_cli.resolvers.docker_resolver.fetch_token', fetch_token_mock):
+            return [docker_resolver.get_with_token('registry', url) for url in urls]
+
+    def test_shared_token(self):
+        unauthorized_response = MagicMock(status_code=401, headers={'Www-Authenticate': self.www_authenticate})
+        ok_response = MagicMock()
+
+        def get(url, stream, headers):
+            if headers.get('Authorization') == 'Bearer new-token':
+                return ok_response
+            else:
+                raise HTTPError(response=unauthorized_response)
+
+        docker_token_cache.put_challenge(self.token_cache_file, 'registry/lightbend/conductr', self.challenge)
+        docker_token_cache.put_token(self.token_cache_file, self.challenge, 'revoked-token', 300)
+        fetch_token_mock = MagicMock(return_value=('new-token', 300))
+
+        self.assertEqual([ok_response, ok_response],
+                         self.get_with_token(MagicMock(side_effect=get), fetch_token_mock,
+                                             self.url, 'https://registry/v2/lightbend/conductr/blobs/sha256:abc'))
+
+        fetch_token_mock.assert_called_once_with('registry', self.challenge)
+
+    def test_cached_token(self):
+        docker_token_cache.put_challenge(self.token_cache_file, 'registry/lightbend/conductr', self.challenge)
+        docker_token_cache.put_token(self.token_cache_file, self.challenge, 'cached-token', 300)
+        get_mock = MagicMock()
+        fetch_token_mock = MagicMock()
+
+        self.get_with_token(get_mock, fetch_token_mock, self.url)
+
+        get_mock.assert_called_once_with(self.url, stream=False, headers={'Authorization': 'Bearer cached-token'})
+        fetch_token_mock.assert_not_called()
+
+    def test_expired_token(self):
+        docker_token_cache.put_challenge(self.token_cache_file, 'registry/lightbend/conductr', self.challenge)
+        with patch('time.time', MagicMock(return_value=0)):
+            docker_token_cache.put_token(self.token_cache_file, self.challenge, 'expired-token', 300)
+        get_mock = MagicMock()
+        fetch_token_mock = MagicMock(return_value=('new-token', 300))
+
+        self.get_with_token(get_mock, fetch_token_mock, self.url)
+
+        get_mock.assert_called_once_with(self.url, stream=False, headers={'Authorization': 'Bearer new-token'})
+        fetch_token_mock.assert_called_once_with('registry', self.challenge)
+
+    def test_challenge(self):
+        unauthorized_response = MagicMock(status_code=401, headers={'Www-Authenticate': self.www_authenticate})
+        ok_response = MagicMock()
+        get_mock = MagicMock(side_effect=[HTTPError(response=unauthorized_response), ok_response])
+        fetch_token_mock = MagicMock(return_value=('new-token', 300))
+
+        self.assertEqual([ok_response], self.get_with_token(get_mock, fetch_token_mock, self.url))
+
+        self.assertEqual(self.challenge,
+                         docker_token_cache.get_challenge(self.token_cache_file, 'registry/lightbend/conductr'))
+        self.assertEqual('new-token', docker_token_cache.get_token(self.token_cache_file, self.challenge))
+
+
+class TestRepositoryOf(TestCase):
+    def test_repository_of(self):
+        self.assertEqual('registry.hub.docker.com/library/alpine',
+                         docker_resolver.repository_of(
+                             'https://registry.hub.docker.com/v2/library/alpine/manifests/latest'))
+        self.assertEqual('registry.hub.docker.com/library/alpine',
+                         docker_resolver.repository_of(
+                             'https://registry.hub.docker.com/v2/library/alpine/blobs/sha256:abc'))
+        self.assertEqual('https://registry/other', docker_resolver.repository_of('https://registry/other'))
 
 
 class TestSupportedSchemes(TestCase):
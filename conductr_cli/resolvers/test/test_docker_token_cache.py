@@ -0,0 +1,71 @@
+from conductr_cli.resolvers import docker_token_cache
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+import os
+import shutil
+import stat
+import tempfile
+
+
+class TestDockerTokenCache(TestCase):
+    challenge = {'realm': 'https://auth/token', 'service': 'registry', 'scope': 'repository:lightbend/conductr:pull'}
+
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'settings', 'docker-tokens.json')
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def test_put_token(self):
+        docker_token_cache.put_token(self.path, self.challenge, 'token', 300)
+
+        self.assertEqual('token', docker_token_cache.get_token(self.path, self.challenge))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_token_per_scope(self):
+        other_challenge = dict(self.challenge, scope='repository:lightbend/other:pull')
+        docker_token_cache.put_token(self.path, self.challenge, 'token', 300)
+        docker_token_cache.put_token(self.path, other_challenge, 'other-token', 300)
+
+        self.assertEqual('token', docker_token_cache.get_token(self.path, self.challenge))
+        self.assertEqual('other-token', docker_token_cache.get_token(self.path, other_challenge))
+
+    def test_token_expired(self):
+        with patch('time.time', MagicMock(return_value=1000)):
+            docker_token_cache.put_token(self.path, self.challenge, 'token', 300)
+
+        with patch('time.time', MagicMock(return_value=1000 + 300 - docker_token_cache.EXPIRY_MARGIN - 1)):
+            self.assertEqual('token', docker_token_cache.get_token(self.path, self.challenge))
+
+        with patch('time.time', MagicMock(return_value=1000 + 300 - docker_token_cache.EXPIRY_MARGIN)):
+            self.assertIsNone(docker_token_cache.get_token(self.path, self.challenge))
+
+    def test_token_default_expiry(self):
+        with patch('time.time', MagicMock(return_value=1000)):
+            docker_token_cache.put_token(self.path, self.challenge, 'token', None)
+
+        self.assertEqual(1000 + docker_token_cache.DEFAULT_EXPIRES_IN,
+                         docker_token_cache.load(self.path)['tokens'][docker_token_cache.token_key(self.challenge)]
+                         ['expires_at'])
+
+    def test_put_token_drops_expired(self):
+        other_challenge = dict(self.challenge, scope='repository:lightbend/other:pull')
+
+        with patch('time.time', MagicMock(return_value=1000)):
+            docker_token_cache.put_token(self.path, other_challenge, 'other-token', 300)
+
+        with patch('time.time', MagicMock(return_value=2000)):
+            docker_token_cache.put_token(self.path, self.challenge, 'token', 300)
+
+        self.assertEqual([docker_token_cache.token_key(self.challenge)],
+                         list(docker_token_cache.load(self.path)['tokens'].keys()))
+
+    def test_put_challenge(self):
+        docker_token_cache.put_challenge(self.path, 'registry/lightbend/conductr', self.challenge)
+
+        self.assertEqual(self.challenge, docker_token_cache.get_challenge(self.path, 'registry/lightbend/conductr'))
+        self.assertIsNone(docker_token_cache.get_challenge(self.path, 'registry/lightbend/other'))
+
+    def test_load_missing(self):
+        self.assertEqual({'tokens': {}, 'challenges': {}}, docker_token_cache.load(self.path))
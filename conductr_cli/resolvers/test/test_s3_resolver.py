@@ -4,8 +4,14 @@ from conductr_cli.exceptions import S3InvalidArtefactError, S3MalformedUrlError
 from conductr_cli.resolvers import s3_resolver
 from conductr_cli.resolvers.schemes import SCHEME_S3
 from botocore.exceptions import ClientError, NoCredentialsError, ProfileNotFound
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
 from unittest.mock import call, patch, MagicMock
+import boto3
 import io
+import os
+import shutil
+import tempfile
 
 
 class TestResolve(CliTestCase):
@@ -97,70 +103,124 @@ class TestResolve(CliTestCase):
 
 
 class TestLoadFromCache(CliTestCase):
-    cache_dir = '/tmp'
     bucket_name = 'myorg'
     s3_key = 'bundle/weather/weather-v3-digest.zip'
     valid_s3_url = 's3://{}/{}'.format(bucket_name, s3_key)
+    metadata = {
+        'bucket': bucket_name,
+        'key': s3_key,
+        'etag': '"abc"',
+        'size': 4,
+        'version_id': None
+    }
 
-    def test_load_bundle_from_cache_found(self):
-        mock_exists = MagicMock(return_value=True)
+    def setUp(self):  # noqa
+        self.cache_dir = tempfile.mkdtemp()
+        self.cached_file_name = s3_resolver.cache_file_name(self.bucket_name, self.s3_key)
+        self.cached_file = os.path.join(self.cache_dir, self.cached_file_name)
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.cache_dir)
+
+    def cache(self, metadata):
+        with open(self.cached_file, 'wb') as file:
+            file.write(b'data')
+        s3_resolver.save_metadata(self.cache_dir, self.cached_file_name, metadata)
+
+    def load_from_cache(self, load, head_object_mock, uri=valid_s3_url):
+        mock_s3_client = MagicMock()
+        mock_s3_client.head_object = head_object_mock
         stdout = MagicMock()
 
-        with patch('os.path.exists', mock_exists):
+        with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', MagicMock(return_value=mock_s3_client)):
             logging_setup.configure_logging(MagicMock(**{}), stdout)
-            result = s3_resolver.load_bundle_from_cache(self.cache_dir, self.valid_s3_url)
-            self.assertEqual((True, 'weather-v3-digest.zip', '/tmp/weather-v3-digest.zip', None), result)
+            return load(self.cache_dir, uri), self.output(stdout)
+
+    def test_load_bundle_from_cache_found(self):
+        self.cache(self.metadata)
+        head_object_mock = MagicMock(side_effect=ClientError({'Error': {'Code': '304'}}, 'HeadObject'))
 
-        mock_exists.assert_called_once_with('/tmp/weather-v3-digest.zip')
-        self.assertEqual('Retrieving from cache /tmp/weather-v3-digest.zip\n', self.output(stdout))
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, head_object_mock)
+
+        self.assertEqual((True, 'weather-v3-digest.zip', self.cached_file, None), result)
+        head_object_mock.assert_called_once_with(Bucket=self.bucket_name, Key=self.s3_key, IfNoneMatch='"abc"')
+        self.assertEqual('Retrieving from cache {}\n'.format(self.cached_file), output)
 
     def test_load_bundle_from_cache_not_found(self):
-        mock_exists = MagicMock(return_value=False)
-        stdout = MagicMock()
+        head_object_mock = MagicMock()
 
-        with patch('os.path.exists', mock_exists):
-            logging_setup.configure_logging(MagicMock(**{}), stdout)
-            result = s3_resolver.load_bundle_from_cache(self.cache_dir, self.valid_s3_url)
-            self.assertEqual((False, None, None, None), result)
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, head_object_mock)
+
+        self.assertEqual((False, None, None, None), result)
+        head_object_mock.assert_not_called()
+        self.assertEqual('', output)
+
+    def test_load_bundle_from_cache_changed(self):
+        self.cache(self.metadata)
+        head_object_mock = MagicMock(return_value={'ETag': '"def"'})
+
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, head_object_mock)
+
+        self.assertEqual((False, None, None, None), result)
+        head_object_mock.assert_called_once_with(Bucket=self.bucket_name, Key=self.s3_key, IfNoneMatch='"abc"')
 
-        mock_exists.assert_called_once_with('/tmp/weather-v3-digest.zip')
-        self.assertEqual('', self.output(stdout))
+    def test_load_bundle_from_cache_other_bucket(self):
+        self.cache(dict(self.metadata, bucket='otherorg'))
+        head_object_mock = MagicMock()
+
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, head_object_mock)
+
+        self.assertEqual((False, None, None, None), result)
+        head_object_mock.assert_not_called()
+
+    def test_load_bundle_from_cache_other_key(self):
+        self.cache(self.metadata)
+        head_object_mock = MagicMock()
+
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, head_object_mock,
+                                              uri='s3://myorg/bundle/other/weather-v3-digest.zip')
+
+        self.assertEqual((False, None, None, None), result)
+        head_object_mock.assert_not_called()
+
+    def test_load_bundle_from_cache_error(self):
+        self.cache(self.metadata)
+        error = ClientError({'Error': {'Code': '403'}}, 'HeadObject')
+
+        result, output = self.load_from_cache(s3_resolver.load_bundle_from_cache, MagicMock(side_effect=error))
+
+        self.assertEqual((False, None, None, error), result)
 
     def test_load_bundle_configuration_from_cache_found(self):
-        mock_exists = MagicMock(return_value=True)
-        stdout = MagicMock()
+        self.cache(self.metadata)
+        head_object_mock = MagicMock(side_effect=ClientError({'Error': {'Code': '304'}}, 'HeadObject'))
 
-        with patch('os.path.exists', mock_exists):
-            logging_setup.configure_logging(MagicMock(**{}), stdout)
-            result = s3_resolver.load_bundle_configuration_from_cache(self.cache_dir, self.valid_s3_url)
-            self.assertEqual((True, 'weather-v3-digest.zip', '/tmp/weather-v3-digest.zip', None), result)
+        result, output = self.load_from_cache(s3_resolver.load_bundle_configuration_from_cache, head_object_mock)
 
-        mock_exists.assert_called_once_with('/tmp/weather-v3-digest.zip')
-        self.assertEqual('Retrieving from cache /tmp/weather-v3-digest.zip\n', self.output(stdout))
+        self.assertEqual((True, 'weather-v3-digest.zip', self.cached_file, None), result)
 
     def test_load_bundle_configuration_from_cache_not_found(self):
-        mock_exists = MagicMock(return_value=False)
-        stdout = MagicMock()
+        result, output = self.load_from_cache(s3_resolver.load_bundle_configuration_from_cache, MagicMock())
 
-        with patch('os.path.exists', mock_exists):
-            logging_setup.configure_logging(MagicMock(**{}), stdout)
-            result = s3_resolver.load_bundle_configuration_from_cache(self.cache_dir, self.valid_s3_url)
-            self.assertEqual((False, None, None, None), result)
+        self.assertEqual((False, None, None, None), result)
 
-        mock_exists.assert_called_once_with('/tmp/weather-v3-digest.zip')
-        self.assertEqual('', self.output(stdout))
+    def test_remove_metadata(self):
+        self.cache(self.metadata)
+
+        s3_resolver.remove_metadata(self.cache_dir, self.cached_file_name)
+        s3_resolver.remove_metadata(self.cache_dir, self.cached_file_name)
+
+        self.assertIsNone(s3_resolver.load_metadata(self.cache_dir, self.cached_file_name))
 
     def test_non_s3_url(self):
-        mock_exists = MagicMock()
-        stdout = MagicMock()
+        head_object_mock = MagicMock()
 
-        with patch('os.path.exists', mock_exists):
-            logging_setup.configure_logging(MagicMock(**{}), stdout)
-            result = s3_resolver.load_bundle_configuration_from_cache(self.cache_dir, 'http://example.org')
-            self.assertEqual((False, None, None, None), result)
+        result, output = self.load_from_cache(s3_resolver.load_bundle_configuration_from_cache, head_object_mock,
+                                              uri='http://example.org')
 
-        mock_exists.assert_not_called()
-        self.assertEqual('', self.output(stdout))
+        self.assertEqual((False, None, None, None), result)
+        head_object_mock.assert_not_called()
+        self.assertEqual('', output)
 
 
 class TestOtherMethods(CliTestCase):
@@ -212,96 +272,173 @@ class TestIsS3Url(CliTestCase):
         self.assertFalse(s3_resolver.is_s3_url('http://test.com'))
 
 
+class TestCacheFileName(CliTestCase):
+    def test_bucket_and_key(self):
+        file_name = s3_resolver.cache_file_name('bucket', 'path/to/bundle-v1-digest.zip')
+
+        self.assertRegex(file_name, '^bundle-v1-digest-[0-9a-f]{16}\\.zip$')
+        self.assertEqual(file_name, s3_resolver.cache_file_name('bucket', 'path/to/bundle-v1-digest.zip'))
+        self.assertNotEqual(file_name, s3_resolver.cache_file_name('other', 'path/to/bundle-v1-digest.zip'))
+        self.assertNotEqual(file_name, s3_resolver.cache_file_name('bucket', 'other/bundle-v1-digest.zip'))
+
+
 class TestDownloadFromS3(CliTestCase):
     cache_dir = '/tmp'
     bucket_name = 'acme-org'
     key_name = 'bundle/builder/builder-v1-digest.zip'
 
     artefact_size = 100
-    artefact_data = MagicMock(name='artefact data')
     artefact = {
         'ContentLength': artefact_size,
-        'Body': artefact_data
+        'ContentType': 'application/zip',
+        'ETag': '"abc"',
+        'VersionId': 'v1'
     }
 
     def test_success(self):
-        mock_get_object = MagicMock(return_value=self.artefact)
+        cached_file = os.path.join(self.cache_dir, s3_resolver.cache_file_name(self.bucket_name, self.key_name))
+        mock_head_object = MagicMock(return_value=self.artefact)
 
         mock_s3_client = MagicMock()
-        mock_s3_client.get_object = mock_get_object
+        mock_s3_client.head_object = mock_head_object
 
         mock_create_s3_client = MagicMock(return_value=mock_s3_client)
         mock_validate_artefact = MagicMock()
-        mock_save_artefact_data_to_file = MagicMock()
+        mock_download_artefact_to_file = MagicMock()
         mock_move = MagicMock()
+        mock_save_metadata = MagicMock()
 
         with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', mock_create_s3_client), \
+                patch('conductr_cli.resolvers.s3_resolver.save_metadata', mock_save_metadata), \
                 patch('conductr_cli.resolvers.s3_resolver.validate_artefact', mock_validate_artefact), \
-                patch('conductr_cli.resolvers.s3_resolver.save_artefact_data_to_file',
-                      mock_save_artefact_data_to_file), \
+                patch('conductr_cli.resolvers.s3_resolver.download_artefact_to_file',
+                      mock_download_artefact_to_file), \
                 patch('shutil.move', mock_move):
             result = s3_resolver.download_from_s3(self.cache_dir, self.bucket_name, self.key_name)
-            self.assertEqual((True, 'builder-v1-digest.zip', '/tmp/builder-v1-digest.zip', None), result)
+            self.assertEqual((True, 'builder-v1-digest.zip', cached_file, None), result)
 
         mock_create_s3_client.assert_called_once_with()
-        mock_s3_client.get_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
+        mock_s3_client.head_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
         mock_validate_artefact.assert_called_once_with(self.artefact)
-        mock_save_artefact_data_to_file.assert_called_once_with(self.artefact_size,
-                                                                self.artefact_data,
-                                                                '/tmp/builder-v1-digest.zip.tmp')
-        mock_move.assert_called_once_with('/tmp/builder-v1-digest.zip.tmp', '/tmp/builder-v1-digest.zip')
+        mock_download_artefact_to_file.assert_called_once_with(mock_s3_client,
+                                                               self.bucket_name,
+                                                               self.key_name,
+                                                               self.artefact_size,
+                                                               '{}.tmp'.format(cached_file),
+                                                               'v1',
+                                                               '"abc"')
+        mock_move.assert_called_once_with('{}.tmp'.format(cached_file), cached_file)
+        mock_save_metadata.assert_called_once_with(self.cache_dir, os.path.basename(cached_file), {
+            'bucket': self.bucket_name,
+            'key': self.key_name,
+            'etag': '"abc"',
+            'size': self.artefact_size,
+            'version_id': 'v1'
+        })
+
+    def test_unconditional_download_not_revalidated(self):
+        cached_file_name = s3_resolver.cache_file_name(self.bucket_name, self.key_name)
+        artefact = {'ContentLength': self.artefact_size, 'ContentType': 'application/zip'}
+
+        mock_s3_client = MagicMock()
+        mock_s3_client.head_object = MagicMock(return_value=artefact)
+
+        mock_save_metadata = MagicMock()
+        mock_remove_metadata = MagicMock()
+
+        with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', MagicMock(return_value=mock_s3_client)), \
+                patch('conductr_cli.resolvers.s3_resolver.save_metadata', mock_save_metadata), \
+                patch('conductr_cli.resolvers.s3_resolver.remove_metadata', mock_remove_metadata), \
+                patch('conductr_cli.resolvers.s3_resolver.download_artefact_to_file', MagicMock()), \
+                patch('shutil.move', MagicMock()):
+            is_resolved, file_name, file_path, error = s3_resolver.download_from_s3(self.cache_dir, self.bucket_name,
+                                                                                    self.key_name)
+
+        self.assertTrue(is_resolved)
+        mock_save_metadata.assert_not_called()
+        mock_remove_metadata.assert_called_once_with(self.cache_dir, cached_file_name)
 
     def test_client_error(self):
         error = ClientError(MagicMock(), MagicMock())
-        mock_get_object = MagicMock(side_effect=error)
+        mock_head_object = MagicMock(side_effect=error)
 
         mock_s3_client = MagicMock()
-        mock_s3_client.get_object = mock_get_object
+        mock_s3_client.head_object = mock_head_object
 
         mock_create_s3_client = MagicMock(return_value=mock_s3_client)
         mock_validate_artefact = MagicMock()
-        mock_save_artefact_data_to_file = MagicMock()
+        mock_download_artefact_to_file = MagicMock()
         mock_move = MagicMock()
+        mock_save_metadata = MagicMock()
 
         with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', mock_create_s3_client), \
+                patch('conductr_cli.resolvers.s3_resolver.save_metadata', mock_save_metadata), \
                 patch('conductr_cli.resolvers.s3_resolver.validate_artefact', mock_validate_artefact), \
-                patch('conductr_cli.resolvers.s3_resolver.save_artefact_data_to_file',
-                      mock_save_artefact_data_to_file), \
+                patch('conductr_cli.resolvers.s3_resolver.download_artefact_to_file',
+                      mock_download_artefact_to_file), \
                 patch('shutil.move', mock_move):
             result = s3_resolver.download_from_s3(self.cache_dir, self.bucket_name, self.key_name)
             self.assertEqual((False, None, None, error), result)
 
         mock_create_s3_client.assert_called_once_with()
-        mock_s3_client.get_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
+        mock_s3_client.head_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
         mock_validate_artefact.assert_not_called()
-        mock_save_artefact_data_to_file.assert_not_called()
+        mock_download_artefact_to_file.assert_not_called()
         mock_move.assert_not_called()
+        mock_save_metadata.assert_not_called()
+
+    def test_etag_changed_during_download(self):
+        cache_dir = tempfile.mkdtemp()
+        s3_client = boto3.session.Session(aws_access_key_id='key', aws_secret_access_key='secret',
+                                          region_name='us-east-1').client('s3')
+        stubber = Stubber(s3_client)
+        stubber.add_response('head_object', {'ContentLength': 2, 'ContentType': 'application/zip', 'ETag': '"abc"'},
+                             {'Bucket': self.bucket_name, 'Key': self.key_name})
+        stubber.add_client_error('head_object', service_error_code='PreconditionFailed', http_status_code=412,
+                                 expected_params={'Bucket': self.bucket_name, 'Key': self.key_name,
+                                                  'IfMatch': '"abc"'})
+
+        try:
+            with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', MagicMock(return_value=s3_client)), \
+                    stubber:
+                logging_setup.configure_logging(MagicMock(**{}), MagicMock())
+                is_resolved, file_name, file_path, error = s3_resolver.download_from_s3(cache_dir, self.bucket_name,
+                                                                                        self.key_name)
+
+            self.assertFalse(is_resolved)
+            self.assertEqual('PreconditionFailed', error.response['Error']['Code'])
+            self.assertEqual([], os.listdir(cache_dir))
+        finally:
+            shutil.rmtree(cache_dir)
 
     def test_invalid_artefact_error(self):
-        mock_get_object = MagicMock(return_value=self.artefact)
+        mock_head_object = MagicMock(return_value=self.artefact)
 
         mock_s3_client = MagicMock()
-        mock_s3_client.get_object = mock_get_object
+        mock_s3_client.head_object = mock_head_object
 
         mock_create_s3_client = MagicMock(return_value=mock_s3_client)
         error = S3InvalidArtefactError('test')
         mock_validate_artefact = MagicMock(side_effect=error)
-        mock_save_artefact_data_to_file = MagicMock()
+        mock_download_artefact_to_file = MagicMock()
         mock_move = MagicMock()
+        mock_save_metadata = MagicMock()
 
         with patch('conductr_cli.resolvers.s3_resolver.create_s3_client', mock_create_s3_client), \
+                patch('conductr_cli.resolvers.s3_resolver.save_metadata', mock_save_metadata), \
                 patch('conductr_cli.resolvers.s3_resolver.validate_artefact', mock_validate_artefact), \
-                patch('conductr_cli.resolvers.s3_resolver.save_artefact_data_to_file',
-                      mock_save_artefact_data_to_file), \
+                patch('conductr_cli.resolvers.s3_resolver.download_artefact_to_file',
+                      mock_download_artefact_to_file), \
                 patch('shutil.move', mock_move):
             result = s3_resolver.download_from_s3(self.cache_dir, self.bucket_name, self.key_name)
             self.assertEqual((False, None, None, error), result)
 
         mock_create_s3_client.assert_called_once_with()
-        mock_s3_client.get_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
+        mock_s3_client.head_object.assert_called_once_with(Bucket=self.bucket_name, Key=self.key_name)
         mock_validate_artefact.assert_called_once_with(self.artefact)
-        mock_save_artefact_data_to_file.assert_not_called()
+        mock_download_artefact_to_file.assert_not_called()
         mock_move.assert_not_called()
+        mock_save_metadata.assert_not_called()
 
 
 class TestValidateArtefact(CliTestCase):
@@ -347,119 +484,112 @@ class TestValidateArtefact(CliTestCase):
         with self.assertRaises(S3InvalidArtefactError):
             s3_resolver.validate_artefact(artefact)
 
-    def test_missing_body(self):
-        artefact = {
-            'ContentType': 'application/zip',
-            'ContentLength': -1,
-        }
-        with self.assertRaises(S3InvalidArtefactError):
-            s3_resolver.validate_artefact(artefact)
-
 
-class TestSaveArtefactDataToFile(CliTestCase):
+class TestDownloadArtefactToFile(CliTestCase):
+    bucket_name = 'acme-org'
+    key_name = 'bundle/builder/builder-v1-digest.zip'
     artefact_size = 2
-    file_path = '/tmp/bar/foo.zip'
     args = MagicMock(**{})
 
-    def test_success(self):
-        mock_makedirs = MagicMock()
-        mock_exists = MagicMock(side_effect=[False, True])
-        mock_remove = MagicMock()
-
-        mock_artefact_data = MagicMock()
-
-        mock_artefact_data_read = MagicMock(return_value=b'0')
-        mock_artefact_data.read = mock_artefact_data_read
-
-        mock_artefact_data_close = MagicMock()
-        mock_artefact_data.close = mock_artefact_data_close
-
-        written_data = io.BytesIO()
-        written_data.write = MagicMock()
-        mock_open = MagicMock(return_value=written_data)
-
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmpdir, 'bar', 'foo.zip')
+        self.s3_client = boto3.session.Session(aws_access_key_id='key', aws_secret_access_key='secret',
+                                               region_name='us-east-1').client('s3')
+        self.stubber = Stubber(self.s3_client)
+
+    def tearDown(self):  # noqa
+        self.stubber.deactivate()
+        shutil.rmtree(self.tmpdir)
+
+    def add_head_object(self, conditions, etag='"abc"'):
+        self.stubber.add_response('head_object', {'ContentLength': self.artefact_size, 'ETag': etag},
+                                  dict(Bucket=self.bucket_name, Key=self.key_name, **conditions))
+
+    def add_get_object(self, conditions):
+        self.stubber.add_response('get_object',
+                                  {'Body': StreamingBody(io.BytesIO(b'ab'), self.artefact_size),
+                                   'ContentLength': self.artefact_size,
+                                   'ETag': '"abc"'},
+                                  dict(Bucket=self.bucket_name, Key=self.key_name, **conditions))
+
+    def download(self, **kwargs):
         mock_progress_bar = MagicMock(return_value='#')
 
-        mock_time = MagicMock(side_effect=[i for i in range(0, 100)])
+        self.stubber.activate()
+        with patch('conductr_cli.screen_utils.progress_bar', mock_progress_bar):
+            logging_setup.configure_logging(self.args, MagicMock())
+            result = s3_resolver.download_artefact_to_file(self.s3_client, self.bucket_name, self.key_name,
+                                                           self.artefact_size, self.file_path, **kwargs)
 
-        stdout = MagicMock()
+        return result, mock_progress_bar
 
-        with patch('os.makedirs', mock_makedirs), \
-                patch('os.path.exists', mock_exists), \
-                patch('os.remove', mock_remove), \
-                patch('builtins.open', mock_open), \
-                patch('time.time', mock_time), \
-                patch('conductr_cli.screen_utils.progress_bar', mock_progress_bar):
-            logging_setup.configure_logging(self.args, stdout)
-            result = s3_resolver.save_artefact_data_to_file(self.artefact_size, mock_artefact_data, self.file_path)
-            self.assertEqual(self.file_path, result)
+    def test_success(self):
+        self.add_head_object({'IfMatch': '"abc"'})
+        self.add_get_object({'IfMatch': '"abc"'})
 
-        mock_makedirs.assert_called_once_with('/tmp/bar', mode=0o700)
+        result, mock_progress_bar = self.download(etag='"abc"')
 
-        self.assertEqual([
-            call('/tmp/bar'),
-            call(self.file_path),
-        ], mock_exists.call_args_list)
+        self.assertEqual(self.file_path, result)
+        with open(self.file_path, 'rb') as file:
+            self.assertEqual(b'ab', file.read())
+        self.assertEqual(call(1.0), mock_progress_bar.call_args_list[-1])
+        self.stubber.assert_no_pending_responses()
 
-        mock_remove.assert_called_once_with(self.file_path)
+    def test_replace_existing_file(self):
+        os.makedirs(os.path.dirname(self.file_path))
+        with open(self.file_path, 'wb') as file:
+            file.write(b'old data')
+        self.add_head_object({'IfMatch': '"abc"'})
+        self.add_get_object({'IfMatch': '"abc"'})
 
-        self.assertEqual([
-            call(s3_resolver.DATA_READ_CHUNK_SIZE),
-            call(s3_resolver.DATA_READ_CHUNK_SIZE),
-        ], mock_artefact_data_read.call_args_list)
+        self.download(etag='"abc"')
 
-        self.assertEqual([
-            call(0.5),
-            call(1.0),
-        ], mock_progress_bar.call_args_list)
+        with open(self.file_path, 'rb') as file:
+            self.assertEqual(b'ab', file.read())
 
-        self.assertEqual([
-            call(b'0'),
-            call(b'0'),
-        ], written_data.write.call_args_list)
+    def test_version_id(self):
+        self.add_head_object({'VersionId': 'v1'})
+        self.add_get_object({'VersionId': 'v1'})
 
-        mock_artefact_data_close.assert_called_once_with()
+        result, mock_progress_bar = self.download(version_id='v1', etag='"abc"')
 
-        self.assertTrue(written_data.closed)
+        self.assertEqual(self.file_path, result)
+        self.stubber.assert_no_pending_responses()
 
-        self.assertEqual('#\r#\n', self.output(stdout))
+    def test_etag_changed(self):
+        self.stubber.add_client_error('head_object', service_error_code='PreconditionFailed', http_status_code=412,
+                                      expected_params={'Bucket': self.bucket_name, 'Key': self.key_name,
+                                                       'IfMatch': '"abc"'})
 
-    def test_error(self):
-        mock_makedirs = MagicMock()
-        mock_exists = MagicMock(side_effect=[False, True])
-        mock_remove = MagicMock()
+        with self.assertRaises(ClientError) as e:
+            self.download(etag='"abc"')
 
-        mock_artefact_data = MagicMock()
+        self.assertEqual('PreconditionFailed', e.exception.response['Error']['Code'])
+        self.assertFalse(os.path.exists(self.file_path))
 
-        mock_artefact_data_read = MagicMock(return_value=b'0')
-        mock_artefact_data.read = mock_artefact_data_read
+    def test_transfer_config(self):
+        mock_transfer_manager = MagicMock()
 
-        mock_artefact_data_close = MagicMock()
-        mock_artefact_data.close = mock_artefact_data_close
+        with patch('conductr_cli.resolvers.s3_resolver.ConditionalTransferManager', mock_transfer_manager):
+            logging_setup.configure_logging(self.args, MagicMock())
+            s3_resolver.download_artefact_to_file(self.s3_client, self.bucket_name, self.key_name,
+                                                  self.artefact_size, self.file_path)
 
-        written_data = io.BytesIO()
-        error = IOError('test only')
-        written_data.write = MagicMock(side_effect=error)
-        mock_open = MagicMock(return_value=written_data)
+        transfer_config = mock_transfer_manager.call_args[0][1]
+        self.assertEqual(s3_resolver.S3_DOWNLOAD_PART_SIZE, transfer_config.multipart_chunksize)
+        self.assertEqual(s3_resolver.S3_DOWNLOAD_CONCURRENCY, transfer_config.max_concurrency)
 
-        mock_progress_bar = MagicMock(return_value='#')
 
-        mock_time = MagicMock(side_effect=[i for i in range(0, 100)])
+class TestDownloadConditions(CliTestCase):
+    def test_version_id(self):
+        self.assertEqual({'VersionId': 'v1'}, s3_resolver.download_conditions('v1', '"abc"'))
 
-        stdout = MagicMock()
+    def test_etag(self):
+        self.assertEqual({'IfMatch': '"abc"'}, s3_resolver.download_conditions(None, '"abc"'))
 
-        with patch('os.makedirs', mock_makedirs), \
-                patch('os.path.exists', mock_exists), \
-                patch('os.remove', mock_remove), \
-                patch('builtins.open', mock_open), \
-                patch('time.time', mock_time), \
-                patch('conductr_cli.screen_utils.progress_bar', mock_progress_bar), \
-                self.assertRaises(IOError) as e:
-            logging_setup.configure_logging(self.args, stdout)
-            s3_resolver.save_artefact_data_to_file(self.artefact_size, mock_artefact_data, self.file_path)
-
-        self.assertEqual(error, e.exception)
-        mock_artefact_data_close.assert_called_once_with()
+    def test_none(self):
+        self.assertIsNone(s3_resolver.download_conditions(None, None))
 
 
 class TestCreateS3Client(CliTestCase):
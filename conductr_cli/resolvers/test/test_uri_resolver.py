@@ -1,9 +1,16 @@
 from unittest import TestCase
 from urllib.error import URLError
+from conductr_cli.exceptions import BundleDigestMismatchError
 from conductr_cli.resolvers import uri_resolver
 from conductr_cli.resolvers.schemes import SCHEME_FILE, SCHEME_HTTP, SCHEME_HTTPS
 from conductr_cli.test.cli_test_case import create_mock_logger
+from requests.packages.urllib3.exceptions import ProtocolError
+import hashlib
+import json
+import requests
 import os
+import shutil
+import tempfile
 
 from unittest.mock import call, patch, MagicMock
 
@@ -27,19 +34,20 @@ class TestResolveBundle(TestCase):
                 patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', MagicMock(return_value=None)), \
                 patch('logging.getLogger', get_logger_mock):
             result = uri_resolver.resolve_bundle('/cache-dir', '/bundle-url')
             self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        os_remove_mock.assert_called_with('/bundle-cached-path.tmp')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+        os_remove_mock.assert_called_with('/.bundle-cached-path.tmp')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
+        file_move_mock.assert_called_with('/.bundle-cached-path.tmp', '/bundle-cached-path')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
@@ -62,23 +70,50 @@ class TestResolveBundle(TestCase):
                 patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', MagicMock(return_value=None)), \
                 patch('logging.getLogger', get_logger_mock):
             result = uri_resolver.resolve_bundle('/cache-dir', '/bundle-url')
             self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         os_mkdirs_mock.assert_called_with('/cache-dir', mode=448)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
+        file_move_mock.assert_called_with('/.bundle-cached-path.tmp', '/bundle-cached-path')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
 
+    def test_resolve_digest_mismatch(self):
+        os_path_exists_mock = MagicMock(side_effect=[True, False])
+        os_remove_mock = MagicMock()
+        file_move_mock = MagicMock()
+        cache_path_mock = MagicMock(return_value='/bundle-cached-path')
+        get_url_mock = MagicMock(return_value=('bundle-name', '/bundle-url-resolved'))
+        urlretrieve_mock = MagicMock()
+        error = BundleDigestMismatchError('/.bundle-cached-path.tmp', 'sha-256/abc', 'sha-256/def')
+        verify_digest_mock = MagicMock(side_effect=error)
+
+        get_logger_mock, log_mock = create_mock_logger()
+
+        with patch('os.path.exists', os_path_exists_mock), \
+                patch('os.remove', os_remove_mock), \
+                patch('shutil.move', file_move_mock), \
+                patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
+                patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
+                patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', verify_digest_mock), \
+                patch('logging.getLogger', get_logger_mock):
+            self.assertRaises(BundleDigestMismatchError, uri_resolver.resolve_bundle, '/cache-dir', '/bundle-url')
+
+        verify_digest_mock.assert_called_with('/.bundle-cached-path.tmp')
+        os_remove_mock.assert_called_with('/.bundle-cached-path.tmp')
+        file_move_mock.assert_not_called()
+
     def test_resolve_not_found(self):
         os_path_exists_mock = MagicMock(side_effect=[True, False])
         cache_path_mock = MagicMock(return_value='/bundle-cached-path')
@@ -98,11 +133,11 @@ class TestResolveBundle(TestCase):
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
@@ -127,19 +162,20 @@ class TestResolveBundleConfiguration(TestCase):
                 patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', MagicMock(return_value=None)), \
                 patch('logging.getLogger', get_logger_mock):
             result = uri_resolver.resolve_bundle_configuration('/cache-dir', '/bundle-url')
             self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        os_remove_mock.assert_called_with('/bundle-cached-path.tmp')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+        os_remove_mock.assert_called_with('/.bundle-cached-path.tmp')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
+        file_move_mock.assert_called_with('/.bundle-cached-path.tmp', '/bundle-cached-path')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
@@ -162,19 +198,20 @@ class TestResolveBundleConfiguration(TestCase):
                 patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', MagicMock(return_value=None)), \
                 patch('logging.getLogger', get_logger_mock):
             result = uri_resolver.resolve_bundle_configuration('/cache-dir', '/bundle-url')
             self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         os_mkdirs_mock.assert_called_with('/cache-dir', mode=448)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
+        file_move_mock.assert_called_with('/.bundle-cached-path.tmp', '/bundle-cached-path')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
@@ -198,11 +235,11 @@ class TestResolveBundleConfiguration(TestCase):
 
         self.assertEqual([
             call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
+            call('/.bundle-cached-path.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/cache-dir', '/bundle-url')
         get_url_mock.assert_called_with('/bundle-url')
-        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/bundle-cached-path.tmp')
+        urlretrieve_mock.assert_called_with('/bundle-url-resolved', '/.bundle-cached-path.tmp')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving /bundle-url-resolved')
@@ -227,19 +264,20 @@ class TestResolveConductrBinary(TestCase):
                 patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
                 patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
+                patch('conductr_cli.bundle_utils.verify_digest', MagicMock(return_value=None)), \
                 patch('logging.getLogger', get_logger_mock):
             result = uri_resolver.resolve_file('/images', 'conductr-binary-uri')
             self.assertEqual((True, 'conductr-1.0.0.tgz', '/images/conductr-1.0.0.tgz', None), result)
 
         self.assertEqual([
             call('/images'),
-            call('/images/conductr-1.0.0.tgz.tmp')
+            call('/images/.conductr-1.0.0.tgz.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/images', 'conductr-binary-uri')
         get_url_mock.assert_called_with('conductr-binary-uri')
-        os_remove_mock.assert_called_with('/images/conductr-1.0.0.tgz.tmp')
-        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/conductr-1.0.0.tgz.tmp')
-        file_move_mock.assert_called_with('/images/conductr-1.0.0.tgz.tmp', '/images/conductr-1.0.0.tgz')
+        os_remove_mock.assert_called_with('/images/.conductr-1.0.0.tgz.tmp')
+        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/.conductr-1.0.0.tgz.tmp')
+        file_move_mock.assert_called_with('/images/.conductr-1.0.0.tgz.tmp', '/images/conductr-1.0.0.tgz')
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving conductr-binary-uri')
@@ -270,12 +308,12 @@ class TestResolveConductrBinary(TestCase):
         self.assertEqual(e.exception, url_error)
         self.assertEqual([
             call('/images'),
-            call('/images/conductr-1.0.0.tgz.tmp')
+            call('/images/.conductr-1.0.0.tgz.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/images', 'conductr-binary-uri')
         get_url_mock.assert_called_with('conductr-binary-uri')
-        os_remove_mock.assert_called_with('/images/conductr-1.0.0.tgz.tmp')
-        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/conductr-1.0.0.tgz.tmp')
+        os_remove_mock.assert_called_with('/images/.conductr-1.0.0.tgz.tmp')
+        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/.conductr-1.0.0.tgz.tmp')
         file_move_mock.assert_not_called()
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
@@ -306,12 +344,12 @@ class TestResolveConductrBinary(TestCase):
 
         self.assertEqual([
             call('/images'),
-            call('/images/conductr-1.0.0.tgz.tmp')
+            call('/images/.conductr-1.0.0.tgz.tmp')
         ], os_path_exists_mock.call_args_list)
         cache_path_mock.assert_called_with('/images', 'conductr-binary-uri')
         get_url_mock.assert_called_with('conductr-binary-uri')
-        os_remove_mock.assert_called_with('/images/conductr-1.0.0.tgz.tmp')
-        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/conductr-1.0.0.tgz.tmp')
+        os_remove_mock.assert_called_with('/images/.conductr-1.0.0.tgz.tmp')
+        urlretrieve_mock.assert_called_with('conductr-binary-uri', '/images/.conductr-1.0.0.tgz.tmp')
         file_move_mock.assert_not_called()
 
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
@@ -343,6 +381,30 @@ class TestLoadBundleFromCache(TestCase):
         get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
         log_mock.info.assert_called_with('Retrieving from cache /cache-dir/bundle-file.zip')
 
+    def test_uri_revalidated(self):
+        exists_mock = MagicMock(return_value=True)
+        load_validators_mock = MagicMock(return_value={'etag': '"v1"', 'last_modified': None})
+
+        with patch('os.path.exists', exists_mock), \
+                patch('conductr_cli.resolvers.uri_resolver.load_validators', load_validators_mock):
+            result = uri_resolver.load_bundle_from_cache('/cache-dir', 'http://site.com/path/bundle-file.zip')
+            self.assertEqual((False, None, None, None), result)
+
+        load_validators_mock.assert_called_once_with('/cache-dir/bundle-file.zip')
+
+    def test_uri_digest_named(self):
+        bundle_file_name = 'bundle-v1-{}.zip'.format('0123456789abcdef' * 4)
+        exists_mock = MagicMock(return_value=True)
+        load_validators_mock = MagicMock(return_value={'etag': '"v1"', 'last_modified': None})
+
+        with patch('os.path.exists', exists_mock), \
+                patch('conductr_cli.resolvers.uri_resolver.load_validators', load_validators_mock):
+            result = uri_resolver.load_bundle_from_cache('/cache-dir',
+                                                         'https://dl.bintray.com/org/repo/{}'.format(bundle_file_name))
+            self.assertEqual((True, bundle_file_name, '/cache-dir/{}'.format(bundle_file_name), None), result)
+
+        load_validators_mock.assert_not_called()
+
     def test_uri_not_found(self):
         exists_mock = MagicMock(return_value=False)
 
@@ -435,114 +497,268 @@ class TestCachePath(TestCase):
         self.assertEqual('/cache-dir/file.zip', result)
 
 
-class TestProgressBar(TestCase):
-    def test_show_progress_bar(self):
-        os_path_exists_mock = MagicMock(side_effect=[True, True])
-        os_remove_mock = MagicMock()
-        os_chmod_mock = MagicMock()
-        file_move_mock = MagicMock()
-        cache_path_mock = MagicMock(return_value='/bundle-cached-path')
-        get_url_mock = MagicMock(return_value=('bundle-name', 'http://site.com/bundle-url-resolved'))
-        urlretrieve_mock = MagicMock()
-        report_hook_mock = MagicMock()
-        show_progress_mock = MagicMock(return_value=report_hook_mock)
+class TestIsDigestNamed(TestCase):
+    def test_digest_named(self):
+        self.assertTrue(uri_resolver.is_digest_named('/cache-dir/bundle-v1-{}.zip'.format('0123456789abcdef' * 4)))
+        self.assertTrue(uri_resolver.is_digest_named('bundle-{}.zip'.format('0123456789abcdef' * 4)))
 
-        get_logger_mock, log_mock = create_mock_logger()
+    def test_not_digest_named(self):
+        self.assertFalse(uri_resolver.is_digest_named('/cache-dir/bundle-file.zip'))
+        self.assertFalse(uri_resolver.is_digest_named('/cache-dir/bundle-v1-0123456789abcdef.zip'))
+        self.assertFalse(uri_resolver.is_digest_named('/cache-dir/bundle-{}.tgz'.format('0123456789abcdef' * 4)))
 
-        with patch('os.path.exists', os_path_exists_mock), \
-                patch('os.remove', os_remove_mock), \
-                patch('os.chmod', os_chmod_mock), \
-                patch('shutil.move', file_move_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.show_progress', show_progress_mock), \
-                patch('logging.getLogger', get_logger_mock):
-            result = uri_resolver.resolve_bundle('/cache-dir', 'http://site.com/bundle-url')
-            self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
 
-        self.assertEqual([
-            call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
-        ], os_path_exists_mock.call_args_list)
-        cache_path_mock.assert_called_with('/cache-dir', 'http://site.com/bundle-url')
-        get_url_mock.assert_called_with('http://site.com/bundle-url')
-        os_remove_mock.assert_called_with('/bundle-cached-path.tmp')
-        urlretrieve_mock.assert_called_with('http://site.com/bundle-url-resolved',
-                                            '/bundle-cached-path.tmp', reporthook=report_hook_mock)
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+class TestHttpDownload(TestCase):
+    url = 'http://site.com/bundle.zip'
 
-        get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
-        log_mock.info.assert_not_called()
+    def setUp(self):  # noqa
+        self.cache_dir = tempfile.mkdtemp()
+        self.cached_file = os.path.join(self.cache_dir, 'bundle.zip')
+        self.tmp_download_path = uri_resolver.tmp_path(self.cached_file)
+        self.log = MagicMock()
 
-    def test_no_progress_bar_given_quiet_mode(self):
-        os_path_exists_mock = MagicMock(side_effect=[True, True])
-        os_remove_mock = MagicMock()
-        os_chmod_mock = MagicMock()
-        file_move_mock = MagicMock()
-        cache_path_mock = MagicMock(return_value='/bundle-cached-path')
-        get_url_mock = MagicMock(return_value=('bundle-name', 'http://site.com/bundle-url-resolved'))
-        urlretrieve_mock = MagicMock()
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.cache_dir)
 
-        get_logger_mock, log_mock = create_mock_logger()
-        log_mock.is_progress_enabled = MagicMock(return_value=False)
+    def response(self, data=b'', status_code=200, headers=None, error=None):
+        response = MagicMock(status_code=status_code,
+                             headers=dict({'Content-Length': str(len(data))}, **(headers or {})))
+        # As with requests < 2.18, responses aren't context managers
+        del response.__enter__
+        del response.__exit__
 
-        with patch('os.path.exists', os_path_exists_mock), \
-                patch('os.remove', os_remove_mock), \
-                patch('os.chmod', os_chmod_mock), \
-                patch('shutil.move', file_move_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.cache_path', cache_path_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.get_url', get_url_mock), \
-                patch('conductr_cli.resolvers.uri_resolver.urlretrieve', urlretrieve_mock), \
-                patch('logging.getLogger', get_logger_mock):
-            result = uri_resolver.resolve_bundle('/cache-dir', 'http://site.com/bundle-url')
-            self.assertEqual((True, 'bundle-name', '/bundle-cached-path', None), result)
+        def iter_content(chunk_size):
+            yield data
+            if error:
+                raise error
 
-        self.assertEqual([
-            call('/cache-dir'),
-            call('/bundle-cached-path.tmp')
-        ], os_path_exists_mock.call_args_list)
-        cache_path_mock.assert_called_with('/cache-dir', 'http://site.com/bundle-url')
-        get_url_mock.assert_called_with('http://site.com/bundle-url')
-        os_remove_mock.assert_called_with('/bundle-cached-path.tmp')
-        urlretrieve_mock.assert_called_with('http://site.com/bundle-url-resolved', '/bundle-cached-path.tmp')
-        file_move_mock.assert_called_with('/bundle-cached-path.tmp', '/bundle-cached-path')
+        response.iter_content = iter_content
+        return response
 
-        get_logger_mock.assert_called_with('conductr_cli.resolvers.uri_resolver')
-        log_mock.info.assert_called_with('Retrieving http://site.com/bundle-url-resolved')
+    def digested(self, data, hex_digest=None):
+        return data + '\nsha-256/{}'.format(hex_digest or hashlib.sha256(data).hexdigest()).encode('UTF-8')
 
+    def write(self, path, data):
+        with open(path, 'wb') as file:
+            file.write(data)
 
-class TestResolveBundleVersion(TestCase):
-    def test_return_none(self):
-        self.assertIsNone(uri_resolver.resolve_bundle_version("bundle"))
+    def read(self, path):
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def http_download(self, session_mock, cached_file=None):
+        with patch('conductr_cli.http.session', MagicMock(return_value=session_mock)):
+            return uri_resolver.http_download(self.log, self.url, self.tmp_download_path, None, cached_file)
+
+    def test_download(self):
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(b'0123456789', headers={'ETag': '"v1"'})
+
+        self.assertTrue(self.http_download(session_mock))
+
+        session_mock.get.assert_called_once_with(self.url, headers={'Accept-Encoding': 'identity'}, auth=None,
+                                                 stream=True)
+        self.assertEqual(b'0123456789', self.read(self.tmp_download_path))
+        self.assertEqual('"v1"', uri_resolver.load_validators(self.tmp_download_path)['etag'])
+        self.log.info.assert_called_once_with('Retrieving http://site.com/bundle.zip')
+
+    def test_download_auth(self):
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(b'0123456789')
+
+        with patch('conductr_cli.http.session', MagicMock(return_value=session_mock)):
+            uri_resolver.http_download(self.log, self.url, self.tmp_download_path, ('realm', 'user', 'pass'), None)
+
+        self.assertEqual(('user', 'pass'), session_mock.get.call_args[1]['auth'])
+
+    def test_resume(self):
+        self.write(self.tmp_download_path, b'01234')
+        self.write(self.cached_file, b'old')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.tmp_download_path), 'w') as file:
+            json.dump({'etag': '"v2"', 'last_modified': None}, file)
+
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(b'56789', status_code=206, headers={'ETag': '"v2"'})
+
+        self.assertTrue(self.http_download(session_mock))
+
+        self.assertEqual({'Accept-Encoding': 'identity', 'Range': 'bytes=5-', 'If-Range': '"v2"'},
+                         session_mock.get.call_args[1]['headers'])
+        self.assertEqual(b'0123456789', self.read(self.tmp_download_path))
+
+    def test_resume_not_supported(self):
+        self.write(self.tmp_download_path, b'01234')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.tmp_download_path), 'w') as file:
+            json.dump({'etag': 'W/"v2"', 'last_modified': 'Sat, 01 Jan 2017 00:00:00 GMT'}, file)
+
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(b'0123456789')
+
+        self.assertTrue(self.http_download(session_mock))
+
+        self.assertEqual('Sat, 01 Jan 2017 00:00:00 GMT', session_mock.get.call_args[1]['headers']['If-Range'])
+        self.assertEqual(b'0123456789', self.read(self.tmp_download_path))
+
+    def test_resume_complete(self):
+        data = self.digested(b'0123456789')
+        self.write(self.tmp_download_path, data)
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.tmp_download_path), 'w') as file:
+            json.dump({'etag': '"v1"', 'last_modified': None, 'content_length': len(data)}, file)
+
+        session_mock = MagicMock()
+
+        self.assertTrue(self.http_download(session_mock))
+
+        session_mock.get.assert_not_called()
+        self.assertEqual(data, self.read(self.tmp_download_path))
 
+    def test_resume_range_not_satisfiable(self):
+        self.write(self.tmp_download_path, b'0123456789')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.tmp_download_path), 'w') as file:
+            json.dump({'etag': '"v1"', 'last_modified': None}, file)
 
-class TestShowProgress(TestCase):
-    def test_log_progress_until_completion(self):
-        bundle_url = 'http://url/bundle.zip'
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(status_code=416)
 
-        log_mock = MagicMock()
+        self.assertTrue(self.http_download(session_mock))
 
-        log_info_mock = MagicMock()
-        log_mock.info = log_info_mock
+        self.assertEqual('bytes=10-', session_mock.get.call_args[1]['headers']['Range'])
+        self.assertEqual(b'0123456789', self.read(self.tmp_download_path))
 
-        log_progress_mock = MagicMock()
-        log_mock.progress = log_progress_mock
+    def test_restart_corrupted_resume(self):
+        data = self.digested(b'0123456789')
+        self.write(self.tmp_download_path, b'xxxxx')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.tmp_download_path), 'w') as file:
+            json.dump({'etag': '"v1"', 'last_modified': None, 'content_length': len(data)}, file)
 
-        progress_bar_mock = MagicMock(return_value='mock progress bar')
+        session_mock = MagicMock()
+        session_mock.get.side_effect = [
+            self.response(data[5:], status_code=206, headers={'ETag': '"v1"'}),
+            self.response(data, headers={'ETag': '"v1"'})
+        ]
 
-        with patch('conductr_cli.screen_utils.progress_bar', progress_bar_mock):
-            progress_tracker = uri_resolver.show_progress(log_mock, bundle_url)
+        self.assertTrue(self.http_download(session_mock))
 
-            progress_tracker(0, 10, 200)
-            progress_bar_mock.assert_called_with(0.0)
-            log_progress_mock.assert_called_with('mock progress bar', flush=False)
+        self.assertEqual('bytes=5-', session_mock.get.call_args_list[0][1]['headers']['Range'])
+        self.assertNotIn('Range', session_mock.get.call_args_list[1][1]['headers'])
+        self.assertEqual(data, self.read(self.tmp_download_path))
 
-            progress_tracker(20, 10, 200)
-            progress_bar_mock.assert_called_with(1.0)
-            log_progress_mock.assert_called_with('mock progress bar', flush=True)
+    def test_corrupted_download(self):
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(self.digested(b'0123456789', '0' * 64),
+                                                      headers={'ETag': '"v1"'})
 
-            log_info_mock.assert_called_once_with('Retrieving http://url/bundle.zip')
+        self.assertRaises(BundleDigestMismatchError, self.http_download, session_mock)
+
+        self.assertFalse(os.path.exists(self.tmp_download_path))
+        self.assertIsNone(uri_resolver.load_validators(self.tmp_download_path))
+
+    def test_verified_while_downloading(self):
+        data = self.digested(b'0123456789' * 100)
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(data, headers={'ETag': '"v1"'})
+
+        with patch('conductr_cli.bundle_utils.verify_digest', MagicMock(side_effect=AssertionError('read back'))):
+            self.assertTrue(self.http_download(session_mock))
+
+        self.assertEqual(data, self.read(self.tmp_download_path))
+
+    def test_unreachable_uses_cached_file(self):
+        self.write(self.cached_file, b'0123456789')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.cached_file), 'w') as file:
+            json.dump({'etag': '"v1"', 'last_modified': None}, file)
+
+        session_mock = MagicMock()
+        session_mock.get.side_effect = requests.exceptions.ConnectionError()
+
+        self.assertFalse(self.http_download(session_mock, self.cached_file))
+
+        self.assertEqual(uri_resolver.HTTP_DOWNLOAD_ATTEMPTS, session_mock.get.call_count)
+        self.log.warning.assert_called_once_with(
+            'Unable to revalidate http://site.com/bundle.zip, retrieving from cache {}'.format(self.cached_file))
+
+    def test_retry_interrupted(self):
+        session_mock = MagicMock()
+        session_mock.get.side_effect = [
+            self.response(b'01234', headers={'Content-Length': '10', 'ETag': '"v1"'}, error=ProtocolError()),
+            self.response(b'56789', status_code=206, headers={'ETag': '"v1"'})
+        ]
+
+        self.assertTrue(self.http_download(session_mock))
+
+        self.assertEqual('bytes=5-', session_mock.get.call_args[1]['headers']['Range'])
+        self.assertEqual(b'0123456789', self.read(self.tmp_download_path))
+
+    def test_not_modified(self):
+        self.write(self.cached_file, b'0123456789')
+        os.makedirs(os.path.join(self.cache_dir, uri_resolver.HTTP_METADATA_DIR_NAME))
+        with open(uri_resolver.validators_file(self.cached_file), 'w') as file:
+            json.dump({'etag': '"v1"', 'last_modified': 'Sat, 01 Jan 2017 00:00:00 GMT'}, file)
+
+        session_mock = MagicMock()
+        session_mock.get.return_value = self.response(status_code=304)
+
+        self.assertFalse(self.http_download(session_mock, self.cached_file))
+
+        self.assertEqual({'Accept-Encoding': 'identity',
+                          'If-None-Match': '"v1"',
+                          'If-Modified-Since': 'Sat, 01 Jan 2017 00:00:00 GMT'},
+                         session_mock.get.call_args[1]['headers'])
+        self.assertFalse(os.path.exists(self.tmp_download_path))
+
+    def test_segmented_download(self):
+        data = b'0123456789'
+
+        def get(url, headers, auth, stream):
+            if 'Range' in headers:
+                start, end = [int(i) for i in headers['Range'][len('bytes='):].split('-')]
+                return self.response(data[start:end + 1], status_code=206)
+            else:
+                return self.response(data, headers={'Accept-Ranges': 'bytes'})
+
+        session_mock = MagicMock()
+        session_mock.get.side_effect = get
+
+        with patch('conductr_cli.resolvers.uri_resolver.SEGMENTED_DOWNLOAD_THRESHOLD', 4), \
+                patch('conductr_cli.resolvers.uri_resolver.SEGMENTED_DOWNLOAD_CONNECTIONS', 3):
+            self.assertTrue(self.http_download(session_mock))
+
+        self.assertEqual(['bytes=0-3', 'bytes=4-7', 'bytes=8-9'],
+                         sorted(call[1]['headers']['Range'] for call in session_mock.get.call_args_list[1:]))
+        self.assertEqual(data, self.read(self.tmp_download_path))
+
+    def test_resolve_not_modified(self):
+        self.write(self.cached_file, b'0123456789')
+        http_download_mock = MagicMock(return_value=False)
+
+        with patch('conductr_cli.resolvers.uri_resolver.http_download', http_download_mock):
+            self.assertEqual((True, 'bundle.zip', self.cached_file, None),
+                             uri_resolver.resolve_bundle(self.cache_dir, self.url))
+
+        self.assertEqual(b'0123456789', self.read(self.cached_file))
+
+    def test_resolve_moves_validators(self):
+        def http_download(log, url, tmp_download_path, auth, cached_file):
+            self.write(tmp_download_path, b'0123456789')
+            uri_resolver.save_validators(tmp_download_path, MagicMock(headers={'ETag': '"v1"'}))
+            return True
+
+        with patch('conductr_cli.resolvers.uri_resolver.http_download', MagicMock(side_effect=http_download)):
+            uri_resolver.resolve_bundle(self.cache_dir, self.url)
+
+        self.assertEqual('"v1"', uri_resolver.load_validators(self.cached_file)['etag'])
+        self.assertIsNone(uri_resolver.load_validators(self.tmp_download_path))
+
+
+class TestResolveBundleVersion(TestCase):
+    def test_return_none(self):
+        self.assertIsNone(uri_resolver.resolve_bundle_version("bundle"))
 
 
 class TestSupportedSchemes(TestCase):
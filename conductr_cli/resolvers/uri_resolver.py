@@ -4,14 +4,32 @@ from urllib.parse import ParseResult, urlparse, urlunparse
 from urllib.error import URLError
 from pathlib import Path
 
-import time
-
-from conductr_cli import screen_utils
-from conductr_cli.resolvers.resolvers_util import is_local_file
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from conductr_cli import bundle_utils, http
+from conductr_cli.constants import IO_CHUNK_SIZE
+from conductr_cli.exceptions import BundleDigestMismatchError
+from conductr_cli.resolvers.resolvers_util import DownloadProgress, DOWNLOAD_INTERRUPTED_ERRORS, is_local_file
+import json
 import os
 import logging
+import re
+import requests
 import shutil
-import urllib
+
+
+# The number of times a download is attempted when the connection is lost, resuming from the data received so far.
+HTTP_DOWNLOAD_ATTEMPTS = 3
+
+# Artefacts of at least this size are downloaded in as many segments at a time, given that the server supports ranges.
+SEGMENTED_DOWNLOAD_THRESHOLD = int(os.getenv('CONDUCTR_SEGMENTED_DOWNLOAD_THRESHOLD', 64 * 1024 * 1024))
+SEGMENTED_DOWNLOAD_CONNECTIONS = int(os.getenv('CONDUCTR_SEGMENTED_DOWNLOAD_CONNECTIONS', 4))
+
+# The directory within the cache dir holding the validators, i.e. ETag and Last-Modified, of the downloaded files.
+HTTP_METADATA_DIR_NAME = '.http'
+
+# The name of a bundle or bundle configuration produced by shazar, i.e. suffixed with the digest of its content.
+DIGEST_FILE_NAME = re.compile('-[0-9a-f]{64}[.]zip$')
 
 
 def supported_schemes():
@@ -39,17 +57,28 @@ def resolve_file(cache_dir, uri, auth=None, require_bundle_conf=True, raise_erro
                 return True, file_name, file_path, None
 
         cached_file = cache_path(cache_dir, uri)
-        tmp_download_path = '{}.tmp'.format(cached_file)
+        tmp_download_path = tmp_path(cached_file)
 
-        if os.path.exists(tmp_download_path):
-            os.remove(tmp_download_path)
+        if not download_bundle(log, file_url, tmp_download_path, auth, cached_file):
+            return True, file_name, cached_file, None
 
-        download_bundle(log, file_url, tmp_download_path, auth)
+        # Verify the digest trailer, if any, so a corrupted download doesn't end up in the cache. Http downloads are
+        # verified as a part of the download, as a partial download may have to be restarted.
+        if not is_http_url(file_url):
+            try:
+                bundle_utils.verify_digest(tmp_download_path)
+            except BundleDigestMismatchError:
+                os.remove(tmp_download_path)
+                raise
 
         os.chmod(tmp_download_path, 0o600)
         shutil.move(tmp_download_path, cached_file)
+
+        if is_http_url(file_url):
+            move_validators(tmp_download_path, cached_file)
+
         return True, file_name, cached_file, None
-    except URLError as e:
+    except (URLError, requests.exceptions.RequestException) as e:
         if raise_error:
             raise e
         else:
@@ -65,7 +94,12 @@ def load_bundle_from_cache(cache_dir, uri):
         log = logging.getLogger(__name__)
 
         cached_file = cache_path(cache_dir, uri)
-        if os.path.exists(cached_file):
+        if os.path.exists(cached_file) and is_http_url(uri) and not is_digest_named(cached_file) and \
+                load_validators(cached_file):
+            # The cached file is revalidated by the conditional download of `resolve_file`, unless it's named after
+            # the digest of its content and therefore can't have changed.
+            return False, None, None, None
+        elif os.path.exists(cached_file):
             bundle_name = os.path.basename(cached_file)
             log.info('Retrieving from cache {}'.format(cached_file))
             return True, bundle_name, cached_file, None
@@ -106,46 +140,269 @@ def cache_path(cache_dir, uri):
     return '{}/{}'.format(cache_dir, basename)
 
 
-def download_bundle(log, bundle_url, tmp_download_path, auth):
-    parsed = urlparse(bundle_url, scheme='file')
-    is_http_download = parsed.scheme == 'http' or parsed.scheme == 'https'
+def is_digest_named(file_path):
+    return DIGEST_FILE_NAME.search(os.path.basename(file_path)) is not None
 
-    if is_http_download and auth:
-        realm, username, password = auth
-        authinfo = urllib.request.HTTPBasicAuthHandler()
-        authinfo.add_password(realm=realm,
-                              uri=bundle_url,
-                              user=username,
-                              passwd=password)
-        opener = urllib.request.build_opener(authinfo)
-        urllib.request.install_opener(opener)
 
-    if log.is_progress_enabled() and is_http_download:
-        urlretrieve(bundle_url, tmp_download_path, reporthook=show_progress(log, bundle_url))
+def tmp_path(cached_file):
+    # Hidden, so that the partial download isn't mistaken for a cached bundle by the offline resolver
+    return os.path.join(os.path.dirname(cached_file), '.{}.tmp'.format(os.path.basename(cached_file)))
+
+
+def download_bundle(log, bundle_url, tmp_download_path, auth, cached_file=None):
+    """
+    Downloads the given url into `tmp_download_path`. Returns `False` if the url is an http(s) url which hasn't
+    changed since it was downloaded into `cached_file`, in which case nothing is downloaded.
+    """
+    if is_http_url(bundle_url):
+        return http_download(log, bundle_url, tmp_download_path, auth, cached_file)
     else:
+        if os.path.exists(tmp_download_path):
+            os.remove(tmp_download_path)
+
         log.info('Retrieving {}'.format(bundle_url))
-        # File based download, no need to show progress bar
         urlretrieve(bundle_url, tmp_download_path)
+        return True
+
+
+def is_http_url(url):
+    return urlparse(url, scheme='file').scheme in [SCHEME_HTTP, SCHEME_HTTPS]
+
+
+def http_download(log, url, tmp_download_path, auth, cached_file):
+    """
+    Streams the given url into `tmp_download_path`, verifying its digest trailer, if any, as the content is
+    received. A partial download left
+    behind in `tmp_download_path` is resumed with a ranged request, provided the url hasn't changed since, and an
+    interrupted download is resumed up to `HTTP_DOWNLOAD_ATTEMPTS` times. A resumed download which fails verification
+    is restarted from scratch. Large downloads are split into segments which are downloaded concurrently.
+    The download is conditional on the validators of `cached_file`, if any, so that an unchanged url isn't
+    downloaded again, and the cached file is used as is if the url can't be reached.
+    Returns `False` if the url hasn't changed since it was downloaded into `cached_file`.
+    """
+    session = http.session(url)
+    session_auth = (auth[1], auth[2]) if auth else None
+
+    cached_validators = load_validators(cached_file) if cached_file and os.path.exists(cached_file) else None
+    # The content is requested as it is, so that ranges and the content length relate to the bytes written
+    conditional_headers = {'Accept-Encoding': 'identity'}
+
+    if cached_validators and cached_validators.get('etag'):
+        conditional_headers['If-None-Match'] = cached_validators['etag']
+    if cached_validators and cached_validators.get('last_modified'):
+        conditional_headers['If-Modified-Since'] = cached_validators['last_modified']
+
+    log.info('Retrieving {}'.format(url))
+
+    content_hash = bundle_utils.DigestedWrite()
+
+    attempt = 1
+    while True:
+        offset = os.path.getsize(tmp_download_path) if os.path.exists(tmp_download_path) else 0
+        tmp_validators = load_validators(tmp_download_path) if offset > 0 else None
+        headers = dict(conditional_headers)
+
+        if_range = if_range_validator(tmp_validators) if tmp_validators else None
+
+        if if_range:
+            headers['Range'] = 'bytes={}-'.format(offset)
+            headers['If-Range'] = if_range
+        else:
+            offset = 0
+
+        try:
+            # A download which was complete, but not moved into the cache, only has to be verified
+            if offset > 0 and is_complete(tmp_validators, offset):
+                hash_partial_download(content_hash, tmp_download_path, offset)
+            else:
+                with closing(session.get(url, headers=headers, auth=session_auth, stream=True)) as response:
+                    if response.status_code == 304:
+                        log.info('Retrieving from cache {}'.format(cached_file))
+                        return False
+
+                    if response.status_code == 416 and offset > 0:
+                        hash_partial_download(content_hash, tmp_download_path, offset)
+                    else:
+                        download_response(log, session, url, session_auth, tmp_download_path, offset, response,
+                                          content_hash)
+        except DOWNLOAD_INTERRUPTED_ERRORS:
+            if attempt < HTTP_DOWNLOAD_ATTEMPTS:
+                attempt += 1
+                continue
+            elif cached_validators:
+                log.warning('Unable to revalidate {}, retrieving from cache {}'.format(url, cached_file))
+                return False
+            else:
+                raise
+
+        try:
+            content_hash.verify(tmp_download_path)
+        except BundleDigestMismatchError:
+            remove_download(tmp_download_path)
+
+            if offset > 0:
+                log.warning('Restarting the download of {} as the resumed download is corrupted'.format(url))
+                continue
+            else:
+                raise
+
+        return True
+
+
+def download_response(log, session, url, auth, tmp_download_path, offset, response, content_hash):
+    """
+    Writes the content of the given response into `tmp_download_path`, appending it to the partial download if it is
+    the requested range starting at `offset`. The content is hashed into `content_hash` as it is written.
+    """
+    response.raise_for_status()
+
+    if response.status_code != 206:
+        offset = 0
+
+    content_length = int(response.headers.get('Content-Length', 0))
+    save_validators(tmp_download_path, response, offset + content_length if content_length else None)
+
+    progress = DownloadProgress(log, offset + content_length)
+    progress.update(offset)
+
+    if offset == 0 and is_segmentable(response, content_length):
+        response.close()
+        download_segments(session, url, auth, tmp_download_path, content_length, progress)
+        save_validators(tmp_download_path, response, content_length)
+
+        # The segments are received out of order, hence they are hashed once they are all written
+        hash_partial_download(content_hash, tmp_download_path, content_length)
+    else:
+        hash_partial_download(content_hash, tmp_download_path, offset)
+
+        with open(tmp_download_path, 'ab' if offset > 0 else 'wb') as tmp_file:
+            for chunk in response.iter_content(IO_CHUNK_SIZE):
+                tmp_file.write(chunk)
+                content_hash.update(chunk)
+                progress.update(len(chunk))
+
+
+def hash_partial_download(content_hash, tmp_download_path, offset):
+    """
+    Brings `content_hash` up to the first `offset` bytes of the partial download. A download interrupted and resumed
+    by the same `http_download` has already been hashed up to there, whereas the data left behind by a previous
+    command is read back.
+    """
+    if content_hash.size != offset:
+        content_hash.reset()
+
+    if content_hash.size != offset:
+        with open(tmp_download_path, 'rb') as tmp_file:
+            remaining = offset
+            while remaining > 0:
+                chunk = tmp_file.read(min(remaining, IO_CHUNK_SIZE))
+                if not chunk:
+                    break
+                content_hash.update(chunk)
+                remaining -= len(chunk)
+
+
+def is_complete(validators, offset):
+    return validators.get('content_length') is not None and offset >= validators['content_length']
+
+
+def remove_download(tmp_download_path):
+    for path in [tmp_download_path, validators_file(tmp_download_path)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def is_segmentable(response, content_length):
+    return response.status_code == 200 and \
+        response.headers.get('Accept-Ranges') == 'bytes' and \
+        content_length >= SEGMENTED_DOWNLOAD_THRESHOLD and \
+        SEGMENTED_DOWNLOAD_CONNECTIONS > 1
+
+
+def download_segments(session, url, auth, tmp_download_path, size, progress):
+    """
+    Downloads the given url as `SEGMENTED_DOWNLOAD_CONNECTIONS` ranges at a time, each of which is written to its
+    position within `tmp_download_path`.
+    """
+    # The file is only complete once all of the segments are, so it's not resumable until then
+    os.remove(validators_file(tmp_download_path))
+
+    with open(tmp_download_path, 'wb') as tmp_file:
+        tmp_file.truncate(size)
 
+    segment_size = -(-size // SEGMENTED_DOWNLOAD_CONNECTIONS)
+    segments = [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
 
-def show_progress(log, bundle_url):
-    prev_time = 0.0
-    download_message_shown = False
+    try:
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(download_segment, session, url, auth, tmp_download_path, start, end, progress)
+                       for start, end in segments]
+
+        for future in futures:
+            future.result()
+    except Exception:
+        os.remove(tmp_download_path)
+        raise
+
+
+def download_segment(session, url, auth, tmp_download_path, start, end, progress):
+    headers = {'Accept-Encoding': 'identity', 'Range': 'bytes={}-{}'.format(start, end)}
+
+    with closing(session.get(url, headers=headers, auth=auth, stream=True)) as response:
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            raise requests.exceptions.HTTPError('Range {}-{} of {} not supported'.format(start, end, url),
+                                                response=response)
+
+        with open(tmp_download_path, 'r+b') as tmp_file:
+            tmp_file.seek(start)
+            for chunk in response.iter_content(IO_CHUNK_SIZE):
+                tmp_file.write(chunk)
+                progress.update(len(chunk))
 
-    def continue_logging(count, block_size, total_size):
-        nonlocal prev_time, download_message_shown
 
-        if not download_message_shown:
-            log.info('Retrieving {}'.format(bundle_url))
-            download_message_shown = True
+def if_range_validator(validators):
+    # Weak ETags can't be used to resume a download
+    if validators.get('etag') and not validators['etag'].startswith('W/'):
+        return validators['etag']
+    else:
+        return validators.get('last_modified')
+
+
+def move_validators(tmp_download_path, cached_file):
+    try:
+        os.replace(validators_file(tmp_download_path), validators_file(cached_file))
+    except FileNotFoundError:
+        pass
 
-        downloaded_size = count * block_size
-        percent = (downloaded_size * 1.0) / total_size
-        download_complete = percent >= 1.0
-        now_time = time.time()
-        if download_complete or now_time - prev_time >= 0.1:
-            progress_bar_text = screen_utils.progress_bar(percent)
-            log.progress(progress_bar_text, flush=download_complete)
-            prev_time = now_time
 
-    return continue_logging
+def validators_file(path):
+    return os.path.join(os.path.dirname(path), HTTP_METADATA_DIR_NAME, '{}.json'.format(os.path.basename(path)))
+
+
+def load_validators(path):
+    """
+    Returns the `etag` and `last_modified` validators of the response the given file was downloaded from, along with
+    the `content_length` of the complete file, or `None` if they aren't known.
+    """
+    try:
+        with open(validators_file(path), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def save_validators(path, response, content_length=None):
+    validators = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_length': content_length
+    }
+
+    metadata_path = validators_file(path)
+    os.makedirs(os.path.dirname(metadata_path), mode=0o700, exist_ok=True)
+    with open(metadata_path, 'w', encoding='utf-8') as file:
+        json.dump(validators, file, indent=2, sort_keys=True)
@@ -25,11 +25,20 @@ from conductr_cli import docker, host, sandbox_proxy, terminal
 from conductr_cli.sandbox_version import is_conductr_supportive_of_features, is_cinnamon_grafana_docker_based
 from conductr_cli.constants import FEATURE_PROVIDE_LOGGING, FEATURE_PROVIDE_PROXYING
 from conductr_cli.screen_utils import h1
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from zipfile import ZipFile
 import logging
 import os
 
 
+# The maximum number of feature bundles being waited on at a time within `concurrent_bundle_runs`.
+MAX_CONCURRENT_BUNDLE_RUNS = 8
+
+# The executor and futures of the bundle runs within `concurrent_bundle_runs`, or None outside of it.
+_concurrent_bundle_runs = None
+
+
 class FeatureStartResult:
     def __init__(self, started, bundle_results):
         self.started = started
@@ -733,7 +742,42 @@ def load_and_run_bundle(log, bundle, name, bind_addrs, offline_mode, config=None
         ['run', name, '--disable-instructions'] + parse_bind_addrs(bind_addrs) + ([] if run_add is None else run_add)
 
     conductr_cli.conduct_main.run(load_command, configure_logging=False)
-    conductr_cli.conduct_main.run(run_command, configure_logging=False)
+
+    if _concurrent_bundle_runs is None:
+        conductr_cli.conduct_main.run(run_command, configure_logging=False)
+    else:
+        executor, futures = _concurrent_bundle_runs
+        futures.append(executor.submit(conductr_cli.conduct_main.run, run_command, configure_logging=False))
+
+
+@contextmanager
+def concurrent_bundle_runs():
+    """Within this context, `load_and_run_bundle` returns once the bundle is loaded and the run is waited upon in the
+    background. Leaving the context waits for all of these runs, so the startup of the feature bundles takes as long
+    as the slowest of them rather than their sum. Any error of a run is raised when leaving the context.
+    """
+    global _concurrent_bundle_runs
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BUNDLE_RUNS) as executor:
+        _concurrent_bundle_runs = executor, futures
+        try:
+            yield
+        finally:
+            _concurrent_bundle_runs = None
+
+    for future in futures:
+        future.result()
+
+
+def wait_for_bundle_runs():
+    """Within `concurrent_bundle_runs`, waits for the bundle runs requested so far, e.g. before starting a feature
+    which relies on the bundles of another. Any error of these runs is raised.
+    """
+    if _concurrent_bundle_runs is not None:
+        _, futures = _concurrent_bundle_runs
+        for future in list(futures):
+            future.result()
 
 
 def select_bintray_uri(name, version_args=[], bundle_repo=''):
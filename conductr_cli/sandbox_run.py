@@ -35,12 +35,22 @@ def run(args):
     if run_result.wait_for_conductr:
         sandbox_common.wait_for_start(run_result)
 
+    feature_start_results = []
+
+    with sandbox_features.concurrent_bundle_runs():
+        for feature in features:
+            # The bundles of the features a feature depends upon have to be running before it is started
+            if feature.dependencies:
+                sandbox_features.wait_for_bundle_runs()
+
+            feature.conductr_post_start(args, run_result)
+            feature_start_results.append((feature, feature.start()))
+
+    # The features are only reported once all of their bundles are running
     feature_results = []
     feature_provided = []
 
-    for feature in features:
-        feature.conductr_post_start(args, run_result)
-        result = feature.start()
+    for feature, result in feature_start_results:
         feature_results += result.bundle_results
 
         if result.started:
@@ -3,10 +3,15 @@ import argparse
 from functools import partial
 from conductr_cli import logging_setup
 from conductr_cli.constants import IO_CHUNK_SIZE, SHAZAR_TIMESTAMP_MIN
+from conductr_cli.zip_writer import COMPRESSIONS, DEFAULT_COMPRESSION, DEFAULT_COMPRESSION_LEVEL, DEFAULT_JOBS, \
+    INDEX_SUFFIX, ZipIndex, ZipWriter, normalize_arcname, save_index, stats_report
+from contextlib import contextmanager
+import glob
 import hashlib
 import logging
 import os
 import shutil
+import stat
 import sys
 import tarfile
 import tempfile
@@ -51,60 +56,160 @@ def build_parser():
     parser.add_argument('source',
                         help='Optional path to a bundle directory or bundle configuration file or tar file.',
                         nargs='?')
+    add_zip_arguments(parser)
     parser.set_defaults(func=shazar)
     return parser
 
 
+def add_zip_arguments(parser):
+    parser.add_argument('--compression',
+                        choices=COMPRESSIONS,
+                        default=DEFAULT_COMPRESSION,
+                        help='The compression method of the zip entries, defaults to {}\n'
+                             'With auto, the entries whose first block hardly compresses are stored, and the others '
+                             'deflated'.format(DEFAULT_COMPRESSION))
+    parser.add_argument('--compression-level',
+                        type=int,
+                        choices=range(0, 10),
+                        default=DEFAULT_COMPRESSION_LEVEL,
+                        metavar='{0..9}',
+                        help='The zlib level of the deflated zip entries, defaults to that of zlib')
+    parser.add_argument('--compression-report',
+                        action='store_true',
+                        help='Reports the bytes saved and time spent per compression method on stderr')
+    parser.add_argument('--jobs',
+                        type=int,
+                        default=DEFAULT_JOBS,
+                        help='The number of zip entries compressed at a time, defaults to {}\n'
+                             'The zip is the same whatever the number of jobs'.format(DEFAULT_JOBS))
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='If enabled, the files which are unchanged since the zip previously written to the same '
+                             'output have their compressed entries copied from it rather than compressed again\n'
+                             'The zip is the same as one written from scratch')
+
+
+@contextmanager
+def zip_writer(zip_file, args, index=None, previous=None):
+    compression_level = vars(args).get('compression_level')
+    with ZipWriter(zip_file,
+                   compression=vars(args).get('compression') or DEFAULT_COMPRESSION,
+                   jobs=vars(args).get('jobs') or DEFAULT_JOBS,
+                   compression_level=DEFAULT_COMPRESSION_LEVEL if compression_level is None
+                   else compression_level,
+                   index=index,
+                   previous=previous) as writer:
+        yield writer
+
+    # The zip may be written to stdout, hence the report goes to stderr
+    if vars(args).get('compression_report'):
+        for line in stats_report(writer.stats):
+            print(line, file=sys.stderr)
+
+
 def shazar(args):
+    source_is_tar = args.source is None or args.tar
+    source_base_name = None if source_is_tar else os.path.basename(args.source.rstrip('\\/'))
+
+    # Per UNIX conventions, if given "-" as a filename that's a way of saying to use stdout. This solves the
+    # use-case of outputting to stdout despite giving `shazar` a `source` argument.
+
+    incremental = vars(args).get('incremental')
+
+    if args.output == '-' or (args.output is None and source_base_name is None):
+        if incremental:
+            logging.getLogger(__name__).error('shazar: --incremental requires an output file or directory')
+            sys.exit(2)
+
+        write_zip(args, source_base_name, sys.stdout.buffer)
+    elif args.output is not None and incremental:
+        write_incremental_zip(args.output, partial(write_zip, args, source_base_name))
+    elif args.output is not None:
+        # write directly to the file here so writing to device nodes like e.g. /dev/null is supported
+        with open(args.output, 'wb') as file:
+            write_zip(args, source_base_name, file)
+    else:
+        # The name of the bundle depends on its digest, so it's written next to its destination and renamed once
+        # the digest is known
+        index = {} if incremental else None
+        previous_path = previous_zip(args.output_dir, source_base_name) if incremental else None
+        previous = ZipIndex(previous_path) if previous_path else None
+
+        with tempfile.NamedTemporaryFile(dir=args.output_dir, delete=False) as file:
+            try:
+                hex_digest = write_zip(args, source_base_name, file, index, previous)
+            except BaseException:
+                os.remove(file.name)
+                raise
+
+        dest = os.path.join(args.output_dir, '{}-{}.zip'.format(source_base_name, hex_digest))
+
+        shutil.move(file.name, dest)
+
+        if index is not None:
+            save_index(dest, index)
+
+        if not source_is_tar:
+            sys.stdout.write(dest + os.linesep)
+
+
+def write_zip(args, source_base_name, output, index=None, previous=None):
+    """
+    Zips the source given by `args` straight into `output` followed by the digest trailer, indexing its files into
+    `index` and reusing the unchanged ones from `previous`, if given.
+    Returns the hex digest of the zip.
+    """
     log = logging.getLogger(__name__)
 
-    source_is_tar = args.source is None or args.tar
+    digest_writer = DigestWriter(output)
+
+    with zipfile.ZipFile(digest_writer, 'w') as zip_file, zip_writer(zip_file, args, index, previous) as writer:
+        if source_base_name is None:
+            try:
+                with tarfile.open(fileobj=sys.stdin.buffer, mode='r|') \
+                        if args.source is None else tarfile.open(args.source, mode='r') as tar:
+                    tar_to_zip(tar, writer)
 
-    with tempfile.NamedTemporaryFile() as zip_file_data:
-        source_base_name = None
-
-        with zipfile.ZipFile(zip_file_data, 'w') as zip_file:
-            if source_is_tar:
-                try:
-                    with tarfile.open(fileobj=sys.stdin.buffer, mode='r|') \
-                            if args.source is None else tarfile.open(args.source, mode='r') as tar:
-                        tar_to_zip(tar, zip_file)
-
-                except tarfile.ReadError:
-                    log.error('shazar: input must be in tar format')
-                    sys.exit(2)
-            else:
-                source_base_name = os.path.basename(args.source.rstrip('\\/'))
-
-                if os.path.isdir(args.source):
-                    dir_to_zip(args.source, zip_file, source_base_name)
-                else:
-                    zip_file.write(args.source, source_base_name)
-
-        zip_file_data.seek(0)
-
-        # Per UNIX conventions, if given "-" as a filename that's a way of saying to use stdout. This solves the
-        # use-case of outputting to stdout despite giving `shazar` a `source` argument.
-
-        if args.output == '-' or (args.output is None and source_base_name is None):
-            write_with_digest(zip_file_data, sys.stdout.buffer)
-        elif args.output is not None:
-            # write directly to the file here so writing to device nodes like e.g. /dev/null is supported
-            with open(args.output, 'wb') as file:
-                write_with_digest(zip_file_data, file)
+            except tarfile.ReadError:
+                log.error('shazar: input must be in tar format')
+                sys.exit(2)
+        elif os.path.isdir(args.source):
+            dir_to_zip(args.source, writer, source_base_name)
         else:
-            with tempfile.NamedTemporaryFile(delete=False) as file:
-                hex_digest = write_with_digest(zip_file_data, file)
+            writer.write(args.source, source_base_name)
+
+    return digest_writer.write_digest()
+
 
-                dest = args.output if args.output is not None else os.path.join(
-                    args.output_dir,
-                    '{}-{}.zip'.format(source_base_name, hex_digest)
-                )
+def write_incremental_zip(path, write):
+    """
+    Writes the zip at `path` with `write(output, index, previous)`, reusing the entries of the zip previously written
+    at `path`, then saves its index next to it. Returns what `write` returns.
+    """
+    previous = ZipIndex(path)
+    index = {}
 
-            shutil.move(file.name, dest)
+    # The entries of the previous zip are read while writing, so it's only replaced once the new one is complete
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or None, delete=False) as file:
+        try:
+            result = write(file, index, previous)
+        except BaseException:
+            os.remove(file.name)
+            raise
 
-            if not source_is_tar:
-                sys.stdout.write(dest + os.linesep)
+    shutil.move(file.name, path)
+    save_index(path, index)
+
+    return result
+
+
+def previous_zip(output_dir, source_base_name):
+    """
+    Returns the zip of `source_base_name` most recently written to `output_dir` along with its index, if any.
+    """
+    pattern = os.path.join(glob.escape(output_dir), glob.escape('{}-'.format(source_base_name)) + '*.zip')
+    paths = [path for path in glob.glob(pattern) if os.path.exists(path + INDEX_SUFFIX)]
+    return max(paths, key=os.path.getmtime) if paths else None
 
 
 def dir_to_zip(dir, zip_file, source_base_name, mtime=None):
@@ -126,11 +231,11 @@ def tar_to_zip(tar, zip_file):
         mtime_to_use = max(entry.mtime, SHAZAR_TIMESTAMP_MIN)
 
         if entry.isfile():
-            with tempfile.NamedTemporaryFile() as entry_file:
-                shutil.copyfileobj(tar.extractfile(entry), entry_file)
-                entry_file.flush()
-                os.utime(entry_file.name, (mtime_to_use, mtime_to_use))
-                zip_file.write(entry_file.name, entry.name)
+            # The member is streamed into its entry, with the date and permissions it has in the tar, and its name
+            # normalized as `ZipFile.write` would
+            info = zipfile.ZipInfo(normalize_arcname(entry.name), date_time=time.localtime(mtime_to_use)[:6])
+            info.external_attr = (stat.S_IFREG | entry.mode) << 16
+            zip_file.write_fileobj(info, tar.extractfile(entry))
         elif entry.isdir():
             info = zipfile.ZipInfo(entry.name + '/', date_time=time.localtime(mtime_to_use))
             info.create_system = 0
@@ -140,17 +245,47 @@ def tar_to_zip(tar, zip_file):
             sys.exit(1)
 
 
-def write_with_digest(input, output):
-    digest = hashlib.sha256()
+class DigestWriter(object):
+    """
+    Write-only file object which passes everything written to it on to `output` while computing its sha-256 digest,
+    so that a zip file is digested as it is written rather than read back afterwards.
 
-    iterator = iter(partial(input.read, IO_CHUNK_SIZE), b'')
+    The writer can tell its position but can't seek, so the zip is written in a single pass. This also allows writing
+    to outputs which can't seek, such as pipes.
+    """
 
-    for chunk in iterator:
-        output.write(chunk)
-        digest.update(chunk)
+    def __init__(self, output):
+        self.output = output
+        self.digest = hashlib.sha256()
+        self.position = 0
 
-    hex_digest = digest.hexdigest()
+    def write(self, data):
+        self.output.write(data)
+        self.digest.update(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        self.output.flush()
+
+    def write_digest(self):
+        """
+        Appends the digest trailer of the data written so far to `output`, returning the hex digest.
+        """
+        hex_digest = self.digest.hexdigest()
+
+        self.output.write(('\nsha-256/' + hex_digest).encode('UTF-8'))
+
+        return hex_digest
+
+
+def write_with_digest(input, output):
+    digest_writer = DigestWriter(output)
 
-    output.write(('\nsha-256/' + hex_digest).encode('UTF-8'))
+    for chunk in iter(partial(input.read, IO_CHUNK_SIZE), b''):
+        digest_writer.write(chunk)
 
-    return hex_digest
+    return digest_writer.write_digest()
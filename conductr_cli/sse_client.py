@@ -1,5 +1,11 @@
 from conductr_cli import conduct_request
+from dcos.errors import DCOSConnectionError
+from requests.exceptions import ChunkedEncodingError, ConnectionError, HTTPError
+from requests.packages.urllib3.exceptions import ProtocolError, ReadTimeoutError
+import logging
 import re
+import socket
+import time
 
 
 SSE_REQUEST_INPUT = {
@@ -10,30 +16,26 @@ SSE_REQUEST_INPUT = {
 }
 
 
-SSE_END_OF_FIELD = re.compile(r'\r\n\r\n|\r\r|\n\n')
+# The maximum number of bytes read from the event stream at a time.
+DEFAULT_CHUNK_SIZE = 4096
 
+SSE_END_OF_LINE = re.compile(b'\r\n|\r|\n')
 
-def is_event_complete(buf):
-    return re.search(SSE_END_OF_FIELD, buf) is not None
+# The reconnection time used until the server provides one using the `retry` field, in milliseconds.
+DEFAULT_RETRY_MILLIS = 3000
 
+# The upper bound of the delay between reconnection attempts, in seconds.
+MAX_RECONNECT_DELAY = 30
 
-def parse_event(raw_sse_string):
-    event, data = None, None
-    lines = raw_sse_string.split('\n')
-    for line in lines:
-        if line.rstrip():
-            key, value = line.split(':')
-            if key == 'event':
-                event = value
-            elif key == 'data':
-                data = value
-    return Event(event, data)
+# The number of consecutive failed reconnection attempts after which the underlying error is raised.
+DEFAULT_MAX_RECONNECT_ATTEMPTS = 5
 
 
 class Event:
-    def __init__(self, event, data):
+    def __init__(self, event, data, id=None):
         self.event = event
         self.data = data
+        self.id = id
 
     def __eq__(self, other):
         if type(other) is type(self):
@@ -44,6 +46,114 @@ class Event:
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __repr__(self):
+        return 'Event(event={!r}, data={!r}, id={!r})'.format(self.event, self.data, self.id)
+
+
+class EventParser:
+    """
+    Incremental parser of a `text/event-stream` as specified by https://www.w3.org/TR/eventsource/.
+
+    Raw bytes are fed in chunks of arbitrary size. The bytes are accumulated in a buffer which is only scanned from
+    where the previous scan for an end of line stopped, so each byte of the stream is examined once regardless of how
+    the stream is chunked.
+
+    Multiple `data` fields within an event are joined by a newline, and only the first ':' separates the field name
+    from its value. The `id` and `retry` fields are retained as the last event id and the reconnection time
+    respectively.
+    """
+    def __init__(self):
+        self.buffer = bytearray()
+        self.scan_position = 0
+        self.last_event_id = None
+        self.retry = None
+        self._reset_event()
+
+    def discard_incomplete(self):
+        """
+        Discards the incomplete event and any buffered bytes, e.g. when the stream is interrupted.
+        The last event id and reconnection time are retained.
+        """
+        self.buffer = bytearray()
+        self.scan_position = 0
+        self._reset_event()
+
+    def _reset_event(self):
+        self.event_type = None
+        self.data_lines = None
+
+    def feed(self, chunk):
+        """
+        Feeds a chunk of raw bytes into the parser.
+        :param chunk: the bytes read from the event stream
+        :return: the list of events completed by the given chunk
+        """
+        self.buffer.extend(chunk)
+
+        events = []
+        line_start = 0
+        while True:
+            match = SSE_END_OF_LINE.search(self.buffer, self.scan_position)
+            if not match:
+                self.scan_position = len(self.buffer)
+                break
+
+            # A trailing '\r' may be the first half of a '\r\n' split across chunks, so wait for the next chunk.
+            if match.group() == b'\r' and match.end() == len(self.buffer):
+                self.scan_position = match.start()
+                break
+
+            event = self._process_line(self.buffer[line_start:match.start()])
+            if event:
+                events.append(event)
+
+            line_start = match.end()
+            self.scan_position = line_start
+
+        if line_start:
+            del self.buffer[:line_start]
+            self.scan_position -= line_start
+
+        return events
+
+    def _process_line(self, raw_line):
+        if not raw_line:
+            return self._dispatch_event()
+
+        line = raw_line.decode('utf-8', errors='replace')
+        if line.startswith(':'):
+            # Comment line
+            return None
+
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+
+        if field == 'event':
+            self.event_type = value
+        elif field == 'data':
+            if self.data_lines is None:
+                self.data_lines = []
+            self.data_lines.append(value)
+        elif field == 'id':
+            if '\0' not in value:
+                self.last_event_id = value
+        elif field == 'retry':
+            if value.isdigit():
+                self.retry = int(value)
+
+        return None
+
+    def _dispatch_event(self):
+        # Blocks which only carry an `id` or `retry` field don't constitute an event.
+        if self.event_type is None and self.data_lines is None:
+            return None
+
+        data = '\n'.join(self.data_lines) if self.data_lines is not None else None
+        event = Event(self.event_type, data, self.last_event_id)
+        self._reset_event()
+        return event
+
 
 class Client:
     """
@@ -56,42 +166,171 @@ class Client:
 
     Changes introduced as part of the backport:
     - Support for Python 3.2 (i.e. do not use u'')
-    - Parse only for event and data string within SSE
-    - No support for retries and last event id
+    - The stream is read as its bytes are received, up to `chunk_size` bytes at a time, and parsed incrementally by
+      `EventParser`
+    - When the stream is interrupted, the client reconnects sending the `Last-Event-ID` header. The delay between
+      reconnection attempts starts from the `retry` value provided by the server, doubling with each consecutive
+      failed attempt up to `MAX_RECONNECT_DELAY` seconds. The error is raised once `max_reconnect_attempts`
+      consecutive attempts have failed.
     """
-    def __init__(self, dcos_mode, host, url, headers=None, **kwargs):
+    def __init__(self, dcos_mode, host, url, headers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_reconnect_attempts=DEFAULT_MAX_RECONNECT_ATTEMPTS, **kwargs):
         self.dcos_mode = dcos_mode
         self.host = host
         self.url = url
         self.headers = headers
+        self.chunk_size = chunk_size
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.failed_reconnect_attempts = 0
+        self.closed = False
+        self.response = None
         self.responseIter = None
+        self.parser = EventParser()
+        self.pending_events = []
         self.kwargs = kwargs
 
     def connect(self):
-        sse_request_input = dict(SSE_REQUEST_INPUT)
+        headers = dict(SSE_REQUEST_INPUT['headers'])
         if self.headers:
-            sse_request_input['headers'].update(self.headers)
+            headers.update(self.headers)
+        if self.parser.last_event_id:
+            headers['Last-Event-ID'] = self.parser.last_event_id
+        sse_request_input = {'headers': headers}
 
         kwargs_all = {}
         kwargs_all.update(self.kwargs)
         kwargs_all.update(sse_request_input)
 
         response = conduct_request.get(self.dcos_mode, self.host, self.url, stream=True, **kwargs_all)
-        response.raise_for_status()
-        self.responseIter = response.iter_content(decode_unicode=True)
+        try:
+            response.raise_for_status()
+        except HTTPError:
+            response.close()
+            raise
+        self.response = response
+        self.responseIter = iter_available(response, self.chunk_size)
+
+    def close(self):
+        self.closed = True
+        if self.response is not None:
+            shutdown_connection(self.response)
+            self.response.close()
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        buf = ''
-        while not is_event_complete(buf):
-            next_char = next(self.responseIter)
-            buf += next_char
-
-        split = re.split(SSE_END_OF_FIELD, buf)
-        raw_sse = split[0]
-        return parse_event(raw_sse)
+        while not self.pending_events:
+            if self.closed:
+                raise StopIteration
+
+            try:
+                chunk = next(self.responseIter)
+            except StopIteration:
+                # The server or an intermediary has closed the stream
+                self.reconnect(None)
+                continue
+            except (ChunkedEncodingError, ConnectionError) as e:
+                self.reconnect(e)
+                continue
+
+            self.failed_reconnect_attempts = 0
+            self.pending_events.extend(self.parser.feed(chunk))
+
+        return self.pending_events.pop(0)
+
+    def reconnect(self, error):
+        log = logging.getLogger(__name__)
+        self.parser.discard_incomplete()
+
+        # The stream has been closed, rather than interrupted
+        if self.closed:
+            return
+
+        # The interrupted response is released before waiting, so its connection doesn't linger during the backoff
+        try:
+            self.response.close()
+        except Exception as e:
+            log.debug('Unable to close the event stream {}: {}'.format(self.url, e))
+        finally:
+            self.response = None
+            self.responseIter = None
+
+        while self.failed_reconnect_attempts < self.max_reconnect_attempts:
+            delay = self.reconnect_delay()
+            self.failed_reconnect_attempts += 1
+            log.debug('Event stream {} interrupted, reconnecting in {} seconds'.format(self.url, delay))
+            time.sleep(delay)
+
+            if self.closed:
+                return
+
+            try:
+                self.connect()
+                return
+            except (ConnectionError, DCOSConnectionError) as e:
+                error = e
+            except HTTPError as e:
+                # Only retry server errors, e.g. a load balancer without available upstream
+                if e.response is None or e.response.status_code < 500:
+                    raise e
+                error = e
+
+        if error:
+            raise error
+        else:
+            raise StopIteration
+
+    def reconnect_delay(self):
+        retry_millis = self.parser.retry if self.parser.retry is not None else DEFAULT_RETRY_MILLIS
+        return min(MAX_RECONNECT_DELAY, retry_millis / 1000.0 * (2 ** self.failed_reconnect_attempts))
+
+
+def shutdown_connection(response):
+    """
+    Shuts down the socket of the given streamed response, if any, so that a read waiting for the next event on
+    another thread returns right away rather than once the server sends more.
+    """
+    connection = getattr(response.raw, 'connection', None) or getattr(response.raw, '_connection', None)
+    sock = getattr(connection, 'sock', None)
+    if sock is None:
+        # The connection lets go of its socket when the stream is delimited by closing it, while the response reads
+        # from the socket through a file object
+        file = getattr(getattr(response.raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(file, 'raw', None), '_sock', None)
+
+    if isinstance(sock, socket.socket):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def iter_available(response, chunk_size):
+    """
+    Yields the content of the given streamed response as soon as it is received, up to `chunk_size` bytes at a time.
+    Unlike `iter_content`, a read doesn't wait for `chunk_size` bytes, which may take until the next heartbeat when the
+    stream isn't chunked. Reading what is available requires urllib3 2 or later, otherwise the response is read in
+    chunks of `chunk_size` bytes.
+    """
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is None:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            yield chunk
+        return
+
+    while True:
+        # The errors are raised as `iter_content` raises them
+        try:
+            chunk = read1(chunk_size)
+        except ProtocolError as e:
+            raise ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise ConnectionError(e)
+
+        if not chunk:
+            return
+        yield chunk
 
 
 def get_events(dcos_mode, host, url, headers=None, **kwargs):
@@ -0,0 +1,127 @@
+from conductr_cli import sse_client
+import queue
+import threading
+
+
+_hubs = {}
+_hubs_lock = threading.Lock()
+
+END_OF_STREAM = object()
+
+
+class EventHub:
+    """
+    Single subscription to an SSE endpoint which fans the events out to any number of subscribers.
+
+    The events are read on a background thread and placed on the queue of each subscriber. If the event stream fails,
+    the error is raised to each of the subscribers. The stream is closed as soon as the last subscriber is gone, which
+    interrupts the background thread if it is waiting for the next event.
+    """
+    def __init__(self, dcos_mode, host, url, **kwargs):
+        self.dcos_mode = dcos_mode
+        self.host = host
+        self.url = url
+        self.kwargs = kwargs
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self.closed = False
+        self.thread = None
+        self.events = None
+
+    def subscribe(self):
+        """
+        Returns the queue of a new subscriber, or `None` if the hub has been closed.
+        """
+        subscription = queue.Queue()
+        with self.lock:
+            if self.closed:
+                return None
+
+            self.subscriptions.append(subscription)
+            if not self.thread:
+                self.thread = threading.Thread(target=self.dispatch, name='sse-hub', daemon=True)
+                self.thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+            if not self.subscriptions:
+                self.closed = True
+
+        if self.closed:
+            remove_hub(self)
+            self.close_events()
+
+    def publish(self, item):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            subscription.put(item)
+
+    def close_events(self):
+        with self.lock:
+            events, self.events = self.events, None
+
+        if events is not None:
+            events.close()
+
+    def dispatch(self):
+        try:
+            events = sse_client.get_events(self.dcos_mode, self.host, self.url, **self.kwargs)
+            with self.lock:
+                self.events = events
+
+            for event in events:
+                if self.closed:
+                    break
+                self.publish(event)
+            self.publish(END_OF_STREAM)
+        except Exception as e:
+            self.publish(e)
+        finally:
+            with self.lock:
+                self.closed = True
+            remove_hub(self)
+            self.close_events()
+
+
+def remove_hub(hub):
+    with _hubs_lock:
+        if _hubs.get(hub.url) is hub:
+            del _hubs[hub.url]
+
+
+def subscribe(dcos_mode, host, url, **kwargs):
+    """
+    Subscribes to the events of the given SSE endpoint, sharing the connection of any existing subscription to the
+    same endpoint within this process. Takes the same arguments as `sse_client.get_events`.
+
+    The subscriber is registered immediately, so no event received from this point onwards is missed. The returned
+    iterator is unsubscribed once it is exhausted, closed or garbage collected.
+    """
+    with _hubs_lock:
+        hub = _hubs.get(url)
+        subscription = hub.subscribe() if hub else None
+        if subscription is None:
+            hub = EventHub(dcos_mode, host, url, **kwargs)
+            _hubs[url] = hub
+            subscription = hub.subscribe()
+
+    return iterate_subscription(hub, subscription)
+
+
+def iterate_subscription(hub, subscription):
+    try:
+        while True:
+            item = subscription.get()
+            if item is END_OF_STREAM:
+                return
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        hub.unsubscribe(subscription)
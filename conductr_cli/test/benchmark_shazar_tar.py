@@ -0,0 +1,83 @@
+"""
+Benchmark of zipping a tar with `shazar_main.tar_to_zip`.
+
+Builds a synthetic tar of 50,000 small files and zips it by streaming each member into its entry, as
+`shazar_main.tar_to_zip` does, and through the previous temporary file per member for comparison. Run with:
+
+    python -m conductr_cli.test.benchmark_shazar_tar
+"""
+from conductr_cli import shazar_main
+from conductr_cli.constants import SHAZAR_TIMESTAMP_MIN
+from conductr_cli.zip_writer import ZipWriter
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import timeit
+import zipfile
+
+
+FILE_COUNT = 50000
+
+FILE_SIZE = 512
+
+COMPRESSIONS = ['stored', 'deflated']
+
+
+def create_tar(path):
+    with tarfile.open(path, mode='w') as tar:
+        for i in range(FILE_COUNT):
+            data = 'file {}\n'.format(i).encode('UTF-8')
+            data = (data * (FILE_SIZE // len(data) + 1))[:FILE_SIZE]
+
+            info = tarfile.TarInfo('bundle/dir-{}/file-{}.txt'.format(i // 1000, i))
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = 1234567890
+            tar.addfile(info, io.BytesIO(data))
+
+
+def legacy_tar_to_zip(tar, zip_file):
+    # The temporary file per member which preceded the streaming of `shazar_main.tar_to_zip`.
+    for entry in tar:
+        mtime_to_use = max(entry.mtime, SHAZAR_TIMESTAMP_MIN)
+
+        if entry.isfile():
+            with tempfile.NamedTemporaryFile() as entry_file:
+                shutil.copyfileobj(tar.extractfile(entry), entry_file)
+                entry_file.flush()
+                os.utime(entry_file.name, (mtime_to_use, mtime_to_use))
+                zip_file.write(entry_file.name, entry.name)
+
+
+def zip_tar(tar_path, compression, tar_to_zip):
+    with tarfile.open(tar_path, mode='r|') as tar, \
+            zipfile.ZipFile(io.BytesIO(), 'w') as zip_file, \
+            ZipWriter(zip_file, compression) as writer:
+        tar_to_zip(tar, writer)
+
+
+def run():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        tar_path = os.path.join(tmpdir, 'bundle.tar')
+        create_tar(tar_path)
+        print('{} files of {} bytes, {} bytes of tar'.format(FILE_COUNT, FILE_SIZE, os.path.getsize(tar_path)))
+
+        for compression in COMPRESSIONS:
+            print('  {}'.format(compression))
+
+            elapsed = min(timeit.repeat(lambda: zip_tar(tar_path, compression, legacy_tar_to_zip),
+                                        number=1, repeat=3))
+            print('    temporary files {:10.2f} ms'.format(elapsed * 1000))
+
+            elapsed = min(timeit.repeat(lambda: zip_tar(tar_path, compression, shazar_main.tar_to_zip),
+                                        number=1, repeat=3))
+            print('    streamed        {:10.2f} ms'.format(elapsed * 1000))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    run()
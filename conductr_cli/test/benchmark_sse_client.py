@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of the SSE event stream parsing.
+
+Feeds the recorded event streams in `data/sse` through `sse_client.EventParser` using various chunk sizes, and
+through the previous per-character parsing for comparison. Run with:
+
+    python -m conductr_cli.test.benchmark_sse_client
+"""
+from conductr_cli import sse_client
+import os
+import re
+import timeit
+
+
+RECORDED_STREAMS_DIR = os.path.join(os.path.dirname(__file__), 'data', 'sse')
+
+REPEAT_STREAM = 50
+
+CHUNK_SIZES = [1, 64, 1024, sse_client.DEFAULT_CHUNK_SIZE]
+
+LEGACY_END_OF_FIELD = re.compile(r'\r\n\r\n|\r\r|\n\n')
+
+
+def legacy_parse(raw_sse_string):
+    # The per-character buffering which preceded `sse_client.EventParser`.
+    events = []
+    chars = iter(raw_sse_string)
+    while True:
+        buf = ''
+        while re.search(LEGACY_END_OF_FIELD, buf) is None:
+            try:
+                buf += next(chars)
+            except StopIteration:
+                return events
+        events.append(re.split(LEGACY_END_OF_FIELD, buf)[0])
+
+
+def parse(raw_sse, chunk_size):
+    parser = sse_client.EventParser()
+    events = []
+    for i in range(0, len(raw_sse), chunk_size):
+        events.extend(parser.feed(raw_sse[i:i + chunk_size]))
+    return events
+
+
+def run():
+    for file_name in sorted(os.listdir(RECORDED_STREAMS_DIR)):
+        with open(os.path.join(RECORDED_STREAMS_DIR, file_name), 'rb') as f:
+            raw_sse = f.read() * REPEAT_STREAM
+
+        event_count = len(parse(raw_sse, sse_client.DEFAULT_CHUNK_SIZE))
+        print('{}: {} bytes, {} events'.format(file_name, len(raw_sse), event_count))
+
+        elapsed = min(timeit.repeat(lambda: legacy_parse(raw_sse.decode('utf-8')), number=1, repeat=3))
+        print('  per-character  {:10.2f} ms'.format(elapsed * 1000))
+
+        for chunk_size in CHUNK_SIZES:
+            elapsed = min(timeit.repeat(lambda: parse(raw_sse, chunk_size), number=1, repeat=3))
+            print('  chunk {:<8} {:10.2f} ms'.format(chunk_size, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    run()
@@ -148,3 +148,10 @@ def create_mock_logger():
 def file_contents(file_path):
     with open(os.path.join(os.path.dirname(__file__), file_path), 'r') as content_file:
         return content_file.read()
+
+
+def as_sse_events(events):
+    """Returns the given events as an event stream which can be closed, as returned by `sse_client.get_events`"""
+    event_stream = MagicMock()
+    event_stream.__iter__.return_value = iter(events)
+    return event_stream
@@ -63,13 +63,13 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -88,8 +88,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(), self.output(stdout))
 
@@ -104,12 +103,12 @@ class ConductLoadTestBase(CliTestCase):
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
 
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
                 patch('dcos.http.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
@@ -129,8 +128,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(command=self.default_args['command']), self.output(stdout))
 
@@ -141,7 +139,7 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         args = self.default_args.copy()
         args.update({'verbose': True})
@@ -150,8 +148,8 @@ class ConductLoadTestBase(CliTestCase):
         with \
                 patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -170,8 +168,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(verbose=self.default_response), self.output(stdout))
 
@@ -182,7 +179,7 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         args = self.default_args.copy()
         args.update({'quiet': True})
@@ -190,8 +187,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -210,8 +207,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual('45e0c477d3e5ea92aa8d85c0d8f3e25c\n', self.output(stdout))
 
@@ -222,7 +218,7 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         args = self.default_args.copy()
         args.update({'long_ids': True})
@@ -230,8 +226,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -250,8 +246,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(bundle_id='45e0c477d3e5ea92aa8d85c0d8f3e25c'), self.output(stdout))
 
@@ -262,7 +257,7 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         cli_parameters = ' --ip 127.0.1.1 --port 9006'
         args = self.default_args.copy()
@@ -271,8 +266,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -291,8 +286,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(
             self.default_output(params=cli_parameters),
@@ -305,7 +299,7 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         cli_parameters = ' --host 127.0.1.1 --port 9006'
         args = self.default_args.copy()
@@ -314,8 +308,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -334,8 +328,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(
             self.default_output(params=cli_parameters),
@@ -353,13 +346,13 @@ class ConductLoadTestBase(CliTestCase):
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
         wait_for_installation_mock = MagicMock()
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         input_args = MagicMock(**args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -378,8 +371,7 @@ class ConductLoadTestBase(CliTestCase):
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
         wait_for_installation_mock.assert_called_with(self.bundle_id, input_args)
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(), self.output(stdout))
 
@@ -389,7 +381,7 @@ class ConductLoadTestBase(CliTestCase):
         http_method = self.respond_with(200, self.default_response)
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
 
         args = self.default_args.copy()
         args.update({'no_wait': True})
@@ -397,8 +389,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_load.load(input_args)
@@ -415,8 +407,7 @@ class ConductLoadTestBase(CliTestCase):
                                        auth=self.conductr_auth,
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(), self.output(stdout))
 
@@ -426,7 +417,7 @@ class ConductLoadTestBase(CliTestCase):
         http_method = self.respond_with(200, self.default_response)
         stdout = MagicMock()
         bundle_open_mock = MagicMock(side_effect=lambda p1, p2, p3: (p1, 1))
-        cleanup_old_bundles_mock = MagicMock()
+        cache_resolved_files_mock = MagicMock()
         wait_for_installation_mock = MagicMock()
 
         args = self.default_args.copy()
@@ -435,8 +426,8 @@ class ConductLoadTestBase(CliTestCase):
 
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('conductr_cli.conduct_load.cleanup_old_bundles', cleanup_old_bundles_mock), \
-                patch('requests.post', http_method), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, stdout)
@@ -454,8 +445,7 @@ class ConductLoadTestBase(CliTestCase):
                                        auth=self.conductr_auth,
                                        verify=self.server_verification_file,
                                        headers={'Content-Type': self.multipart_content_type, 'Host': '127.0.0.1'})
-        cleanup_old_bundles_mock.assert_called_with(self.bundle_resolve_cache_dir, self.bundle_file_name,
-                                                    excluded=self.bundle_file)
+        cache_resolved_files_mock.assert_called_with(input_args, self.bundle_file, None)
 
         self.assertEqual(self.default_output(), self.output(stdout))
 
@@ -470,7 +460,7 @@ class ConductLoadTestBase(CliTestCase):
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock):
             logging_setup.configure_logging(input_args, stdout, stderr)
             result = conduct_load.load(input_args)
@@ -504,7 +494,7 @@ class ConductLoadTestBase(CliTestCase):
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock):
             logging_setup.configure_logging(input_args, stdout, stderr)
             result = conduct_load.load(input_args)
@@ -537,7 +527,7 @@ class ConductLoadTestBase(CliTestCase):
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock):
             logging_setup.configure_logging(input_args, stdout, stderr)
             result = conduct_load.load(input_args)
@@ -680,7 +670,7 @@ class ConductLoadTestBase(CliTestCase):
         input_args = MagicMock(**self.default_args)
         with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock):
             logging_setup.configure_logging(input_args, err_output=stderr)
@@ -35,7 +35,7 @@ class ConductRunTestBase(CliTestCase):
 
         input_args = MagicMock(**self.default_args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -56,7 +56,7 @@ class ConductRunTestBase(CliTestCase):
         args.update({'verbose': True})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -77,7 +77,7 @@ class ConductRunTestBase(CliTestCase):
         args.update({'long_ids': True})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -99,7 +99,7 @@ class ConductRunTestBase(CliTestCase):
         args.update({'cli_parameters': cli_parameters})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -123,7 +123,7 @@ class ConductRunTestBase(CliTestCase):
         args.update({'cli_parameters': cli_parameters})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -149,7 +149,7 @@ class ConductRunTestBase(CliTestCase):
 
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
@@ -169,7 +169,7 @@ class ConductRunTestBase(CliTestCase):
         args.update({'no_wait': True})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method):
+        with patch('requests.Session.put', http_method):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_run.run(input_args)
             self.assertTrue(result)
@@ -184,7 +184,7 @@ class ConductRunTestBase(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method):
+        with patch('requests.Session.put', http_method):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_run.run(input_args)
             self.assertFalse(result)
@@ -202,7 +202,7 @@ class ConductRunTestBase(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method):
+        with patch('requests.Session.put', http_method):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_run.run(input_args)
             self.assertFalse(result)
@@ -221,7 +221,7 @@ class ConductRunTestBase(CliTestCase):
 
         input_args = MagicMock(**self.default_args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_run.run(input_args)
@@ -244,6 +244,78 @@ class TestBndlCreate(CliTestCase):
             shutil.rmtree(tmpdir)
             shutil.rmtree(tmpdir2)
 
+    def test_incremental_same_as_clean(self):
+        stdout_mock = MagicMock()
+        tmpdir = tempfile.mkdtemp()
+        outdir = tempfile.mkdtemp()
+        output = os.path.join(outdir, 'incremental.zip')
+        clean_output = os.path.join(outdir, 'clean.zip')
+
+        def create_args(output, incremental):
+            return create_attributes_object({
+                'name': 'test',
+                'source': tmpdir,
+                'format': BndlFormat.OCI_IMAGE,
+                'image_tag': 'latest',
+                'output': output,
+                'use_shazar': True,
+                'use_default_endpoints': True,
+                'annotations': [],
+                'validation_excludes': [],
+                'use_default_volumes': True,
+                'with_defaults': None,
+                'compression': 'deflated',
+                'incremental': incremental
+            })
+
+        try:
+            os.mkdir(os.path.join(tmpdir, 'refs'))
+            with open(os.path.join(tmpdir, 'oci-layout'), 'w') as file:
+                file.write('{"imageLayoutVersion": "1.0.0"}')
+            with open(os.path.join(tmpdir, 'refs/latest'), 'w') as file:
+                file.write('{}')
+
+            with \
+                    patch('sys.stdin', MagicMock(**{'buffer': BytesIO(b'')})), \
+                    patch('sys.stdout.buffer.write', stdout_mock):
+                bndl_create.bndl_create(create_args(output, True))
+
+                with open(os.path.join(tmpdir, 'refs/latest'), 'w') as file:
+                    file.write('{"changed": true}')
+
+                bndl_create.bndl_create(create_args(output, True))
+                bndl_create.bndl_create(create_args(clean_output, False))
+
+            self.assertTrue(os.path.exists(output + '.index'))
+            with open(output, 'rb') as fileobj, open(clean_output, 'rb') as fileobj2:
+                self.assertEqual(fileobj2.read(), fileobj.read())
+
+        finally:
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(outdir)
+
+    def test_incremental_without_output(self):
+        stdout_mock = MagicMock()
+        stderr_mock = MagicMock()
+        logging_setup.configure_logging(MagicMock(), stdout_mock, stderr_mock)
+
+        attributes = create_attributes_object({
+            'name': 'test',
+            'source': None,
+            'format': BndlFormat.BUNDLE,
+            'output': None,
+            'use_shazar': True,
+            'incremental': True
+        })
+
+        with patch('sys.stdin', MagicMock(**{'buffer': BytesIO(b'')})):
+            self.assertEqual(bndl_create.bndl_create(attributes), 2)
+
+        self.assertEqual(
+            self.output(stderr_mock),
+            as_error('Error: bndl: --incremental requires an output file\n')
+        )
+
     def test_mtime_from_config(self):
         config = {
             'created': '2017-02-27T19:42:10.522384312Z'
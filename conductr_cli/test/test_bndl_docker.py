@@ -1,6 +1,8 @@
 from conductr_cli import bndl_docker
+from conductr_cli.constants import DOCKER_VERIFIED_LAYERS_FILE_NAME
 from conductr_cli.test.cli_test_case import CliTestCase
 from io import BytesIO
+import hashlib
 import json
 import os
 import shutil
@@ -236,3 +238,135 @@ class TestBndlDocker(CliTestCase):
         finally:
             shutil.rmtree(tmpdir)
             shutil.rmtree(dest_tmpdir)
+
+    def test_docker_unpack_dir_compressed_layer(self):
+        tmpdir = tempfile.mkdtemp()
+        dest_tmpdir = os.path.join(tempfile.mkdtemp(), 'component')
+
+        layer_data = b'compressed layer'
+        layer_digest = hashlib.sha256(layer_data).hexdigest()
+
+        try:
+            with open(os.path.join(tmpdir, 'config.json'), 'w') as file:
+                json.dump({
+                    'created': '2017-01-13T22:50:56.415736637Z',
+                    'architecture': 'amd64',
+                    'os': 'linux',
+                    'config': {},
+                    'rootfs': {'type': 'layers', 'diff_ids': ['sha256:abc']},
+                    'history': []
+                }, file)
+
+            with open(os.path.join(tmpdir, 'manifest.json'), 'w') as file:
+                json.dump([{
+                    'Config': 'config.json',
+                    'RepoTags': ['lightbend/conductr:latest'],
+                    'Layers': ['{}/layer.tar.gz'.format(layer_digest)]
+                }], file)
+
+            layer_path = os.path.join(tmpdir, layer_digest, 'layer.tar.gz')
+            os.mkdir(os.path.dirname(layer_path))
+            with open(layer_path, 'wb') as file:
+                file.write(layer_data)
+
+            self.assertEqual('conductr', bndl_docker.docker_unpack(dest_tmpdir, tmpdir, True, None, None))
+
+            blob_path = os.path.join(dest_tmpdir, 'blobs', 'sha256', layer_digest)
+            self.assertTrue(os.path.samefile(layer_path, blob_path))
+
+            with open(os.path.join(dest_tmpdir, 'refs', 'latest'), 'r') as file:
+                manifest_digest = json.load(file)['digest'].split(':', 1)[1]
+
+            with open(os.path.join(dest_tmpdir, 'blobs', 'sha256', manifest_digest), 'r') as file:
+                self.assertEqual(
+                    [{
+                        'mediaType': 'application/vnd.oci.image.layer.v1.tar+gzip',
+                        'size': len(layer_data),
+                        'digest': 'sha256:{}'.format(layer_digest)
+                    }],
+                    json.load(file)['layers'])
+        finally:
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(os.path.dirname(dest_tmpdir))
+
+    @staticmethod
+    def write_image_dir(image_dir, layer_dir_name, layer_data, verified=False):
+        with open(os.path.join(image_dir, 'config.json'), 'w') as file:
+            json.dump({
+                'created': '2017-01-13T22:50:56.415736637Z',
+                'architecture': 'amd64',
+                'os': 'linux',
+                'config': {},
+                'rootfs': {'type': 'layers', 'diff_ids': ['sha256:abc']},
+                'history': []
+            }, file)
+
+        with open(os.path.join(image_dir, 'manifest.json'), 'w') as file:
+            json.dump([{
+                'Config': 'config.json',
+                'RepoTags': ['lightbend/conductr:latest'],
+                'Layers': ['{}/layer.tar.gz'.format(layer_dir_name)]
+            }], file)
+
+        os.mkdir(os.path.join(image_dir, layer_dir_name))
+        with open(os.path.join(image_dir, layer_dir_name, 'layer.tar.gz'), 'wb') as file:
+            file.write(layer_data)
+
+        if verified:
+            open(os.path.join(image_dir, DOCKER_VERIFIED_LAYERS_FILE_NAME), 'w').close()
+
+    def test_docker_unpack_dir_digest_from_layout(self):
+        tmpdir = tempfile.mkdtemp()
+        dest_tmpdir = os.path.join(tempfile.mkdtemp(), 'component')
+
+        # The layer is named after the digest of its blob, which is taken as is rather than computed from its content
+        layer_digest = hashlib.sha256(b'registry layer').hexdigest()
+
+        try:
+            self.write_image_dir(tmpdir, layer_digest, b'compressed layer', verified=True)
+
+            self.assertEqual('conductr', bndl_docker.docker_unpack(dest_tmpdir, tmpdir, True, None, None))
+
+            self.assertTrue(os.path.samefile(os.path.join(tmpdir, layer_digest, 'layer.tar.gz'),
+                                             os.path.join(dest_tmpdir, 'blobs', 'sha256', layer_digest)))
+        finally:
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(os.path.dirname(dest_tmpdir))
+
+    def test_docker_unpack_dir_digest_not_verified(self):
+        tmpdir = tempfile.mkdtemp()
+        dest_tmpdir = os.path.join(tempfile.mkdtemp(), 'component')
+
+        # Without the marker of the docker resolver, a layer named after a digest is hashed all the same
+        layer_data = b'compressed layer'
+        layer_dir_name = hashlib.sha256(b'registry layer').hexdigest()
+
+        try:
+            self.write_image_dir(tmpdir, layer_dir_name, layer_data)
+
+            self.assertEqual('conductr', bndl_docker.docker_unpack(dest_tmpdir, tmpdir, True, None, None))
+
+            blobs = os.listdir(os.path.join(dest_tmpdir, 'blobs', 'sha256'))
+            self.assertIn(hashlib.sha256(layer_data).hexdigest(), blobs)
+            self.assertNotIn(layer_dir_name, blobs)
+        finally:
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(os.path.dirname(dest_tmpdir))
+
+    def test_docker_unpack_dir_digest_computed(self):
+        tmpdir = tempfile.mkdtemp()
+        dest_tmpdir = os.path.join(tempfile.mkdtemp(), 'component')
+
+        layer_data = b'compressed layer'
+
+        try:
+            self.write_image_dir(tmpdir, 'layer-1', layer_data)
+
+            self.assertEqual('conductr', bndl_docker.docker_unpack(dest_tmpdir, tmpdir, True, None, None))
+
+            self.assertTrue(os.path.samefile(
+                os.path.join(tmpdir, 'layer-1', 'layer.tar.gz'),
+                os.path.join(dest_tmpdir, 'blobs', 'sha256', hashlib.sha256(layer_data).hexdigest())))
+        finally:
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(os.path.dirname(dest_tmpdir))
@@ -16,6 +16,8 @@ class TestBndl(CliTestCase):
         self.assertEqual(args.name, 'hello')
         self.assertEqual(args.image_tag, 'latest')
         self.assertTrue(args.use_shazar)
+        self.assertEqual(args.compression, 'stored')
+        self.assertEqual(args.jobs, 1)
         self.assertTrue(args.use_default_endpoints)
 
     def test_parser_with_all_params(self):
@@ -0,0 +1,84 @@
+from conductr_cli import bndl_verify_main, logging_setup
+from conductr_cli.test.cli_test_case import CliTestCase, as_error, strip_margin
+from unittest.mock import patch, MagicMock
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+class TestBndlVerify(CliTestCase):
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+
+        self.content = b'abc\n' * 1000
+        self.hex_digest = hashlib.sha256(self.content).hexdigest()
+
+        trailer = b'\nsha-256/' + self.hex_digest.encode('UTF-8')
+        self.verified_bundle = self.write_bundle('verified.zip', self.content + trailer)
+        self.corrupted_bundle = self.write_bundle('corrupted.zip', b'xyz' + self.content + trailer)
+        self.plain_bundle = self.write_bundle('plain.zip', self.content)
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def write_bundle(self, name, data):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def test_parser(self):
+        args = bndl_verify_main.build_parser().parse_args(['-q', 'a.zip', 'b.zip'])
+
+        self.assertEqual(args.func.__name__, 'verify')
+        self.assertTrue(args.quiet)
+        self.assertEqual(args.bundles, ['a.zip', 'b.zip'])
+
+    def test_verified(self):
+        stdout = MagicMock()
+        args = bndl_verify_main.build_parser().parse_args([self.verified_bundle])
+        logging_setup.configure_logging(args, stdout)
+
+        self.assertEqual(0, bndl_verify_main.verify(args))
+
+        self.assertEqual('{}: OK sha-256/{}\n'.format(self.verified_bundle, self.hex_digest), self.output(stdout))
+
+    def test_verified_quiet(self):
+        stdout = MagicMock()
+        args = bndl_verify_main.build_parser().parse_args(['-q', self.verified_bundle])
+        logging_setup.configure_logging(args, stdout)
+
+        self.assertEqual(0, bndl_verify_main.verify(args))
+
+        self.assertEqual('{}\n'.format(self.verified_bundle), self.output(stdout))
+
+    def test_failed(self):
+        stdout = MagicMock()
+        stderr = MagicMock()
+        args = bndl_verify_main.build_parser().parse_args([self.corrupted_bundle, self.plain_bundle, self.verified_bundle])
+        logging_setup.configure_logging(args, stdout, stderr)
+
+        self.assertEqual(1, bndl_verify_main.verify(args))
+
+        self.assertEqual('{}: OK sha-256/{}\n'.format(self.verified_bundle, self.hex_digest), self.output(stdout))
+        self.assertEqual(
+            as_error(strip_margin("""|Error: {}: FAILED expected sha-256/{}, actual sha-256/{}
+                                     |Error: {}: FAILED no digest to verify
+                                     |""".format(self.corrupted_bundle, self.hex_digest,
+                                                 hashlib.sha256(b'xyz' + self.content).hexdigest(),
+                                                 self.plain_bundle))),
+            self.output(stderr)
+        )
+
+    def test_run(self):
+        verify_mock = MagicMock(return_value=0)
+        exit_mock = MagicMock()
+
+        with patch('conductr_cli.bndl_verify_main.verify', verify_mock), \
+                patch('conductr_cli.logging_setup.configure_logging', MagicMock()), \
+                patch('sys.exit', exit_mock):
+            bndl_verify_main.run([self.verified_bundle])
+
+        self.assertEqual([self.verified_bundle], verify_mock.call_args[0][0].bundles)
+        exit_mock.assert_called_once_with(0)
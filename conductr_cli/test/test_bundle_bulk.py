@@ -0,0 +1,200 @@
+from argparse import Namespace
+from conductr_cli.test.cli_test_case import CliTestCase, as_error, as_sse_events, strip_margin
+from conductr_cli import bundle_bulk, logging_setup
+from conductr_cli.exceptions import WaitTimeoutError
+from requests.exceptions import HTTPError
+from unittest.mock import patch, MagicMock
+
+
+def create_bundle(bundle_id, name, roles=[], tags=[], executions=0, installations=1, has_error=False):
+    return {
+        'bundleId': bundle_id,
+        'attributes': {
+            'bundleName': name,
+            'roles': roles,
+            'tags': tags
+        },
+        'bundleExecutions': [{'isStarted': True} for _ in range(executions)],
+        'bundleInstallations': [{} for _ in range(installations)],
+        'hasError': has_error
+    }
+
+
+def create_event(event, bundle_id):
+    return MagicMock(event=event, data='{{"bundleId":"{}"}}'.format(bundle_id))
+
+
+def create_heartbeat_event():
+    return MagicMock(event=None, data=None)
+
+
+class TestBundleBulk(CliTestCase):
+    conductr_auth = ('username', 'password')
+    server_verification_file = MagicMock(name='server_verification_file')
+
+    default_args = {
+        'dcos_mode': False,
+        'command': 'conduct',
+        'scheme': 'http',
+        'host': '127.0.0.1',
+        'port': 9005,
+        'base_path': '/',
+        'api_version': '2',
+        'disable_instructions': False,
+        'verbose': False,
+        'quiet': False,
+        'no_wait': False,
+        'wait_timeout': 10,
+        'cli_parameters': '',
+        'scale': 2,
+        'bundle': 'visualizer',
+        'bundles': ['eslite'],
+        'name_prefix': None,
+        'role': None,
+        'tag': None,
+        'parallelism': 2,
+        'conductr_auth': conductr_auth,
+        'server_verification_file': server_verification_file
+    }
+
+    def create_args(self, **kwargs):
+        args = dict(self.default_args)
+        args.update(kwargs)
+        return Namespace(**args)
+
+    def test_is_bulk(self):
+        self.assertFalse(bundle_bulk.is_bulk(self.create_args(bundles=[])))
+        self.assertTrue(bundle_bulk.is_bulk(self.create_args()))
+        self.assertTrue(bundle_bulk.is_bulk(self.create_args(bundles=[], role='web')))
+        self.assertFalse(bundle_bulk.is_bulk(self.create_args(bundle=None, bundles=[])))
+
+    def test_select_bundles(self):
+        get_bundles_mock = MagicMock(return_value=[
+            create_bundle('a101', 'reactive-maps-frontend', roles=['web'], tags=['1.0.0']),
+            create_bundle('b202', 'reactive-maps-backend', roles=['intranet'], tags=['1.0.0']),
+            create_bundle('c303', 'reactive-maps-frontend', roles=['web'], tags=['2.0.0']),
+            create_bundle('d404', 'visualizer', roles=['web'], tags=['1.0.0'])
+        ])
+        args = self.create_args(bundles=['eslite', 'visualizer'], name_prefix='reactive-maps', role='web', tag='1.0.0')
+
+        with patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock):
+            result = bundle_bulk.select_bundles(args)
+
+        self.assertEqual(['visualizer', 'eslite', 'a101'], result)
+        get_bundles_mock.assert_called_once_with(args)
+
+    def test_stop(self):
+        bundle_ids = {'visualizer': 'a101', 'eslite': 'b202'}
+        stop_bundle_mock = MagicMock(side_effect=lambda args: {'bundleId': bundle_ids[args.bundle]})
+        get_bundles_mock = MagicMock(side_effect=[
+            [create_bundle('a101', 'visualizer', executions=1), create_bundle('b202', 'eslite', executions=1)],
+            [create_bundle('a101', 'visualizer', executions=0), create_bundle('b202', 'eslite', executions=1)],
+            [create_bundle('a101', 'visualizer', executions=0), create_bundle('b202', 'eslite', executions=0)]
+        ])
+        subscribe_mock = MagicMock(return_value=as_sse_events([
+            create_event('bundleExecutionRemoved', 'a101'),
+            create_event('bundleExecutionRemoved', 'c303'),
+            create_event('bundleExecutionRemoved', 'b202')
+        ]))
+        stdout = MagicMock()
+
+        args = self.create_args()
+        with patch('conductr_cli.control_protocol.stop_bundle', stop_bundle_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock), \
+                patch('conductr_cli.sse_hub.subscribe', subscribe_mock):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(bundle_bulk.stop(args))
+
+        self.assertEqual(['visualizer', 'eslite'],
+                         sorted([call[0][0].bundle for call in stop_bundle_mock.call_args_list], reverse=True))
+        self.assertEqual(3, get_bundles_mock.call_count)
+        subscribe_mock.assert_called_once_with(False, '127.0.0.1', 'http://127.0.0.1:9005/v2/bundles/events',
+                                               auth=self.conductr_auth, verify=self.server_verification_file)
+        self.assertEqual(strip_margin("""|Bundle stop request sent for 2 of 2 bundles.
+                                         |All 2 bundles stopped
+                                         |Print ConductR info with: conduct info
+                                         |"""), self.output(stdout))
+
+    def test_run_already_started(self):
+        run_bundle_mock = MagicMock(side_effect=lambda args: {'bundleId': args.bundle})
+        get_bundles_mock = MagicMock(return_value=[
+            create_bundle('visualizer', 'visualizer', executions=2),
+            create_bundle('eslite', 'eslite', executions=2)
+        ])
+        subscribe_mock = MagicMock()
+        stdout = MagicMock()
+
+        args = self.create_args(disable_instructions=True)
+        with patch('conductr_cli.control_protocol.run_bundle', run_bundle_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock), \
+                patch('conductr_cli.sse_hub.subscribe', subscribe_mock):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(bundle_bulk.run(args))
+
+        self.assertEqual(2, run_bundle_mock.call_count)
+        subscribe_mock.assert_not_called()
+        self.assertEqual(strip_margin("""|Bundle run request sent for 2 of 2 bundles.
+                                         |All 2 bundles started
+                                         |"""), self.output(stdout))
+
+    def test_run_with_error(self):
+        run_bundle_mock = MagicMock(side_effect=lambda args: {'bundleId': args.bundle})
+        get_bundles_mock = MagicMock(return_value=[
+            create_bundle('visualizer', 'visualizer', executions=2),
+            create_bundle('eslite', 'eslite', executions=0, has_error=True)
+        ])
+        stdout = MagicMock()
+        stderr = MagicMock()
+
+        args = self.create_args(disable_instructions=True)
+        with patch('conductr_cli.control_protocol.run_bundle', run_bundle_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock), \
+                patch('conductr_cli.bundle_scale.IGNORE_ERROR_FIRST_SECONDS', -1):
+            logging_setup.configure_logging(args, stdout, stderr)
+            self.assertFalse(bundle_bulk.run(args))
+
+        self.assertEqual(as_error(strip_margin("""|Error: Bundle eslite has error
+                                                  |""")), self.output(stderr))
+
+    def test_unload_request_failure(self):
+        def unload_bundle(args):
+            if args.bundle == 'eslite':
+                raise HTTPError(response=MagicMock(status_code=404, reason='Not Found'))
+            return {'bundleId': args.bundle}
+
+        get_bundles_mock = MagicMock(return_value=[])
+        stdout = MagicMock()
+        stderr = MagicMock()
+
+        args = self.create_args(disable_instructions=True)
+        with patch('conductr_cli.control_protocol.unload_bundle', MagicMock(side_effect=unload_bundle)), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock):
+            logging_setup.configure_logging(args, stdout, stderr)
+            self.assertFalse(bundle_bulk.unload(args))
+
+        self.assertEqual(strip_margin("""|Bundle unload request sent for 1 of 2 bundles.
+                                         |All 1 bundles unloaded
+                                         |"""), self.output(stdout))
+        self.assertEqual(as_error(strip_margin("""|Error: Unable to unload bundle eslite: 404 Not Found
+                                                  |""")), self.output(stderr))
+
+    def test_wait_timeout(self):
+        get_bundles_mock = MagicMock(return_value=[create_bundle('a101', 'visualizer', executions=1)])
+        subscribe_mock = MagicMock(return_value=as_sse_events([create_heartbeat_event()]))
+
+        args = self.create_args(wait_timeout=-1)
+        with patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock), \
+                patch('conductr_cli.sse_hub.subscribe', subscribe_mock):
+            logging_setup.configure_logging(args, MagicMock())
+            self.assertRaises(WaitTimeoutError, bundle_bulk.wait_for_bundles, ['a101'],
+                              bundle_bulk.is_stop_scale_met, 'stopped', args)
+
+    def test_no_bundles(self):
+        stderr = MagicMock()
+
+        args = self.create_args(bundle=None, bundles=[])
+        logging_setup.configure_logging(args, MagicMock(), stderr)
+        self.assertFalse(bundle_bulk.stop(args))
+
+        self.assertEqual(as_error(strip_margin("""|Error: No bundles to stop
+                                                  |""")), self.output(stderr))
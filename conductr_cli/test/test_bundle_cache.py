@@ -0,0 +1,150 @@
+from unittest import TestCase
+from unittest.mock import patch
+from conductr_cli import bundle_cache
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+
+class TestBundleCache(TestCase):
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = os.path.join(self.tmpdir, 'store')
+        self.bundle_cache_dir = os.path.join(self.tmpdir, 'bundle')
+        self.configuration_cache_dir = os.path.join(self.tmpdir, 'configuration')
+        os.mkdir(self.bundle_cache_dir)
+        os.mkdir(self.configuration_cache_dir)
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def write_file(self, cache_dir, name, data):
+        path = os.path.join(cache_dir, name)
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def test_add(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        digest = hashlib.sha256(b'bundle').hexdigest()
+
+        self.assertEqual([digest], bundle_cache.add(self.store, [bundle]))
+
+        stored_object = bundle_cache.object_path(self.store, digest)
+        self.assertTrue(os.path.samefile(bundle, stored_object))
+
+        index = bundle_cache.load_index(self.store)
+        self.assertEqual({bundle: digest}, index['paths'])
+        self.assertEqual(6, index['objects'][digest]['size'])
+
+    def test_add_waits_for_lock(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        configuration = self.write_file(self.configuration_cache_dir, 'config.zip', b'config')
+
+        with bundle_cache.locked(self.store):
+            # The index is updated by another command while this one holds the lock
+            thread = threading.Thread(target=bundle_cache.add, args=(self.store, [configuration]))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+
+            index = bundle_cache.load_index(self.store)
+            bundle_cache.add_path(self.store, index, bundle)
+            bundle_cache.save_index(self.store, index)
+
+        thread.join(5)
+        self.assertEqual({bundle, configuration}, set(bundle_cache.load_index(self.store)['paths']))
+
+    def test_add_dedup(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        configuration = self.write_file(self.configuration_cache_dir, 'bundle.zip', b'bundle')
+
+        bundle_cache.add(self.store, [bundle, configuration])
+
+        self.assertTrue(os.path.samefile(bundle, configuration))
+        self.assertEqual(1, len(bundle_cache.entries(self.store)))
+
+    def test_add_linked_not_hashed(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        bundle_cache.add(self.store, [bundle])
+
+        with patch('conductr_cli.bundle_cache.file_digest') as file_digest_mock:
+            bundle_cache.add(self.store, [bundle])
+
+        file_digest_mock.assert_not_called()
+
+    def test_add_link_fallback_to_copy(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        digest = hashlib.sha256(b'bundle').hexdigest()
+
+        with patch('os.link', side_effect=OSError('Invalid cross-device link')):
+            bundle_cache.add(self.store, [bundle])
+
+        stored_object = bundle_cache.object_path(self.store, digest)
+        self.assertFalse(os.path.samefile(bundle, stored_object))
+        with open(stored_object, 'rb') as file:
+            self.assertEqual(b'bundle', file.read())
+
+    def test_evict(self):
+        oldest = self.write_file(self.bundle_cache_dir, 'oldest.zip', b'1' * 100)
+        older = self.write_file(self.bundle_cache_dir, 'older.zip', b'2' * 100)
+        recent = self.write_file(self.bundle_cache_dir, 'recent.zip', b'3' * 100)
+
+        with patch('time.time', side_effect=[1, 2, 3]):
+            oldest_digest, older_digest, recent_digest = bundle_cache.add(self.store, [oldest, older, recent])
+
+        self.assertEqual([(oldest_digest, 100), (older_digest, 100)],
+                         bundle_cache.evict(self.store, 150))
+
+        self.assertFalse(os.path.exists(oldest))
+        self.assertFalse(os.path.exists(older))
+        self.assertTrue(os.path.exists(recent))
+        self.assertFalse(os.path.exists(bundle_cache.object_path(self.store, oldest_digest)))
+        self.assertEqual([recent_digest], [entry['digest'] for entry in bundle_cache.entries(self.store)])
+
+    def test_evict_keep(self):
+        oldest = self.write_file(self.bundle_cache_dir, 'oldest.zip', b'1' * 100)
+        recent = self.write_file(self.bundle_cache_dir, 'recent.zip', b'2' * 100)
+
+        with patch('time.time', side_effect=[1, 2]):
+            oldest_digest, recent_digest = bundle_cache.add(self.store, [oldest, recent])
+
+        self.assertEqual([(recent_digest, 100)], bundle_cache.evict(self.store, 150, keep=[oldest_digest]))
+        self.assertTrue(os.path.exists(oldest))
+
+    def test_gc(self):
+        removed_bundle = self.write_file(self.bundle_cache_dir, 'removed.zip', b'removed')
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        removed_digest, digest = bundle_cache.add(self.store, [removed_bundle, bundle])
+        os.remove(removed_bundle)
+
+        orphan_digest = hashlib.sha256(b'orphan').hexdigest()
+        orphan = bundle_cache.object_path(self.store, orphan_digest)
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, 'wb') as file:
+            file.write(b'orphan')
+
+        self.assertEqual([(removed_digest, 7), (orphan_digest, 6)], bundle_cache.gc(self.store, 1024))
+
+        self.assertFalse(os.path.exists(bundle_cache.object_path(self.store, removed_digest)))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertEqual([digest], [entry['digest'] for entry in bundle_cache.entries(self.store)])
+
+    def test_verify(self):
+        bundle = self.write_file(self.bundle_cache_dir, 'bundle.zip', b'bundle')
+        corrupted = self.write_file(self.bundle_cache_dir, 'corrupted.zip', b'corrupted')
+        digest, corrupted_digest = bundle_cache.add(self.store, [bundle, corrupted])
+
+        with open(corrupted, 'ab') as file:
+            file.write(b'!')
+
+        self.assertEqual([corrupted_digest], bundle_cache.verify(self.store))
+
+        self.assertTrue(os.path.exists(bundle))
+        self.assertFalse(os.path.exists(corrupted))
+        self.assertEqual([digest], [entry['digest'] for entry in bundle_cache.entries(self.store)])
+
+    def test_load_index_missing(self):
+        self.assertEqual({'objects': {}, 'paths': {}}, bundle_cache.load_index(self.store))
@@ -34,7 +34,7 @@ class TestGetDeploymentStateIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             result = bundle_deploy_v2.get_deployment_events('abc-def', input_args)
             self.assertEqual(json.loads(deployment_state), result)
 
@@ -55,7 +55,7 @@ class TestGetDeploymentStateIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             result = bundle_deploy_v2.get_deployment_events('abc-def', input_args)
             self.assertIsNone(result)
 
@@ -92,7 +92,7 @@ class TestGetDeploymentStateHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             result = bundle_deploy_v2.get_deployment_events('abc-def', input_args)
             self.assertEqual(json.loads(deployment_state), result)
 
@@ -113,7 +113,7 @@ class TestGetDeploymentStateHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             result = bundle_deploy_v2.get_deployment_events('abc-def', input_args)
             self.assertIsNone(result)
 
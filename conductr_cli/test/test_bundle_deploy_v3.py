@@ -1,4 +1,4 @@
-from conductr_cli.test.cli_test_case import CliTestCase, strip_margin
+from conductr_cli.test.cli_test_case import CliTestCase, as_sse_events, strip_margin
 from conductr_cli import bundle_deploy_v3, logging_setup
 from conductr_cli.exceptions import ContinuousDeliveryError, WaitTimeoutError
 from requests.exceptions import HTTPError
@@ -213,7 +213,7 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -233,7 +233,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse(None),
             self.sse(None),
             self.sse('deploymentSuccess')
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
@@ -339,14 +339,14 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse('requestAccepted'),
             self.sse('scheduleSimpleDeployments'),
             self.sse('deploymentScheduled'),
             self.sse(None),
             self.sse(None),
             self.sse('deploymentSuccess')
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
@@ -413,7 +413,7 @@ class TestWaitForDeployment(CliTestCase):
         url_mock = MagicMock(return_value='/deployments/events')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -423,7 +423,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse(None),
             self.sse(None),
             self.sse('deploymentFailure')
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -521,7 +521,7 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -541,7 +541,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse(None),
             self.sse(None),
             self.sse('deploymentSuccess')
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
@@ -616,7 +616,7 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -636,7 +636,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse(None),
             self.sse(None),
             self.sse('deploymentSuccess')
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
@@ -726,7 +726,7 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -738,7 +738,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse('deploymentScheduled'),
             self.sse(None),
             self.sse('deploymentFailure'),
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
@@ -840,7 +840,7 @@ class TestWaitForDeployment(CliTestCase):
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
 
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.sse(None),
             self.sse('requestAccepted'),
             self.sse(None),
@@ -860,7 +860,7 @@ class TestWaitForDeployment(CliTestCase):
             self.sse(None),
             self.sse(None),
             self.sse('deploymentSuccess')
-        ])
+        ]))
 
         deployment_id = 'a101449418187d92c789d1adc240b6d6'
         dcos_mode = False
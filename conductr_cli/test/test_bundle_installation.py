@@ -1,6 +1,6 @@
 import json
 
-from conductr_cli.test.cli_test_case import CliTestCase, strip_margin
+from conductr_cli.test.cli_test_case import CliTestCase, as_sse_events, strip_margin
 from conductr_cli import bundle_installation, logging_setup
 from conductr_cli.exceptions import WaitTimeoutError
 from unittest.mock import call, patch, MagicMock
@@ -9,6 +9,7 @@ from unittest.mock import call, patch, MagicMock
 def create_test_event(event_name):
     sse_mock = MagicMock()
     sse_mock.event = event_name
+    sse_mock.data = None
     return sse_mock
 
 
@@ -21,8 +22,8 @@ class TestCountInstallationIp(CliTestCase):
     server_verification_file = MagicMock(name='server_verification_file')
 
     def test_return_installation_count(self):
-        bundles_endpoint_reply = """
-            [{
+        bundle_endpoint_reply = """
+            {
                 "bundleId": "a101449418187d92c789d1adc240b6d6",
                 "bundleInstallations": [{
                     "uniqueAddress": {
@@ -31,10 +32,9 @@ class TestCountInstallationIp(CliTestCase):
                     },
                     "bundleFile": "file:///tmp/79e700212ddff716622b39ceace28fc2f51c4a05cfd993ebb50833ea8b772edf.zip"
                 }]
-            }]
+            }
         """
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=json.loads(bundle_endpoint_reply))
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -48,15 +48,15 @@ class TestCountInstallationIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(1, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_installation_count_v2(self):
-        bundles_endpoint_reply = """
-            [{
+        bundle_endpoint_reply = """
+            {
                 "bundleId": "a101449418187d92c789d1adc240b6d6",
                 "bundleInstallations": [{
                     "uniqueAddress": {
@@ -65,10 +65,9 @@ class TestCountInstallationIp(CliTestCase):
                     },
                     "bundleFile": "file:///tmp/79e700212ddff716622b39ceace28fc2f51c4a05cfd993ebb50833ea8b772edf.zip"
                 }]
-            }]
+            }
         """
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=json.loads(bundle_endpoint_reply))
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -82,16 +81,14 @@ class TestCountInstallationIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(1, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_zero_installation_count_v1(self):
-        bundles_endpoint_reply = '[]'
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=None)
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -105,16 +102,14 @@ class TestCountInstallationIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(0, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_zero_installation_count_v2(self):
-        bundles_endpoint_reply = '[]'
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=None)
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -128,11 +123,11 @@ class TestCountInstallationIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(0, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
 
 class TestCountInstallationHost(CliTestCase):
@@ -140,8 +135,8 @@ class TestCountInstallationHost(CliTestCase):
     server_verification_file = MagicMock(name='server_verification_file')
 
     def test_return_installation_count(self):
-        bundles_endpoint_reply = """
-            [{
+        bundle_endpoint_reply = """
+            {
                 "bundleId": "a101449418187d92c789d1adc240b6d6",
                 "bundleInstallations": [{
                     "uniqueAddress": {
@@ -150,10 +145,9 @@ class TestCountInstallationHost(CliTestCase):
                     },
                     "bundleFile": "file:///tmp/79e700212ddff716622b39ceace28fc2f51c4a05cfd993ebb50833ea8b772edf.zip"
                 }]
-            }]
+            }
         """
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=json.loads(bundle_endpoint_reply))
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -167,15 +161,15 @@ class TestCountInstallationHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(1, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_installation_count_v2(self):
-        bundles_endpoint_reply = """
-            [{
+        bundle_endpoint_reply = """
+            {
                 "bundleId": "a101449418187d92c789d1adc240b6d6",
                 "bundleInstallations": [{
                     "uniqueAddress": {
@@ -184,10 +178,9 @@ class TestCountInstallationHost(CliTestCase):
                     },
                     "bundleFile": "file:///tmp/79e700212ddff716622b39ceace28fc2f51c4a05cfd993ebb50833ea8b772edf.zip"
                 }]
-            }]
+            }
         """
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=json.loads(bundle_endpoint_reply))
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -201,16 +194,14 @@ class TestCountInstallationHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(1, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_zero_installation_count_v1(self):
-        bundles_endpoint_reply = '[]'
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=None)
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -224,16 +215,14 @@ class TestCountInstallationHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(0, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
     def test_return_zero_installation_count_v2(self):
-        bundles_endpoint_reply = '[]'
-        bundles_mock = MagicMock()
-        bundles_mock.return_value = json.loads(bundles_endpoint_reply)
+        bundle_mock = MagicMock(return_value=None)
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
         args = {
@@ -247,11 +236,11 @@ class TestCountInstallationHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('conductr_cli.control_protocol.get_bundles', bundles_mock):
+        with patch('conductr_cli.control_protocol.get_bundle', bundle_mock):
             result = bundle_installation.count_installations(bundle_id, input_args)
             self.assertEqual(0, result)
 
-        bundles_mock.assert_called_once_with(input_args)
+        bundle_mock.assert_called_once_with(input_args, bundle_id)
 
 
 class TestWaitForInstallation(CliTestCase):
@@ -263,12 +252,12 @@ class TestWaitForInstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_heartbeat_event(),
             create_test_event('bundleInstallationAdded'),
             create_test_event('otherEvent'),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -322,14 +311,14 @@ class TestWaitForInstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_heartbeat_event(),
             create_test_event('bundleInstallationAdded'),
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -383,14 +372,14 @@ class TestWaitForInstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_heartbeat_event(),
             create_heartbeat_event()
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -440,7 +429,7 @@ class TestWaitForInstallation(CliTestCase):
         count_installations_mock = MagicMock(side_effect=[3])
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[])
+        get_events_mock = MagicMock(return_value=as_sse_events([]))
         stdout = MagicMock()
 
         bundle_id = 'a101449418187d92c789d1adc240b6d6'
@@ -470,11 +459,11 @@ class TestWaitForInstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
 
@@ -508,16 +497,47 @@ class TestWaitForInstallation(CliTestCase):
         self.assertEqual(strip_margin("""|Bundle a101449418187d92c789d1adc240b6d6 waiting to be installed
                                          |"""), self.output(stdout))
 
+    def test_wait_timeout_other_bundle_events(self):
+        count_installations_mock = MagicMock(return_value=0)
+        other_bundle_event = create_test_event('bundleInstallationAdded')
+        other_bundle_event.data = '{"bundleId": "c1ab77e63b722ef1d5e2bd2b4fc4d7a2"}'
+
+        def other_bundle_events():
+            yield other_bundle_event
+            self.fail('The events of other bundles are consumed beyond the timeout')
+
+        get_events_mock = MagicMock(return_value=as_sse_events(other_bundle_events()))
+
+        stdout = MagicMock()
+
+        bundle_id = 'a101449418187d92c789d1adc240b6d6'
+        args = MagicMock(**{
+            'dcos_mode': False,
+            'conductr_auth': self.conductr_auth,
+            'server_verification_file': self.server_verification_file,
+            # Purposely set no timeout to invoke the error
+            'wait_timeout': -1
+        })
+        with patch('conductr_cli.conduct_url.url', MagicMock(return_value='/bundle-events/endpoint')), \
+                patch('conductr_cli.bundle_installation.count_installations', count_installations_mock), \
+                patch('conductr_cli.conduct_url.conductr_host', MagicMock(return_value='10.0.0.1')), \
+                patch('conductr_cli.sse_client.get_events', get_events_mock):
+            logging_setup.configure_logging(args, stdout)
+            # The events of other bundles don't hold off the timeout
+            self.assertRaises(WaitTimeoutError, bundle_installation.wait_for_installation, bundle_id, args)
+
+        count_installations_mock.assert_called_once_with(bundle_id, args)
+
     def test_wait_timeout_all_events(self):
         count_installations_mock = MagicMock(return_value=0)
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -577,11 +597,11 @@ class TestWaitForUninstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_heartbeat_event(),
             create_test_event('bundleInstallationRemoved'),
             create_test_event('bundleInstallationRemoved')
-        ])
+        ]))
 
         stdout = MagicMock()
 
@@ -620,7 +640,7 @@ class TestWaitForUninstallation(CliTestCase):
         count_installations_mock = MagicMock(side_effect=[0])
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[])
+        get_events_mock = MagicMock(return_value=as_sse_events([]))
 
         stdout = MagicMock()
 
@@ -654,11 +674,11 @@ class TestWaitForUninstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
 
@@ -697,11 +717,11 @@ class TestWaitForUninstallation(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded'),
             create_test_event('bundleInstallationAdded')
-        ])
+        ]))
 
         stdout = MagicMock()
         is_tty_mock = MagicMock(return_value=True)
@@ -1,4 +1,4 @@
-from conductr_cli.test.cli_test_case import CliTestCase, as_error, as_warn, strip_margin
+from conductr_cli.test.cli_test_case import CliTestCase, as_error, as_sse_events, as_warn, strip_margin
 from conductr_cli import bundle_scale, logging_setup
 from conductr_cli.exceptions import BundleScaleError, WaitTimeoutError
 from requests.exceptions import HTTPError
@@ -53,7 +53,7 @@ class TestGetScaleIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(1, scale)
             self.assertFalse(has_error)
@@ -104,7 +104,7 @@ class TestGetScaleIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(1, scale)
             self.assertFalse(has_error)
@@ -128,7 +128,7 @@ class TestGetScaleIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(0, scale)
             self.assertFalse(has_error)
@@ -152,7 +152,7 @@ class TestGetScaleIp(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(0, scale)
             self.assertFalse(has_error)
@@ -209,7 +209,7 @@ class TestGetScaleHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(1, scale)
             self.assertFalse(has_error)
@@ -260,7 +260,7 @@ class TestGetScaleHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(1, scale)
             self.assertFalse(has_error)
@@ -284,7 +284,7 @@ class TestGetScaleHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(0, scale)
             self.assertFalse(has_error)
@@ -308,7 +308,7 @@ class TestGetScaleHost(CliTestCase):
             'server_verification_file': self.server_verification_file
         }
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method):
+        with patch('requests.Session.get', http_method):
             scale, has_error = bundle_scale.get_scale(bundle_id, True, input_args)
             self.assertEqual(0, scale)
             self.assertFalse(has_error)
@@ -322,6 +322,42 @@ class TestWaitForScale(CliTestCase):
     conductr_auth = ('username', 'password')
     server_verification_file = MagicMock(name='server_verification_file')
 
+    def test_ignore_other_bundle_events(self):
+        get_scale_mock = MagicMock(side_effect=[
+            (0, False),
+            (1, False)
+        ])
+        url_mock = MagicMock(return_value='/bundle-events/endpoint')
+        conductr_host_mock = MagicMock(return_value='10.0.0.1')
+        other_bundle_event = self.create_test_event('bundleExecutionAdded')
+        other_bundle_event.data = '{"bundleId": "c1ab77e63b722ef1d5e2bd2b4fc4d7a2"}'
+        get_events_mock = MagicMock(return_value=as_sse_events([
+            other_bundle_event,
+            other_bundle_event,
+            self.create_test_event('bundleExecutionAdded')
+        ]))
+
+        stdout = MagicMock()
+
+        bundle_id = 'a101449418187d92c789d1adc240b6d6'
+        args = MagicMock(**{
+            'dcos_mode': False,
+            'wait_timeout': 10,
+            'conductr_auth': self.conductr_auth,
+            'server_verification_file': self.server_verification_file
+        })
+        with patch('conductr_cli.conduct_url.url', url_mock), \
+                patch('conductr_cli.conduct_url.conductr_host', conductr_host_mock), \
+                patch('conductr_cli.bundle_scale.get_scale', get_scale_mock), \
+                patch('conductr_cli.sse_client.get_events', get_events_mock):
+            logging_setup.configure_logging(args, stdout)
+            bundle_scale.wait_for_scale(bundle_id, 1, wait_for_is_active=True, args=args)
+
+        self.assertEqual(get_scale_mock.call_args_list, [
+            call(bundle_id, True, args),
+            call(bundle_id, True, args)
+        ])
+
     def test_wait_for_scale(self):
         get_scale_mock = MagicMock(side_effect=[
             (0, False),
@@ -333,13 +369,13 @@ class TestWaitForScale(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event(None),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('otherEvent'),
             self.create_test_event('bundleExecutionAdded')
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -417,7 +453,7 @@ class TestWaitForScale(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event(None),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded'),
@@ -426,7 +462,7 @@ class TestWaitForScale(CliTestCase):
             self.create_test_event(None),
             self.create_test_event(None),
             self.create_test_event('bundleExecutionAdded')
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -504,14 +540,14 @@ class TestWaitForScale(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event(None),
             self.create_test_event(None),
             self.create_test_event(None),
             self.create_test_event(None),
             self.create_test_event(None),
             self.create_test_event(None)
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -565,7 +601,7 @@ class TestWaitForScale(CliTestCase):
     def test_return_immediately_if_scale_is_met(self):
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[])
+        get_events_mock = MagicMock(return_value=as_sse_events([]))
         get_scale_mock = MagicMock(return_value=(3, False))
         display_bundle_scale_error_message_mock = MagicMock()
 
@@ -605,9 +641,9 @@ class TestWaitForScale(CliTestCase):
 
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event(None) for i in range(1, 10)
-        ])
+        ]))
         get_scale_mock = MagicMock(return_value=(0, True))
         display_bundle_scale_error_message_mock = MagicMock()
 
@@ -651,11 +687,11 @@ class TestWaitForScale(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded')
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -704,11 +740,11 @@ class TestWaitForScale(CliTestCase):
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded')
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -749,16 +785,48 @@ class TestWaitForScale(CliTestCase):
 
         display_bundle_scale_error_message_mock.assert_called_with(bundle_id, args)
 
+    def test_wait_timeout_other_bundle_events(self):
+        get_scale_mock = MagicMock(return_value=(0, False))
+        other_bundle_event = self.create_test_event('bundleExecutionAdded')
+        other_bundle_event.data = '{"bundleId": "c1ab77e63b722ef1d5e2bd2b4fc4d7a2"}'
+
+        def other_bundle_events():
+            yield other_bundle_event
+            self.fail('The events of other bundles are consumed beyond the timeout')
+
+        get_events_mock = MagicMock(return_value=as_sse_events(other_bundle_events()))
+
+        stdout = MagicMock()
+
+        bundle_id = 'a101449418187d92c789d1adc240b6d6'
+        args = MagicMock(**{
+            'dcos_mode': False,
+            # Purposely set no timeout to invoke the error
+            'wait_timeout': -1,
+            'conductr_auth': self.conductr_auth,
+            'server_verification_file': self.server_verification_file
+        })
+        with patch('conductr_cli.conduct_url.url', MagicMock(return_value='/bundle-events/endpoint')), \
+                patch('conductr_cli.conduct_url.conductr_host', MagicMock(return_value='10.0.0.1')), \
+                patch('conductr_cli.bundle_scale.get_scale', get_scale_mock), \
+                patch('conductr_cli.sse_client.get_events', get_events_mock):
+            logging_setup.configure_logging(args, stdout)
+            # The events of other bundles don't hold off the timeout
+            self.assertRaises(WaitTimeoutError, bundle_scale.wait_for_scale, bundle_id, 1, wait_for_is_active=True,
+                              args=args)
+
+        get_scale_mock.assert_called_once_with(bundle_id, True, args)
+
     def test_wait_timeout_all_events(self):
         get_scale_mock = MagicMock(return_value=(0, False))
         url_mock = MagicMock(return_value='/bundle-events/endpoint')
         conductr_host = '10.0.0.1'
         conductr_host_mock = MagicMock(return_value=conductr_host)
-        get_events_mock = MagicMock(return_value=[
+        get_events_mock = MagicMock(return_value=as_sse_events([
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded'),
             self.create_test_event('bundleExecutionAdded')
-        ])
+        ]))
         display_bundle_scale_error_message_mock = MagicMock()
 
         stdout = MagicMock()
@@ -815,6 +883,7 @@ class TestWaitForScale(CliTestCase):
     def create_test_event(self, event_name):
         sse_mock = MagicMock()
         sse_mock.event = event_name
+        sse_mock.data = None
         return sse_mock
 
 
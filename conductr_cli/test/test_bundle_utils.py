@@ -1,10 +1,35 @@
 from unittest import TestCase
-from conductr_cli import bundle_utils, constants
+from conductr_cli import bundle_utils, constants, sse_client
+from conductr_cli.exceptions import BundleDigestMismatchError
 from conductr_cli.test.cli_test_case import create_temp_bundle_with_contents
+from io import BytesIO
+import hashlib
 import shutil
 import tempfile
 
 
+class IsOtherBundleEvent(TestCase):
+    bundle_id = '45e0c477d3e5ea92aa8d85c0d8f3e25c'
+
+    def test_other_bundle(self):
+        event = sse_client.Event('bundleExecutionAdded', '{"bundleId":"c1ab77e63b722ef1d5e2bd2b4fc4d7a2"}')
+        self.assertTrue(bundle_utils.is_other_bundle_event(event, self.bundle_id))
+
+    def test_same_bundle(self):
+        event = sse_client.Event('bundleExecutionAdded', '{"bundleId":"45e0c477d3e5ea92aa8d85c0d8f3e25c"}')
+        self.assertFalse(bundle_utils.is_other_bundle_event(event, self.bundle_id))
+
+    def test_no_bundle_identifying_data(self):
+        self.assertFalse(bundle_utils.is_other_bundle_event(sse_client.Event('bundleExecutionAdded', ''),
+                                                            self.bundle_id))
+        self.assertFalse(bundle_utils.is_other_bundle_event(sse_client.Event('bundleExecutionAdded', None),
+                                                            self.bundle_id))
+        self.assertFalse(bundle_utils.is_other_bundle_event(sse_client.Event('bundleExecutionAdded', 'text'),
+                                                            self.bundle_id))
+        self.assertFalse(bundle_utils.is_other_bundle_event(sse_client.Event('bundleExecutionAdded', '[1]'),
+                                                            self.bundle_id))
+
+
 class ShortId(TestCase):
     def test(self):
         self.assertEqual(
@@ -157,3 +182,171 @@ class Digest(TestCase):
                 reader.digest,
                 ('sha-256', '6ae881d57578a07900c4eb37e21afa4c2095beb8e852fb6ed8d0c9f343bc7fa8')
             )
+
+    def test_digest_extract_and_open_with_digest(self):
+        some_raw_test_data = b'abc\n' * 1000
+        some_test_data = \
+            some_raw_test_data + b'\nsha-256/50e7b4ef0ee5583ddbbab6907b073a93e79364f41a48f00be0c4b5d9e1374a30'
+
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(some_test_data)
+            file.flush()
+
+            open_file, digest = bundle_utils.digest_extract_and_open(file.name)
+            with open_file:
+                self.assertIsInstance(open_file, bundle_utils.BoundedFile)
+                self.assertEqual(len(some_raw_test_data), open_file.len)
+                self.assertEqual(some_raw_test_data, open_file.read())
+                self.assertEqual(b'', open_file.read())
+                self.assertEqual(len(some_raw_test_data), open_file.tell())
+
+                open_file.seek(-4, 2)
+                self.assertEqual(b'abc\n', open_file.read(128))
+
+                open_file.seek(0)
+                self.assertEqual(b'abc', open_file.read(3))
+
+            self.assertEqual(
+                digest,
+                ('sha-256', '50e7b4ef0ee5583ddbbab6907b073a93e79364f41a48f00be0c4b5d9e1374a30')
+            )
+
+    def test_digest_extract_and_open_no_digest_small(self):
+        some_test_data = b'this is a\ntest file'
+
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(some_test_data)
+            file.flush()
+
+            open_file, digest = bundle_utils.digest_extract_and_open(file.name)
+            with open_file:
+                self.assertNotIsInstance(open_file, bundle_utils.BoundedFile)
+                self.assertEqual(some_test_data, open_file.read())
+
+            self.assertIsNone(digest)
+
+    def test_digested_read_verify(self):
+        some_raw_test_data = b'abc' * 1000
+        some_digest = hashlib.sha256(some_raw_test_data).hexdigest()
+
+        reader = bundle_utils.DigestedRead(BytesIO(some_raw_test_data + b'\nsha-256/' + some_digest.encode('UTF-8')),
+                                           verify=True)
+        data = b''
+        chunk = reader.read(100)
+        while chunk:
+            data += chunk
+            chunk = reader.read(100)
+
+        self.assertEqual(some_raw_test_data, data)
+        self.assertEqual(('sha-256', some_digest), reader.digest)
+
+    def test_digested_read_verify_mismatch(self):
+        some_test_data = b'abc' * 1000 + b'\nsha-256/' + hashlib.sha256(b'xyz').hexdigest().encode('UTF-8')
+
+        reader = bundle_utils.DigestedRead(BytesIO(some_test_data), verify=True, name='bundle.zip')
+
+        with self.assertRaises(BundleDigestMismatchError) as e:
+            while reader.read(100):
+                pass
+
+        self.assertEqual('bundle.zip', e.exception.file_name)
+        self.assertEqual('sha-256/{}'.format(hashlib.sha256(b'xyz').hexdigest()), e.exception.expected_digest)
+        self.assertEqual('sha-256/{}'.format(hashlib.sha256(b'abc' * 1000).hexdigest()), e.exception.actual_digest)
+
+    def test_verify_digest(self):
+        some_raw_test_data = b'abc\n' * 1000
+        some_digest = hashlib.sha256(some_raw_test_data).hexdigest()
+
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(some_raw_test_data + b'\nsha-256/' + some_digest.encode('UTF-8'))
+            file.flush()
+
+            self.assertEqual(('sha-256', some_digest), bundle_utils.verify_digest(file.name))
+
+    def test_verify_digest_mismatch(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b'abc\n' * 1000 + b'\nsha-256/' + hashlib.sha256(b'xyz').hexdigest().encode('UTF-8'))
+            file.flush()
+
+            self.assertRaises(BundleDigestMismatchError, bundle_utils.verify_digest, file.name)
+
+    def test_verify_digest_no_digest(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b'this is a\ntest file')
+            file.flush()
+
+            self.assertIsNone(bundle_utils.verify_digest(file.name))
+
+
+class TestBoundedFile(TestCase):
+    def test_multipart_encoder(self):
+        from requests_toolbelt import MultipartEncoder
+
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b'0123456789trailer')
+            file.flush()
+            file.seek(0)
+
+            encoder = MultipartEncoder([('bundle', ('bundle.zip', bundle_utils.BoundedFile(file, 10)))])
+            content = encoder.read()
+
+        self.assertEqual(len(content), encoder.len)
+        self.assertIn(b'\r\n\r\n0123456789\r\n', content)
+        self.assertNotIn(b'trailer', content)
+
+    def test_digest_mismatch(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b'0123456789trailer')
+            file.flush()
+            file.seek(0)
+
+            bounded_file = bundle_utils.BoundedFile(file, 10, ('sha-256', hashlib.sha256(b'9876543210').hexdigest()))
+
+            self.assertEqual(b'01234', bounded_file.read(5))
+            self.assertRaises(BundleDigestMismatchError, bounded_file.read, 5)
+
+    def test_digest_restarted_on_seek(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(b'0123456789trailer')
+            file.flush()
+            file.seek(0)
+
+            bounded_file = bundle_utils.BoundedFile(file, 10, ('sha-256', hashlib.sha256(b'0123456789').hexdigest()))
+
+            self.assertEqual(b'01234', bounded_file.read(5))
+            bounded_file.seek(0)
+            self.assertEqual(b'0123456789', bounded_file.read())
+
+
+class TestDigestedWrite(TestCase):
+    def write(self, data, chunk_size):
+        digested_write = bundle_utils.DigestedWrite()
+        for i in range(0, len(data), chunk_size):
+            digested_write.update(data[i:i + chunk_size])
+        return digested_write
+
+    def test_verify(self):
+        content = b'some bundle content' * 100
+        data = content + '\nsha-256/{}'.format(hashlib.sha256(content).hexdigest()).encode('UTF-8')
+
+        for chunk_size in [1, 7, 1024]:
+            digested_write = self.write(data, chunk_size)
+            self.assertEqual(len(data), digested_write.size)
+            self.assertEqual(('sha-256', hashlib.sha256(content).hexdigest()), digested_write.verify('bundle.zip'))
+
+    def test_mismatch(self):
+        data = b'some bundle content\nsha-256/' + b'0' * 64
+
+        self.assertRaises(BundleDigestMismatchError, self.write(data, 5).verify, 'bundle.zip')
+
+    def test_no_digest(self):
+        digested_write = self.write(b'some bundle content' * 100, 64)
+
+        self.assertIsNone(digested_write.verify('bundle.zip'))
+
+    def test_reset(self):
+        digested_write = self.write(b'0123456789', 4)
+        digested_write.reset()
+
+        self.assertEqual(0, digested_write.size)
+        self.assertIsNone(digested_write.verify('bundle.zip'))
@@ -0,0 +1,79 @@
+from argparse import Namespace
+from conductr_cli.test.cli_test_case import CliTestCase, as_error, strip_margin
+from conductr_cli import conduct_cache, logging_setup
+from unittest.mock import patch, MagicMock
+
+
+class TestConductCache(CliTestCase):
+    default_args = {
+        'verbose': False,
+        'quiet': False,
+        'long_ids': False,
+        'utc': True,
+        'cache_store_dir': '/cache/store',
+        'cache_quota': 1024 * 1024
+    }
+
+    def create_args(self, **kwargs):
+        args = dict(self.default_args)
+        args.update(kwargs)
+        return Namespace(**args)
+
+    def test_cache_ls(self):
+        entries_mock = MagicMock(return_value=[
+            {
+                'digest': '45e0c477d3e5ea92aa8d85c0d8f3e25c',
+                'size': 2048,
+                'last_used': 1483228800,
+                'paths': ['/cache/bundle/visualizer.zip', '/cache/configuration/visualizer.zip']
+            }
+        ])
+        stdout = MagicMock()
+
+        args = self.create_args()
+        with patch('conductr_cli.bundle_cache.entries', entries_mock):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_cache.cache_ls(args))
+
+        entries_mock.assert_called_once_with('/cache/store')
+        self.assertEqual(
+            strip_margin("""|DIGEST      SIZE  LAST USED                 FILES
+                            |45e0c47  2.0 KiB  Sun 2017-01-01T00:00:00Z  /cache/bundle/visualizer.zip, /cache/configuration/visualizer.zip
+                            |Total of 2.0 KiB in 1 objects, quota of 1.0 MiB
+                            |"""),  # noqa
+            self.output(stdout))
+
+    def test_cache_gc(self):
+        gc_mock = MagicMock(return_value=[('45e0c477d3e5ea92aa8d85c0d8f3e25c', 2048)])
+        stdout = MagicMock()
+
+        args = self.create_args()
+        with patch('conductr_cli.bundle_cache.gc', gc_mock):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_cache.cache_gc(args))
+
+        gc_mock.assert_called_once_with('/cache/store', 1024 * 1024)
+        self.assertEqual('Removed 1 objects, freeing 2.0 KiB\n', self.output(stdout))
+
+    def test_cache_verify(self):
+        stdout = MagicMock()
+
+        args = self.create_args()
+        with patch('conductr_cli.bundle_cache.verify', MagicMock(return_value=[])):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_cache.cache_verify(args))
+
+        self.assertEqual('All cached objects verified\n', self.output(stdout))
+
+    def test_cache_verify_corrupted(self):
+        stderr = MagicMock()
+
+        args = self.create_args()
+        with patch('conductr_cli.bundle_cache.verify', MagicMock(return_value=['45e0c477d3e5ea92aa8d85c0d8f3e25c'])):
+            logging_setup.configure_logging(args, MagicMock(), stderr)
+            self.assertFalse(conduct_cache.cache_verify(args))
+
+        self.assertEqual(
+            as_error('Error: Object 45e0c477d3e5ea92aa8d85c0d8f3e25c is corrupted and has been removed along with '
+                     'its cached files\n'),
+            self.output(stderr))
@@ -333,7 +333,7 @@ class TestConductInfoShowAllBundlesCommand(CliTestCase):
         args.update({'verbose': True})
         input_args = MagicMock(**args)
 
-        with patch('requests.get', http_method), \
+        with patch('requests.Session.get', http_method), \
                 patch('conductr_cli.license.get_license', mock_get_license):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_info.info(input_args)
@@ -1,9 +1,9 @@
+from argparse import Namespace
 from unittest import TestCase
 from unittest.mock import call, patch, MagicMock
 from conductr_cli import conduct_load
 from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
 
-import datetime
 import io
 
 
@@ -71,74 +71,31 @@ class TestCommonFunctions(TestCase):
         self.assertIsInstance(result, io.StringIO)
         self.assertEqual(['input'], result.readlines())
 
-    def test_cleanup_old_bundles(self):
-        cache_dir = '/home/user/.conductr/cache'
-        recently_loaded_bundle = '{}/reactive-maps-frontend-v1-recent.zip'.format(cache_dir)
-        files_in_cache = [
-            '{}/reactive-maps-frontend-v1-oldest.zip'.format(cache_dir),
-            '{}/reactive-maps-frontend-v1-older.zip'.format(cache_dir),
-            '{}/reactive-maps-frontend-v1-old.zip'.format(cache_dir),
-            recently_loaded_bundle
-        ]
-        glob_mock = MagicMock(return_value=files_in_cache)
-        is_same_path_mock = MagicMock(side_effect=[False, False, False, True])
-        isfile_mock = MagicMock(return_value=True)
-
-        today = datetime.date.today()
-        yesterday = today - datetime.timedelta(1)
-        last_week = today - datetime.timedelta(7)
-        last_month = today - datetime.timedelta(30)
-        getmtime_mock = MagicMock(side_effect=[last_month, last_week, yesterday])
-
-        remove_mock = MagicMock()
-
-        with patch('glob.glob', glob_mock), \
-                patch('os.path.isfile', isfile_mock), \
-                patch('os.path.getmtime', getmtime_mock), \
-                patch('os.remove', remove_mock), \
-                patch('conductr_cli.conduct_load.is_same_path', is_same_path_mock):
-            conduct_load.cleanup_old_bundles(cache_dir, 'reactive-maps-frontend-v1-recent.zip',
-                                             excluded=recently_loaded_bundle)
-
-        glob_mock.assert_called_with('{}/*.zip'.format(cache_dir))
-        self.assertEqual(isfile_mock.call_args_list, [
-            call('{}/reactive-maps-frontend-v1-oldest.zip'.format(cache_dir)),
-            call('{}/reactive-maps-frontend-v1-older.zip'.format(cache_dir)),
-            call('{}/reactive-maps-frontend-v1-old.zip'.format(cache_dir)),
-            call(recently_loaded_bundle)
-        ])
-        self.assertEqual(is_same_path_mock.call_args_list, [
-            call('{}/reactive-maps-frontend-v1-oldest.zip'.format(cache_dir), recently_loaded_bundle),
-            call('{}/reactive-maps-frontend-v1-older.zip'.format(cache_dir), recently_loaded_bundle),
-            call('{}/reactive-maps-frontend-v1-old.zip'.format(cache_dir), recently_loaded_bundle),
-            call(recently_loaded_bundle, recently_loaded_bundle)
-        ])
-        self.assertEqual(getmtime_mock.call_args_list, [
-            call('{}/reactive-maps-frontend-v1-oldest.zip'.format(cache_dir)),
-            call('{}/reactive-maps-frontend-v1-older.zip'.format(cache_dir)),
-            call('{}/reactive-maps-frontend-v1-old.zip'.format(cache_dir))
-        ])
-        self.assertEqual(remove_mock.call_args_list, [
-            call('{}/reactive-maps-frontend-v1-oldest.zip'.format(cache_dir)),
-            call('{}/reactive-maps-frontend-v1-older.zip'.format(cache_dir))
-        ])
-
-    def test_is_same_path(self):
-        file_a = "path-a.zip"
-        file_b = "path-b.zip"
-        abs_path_mock = MagicMock(side_effect=[
-            "same-path", "same-path",
-            "different-path-a", "different-path-b"
-        ])
-
-        with patch('os.path.abspath', abs_path_mock):
-            self.assertTrue(conduct_load.is_same_path(file_a, file_b))
-            self.assertFalse(conduct_load.is_same_path(file_a, file_b))
-
-        self.assertEqual(abs_path_mock.call_args_list, [
-            call(file_a), call(file_b),
-            call(file_a), call(file_b)
-        ])
+    def test_cache_resolved_files(self):
+        args = Namespace(bundle_resolve_cache_dir='/cache/bundle',
+                         configuration_resolve_cache_dir='/cache/configuration',
+                         cache_store_dir='/cache/store',
+                         cache_quota=1024)
+        add_mock = MagicMock(return_value=['abc', 'def'])
+        evict_mock = MagicMock()
+
+        with patch('conductr_cli.bundle_cache.add', add_mock), \
+                patch('conductr_cli.bundle_cache.evict', evict_mock):
+            conduct_load.cache_resolved_files(args, '/cache/bundle/bundle.zip', '/tmp/bndl.zip',
+                                              '/cache/configuration/config.zip')
+
+        add_mock.assert_called_once_with('/cache/store', ['/cache/bundle/bundle.zip', '/cache/configuration/config.zip'])
+        evict_mock.assert_called_once_with('/cache/store', 1024, keep=['abc', 'def'])
+
+    def test_cache_resolved_files_not_cached(self):
+        args = Namespace(bundle_resolve_cache_dir='/cache/bundle',
+                         configuration_resolve_cache_dir='/cache/configuration')
+        add_mock = MagicMock()
+
+        with patch('conductr_cli.bundle_cache.add', add_mock):
+            conduct_load.cache_resolved_files(args, '/home/user/bundle.zip', None)
+
+        add_mock.assert_not_called()
 
     def test_open_bundle_use_given_name_no_digest(self):
         extract_open_mock = MagicMock(return_value=(1, None))
@@ -182,3 +139,14 @@ class TestCommonFunctions(TestCase):
                 test_failed = False
 
         self.assertFalse(test_failed)
+
+    def test_verify_digests(self):
+        log = MagicMock()
+        verify_digest_mock = MagicMock(side_effect=[('sha-256', 'abc'), None])
+
+        with patch('conductr_cli.bundle_utils.verify_digest', verify_digest_mock):
+            conduct_load.verify_digests(log, 'bundle.zip', None, 'config.zip')
+
+        self.assertEqual([call('bundle.zip'), call('config.zip')], verify_digest_mock.call_args_list)
+        self.assertEqual([call('Verifying bundle.zip..'), call('Verifying config.zip..')], log.info.call_args_list)
+        log.warning.assert_called_once_with('config.zip has no digest to verify')
@@ -201,7 +201,7 @@ class TestConductLoadCommand(ConductLoadTestBase):
                 patch('conductr_cli.bundle_utils.conf', conf_mock), \
                 patch('conductr_cli.conduct_load.string_io', string_io_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.bundle_utils.digest_extract_and_open', open_mock), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.bundle_installation.wait_for_installation', wait_for_installation_mock), \
@@ -286,7 +286,7 @@ class TestConductLoadCommand(ConductLoadTestBase):
                 patch('conductr_cli.bundle_utils.conf', conf_mock), \
                 patch('conductr_cli.conduct_load.string_io', string_io_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.bundle_utils.digest_extract_and_open', open_mock), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.conduct_load.bndl_arguments_present', lambda _: False), \
@@ -478,7 +478,7 @@ class TestConductLoadCommand(ConductLoadTestBase):
                 patch('conductr_cli.bundle_utils.conf', conf_mock), \
                 patch('conductr_cli.conduct_load.string_io', string_io_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.bundle_utils.digest_extract_and_open', open_mock), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.conduct_load.bndl_arguments_present', lambda _: False), \
@@ -564,7 +564,7 @@ class TestConductLoadCommand(ConductLoadTestBase):
                 patch('conductr_cli.bundle_utils.conf', conf_mock), \
                 patch('conductr_cli.conduct_load.string_io', string_io_mock), \
                 patch('conductr_cli.conduct_load.create_multipart', create_multipart_mock), \
-                patch('requests.post', http_method), \
+                patch('requests.Session.post', http_method), \
                 patch('conductr_cli.bundle_utils.digest_extract_and_open', open_mock), \
                 patch('conductr_cli.conduct_load.open_bundle', bundle_open_mock), \
                 patch('conductr_cli.conduct_load.bndl_arguments_present', lambda _: True), \
@@ -37,7 +37,7 @@ class TestConductLogsCommand(CliTestCase):
         stdout = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.get', http_method), \
+        with patch('requests.Session.get', http_method), \
                 patch('urllib.parse.quote', quote_method):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_logs.logs(input_args)
@@ -68,7 +68,7 @@ class TestConductLogsCommand(CliTestCase):
         stdout = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.get', http_method), \
+        with patch('requests.Session.get', http_method), \
                 patch('urllib.parse.quote', quote_method):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_logs.logs(input_args)
@@ -89,7 +89,7 @@ class TestConductLogsCommand(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.get', http_method), \
+        with patch('requests.Session.get', http_method), \
                 patch('urllib.parse.quote', quote_method):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_logs.logs(input_args)
@@ -114,7 +114,7 @@ class TestConductLogsCommand(CliTestCase):
         stdout = MagicMock()
 
         input_args = MagicMock(**args)
-        with patch('requests.get', http_method), \
+        with patch('requests.Session.get', http_method), \
                 patch('urllib.parse.quote', quote_method):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_logs.logs(input_args)
@@ -1,6 +1,6 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
-from conductr_cli.conduct_main import build_parser, get_cli_parameters
+from conductr_cli.conduct_main import build_parser, get_cli_parameters, validate_bundle_selection
 from conductr_cli.constants import DEFAULT_LICENSE_DOWNLOAD_URL
 from argparse import Namespace
 import os
@@ -98,6 +98,21 @@ class TestConduct(TestCase):
         self.assertEqual(args.wait_timeout, 60)
         self.assertEqual(args.bundle, 'path-to-bundle')
         self.assertEqual(args.configuration, 'path-to-conf')
+        self.assertFalse(args.verify)
+        self.assertFalse(args.refresh_metadata)
+
+    def test_parser_load_refresh_metadata(self):
+        args = self.parser.parse_args('load --refresh-metadata path-to-bundle'.split())
+
+        self.assertEqual(args.func.__name__, 'load')
+        self.assertTrue(args.refresh_metadata)
+
+    def test_parser_load_verify(self):
+        args = self.parser.parse_args('load --verify path-to-bundle'.split())
+
+        self.assertEqual(args.func.__name__, 'load')
+        self.assertTrue(args.verify)
+        self.assertEqual(args.bundle, 'path-to-bundle')
 
     def test_parser_load_stdin_explicit(self):
         args = self.parser.parse_args('load - path-to-conf'.split())
@@ -216,6 +231,62 @@ class TestConduct(TestCase):
         self.assertEqual(args.wait_timeout, 60)
         self.assertEqual(args.bundle, 'path-to-bundle')
 
+    def test_parser_stop_bundles(self):
+        args = self.parser.parse_args('stop bundle-a bundle-b --name-prefix reactive --role web --tag 1.0.0 '
+                                      '--parallelism 4'.split())
+
+        self.assertEqual(args.func.__name__, 'stop')
+        self.assertEqual(args.bundle, 'bundle-a')
+        self.assertEqual(args.bundles, ['bundle-b'])
+        self.assertEqual(args.name_prefix, 'reactive')
+        self.assertEqual(args.role, 'web')
+        self.assertEqual(args.tag, '1.0.0')
+        self.assertEqual(args.parallelism, 4)
+
+    def test_parser_stop_no_bundle(self):
+        exit_mock = MagicMock(side_effect=SystemExit(2))
+        print_usage_mock = MagicMock()
+        stderr = MagicMock()
+
+        with patch('sys.exit', exit_mock), \
+                patch('argparse.ArgumentParser.print_usage', print_usage_mock), \
+                patch('sys.stderr.write', stderr):
+            args = self.parser.parse_args('stop'.split())
+            self.assertRaises(SystemExit, validate_bundle_selection, args)
+
+        self.assertEqual(print_usage_mock.call_count, 1)
+        stderr.assert_called_once_with('conduct stop: error: the following arguments are required: bundle\n')
+        exit_mock.assert_called_with(2)
+
+    def test_parser_stop_selector_only(self):
+        args = self.parser.parse_args('stop --role web'.split())
+        validate_bundle_selection(args)
+
+        self.assertEqual(args.bundle, None)
+        self.assertEqual(args.role, 'web')
+        self.assertNotIn('bundle_selection_parser', vars(args))
+
+    def test_parser_cache_ls(self):
+        args = self.parser.parse_args('cache ls --long-ids'.split())
+
+        self.assertEqual(args.func.__name__, 'cache_ls')
+        self.assertTrue(args.long_ids)
+        self.assertEqual(args.cache_store_dir, '{}/.conductr/cache/store'.format(os.path.expanduser('~')))
+        self.assertEqual(args.cache_quota, 10 * 1024 ** 3)
+
+    def test_parser_cache_gc(self):
+        args = self.parser.parse_args('cache gc --cache-store-dir /store --cache-quota 500M'.split())
+
+        self.assertEqual(args.func.__name__, 'cache_gc')
+        self.assertEqual(args.cache_store_dir, '/store')
+        self.assertEqual(args.cache_quota, 500 * 1024 ** 2)
+
+    def test_parser_cache_verify(self):
+        args = self.parser.parse_args('cache verify -v'.split())
+
+        self.assertEqual(args.func.__name__, 'cache_verify')
+        self.assertTrue(args.verbose)
+
     def test_parser_deploy(self):
         args = self.parser.parse_args('deploy cassandra'.split())
 
@@ -263,6 +334,15 @@ class TestConduct(TestCase):
         self.assertEqual(args.webhook, 'bintray')
         self.assertEqual(args.bundle, 'cassandra')
 
+    def test_parser_prefetch(self):
+        args = self.parser.parse_args('prefetch --manifest site.txt --parallelism 16 eslite visualizer'.split())
+
+        self.assertEqual(args.func.__name__, 'prefetch')
+        self.assertEqual(args.bundles, ['eslite', 'visualizer'])
+        self.assertEqual(args.manifest, 'site.txt')
+        self.assertEqual(args.parallelism, 16)
+        self.assertEqual(args.bundle_resolve_cache_dir, '{}/.conductr/cache/bundle'.format(os.path.expanduser('~')))
+
     def test_parser_load_license(self):
         args = self.parser.parse_args('load-license'.split())
 
@@ -0,0 +1,174 @@
+from argparse import Namespace
+from conductr_cli.test.cli_test_case import CliTestCase, as_error
+from conductr_cli import conduct_prefetch, logging_setup
+from conductr_cli.exceptions import BundleResolutionError
+from unittest.mock import call, patch, MagicMock
+import os
+import shutil
+import tempfile
+
+
+class TestConductPrefetch(CliTestCase):
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.bundle_cache_dir = os.path.join(self.tmpdir, 'bundle')
+        self.configuration_cache_dir = os.path.join(self.tmpdir, 'configuration')
+        os.mkdir(self.bundle_cache_dir, 0o700)
+        os.mkdir(self.configuration_cache_dir, 0o700)
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def create_args(self, **kwargs):
+        args = {
+            'verbose': False,
+            'quiet': False,
+            'custom_settings': None,
+            'bundles': [],
+            'manifest': None,
+            'parallelism': 2,
+            'bundle_resolve_cache_dir': self.bundle_cache_dir,
+            'configuration_resolve_cache_dir': self.configuration_cache_dir,
+            'cache_store_dir': os.path.join(self.tmpdir, 'store'),
+            'cache_quota': 1024 * 1024
+        }
+        args.update(kwargs)
+        return Namespace(**args)
+
+    def write_file(self, path, data):
+        with open(path, 'wb') as file:
+            file.write(data)
+        return path
+
+    def resolve_mock(self, cache_dir):
+        def resolve(custom_settings, resolve_cache_dir, uri):
+            if uri == 'missing':
+                raise BundleResolutionError('Unable to resolve bundle using missing', [], [])
+            return uri, self.write_file(os.path.join(cache_dir, '{}.zip'.format(uri)), b'0' * 1024)
+        return MagicMock(side_effect=resolve)
+
+    def test_prefetch(self):
+        resolve_bundle_mock = self.resolve_mock(self.bundle_cache_dir)
+        resolve_bundle_configuration_mock = self.resolve_mock(self.configuration_cache_dir)
+        cache_resolved_files_mock = MagicMock()
+        manifest = self.write_file(os.path.join(self.tmpdir, 'manifest'),
+                                   b'# Bundles of the site\n'
+                                   b'\n'
+                                   b'eslite\n'
+                                   b'visualizer visualizer-conf\n')
+        stdout = MagicMock()
+
+        args = self.create_args(bundles=['cassandra'], manifest=manifest)
+        with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
+                patch('conductr_cli.resolver.resolve_bundle_configuration', resolve_bundle_configuration_mock), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', cache_resolved_files_mock), \
+                patch('conductr_cli.conduct_prefetch.time', MagicMock(**{'time.side_effect': [0, 2]})):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_prefetch.prefetch(args))
+
+        self.assertEqual([call(None, self.bundle_cache_dir, 'cassandra'),
+                          call(None, self.bundle_cache_dir, 'eslite'),
+                          call(None, self.bundle_cache_dir, 'visualizer')],
+                         sorted(resolve_bundle_mock.call_args_list))
+        resolve_bundle_configuration_mock.assert_called_once_with(None, self.configuration_cache_dir,
+                                                                  'visualizer-conf')
+        cached_files = cache_resolved_files_mock.call_args[0][1:]
+        self.assertEqual(4, len(cached_files))
+
+        self.assertEqual('Prefetched 3 of 3 bundles, 4.0 KiB in 2.0s (2.0 KiB/s)\n', self.output(stdout))
+
+    def test_prefetch_docker_image(self):
+        image_dir = os.path.join(self.bundle_cache_dir, 'docker-image-abc')
+        os.makedirs(os.path.join(image_dir, 'layer'))
+        self.write_file(os.path.join(image_dir, 'layer', 'layer.tar'), b'0' * 1024)
+
+        def resolve_bundle(custom_settings, resolve_cache_dir, uri):
+            if uri == 'alpine':
+                return uri, image_dir
+            return uri, self.write_file(os.path.join(resolve_cache_dir, '{}.zip'.format(uri)), b'0' * 1024)
+        stdout = MagicMock()
+
+        args = self.create_args(bundles=['alpine', 'cassandra'])
+        with patch('conductr_cli.resolver.resolve_bundle', MagicMock(side_effect=resolve_bundle)), \
+                patch('conductr_cli.conduct_prefetch.time', MagicMock(**{'time.side_effect': [0, 2]})):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_prefetch.prefetch(args))
+
+        self.assertTrue(os.path.isdir(image_dir))
+        with open(os.path.join(args.cache_store_dir, 'index.json'), 'r', encoding='utf-8') as file:
+            self.assertIn(os.path.join(self.bundle_cache_dir, 'cassandra.zip'), file.read())
+
+        self.assertEqual('Prefetched 2 of 2 bundles, 2.0 KiB in 2.0s (1.0 KiB/s)\n', self.output(stdout))
+
+    def test_prefetch_failure(self):
+        resolve_bundle_mock = self.resolve_mock(self.bundle_cache_dir)
+        stdout = MagicMock()
+        stderr = MagicMock()
+
+        args = self.create_args(bundles=['missing', 'cassandra'])
+        with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', MagicMock()), \
+                patch('conductr_cli.conduct_prefetch.time', MagicMock(**{'time.side_effect': [0, 1]})):
+            logging_setup.configure_logging(args, stdout, stderr)
+            self.assertFalse(conduct_prefetch.prefetch(args))
+
+        self.assertEqual(as_error('Error: Unable to resolve bundle using missing\n'), self.output(stderr))
+        self.assertEqual('Prefetched 1 of 2 bundles, 1.0 KiB in 1.0s (1.0 KiB/s)\n', self.output(stdout))
+
+    def test_prefetch_duplicates(self):
+        resolve_bundle_mock = self.resolve_mock(self.bundle_cache_dir)
+        resolve_bundle_configuration_mock = self.resolve_mock(self.configuration_cache_dir)
+        manifest = self.write_file(os.path.join(self.tmpdir, 'manifest'),
+                                   b'cassandra\n'
+                                   b'visualizer visualizer-conf\n'
+                                   b'visualizer visualizer-conf\n'
+                                   b'eslite visualizer-conf\n')
+        stdout = MagicMock()
+
+        args = self.create_args(bundles=['cassandra'], manifest=manifest)
+        with patch('conductr_cli.resolver.resolve_bundle', resolve_bundle_mock), \
+                patch('conductr_cli.resolver.resolve_bundle_configuration', resolve_bundle_configuration_mock), \
+                patch('conductr_cli.conduct_load.cache_resolved_files', MagicMock()), \
+                patch('conductr_cli.conduct_prefetch.time', MagicMock(**{'time.side_effect': [0, 2]})):
+            logging_setup.configure_logging(args, stdout)
+            self.assertTrue(conduct_prefetch.prefetch(args))
+
+        self.assertEqual([call(None, self.bundle_cache_dir, 'cassandra'),
+                          call(None, self.bundle_cache_dir, 'eslite'),
+                          call(None, self.bundle_cache_dir, 'visualizer')],
+                         sorted(resolve_bundle_mock.call_args_list))
+        resolve_bundle_configuration_mock.assert_called_once_with(None, self.configuration_cache_dir,
+                                                                  'visualizer-conf')
+
+        self.assertEqual('Prefetched 3 of 3 bundles, 4.0 KiB in 2.0s (2.0 KiB/s)\n', self.output(stdout))
+
+    def test_prefetch_download_error(self):
+        resolve_mock = self.resolve_mock(self.bundle_cache_dir)
+
+        def resolve_bundle(custom_settings, resolve_cache_dir, uri):
+            if uri == 'unreachable':
+                raise ConnectionError('Connection refused')
+            return resolve_mock(custom_settings, resolve_cache_dir, uri)
+        stdout = MagicMock()
+        stderr = MagicMock()
+
+        args = self.create_args(bundles=['unreachable', 'cassandra'])
+        with patch('conductr_cli.resolver.resolve_bundle', MagicMock(side_effect=resolve_bundle)), \
+                patch('conductr_cli.conduct_prefetch.time', MagicMock(**{'time.side_effect': [0, 1]})):
+            logging_setup.configure_logging(args, stdout, stderr)
+            self.assertFalse(conduct_prefetch.prefetch(args))
+
+        with open(os.path.join(args.cache_store_dir, 'index.json'), 'r', encoding='utf-8') as file:
+            self.assertIn(os.path.join(self.bundle_cache_dir, 'cassandra.zip'), file.read())
+
+        self.assertEqual(as_error('Error: Unable to prefetch unreachable: Connection refused\n'), self.output(stderr))
+        self.assertEqual('Prefetched 1 of 2 bundles, 1.0 KiB in 1.0s (1.0 KiB/s)\n', self.output(stdout))
+
+    def test_no_bundles(self):
+        stderr = MagicMock()
+
+        args = self.create_args()
+        logging_setup.configure_logging(args, MagicMock(), stderr)
+        self.assertFalse(conduct_prefetch.prefetch(args))
+
+        self.assertEqual(as_error('Error: No bundles to prefetch\n'), self.output(stderr))
@@ -21,7 +21,7 @@ class TestRequest(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.get', dcos_http_mock), \
-                patch('requests.get', requests_http_mock):
+                patch('requests.Session.get', requests_http_mock):
             result = conduct_request.get(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(requests_http_response, result)
 
@@ -41,7 +41,7 @@ class TestRequest(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.post', dcos_http_mock), \
-                patch('requests.post', requests_http_mock):
+                patch('requests.Session.post', requests_http_mock):
             result = conduct_request.post(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(requests_http_response, result)
 
@@ -61,7 +61,7 @@ class TestRequest(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.put', dcos_http_mock), \
-                patch('requests.put', requests_http_mock):
+                patch('requests.Session.put', requests_http_mock):
             result = conduct_request.put(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(requests_http_response, result)
 
@@ -81,7 +81,7 @@ class TestRequest(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.delete', dcos_http_mock), \
-                patch('requests.delete', requests_http_mock):
+                patch('requests.Session.delete', requests_http_mock):
             result = conduct_request.delete(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(requests_http_response, result)
 
@@ -108,7 +108,7 @@ class TestRequestDcosMode(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.get', dcos_http_mock), \
-                patch('requests.get', requests_http_mock):
+                patch('requests.Session.get', requests_http_mock):
             result = conduct_request.get(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(dcos_http_response, result)
 
@@ -128,7 +128,7 @@ class TestRequestDcosMode(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.post', dcos_http_mock), \
-                patch('requests.post', requests_http_mock):
+                patch('requests.Session.post', requests_http_mock):
             result = conduct_request.post(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(dcos_http_response, result)
 
@@ -148,7 +148,7 @@ class TestRequestDcosMode(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.put', dcos_http_mock), \
-                patch('requests.put', requests_http_mock):
+                patch('requests.Session.put', requests_http_mock):
             result = conduct_request.put(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(dcos_http_response, result)
 
@@ -168,7 +168,7 @@ class TestRequestDcosMode(TestCase):
 
         with patch('conductr_cli.conduct_request.enrich_args', enrich_args_mock), \
                 patch('dcos.http.delete', dcos_http_mock), \
-                patch('requests.delete', requests_http_mock):
+                patch('requests.Session.delete', requests_http_mock):
             result = conduct_request.delete(self.dcos_mode, self.host, self.url, **self.kwargs)
             self.assertEqual(dcos_http_response, result)
 
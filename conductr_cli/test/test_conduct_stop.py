@@ -55,7 +55,7 @@ class TestConductStopCommand(CliTestCase):
         stdout = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_stop.stop(input_args)
@@ -75,7 +75,7 @@ class TestConductStopCommand(CliTestCase):
         args = self.default_args.copy()
         args.update({'verbose': True})
         input_args = MagicMock(**args)
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_stop.stop(input_args)
@@ -95,7 +95,7 @@ class TestConductStopCommand(CliTestCase):
         args = self.default_args.copy()
         args.update({'long_ids': True})
         input_args = MagicMock(**args)
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_stop.stop(input_args)
@@ -117,7 +117,7 @@ class TestConductStopCommand(CliTestCase):
         args.update({'cli_parameters': cli_parameters})
         input_args = MagicMock(**args)
 
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_stop.stop(input_args)
@@ -136,7 +136,7 @@ class TestConductStopCommand(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method):
+        with patch('requests.Session.put', http_method):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_stop.stop(input_args)
             self.assertFalse(result)
@@ -154,7 +154,7 @@ class TestConductStopCommand(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method):
+        with patch('requests.Session.put', http_method):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_stop.stop(input_args)
             self.assertFalse(result)
@@ -172,7 +172,7 @@ class TestConductStopCommand(CliTestCase):
         stderr = MagicMock()
 
         input_args = MagicMock(**self.default_args)
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, err_output=stderr)
             result = conduct_stop.stop(input_args)
@@ -200,7 +200,7 @@ class TestConductStopCommand(CliTestCase):
         stdout = MagicMock()
 
         input_args = MagicMock(**args)
-        with patch('requests.put', http_method), \
+        with patch('requests.Session.put', http_method), \
                 patch('conductr_cli.bundle_scale.wait_for_scale', wait_for_scale_mock):
             logging_setup.configure_logging(input_args, stdout)
             result = conduct_stop.stop(input_args)
@@ -105,9 +105,12 @@ class TestConductrRestore(CliTestCase):
         mock_args = MagicMock(**self.args)
         mock_run_bundle.return_value = json.loads('{"bundleId":"abcd"}')
         mock_copy.return_value = MagicMock()
-        scale_bundle(mock_args, 'abcd', 3, 'efgh')
+        wait_for_scale = scale_bundle(mock_args, 'abcd', 3, 'efgh')
 
         mock_run_bundle.assert_called_once_with(mock_copy.return_value)
+        scale_mock.assert_not_called()
+
+        wait_for_scale()
         scale_mock.assert_called_once_with('abcd', 3, wait_for_is_active=True, args=mock_copy.return_value)
 
     @patch('conductr_cli.control_protocol.get_bundles')
@@ -204,3 +207,4 @@ class TestConductrRestore(CliTestCase):
                        call(mock_args, '1234', 1, 'yolo')]
 
         mock_scale_bundle.assert_has_calls(scale_calls)
+        self.assertEqual(6, mock_scale_bundle.return_value.call_count)
@@ -0,0 +1,82 @@
+from conductr_cli.test.cli_test_case import CliTestCase
+from conductr_cli import control_protocol, logging_setup
+from unittest.mock import patch, MagicMock
+import json
+
+
+class TestGetBundle(CliTestCase):
+    bundle_id = 'a101449418187d92c789d1adc240b6d6'
+    bundle = {'bundleId': bundle_id, 'bundleInstallations': []}
+    other_bundle = {'bundleId': 'b101449418187d92c789d1adc240b6d6', 'bundleInstallations': []}
+
+    args = {
+        'dcos_mode': False,
+        'scheme': 'http',
+        'host': '127.0.0.1',
+        'port': 9005,
+        'base_path': '/',
+        'api_version': '2',
+        'verbose': False,
+        'quiet': False,
+        'conductr_auth': None,
+        'server_verification_file': None
+    }
+
+    bundles_url = 'http://127.0.0.1:9005/v2/bundles'
+    bundle_url = 'http://127.0.0.1:9005/v2/bundles/{}'.format(bundle_id)
+
+    def setUp(self):  # noqa
+        control_protocol.SINGLE_BUNDLE_STATE_SUPPORTED.clear()
+        control_protocol.SINGLE_BUNDLE_STATE_UNSUPPORTED.clear()
+
+    def tearDown(self):  # noqa
+        control_protocol.SINGLE_BUNDLE_STATE_SUPPORTED.clear()
+        control_protocol.SINGLE_BUNDLE_STATE_UNSUPPORTED.clear()
+
+    def response(self, status_code, body=None, content_type='application/json'):
+        return MagicMock(status_code=status_code,
+                         headers={'Content-Type': content_type},
+                         text=json.dumps(body))
+
+    def get_bundle(self, *responses):
+        http_method = MagicMock(side_effect=responses)
+
+        with patch('conductr_cli.conduct_request.get', http_method):
+            logging_setup.configure_logging(MagicMock(**self.args), MagicMock())
+            bundle = control_protocol.get_bundle(MagicMock(**self.args), self.bundle_id)
+
+        return bundle, [call_args[0][2] for call_args in http_method.call_args_list]
+
+    def test_single_bundle(self):
+        bundle, urls = self.get_bundle(self.response(200, self.bundle))
+
+        self.assertEqual(self.bundle, bundle)
+        self.assertEqual([self.bundle_url], urls)
+
+    def test_not_found(self):
+        bundle, urls = self.get_bundle(self.response(404, content_type='text/plain'),
+                                       self.response(200, [self.other_bundle]))
+
+        self.assertIsNone(bundle)
+        self.assertEqual([self.bundle_url, self.bundles_url], urls)
+        self.assertNotIn(self.bundles_url, control_protocol.SINGLE_BUNDLE_STATE_UNSUPPORTED)
+
+    def test_not_found_once_supported(self):
+        self.get_bundle(self.response(200, self.bundle))
+
+        bundle, urls = self.get_bundle(self.response(404, content_type='text/plain'))
+
+        self.assertIsNone(bundle)
+        self.assertEqual([self.bundle_url], urls)
+
+    def test_unsupported(self):
+        bundle, urls = self.get_bundle(self.response(200, content_type='application/zip'),
+                                       self.response(200, [self.bundle, self.other_bundle]))
+
+        self.assertEqual(self.bundle, bundle)
+        self.assertEqual([self.bundle_url, self.bundles_url], urls)
+
+        bundle, urls = self.get_bundle(self.response(200, [self.bundle, self.other_bundle]))
+
+        self.assertEqual(self.bundle, bundle)
+        self.assertEqual([self.bundles_url], urls)
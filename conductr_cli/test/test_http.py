@@ -0,0 +1,55 @@
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+from conductr_cli import http
+
+
+class TestSession(TestCase):
+    def tearDown(self):
+        http.close_sessions()
+
+    def test_reuse_session_for_same_host(self):
+        session = http.session('http://10.0.0.1:9005/bundles')
+        self.assertIs(session, http.session('http://10.0.0.1:9005/bundles/events'))
+
+    def test_separate_session_per_host(self):
+        self.assertIsNot(http.session('http://10.0.0.1:9005/bundles'),
+                         http.session('http://10.0.0.2:9005/bundles'))
+        self.assertIsNot(http.session('http://10.0.0.1:9005/bundles'),
+                         http.session('https://10.0.0.1:9005/bundles'))
+
+    def test_close_sessions(self):
+        session = http.session('http://10.0.0.1:9005/bundles')
+        close_mock = MagicMock()
+        with patch.object(session, 'close', close_mock):
+            http.close_sessions()
+
+        close_mock.assert_called_once_with()
+        self.assertIsNot(session, http.session('http://10.0.0.1:9005/bundles'))
+
+
+class TestPooledRequests(TestCase):
+    def tearDown(self):
+        http.close_sessions()
+
+    def test_request(self):
+        response = MagicMock()
+        request_mock = MagicMock(return_value=response)
+
+        with patch('requests.Session.request', request_mock):
+            result = http.PooledRequests().request('get', 'http://10.0.0.1:9005/bundles', timeout=5)
+
+        self.assertEqual(response, result)
+        request_mock.assert_called_once_with('get', 'http://10.0.0.1:9005/bundles', timeout=5)
+
+    def test_delegate_to_requests(self):
+        import requests
+        self.assertIs(requests.exceptions, http.PooledRequests().exceptions)
+
+    def test_pool_dcos_requests(self):
+        from dcos import http as dcos_http
+        original_requests = dcos_http.requests
+        try:
+            http.pool_dcos_requests()
+            self.assertIsInstance(dcos_http.requests, http.PooledRequests)
+        finally:
+            dcos_http.requests = original_requests
@@ -1,12 +1,14 @@
 from unittest import TestCase
 from unittest.mock import patch, MagicMock, Mock
 from conductr_cli.test.cli_test_case import CliTestCase, as_warn, strip_margin, create_mock_logger
-from conductr_cli.exceptions import BundleResolutionError, ContinuousDeliveryError
+from conductr_cli.exceptions import BundleResolutionError, ContinuousDeliveryError, ResolutionCancelledError
 from conductr_cli import logging_setup, resolver
 from conductr_cli.resolvers import bintray_resolver, docker_resolver, docker_offline_resolver, uri_resolver, \
     offline_resolver, stdin_resolver, s3_resolver
+from conductr_cli.resolvers.resolvers_util import DownloadProgress
 from conductr_cli.resolvers.schemes import SCHEME_HTTP, SCHEME_BUNDLE
 from pyhocon import ConfigFactory
+import threading
 
 
 class TestResolver(CliTestCase):
@@ -616,6 +618,121 @@ class TestResolverContinuousDeliveryUri(TestCase):
         second_resolver_mock.continuous_delivery_uri.assert_called_with(self.resolved_version)
 
 
+class TestResolverResults(TestCase):
+    def test_sequential(self):
+        resolve_mock = MagicMock(side_effect=['first result', 'second result'])
+        results = resolver.resolver_results(['first', 'second'], resolve_mock)
+
+        self.assertEqual(('first', 'first result'), next(results))
+        resolve_mock.assert_called_once_with('first')
+
+    def test_concurrent_priority_order(self):
+        first_started = threading.Event()
+        release_first = threading.Event()
+        release_last = threading.Event()
+
+        def resolve(resolver_name):
+            if resolver_name == 'first':
+                first_started.set()
+                # Only fails when released by the second resolver, which runs concurrently
+                return not release_first.wait(5)
+            elif resolver_name == 'second':
+                first_started.wait(5)
+                release_first.set()
+                return True
+            else:
+                release_last.wait(5)
+                return False
+
+        try:
+            with patch('conductr_cli.resolver.CONCURRENT_RESOLUTION', True):
+                results = resolver.resolver_results(['first', 'second', 'last'], resolve)
+
+                # The second resolver can only complete once the first has started, so they are called at once.
+                # The second result is yielded without waiting for the last resolver.
+                self.assertEqual(('first', False), next(results))
+                self.assertEqual(('second', True), next(results))
+        finally:
+            release_last.set()
+
+    def test_concurrent_error(self):
+        def resolve(resolver_name):
+            if resolver_name == 'first':
+                raise ValueError('failed')
+            else:
+                return True
+
+        with patch('conductr_cli.resolver.CONCURRENT_RESOLUTION', True):
+            results = resolver.resolver_results(['first', 'second'], resolve)
+            self.assertRaises(ValueError, next, results)
+
+    def test_concurrent_cancelled(self):
+        progress_created = threading.Event()
+        download_stopped = threading.Event()
+
+        def resolve(resolver_name):
+            if resolver_name == 'first':
+                return True
+            else:
+                progress = DownloadProgress(MagicMock(), 1024)
+                progress_created.set()
+                if progress.cancelled.wait(5):
+                    self.assertRaises(ResolutionCancelledError, progress.update, 512)
+                    download_stopped.set()
+                return False
+
+        with patch('conductr_cli.resolver.CONCURRENT_RESOLUTION', True):
+            results = resolver.resolver_results(['first', 'second'], resolve)
+            self.assertEqual(('first', True), next(results))
+            progress_created.wait(5)
+
+            # The second resolution is cancelled once the caller settles for the first
+            results.close()
+            self.assertTrue(download_stopped.wait(5))
+
+    def test_concurrent_resolve_bundle(self):
+        custom_settings = Mock()
+
+        first_resolver_mock = Mock(name='first_resolver')
+        first_resolver_mock.__name__ = 'first_resolver'
+        first_resolver_mock.load_bundle_from_cache = MagicMock(return_value=(False, None, None, None))
+        first_resolver_mock.resolve_bundle = MagicMock(return_value=(False, None, None, None))
+
+        second_resolver_mock = Mock(name='second_resolver')
+        second_resolver_mock.__name__ = 'second_resolver'
+        second_resolver_mock.load_bundle_from_cache = MagicMock(return_value=(False, None, None, None))
+        second_resolver_mock.resolve_bundle = MagicMock(return_value=(True, 'bundle_name', 'mock bundle_file', None))
+
+        resolver_chain_mock = MagicMock(return_value=[first_resolver_mock, second_resolver_mock])
+        filter_for_supported_resolvers_mock = MagicMock(return_value=[first_resolver_mock, second_resolver_mock])
+
+        with patch('conductr_cli.resolver.CONCURRENT_RESOLUTION', True), \
+                patch('conductr_cli.resolver.resolver_chain', resolver_chain_mock), \
+                patch('conductr_cli.resolver.filter_for_supported_resolvers', filter_for_supported_resolvers_mock):
+            bundle_name, bundle_file = resolver.resolve_bundle(custom_settings, '/some-cache-dir', '/some-bundle-path')
+
+        self.assertEqual('bundle_name', bundle_name)
+        self.assertEqual('mock bundle_file', bundle_file)
+
+        first_resolver_mock.resolve_bundle.assert_called_with('/some-cache-dir', '/some-bundle-path')
+        second_resolver_mock.resolve_bundle.assert_called_with('/some-cache-dir', '/some-bundle-path')
+
+
+class TestRefreshMetadata(TestCase):
+    def test_refresh_metadata(self):
+        custom_settings = Mock()
+
+        caching_resolver_mock = Mock(name='caching_resolver')
+        other_resolver_mock = Mock(name='other_resolver', spec=['resolve_bundle'])
+        resolver_chain_mock = MagicMock(return_value=[caching_resolver_mock, other_resolver_mock])
+
+        with patch('conductr_cli.resolver.resolver_chain', resolver_chain_mock):
+            resolver.refresh_metadata(custom_settings)
+
+        resolver_chain_mock.assert_called_with(custom_settings, False)
+        caching_resolver_mock.refresh_metadata.assert_called_once_with()
+
+
 class TestResolverChain(TestCase):
     def test_custom_resolver_chain(self):
         custom_settings = ConfigFactory.parse_string(
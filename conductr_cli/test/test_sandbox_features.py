@@ -3,10 +3,12 @@ from unittest.mock import ANY, call, patch, MagicMock
 from conductr_cli import logging_setup
 from conductr_cli.sandbox_features import ContinuousDeliveryFeature, VisualizationFeature, LiteLoggingFeature, \
     OciInDockerFeature, LoggingFeature, MonitoringFeature, ProxyingFeature, \
-    calculate_features, collect_features, feature_conflicts, select_bintray_uri
+    calculate_features, collect_features, concurrent_bundle_runs, feature_conflicts, select_bintray_uri, \
+    wait_for_bundle_runs
 from conductr_cli.docker import DockerVmType
 from conductr_cli.test.cli_test_case import CliTestCase
 from conductr_cli.test.data.test_constants import LATEST_CONDUCTR_VERSION
+import time
 
 
 class TestFeatures(TestCase):
@@ -578,3 +580,46 @@ class TestContinuousDeliveryFeature(TestCase):
 
     def test_conductr_roles(self):
         self.assertEqual([], ContinuousDeliveryFeature.conductr_roles())
+
+
+class TestConcurrentBundleRuns(TestCase):
+    def test_run_in_background(self):
+        run_mock = MagicMock()
+
+        with patch('conductr_cli.conduct_main.run', run_mock):
+            with concurrent_bundle_runs():
+                VisualizationFeature([], '2.0.0', False).start()
+                ContinuousDeliveryFeature([], '2.0.0', False).start()
+
+        self.assertEqual(run_mock.call_args_list[0],
+                         call(['load', 'visualizer', '--disable-instructions'], configure_logging=False))
+        self.assertCountEqual(run_mock.call_args_list, [
+            call(['load', 'visualizer', '--disable-instructions'], configure_logging=False),
+            call(['run', 'visualizer', '--disable-instructions'], configure_logging=False),
+            call(['load', 'continuous-delivery', '--disable-instructions'], configure_logging=False),
+            call(['run', 'continuous-delivery', '--disable-instructions'], configure_logging=False)
+        ])
+
+    def test_wait_for_bundle_runs(self):
+        finished_runs = []
+
+        def run(args, configure_logging):
+            if args[0] == 'run':
+                time.sleep(0.1)
+                finished_runs.append(args[1])
+
+        with patch('conductr_cli.conduct_main.run', MagicMock(side_effect=run)):
+            with concurrent_bundle_runs():
+                VisualizationFeature([], '2.0.0', False).start()
+                wait_for_bundle_runs()
+                self.assertEqual(['visualizer'], finished_runs)
+
+    def test_raise_run_error(self):
+        def run(args, configure_logging):
+            if args[0] == 'run':
+                raise SystemExit(1)
+
+        with patch('conductr_cli.conduct_main.run', MagicMock(side_effect=run)):
+            with self.assertRaises(SystemExit):
+                with concurrent_bundle_runs():
+                    VisualizationFeature([], '2.0.0', False).start()
@@ -1,13 +1,20 @@
 from unittest import TestCase
+import hashlib
+import io
 import shutil
 import sys
+import tarfile
 import tempfile
+import time
 import os
+import zipfile
 from os import remove
-from conductr_cli import logging_setup
-from conductr_cli.shazar_main import build_parser, run, write_with_digest
+from conductr_cli import logging_setup, zip_writer
+from conductr_cli.constants import SHAZAR_TIMESTAMP_MIN
+from conductr_cli.shazar_main import build_parser, run, tar_to_zip, write_with_digest, DigestWriter
+from conductr_cli.zip_writer import ZipWriter
 from conductr_cli.test.cli_test_case import as_error, CliTestCase
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, ANY, MagicMock
 
 
 class TestShazar(TestCase):
@@ -25,6 +32,30 @@ class TestShazar(TestCase):
             'test file data\nsha-256/1be7aaf1938cc19af7d2fdeb48a11c381dff8a98d4c4b47b3b0a5044a5255c04'.encode("UTF-8")
         )
 
+    def test_digest_writer(self):
+        class Pipe(object):
+            def __init__(self):
+                self.data = b''
+
+            def write(self, data):
+                self.data += data
+
+            def flush(self):
+                pass
+
+        pipe = Pipe()
+        digest_writer = DigestWriter(pipe)
+        with zipfile.ZipFile(digest_writer, 'w') as zip_file:
+            zip_file.writestr('bundle/bundle.conf', b'name = "test"')
+
+        hex_digest = digest_writer.write_digest()
+
+        zip_data, trailer = pipe.data.rsplit(b'\n', 1)
+        self.assertEqual(('sha-256/' + hex_digest).encode('UTF-8'), trailer)
+        self.assertEqual(hashlib.sha256(zip_data).hexdigest(), hex_digest)
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+            self.assertEqual(b'name = "test"', zip_file.read('bundle/bundle.conf'))
+
     def test_parser_success(self):
         parser = build_parser()
         args = parser.parse_args('--output-dir output-dir source -o output-file --tar'.split())
@@ -33,6 +64,94 @@ class TestShazar(TestCase):
         self.assertEqual(args.source, 'source')
         self.assertTrue(args.tar)
         self.assertEqual(args.output, 'output-file')
+        self.assertEqual(args.compression, 'stored')
+        self.assertEqual(args.jobs, 1)
+        self.assertEqual(args.compression_level, -1)
+        self.assertFalse(args.compression_report)
+        self.assertFalse(args.incremental)
+
+    def test_parser_compression_policy(self):
+        parser = build_parser()
+        args = parser.parse_args('--compression auto --compression-level 9 --compression-report source'.split())
+
+        self.assertEqual(args.compression, 'auto')
+        self.assertEqual(args.compression_level, 9)
+        self.assertTrue(args.compression_report)
+
+    def test_parser_jobs(self):
+        parser = build_parser()
+        args = parser.parse_args('--compression deflated --jobs 32 --incremental source'.split())
+
+        self.assertEqual(args.compression, 'deflated')
+        self.assertEqual(args.jobs, 32)
+        self.assertTrue(args.incremental)
+
+
+class TestTarToZip(TestCase):
+    def create_tar(self):
+        tar_data = io.BytesIO()
+        with tarfile.open(fileobj=tar_data, mode='w') as tar:
+            dir_info = tarfile.TarInfo('bundle')
+            dir_info.type = tarfile.DIRTYPE
+            dir_info.mtime = 1234567890
+            tar.addfile(dir_info)
+
+            for name, data, mode, mtime in [('bundle/bundle.conf', b'name = "test"', 0o644, 1234567890),
+                                            ('bundle/bin/run', b'#!/bin/sh\n' * 100000, 0o755, 1234567890),
+                                            ('bundle/old.txt', b'old', 0o600, 0)]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = mode
+                info.mtime = mtime
+                tar.addfile(info, io.BytesIO(data))
+
+        tar_data.seek(0)
+        return tar_data
+
+    def test_streamed(self):
+        output = io.BytesIO()
+
+        with \
+                patch('tempfile.NamedTemporaryFile', MagicMock(side_effect=AssertionError('temporary file'))), \
+                tarfile.open(fileobj=self.create_tar(), mode='r|') as tar, \
+                zipfile.ZipFile(output, 'w') as zip_file, \
+                ZipWriter(zip_file, 'deflated', 2) as writer:
+            tar_to_zip(tar, writer)
+
+        with zipfile.ZipFile(output) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(['bundle/', 'bundle/bundle.conf', 'bundle/bin/run', 'bundle/old.txt'],
+                             zip_file.namelist())
+            self.assertEqual(b'#!/bin/sh\n' * 100000, zip_file.read('bundle/bin/run'))
+
+            run_info = zip_file.getinfo('bundle/bin/run')
+            self.assertEqual(time.localtime(1234567890)[:6], run_info.date_time)
+            self.assertEqual(0o100755, run_info.external_attr >> 16)
+            self.assertEqual(zipfile.ZIP_DEFLATED, run_info.compress_type)
+
+            old_info = zip_file.getinfo('bundle/old.txt')
+            # Zip dates have a resolution of 2 seconds
+            self.assertEqual(time.localtime(SHAZAR_TIMESTAMP_MIN)[:5], old_info.date_time[:5])
+            self.assertEqual(0o100600, old_info.external_attr >> 16)
+
+    def test_member_names_normalized(self):
+        tar_data = io.BytesIO()
+        with tarfile.open(fileobj=tar_data, mode='w') as tar:
+            for name in ['./bundle/bundle.conf', '/bundle/bin/run']:
+                info = tarfile.TarInfo(name)
+                info.size = 4
+                info.mtime = 1234567890
+                tar.addfile(info, io.BytesIO(b'test'))
+        tar_data.seek(0)
+
+        output = io.BytesIO()
+        with tarfile.open(fileobj=tar_data, mode='r|') as tar, \
+                zipfile.ZipFile(output, 'w') as zip_file, \
+                ZipWriter(zip_file) as writer:
+            tar_to_zip(tar, writer)
+
+        with zipfile.ZipFile(output) as zip_file:
+            self.assertEqual(['bundle/bundle.conf', 'bundle/bin/run'], zip_file.namelist())
 
 
 class TestIntegration(CliTestCase):
@@ -63,6 +182,29 @@ class TestIntegration(CliTestCase):
             ('^{}tmp[a-z0-9_]{{6,8}}-[a-f0-9]{{64}}\.zip' + os.linesep + '$').format(bundle_dir)
         )
 
+    def test_incremental(self):
+        source_dir = os.path.join(self.tmpdir, 'source')
+        os.mkdir(source_dir)
+        for i in range(5):
+            with open(os.path.join(source_dir, 'file-{}.txt'.format(i)), 'wb') as file:
+                file.write(b'test file data\n' * 1000 * i)
+
+        output = os.path.join(self.tmpdir, 'incremental.zip')
+        clean_output = os.path.join(self.tmpdir, 'clean.zip')
+        run(['--compression', 'auto', '--incremental', '-o', output, source_dir])
+        self.assertTrue(os.path.exists(output + '.index'))
+
+        with open(os.path.join(source_dir, 'file-2.txt'), 'ab') as file:
+            file.write(b'changed')
+
+        with patch('conductr_cli.zip_writer.compress_file', wraps=zip_writer.compress_file) as compress_file_mock:
+            run(['--compression', 'auto', '--incremental', '-o', output, source_dir])
+        run(['--compression', 'auto', '-o', clean_output, source_dir])
+
+        self.assertEqual(1, compress_file_mock.call_count)
+        with open(output, 'rb') as incremental_file, open(clean_output, 'rb') as clean_file:
+            self.assertEqual(clean_file.read(), incremental_file.read())
+
     def test_inputs_tty_help(self):
         parser_print_help_mock = MagicMock()
 
@@ -129,7 +271,7 @@ class TestIntegration(CliTestCase):
             run('')
 
         tarfile.assert_called_once_with(fileobj=sys.stdin.buffer, mode='r|')
-        zipfile.assert_called_once_with(file, 'w')
+        self.assert_zipped_into(zipfile, sys.stdout.buffer)
         stdout.assert_called_once_with(b'\nsha-256/'
                                        b'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
 
@@ -150,7 +292,7 @@ class TestIntegration(CliTestCase):
             run(['--tar', 'testing.tar'])
 
         tarfile.assert_called_once_with('testing.tar', mode='r')
-        zipfile.assert_called_once_with(file, 'w')
+        self.assert_zipped_into(zipfile, sys.stdout.buffer)
         stdout.assert_called_once_with(b'\nsha-256/'
                                        b'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
 
@@ -166,6 +308,7 @@ class TestIntegration(CliTestCase):
                 patch('sys.stdout.buffer.write', stdout), \
                 patch('sys.stdout.isatty', lambda: False), patch('sys.stdin.isatty', lambda: False), \
                 patch('zipfile.ZipFile', zipfile), patch('tarfile.open', tarfile), \
+                patch('conductr_cli.shazar_main.ZipWriter', MagicMock()), \
                 patch('shutil.move', move), \
                 patch('tempfile.NamedTemporaryFile', MagicMock(return_value=file)):
             run(['testing'])
@@ -176,7 +319,7 @@ class TestIntegration(CliTestCase):
         )
 
         tarfile.assert_not_called()
-        zipfile.assert_called_once_with(file, 'w')
+        self.assert_zipped_into(zipfile, file)
         stdout.assert_called_once_with(
             b'./testing-e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855.zip\n'
         )
@@ -203,7 +346,7 @@ class TestIntegration(CliTestCase):
             stdout.assert_not_called()
             mock_move.assert_not_called()
             mock_open.assert_called_once_with('test.zip', 'wb')
-            mock_zipfile.assert_called_once_with(file, 'w')
+            self.assert_zipped_into(mock_zipfile, mock_open.return_value.__enter__.return_value)
 
     def test_output_dash(self):
         # tests that providing "-o -" goes through stdout
@@ -226,10 +369,16 @@ class TestIntegration(CliTestCase):
 
             tarfile.assert_called_once_with(fileobj=sys.stdin.buffer, mode='r|')
             move.assert_not_called()
-            zipfile.assert_called_once_with(file, 'w')
+            self.assert_zipped_into(zipfile, sys.stdout.buffer)
             stdout.assert_called_once_with(b'\nsha-256/'
                                            b'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
 
+    def assert_zipped_into(self, zipfile_mock, output):
+        zipfile_mock.assert_called_once_with(ANY, 'w')
+        digest_writer = zipfile_mock.call_args[0][0]
+        self.assertIsInstance(digest_writer, DigestWriter)
+        self.assertIs(output, digest_writer.output)
+
     def tearDown(self):  # noqa
         shutil.rmtree(self.tmpdir)
         remove(self.tmpfile.name)
@@ -1,7 +1,10 @@
 from unittest import TestCase
 from conductr_cli.test.cli_test_case import strip_margin
 from conductr_cli import sse_client
-from unittest.mock import patch, MagicMock
+from requests.exceptions import ConnectionError, HTTPError
+from requests.packages.urllib3.exceptions import ProtocolError
+from unittest.mock import call, patch, MagicMock
+import socket
 
 
 class TestSSEClient(TestCase):
@@ -13,21 +16,20 @@ class TestSSEClient(TestCase):
                                   |
                                   |data:
                                   |
-                                  |""")
-        raw_sse_iterators = [iter(list(raw_sse))]
-        iter_content_mock = MagicMock(side_effect=raw_sse_iterators)
+                                  |""").encode('utf-8')
+        read1_mock = MagicMock(side_effect=[raw_sse[:10], raw_sse[10:25], raw_sse[25:], b''])
 
         raise_for_status_mock = MagicMock()
 
         response_mock = MagicMock()
         response_mock.raise_for_status = raise_for_status_mock
-        response_mock.iter_content = iter_content_mock
+        response_mock.raw.read1 = read1_mock
 
         request_get_mock = MagicMock(return_value=response_mock)
 
         result = []
-        with patch('requests.get', request_get_mock):
-            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com')
+        with patch('requests.Session.get', request_get_mock):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com', max_reconnect_attempts=0)
             for event in events:
                 result.append(event)
 
@@ -37,6 +39,203 @@ class TestSSEClient(TestCase):
             sse_client.Event(event=None, data='')
         ], result)
 
-        request_get_mock.assert_called_with('http://host.com', stream=True, **sse_client.SSE_REQUEST_INPUT)
+        expected_headers = dict(sse_client.SSE_REQUEST_INPUT['headers'])
+        expected_headers['Host'] = '127.0.0.1'
+        request_get_mock.assert_called_with('http://host.com', stream=True, headers=expected_headers)
         raise_for_status_mock.assert_called_with()
-        iter_content_mock.assert_called_with(decode_unicode=True)
+        read1_mock.assert_called_with(sse_client.DEFAULT_CHUNK_SIZE)
+
+    def test_read_available(self):
+        response_mock = MagicMock()
+        response_mock.raw.read1 = MagicMock(side_effect=[b':heartbeat\n', b'data:a\n\n', b''])
+
+        # Each read returns what is available rather than waiting for a whole chunk
+        self.assertEqual([b':heartbeat\n', b'data:a\n\n'], list(sse_client.iter_available(response_mock, 4096)))
+
+    def test_read_without_read1(self):
+        response_mock = MagicMock(spec=['iter_content', 'raw'])
+        response_mock.raw = MagicMock(spec=['read'])
+        response_mock.iter_content = MagicMock(return_value=iter([b'data:a\n\n']))
+
+        self.assertEqual([b'data:a\n\n'], list(sse_client.iter_available(response_mock, 4096)))
+        response_mock.iter_content.assert_called_once_with(chunk_size=4096)
+
+
+class TestShutdownConnection(TestCase):
+    def test_shutdown_socket(self):
+        sock = MagicMock(spec=socket.socket)
+        response_mock = MagicMock()
+        response_mock.raw.connection.sock = sock
+
+        sse_client.shutdown_connection(response_mock)
+
+        sock.shutdown.assert_called_once_with(socket.SHUT_RDWR)
+
+    def test_shutdown_socket_of_file(self):
+        sock = MagicMock(spec=socket.socket)
+        response_mock = MagicMock()
+        response_mock.raw.connection.sock = None
+        response_mock.raw._fp.fp.raw._sock = sock
+
+        sse_client.shutdown_connection(response_mock)
+
+        sock.shutdown.assert_called_once_with(socket.SHUT_RDWR)
+
+    def test_close_client(self):
+        client = sse_client.Client(False, '127.0.0.1', 'http://host.com')
+        client.response = MagicMock()
+        client.response.raw.connection.sock = MagicMock(spec=socket.socket)
+
+        client.close()
+
+        client.response.raw.connection.sock.shutdown.assert_called_once_with(socket.SHUT_RDWR)
+        client.response.close.assert_called_once_with()
+        self.assertRaises(StopIteration, next, client)
+
+
+class TestSSEClientReconnect(TestCase):
+    @staticmethod
+    def create_response(*chunks, status_code=200):
+        response_mock = MagicMock()
+        response_mock.status_code = status_code
+        if status_code >= 400:
+            response_mock.raise_for_status = MagicMock(side_effect=HTTPError(response=response_mock))
+        response_mock.raw.read1 = MagicMock(side_effect=list(chunks) + [b''])
+        return response_mock
+
+    def test_reconnect_with_last_event_id(self):
+        request_get_mock = MagicMock(side_effect=[
+            self.create_response(b'retry:2500\nid:1\nevent:a\ndata:\n\nid:2\nevent:b\nda',
+                                 ProtocolError('connection reset')),
+            self.create_response(b'id:3\nevent:c\ndata:\n\n')
+        ])
+        sleep_mock = MagicMock()
+
+        with patch('requests.Session.get', request_get_mock), \
+                patch('time.sleep', sleep_mock):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com', max_reconnect_attempts=1)
+            result = [next(events), next(events)]
+
+        self.assertEqual([
+            sse_client.Event(event='a', data='', id='1'),
+            sse_client.Event(event='c', data='', id='3')
+        ], result)
+        sleep_mock.assert_called_once_with(2.5)
+        self.assertEqual('2', request_get_mock.call_args_list[1][1]['headers']['Last-Event-ID'])
+        self.assertNotIn('Last-Event-ID', request_get_mock.call_args_list[0][1]['headers'])
+        self.assertNotIn('Last-Event-ID', sse_client.SSE_REQUEST_INPUT['headers'])
+
+    def test_close_before_reconnect(self):
+        interrupted_response = self.create_response(b'data:\n\n', ConnectionError('reset'))
+        failed_response = self.create_response(status_code=503)
+        request_get_mock = MagicMock(side_effect=[
+            interrupted_response,
+            failed_response,
+            self.create_response(b'event:a\ndata:\n\n')
+        ])
+        calls = MagicMock()
+        interrupted_response.close = calls.close_interrupted
+        failed_response.close = calls.close_failed
+
+        with patch('requests.Session.get', request_get_mock), \
+                patch('time.sleep', calls.sleep):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com')
+            result = [next(events), next(events)]
+
+        self.assertEqual([sse_client.Event(event=None, data=''), sse_client.Event(event='a', data='')], result)
+        self.assertEqual([call.close_interrupted(), call.sleep(3.0), call.close_failed(), call.sleep(6.0)],
+                         calls.mock_calls)
+
+    def test_bounded_backoff(self):
+        request_get_mock = MagicMock(side_effect=[
+            self.create_response(b'data:\n\n'),
+            ConnectionError('refused'),
+            self.create_response(status_code=503),
+            ConnectionError('refused'),
+            ConnectionError('refused'),
+            self.create_response(b'event:a\ndata:\n\n')
+        ])
+        sleep_mock = MagicMock()
+
+        with patch('requests.Session.get', request_get_mock), \
+                patch('time.sleep', sleep_mock), \
+                patch('conductr_cli.sse_client.MAX_RECONNECT_DELAY', 10):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com')
+            result = [next(events), next(events)]
+
+        self.assertEqual([sse_client.Event(event=None, data=''), sse_client.Event(event='a', data='')], result)
+        self.assertEqual([call(3.0), call(6.0), call(10), call(10), call(10)], sleep_mock.call_args_list)
+
+    def test_raise_after_max_reconnect_attempts(self):
+        error = ConnectionError('refused')
+        request_get_mock = MagicMock(side_effect=[
+            self.create_response(b'data:\n\n', ConnectionError('reset')),
+            error,
+            error
+        ])
+
+        with patch('requests.Session.get', request_get_mock), \
+                patch('time.sleep', MagicMock()):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com', max_reconnect_attempts=2)
+            self.assertEqual(sse_client.Event(event=None, data=''), next(events))
+            self.assertRaises(ConnectionError, next, events)
+
+    def test_no_retry_on_client_error(self):
+        request_get_mock = MagicMock(side_effect=[
+            self.create_response(b'data:\n\n'),
+            self.create_response(status_code=404)
+        ])
+
+        with patch('requests.Session.get', request_get_mock), \
+                patch('time.sleep', MagicMock()):
+            events = sse_client.get_events(False, '127.0.0.1', 'http://host.com')
+            self.assertEqual(sse_client.Event(event=None, data=''), next(events))
+            self.assertRaises(HTTPError, next, events)
+
+
+class TestEventParser(TestCase):
+    def parse(self, raw_sse, chunk_size):
+        parser = sse_client.EventParser()
+        events = []
+        for i in range(0, len(raw_sse), chunk_size):
+            events.extend(parser.feed(raw_sse[i:i + chunk_size]))
+        return events
+
+    def test_chunk_boundaries(self):
+        raw_sse = b'event:bundleInstallationAdded\r\ndata:a\r\n\r\ndata:\r\rdata:b\n\n'
+        expected_events = [
+            sse_client.Event(event='bundleInstallationAdded', data='a'),
+            sse_client.Event(event=None, data=''),
+            sse_client.Event(event=None, data='b')
+        ]
+        for chunk_size in [1, 2, 3, 7, len(raw_sse)]:
+            self.assertEqual(expected_events, self.parse(raw_sse, chunk_size))
+
+    def test_multi_line_data(self):
+        raw_sse = b'event:deploymentEvent\ndata:first\ndata:second\ndata:\n\n'
+        self.assertEqual([sse_client.Event(event='deploymentEvent', data='first\nsecond\n')],
+                         self.parse(raw_sse, 4))
+
+    def test_value_containing_colon(self):
+        raw_sse = b'event: bundleExecutionAdded\ndata: {"bundleId":"a101449"}\n\n'
+        self.assertEqual([sse_client.Event(event='bundleExecutionAdded', data='{"bundleId":"a101449"}')],
+                         self.parse(raw_sse, 5))
+
+    def test_comments_and_incomplete_event(self):
+        raw_sse = b':keep-alive\n\ndata:complete\n\ndata:incomplete\n'
+        self.assertEqual([sse_client.Event(event=None, data='complete')], self.parse(raw_sse, 3))
+
+    def test_id_and_retry(self):
+        parser = sse_client.EventParser()
+        events = parser.feed(b'id:1\nretry:2500\ndata:a\n\ndata:b\n\nretry:invalid\n\n')
+
+        self.assertEqual([
+            sse_client.Event(event=None, data='a', id='1'),
+            sse_client.Event(event=None, data='b', id='1'),
+        ], events)
+        self.assertEqual('1', parser.last_event_id)
+        self.assertEqual(2500, parser.retry)
+
+    def test_multi_byte_character_split_across_chunks(self):
+        raw_sse = 'data:café\n\n'.encode('utf-8')
+        self.assertEqual([sse_client.Event(event=None, data='café')], self.parse(raw_sse, 1))
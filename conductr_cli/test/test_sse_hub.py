@@ -0,0 +1,103 @@
+from unittest import TestCase
+from conductr_cli import sse_client, sse_hub
+from conductr_cli.test.cli_test_case import as_sse_events
+from unittest.mock import patch, MagicMock
+import threading
+
+
+class TestSubscribe(TestCase):
+    def test_fan_out_to_subscribers(self):
+        events = [sse_client.Event('a', '1'), sse_client.Event('b', '2')]
+        event_stream = as_sse_events(events)
+        get_events_mock = MagicMock(return_value=event_stream)
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            first = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events', auth=None)
+            second = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events', auth=None)
+
+            self.assertEqual(events, list(first))
+            self.assertEqual(events, list(second))
+
+        get_events_mock.assert_called_once_with(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events', auth=None)
+        event_stream.close.assert_called_once_with()
+
+    def test_concurrent_subscribers(self):
+        subscribed = threading.Barrier(3)
+
+        def events():
+            subscribed.wait(timeout=5)
+            yield sse_client.Event('a', '1')
+
+        event_stream = MagicMock()
+        event_stream.__iter__.return_value = events()
+        get_events_mock = MagicMock(return_value=event_stream)
+
+        results = []
+
+        def wait():
+            subscription = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')
+            subscribed.wait(timeout=5)
+            results.append(list(subscription))
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            threads = [threading.Thread(target=wait) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        get_events_mock.assert_called_once_with(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')
+        self.assertEqual([[sse_client.Event('a', '1')], [sse_client.Event('a', '1')]], results)
+
+    def test_separate_hub_per_url(self):
+        get_events_mock = MagicMock(side_effect=lambda *args, **kwargs: as_sse_events([]))
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            list(sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events'))
+            list(sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/deployments/events'))
+
+        self.assertEqual(2, get_events_mock.call_count)
+
+    def test_new_hub_after_close(self):
+        get_events_mock = MagicMock(side_effect=lambda *args, **kwargs: as_sse_events([sse_client.Event('a', '1')]))
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            subscription = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')
+            self.assertEqual(sse_client.Event('a', '1'), next(subscription))
+            subscription.close()
+
+            self.assertEqual([sse_client.Event('a', '1')],
+                             list(sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')))
+
+        self.assertEqual(2, get_events_mock.call_count)
+
+    def test_close_stream_on_last_unsubscribe(self):
+        closed = threading.Event()
+
+        def events():
+            yield sse_client.Event('a', '1')
+            # Waits for the next event until the stream is closed
+            closed.wait(5)
+
+        event_stream = MagicMock()
+        event_stream.__iter__.return_value = events()
+        event_stream.close = MagicMock(side_effect=closed.set)
+        get_events_mock = MagicMock(return_value=event_stream)
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            subscription = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')
+            self.assertEqual(sse_client.Event('a', '1'), next(subscription))
+            subscription.close()
+
+        self.assertTrue(closed.is_set())
+        self.assertEqual({}, sse_hub._hubs)
+
+    def test_raise_error_to_subscribers(self):
+        error = ConnectionError('refused')
+        get_events_mock = MagicMock(side_effect=error)
+
+        with patch('conductr_cli.sse_client.get_events', get_events_mock):
+            subscription = sse_hub.subscribe(False, '10.0.0.1', 'http://10.0.0.1:9005/bundles/events')
+            self.assertRaises(ConnectionError, list, subscription)
+
+        self.assertEqual({}, sse_hub._hubs)
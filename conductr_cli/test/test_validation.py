@@ -1,8 +1,8 @@
 from argparse import ArgumentTypeError
 from conductr_cli import logging_setup, validation
-from conductr_cli.exceptions import BundleResolutionError
+from conductr_cli.exceptions import BundleDigestMismatchError, BundleResolutionError
 from conductr_cli.resolvers import bintray_resolver
-from conductr_cli.validation import argparse_version, HostnameLookupError
+from conductr_cli.validation import argparse_size, argparse_version, HostnameLookupError
 from conductr_cli.test.cli_test_case import CliTestCase, strip_margin, as_error
 from unittest.mock import patch, MagicMock
 
@@ -35,6 +35,17 @@ class TestTerminal(CliTestCase):
         expect_fail('1.')
         expect_fail(' asdf 1 hello')
 
+    def test_argparse_size(self):
+        self.assertEqual(1024, argparse_size('1024'))
+        self.assertEqual(2 * 1024, argparse_size('2K'))
+        self.assertEqual(500 * 1024 ** 2, argparse_size('500m'))
+        self.assertEqual(10 * 1024 ** 3, argparse_size('10G'))
+        self.assertEqual(1024 ** 4, argparse_size('1T'))
+
+        self.assertRaises(ArgumentTypeError, argparse_size, '10GB')
+        self.assertRaises(ArgumentTypeError, argparse_size, '-1')
+        self.assertRaises(ArgumentTypeError, argparse_size, 'potato')
+
 
 class TestErrorHandler(CliTestCase):
     def test_handle_hostname_lookup_error(self):
@@ -181,3 +192,26 @@ class TestErrorHandler(CliTestCase):
                |"""
         ))
         self.assertEqual(expected_error, self.output(stderr))
+
+    def test_handle_bundle_digest_mismatch_error(self):
+        def raise_error():
+            raise BundleDigestMismatchError('bundle.zip', 'sha-256/abc', 'sha-256/def')
+
+        args = MagicMock(**{})
+        stdout = MagicMock()
+        stderr = MagicMock()
+        logging_setup.configure_logging(args, stdout, stderr)
+
+        function_to_call = validation.handle_bundle_digest_mismatch_error(raise_error)
+        self.assertFalse(function_to_call())
+
+        self.assertEqual('', self.output(stdout))
+
+        expected_error = as_error(strip_margin(
+            """|Error: Digest mismatch of bundle.zip
+               |Error: Expected digest sha-256/abc
+               |Error: Actual digest sha-256/def
+               |Error: The file is corrupted, retrieve it again
+               |"""
+        ))
+        self.assertEqual(expected_error, self.output(stderr))
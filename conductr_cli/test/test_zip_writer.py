@@ -0,0 +1,198 @@
+from unittest import TestCase
+from conductr_cli import zip_writer
+from conductr_cli.shazar_main import DigestWriter
+from conductr_cli.zip_writer import ZipIndex, ZipWriter, save_index, stats_report
+from unittest.mock import patch
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+
+
+class TestZipWriter(TestCase):
+    def setUp(self):  # noqa
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = []
+        for i in range(20):
+            path = os.path.join(self.tmpdir, 'file-{}.txt'.format(i))
+            with open(path, 'wb') as file:
+                file.write('file {}\n'.format(i).encode('UTF-8') * (i * 1000))
+            os.utime(path, (1234567890, 1234567890))
+            self.files.append(path)
+
+    def tearDown(self):  # noqa
+        shutil.rmtree(self.tmpdir)
+
+    def zip(self, compression, jobs, **kwargs):
+        output = io.BytesIO()
+        digest_writer = DigestWriter(output)
+        with zipfile.ZipFile(digest_writer, 'w') as zip_file, \
+                ZipWriter(zip_file, compression, jobs, **kwargs) as writer:
+            self.writer = writer
+            info = zipfile.ZipInfo('bundle/bundle.conf', date_time=(2017, 1, 1, 0, 0, 0))
+            writer.writestr(info, 'name = "test"')
+            for path in self.files:
+                writer.write(path, os.path.join('bundle', os.path.basename(path)))
+
+        hex_digest = digest_writer.write_digest()
+        return output.getvalue()[:digest_writer.tell()], hex_digest
+
+    def test_same_zip_whatever_the_jobs(self):
+        zip_data, hex_digest = self.zip('deflated', 1)
+
+        for jobs in [2, 8]:
+            self.assertEqual(hex_digest, self.zip('deflated', jobs)[1])
+
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(['bundle/bundle.conf'] + ['bundle/file-{}.txt'.format(i) for i in range(20)],
+                             zip_file.namelist())
+            self.assertEqual(b'file 3\n' * 3000, zip_file.read('bundle/file-3.txt'))
+            self.assertEqual(zipfile.ZIP_STORED, zip_file.getinfo('bundle/bundle.conf').compress_type)
+            self.assertEqual(zipfile.ZIP_DEFLATED, zip_file.getinfo('bundle/file-3.txt').compress_type)
+
+    def test_compressed_as_zipfile(self):
+        zip_data, _ = self.zip('deflated', 4)
+
+        expected = io.BytesIO()
+        with zipfile.ZipFile(expected, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for path in self.files:
+                zip_file.write(path, os.path.join('bundle', os.path.basename(path)))
+
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file, zipfile.ZipFile(expected) as expected_zip_file:
+            for expected_info in expected_zip_file.infolist():
+                info = zip_file.getinfo(expected_info.filename)
+                self.assertEqual(expected_info.CRC, info.CRC)
+                self.assertEqual(expected_info.compress_size, info.compress_size)
+                self.assertEqual(expected_info.date_time, info.date_time)
+                self.assertEqual(expected_info.external_attr, info.external_attr)
+
+    def test_zip_file_internals(self):
+        # The entries compressed ahead of the output are written through these internals on the supported Pythons
+        with zipfile.ZipFile(io.BytesIO(), 'w') as zip_file:
+            self.assertTrue(zip_writer.writes_compressed_entries(zip_file))
+
+    @unittest.skipUnless(sys.version_info >= (3, 6), 'ZipFile.open writes entries from Python 3.6')
+    def test_without_zip_file_internals(self):
+        expected_data, _ = self.zip('auto', 1)
+
+        index = {}
+        with patch('conductr_cli.zip_writer.ZIP_FILE_INTERNALS', zip_writer.ZIP_FILE_INTERNALS + ['_missing']):
+            zip_data, _ = self.zip('auto', 4, index=index)
+
+        self.assertFalse(self.writer.writes_compressed)
+        self.assertEqual({}, index)
+        self.assertEqual(21, sum(stats['entries'] for stats in self.writer.stats.values()))
+
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file, \
+                zipfile.ZipFile(io.BytesIO(expected_data)) as expected_zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(expected_zip_file.namelist(), zip_file.namelist())
+            for expected_info in expected_zip_file.infolist():
+                info = zip_file.getinfo(expected_info.filename)
+                self.assertEqual(expected_info.compress_type, info.compress_type)
+                self.assertEqual(expected_info.CRC, info.CRC)
+                self.assertEqual(expected_info.date_time, info.date_time)
+                self.assertEqual(expected_zip_file.read(expected_info), zip_file.read(info))
+
+    def test_stored_without_data_descriptors(self):
+        zip_data, _ = self.zip('stored', 2)
+
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            for info in zip_file.infolist():
+                self.assertEqual(zipfile.ZIP_STORED, info.compress_type)
+                self.assertEqual(0, info.flag_bits)
+
+    def test_auto_stores_incompressible_files(self):
+        path = os.path.join(self.tmpdir, 'file-random.bin')
+        with open(path, 'wb') as file:
+            file.write(os.urandom(100000))
+        self.files.append(path)
+
+        zip_data, hex_digest = self.zip('auto', 1)
+        self.assertEqual(hex_digest, self.zip('auto', 4)[1])
+
+        with zipfile.ZipFile(io.BytesIO(zip_data)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(zipfile.ZIP_STORED, zip_file.getinfo('bundle/file-random.bin').compress_type)
+            self.assertEqual(zipfile.ZIP_STORED, zip_file.getinfo('bundle/file-0.txt').compress_type)
+            self.assertEqual(zipfile.ZIP_DEFLATED, zip_file.getinfo('bundle/file-3.txt').compress_type)
+
+        stats = self.writer.stats
+        self.assertEqual(3, stats['stored']['entries'])
+        self.assertEqual(stats['stored']['file_size'], stats['stored']['compress_size'])
+        self.assertEqual(19, stats['deflated']['entries'])
+        self.assertLess(stats['deflated']['compress_size'], stats['deflated']['file_size'])
+
+    def test_compression_level(self):
+        fastest_data, _ = self.zip('deflated', 2, compression_level=1)
+        best_data, _ = self.zip('deflated', 2, compression_level=9)
+
+        with zipfile.ZipFile(io.BytesIO(best_data)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+        self.assertLess(len(best_data), len(fastest_data))
+
+    def test_stats_report(self):
+        stats = {
+            'stored': {'entries': 2, 'file_size': 2048, 'compress_size': 2048, 'seconds': 0.001},
+            'deflated': {'entries': 3, 'file_size': 3 * 1024 * 1024, 'compress_size': 1024 * 1024, 'seconds': 1.5}
+        }
+        self.assertEqual(['deflated: 3 entries, 3.0 MiB to 1.0 MiB, saved 2.0 MiB in 1.50s',
+                          'stored: 2 entries, 2.0 KiB to 2.0 KiB, saved 0 Bytes in 0.00s'],
+                         stats_report(stats))
+
+    def test_incremental_same_as_clean(self):
+        previous_path = os.path.join(self.tmpdir, 'previous.zip')
+        index = {}
+        with open(previous_path, 'wb') as file:
+            file.write(self.zip('auto', 2, index=index)[0])
+        save_index(previous_path, index)
+        self.assertEqual(20, len(index))
+
+        with open(self.files[3], 'ab') as file:
+            file.write(b'changed\n')
+
+        clean_data, clean_digest = self.zip('auto', 2)
+
+        previous = ZipIndex(previous_path)
+        new_index = {}
+        with patch('conductr_cli.zip_writer.compress_file', wraps=zip_writer.compress_file) as compress_file_mock:
+            incremental_data, incremental_digest = self.zip('auto', 2, index=new_index, previous=previous)
+
+        self.assertEqual(clean_digest, incremental_digest)
+        self.assertEqual(clean_data, incremental_data)
+        self.assertEqual(1, compress_file_mock.call_count)
+        self.assertNotEqual(index['bundle/file-3.txt']['sha256'], new_index['bundle/file-3.txt']['sha256'])
+        self.assertEqual(index['bundle/file-4.txt'], new_index['bundle/file-4.txt'])
+
+    def test_incremental_not_reused_when_compressed_otherwise(self):
+        previous_path = os.path.join(self.tmpdir, 'previous.zip')
+        index = {}
+        with open(previous_path, 'wb') as file:
+            file.write(self.zip('deflated', 1, index=index)[0])
+        save_index(previous_path, index)
+
+        previous = ZipIndex(previous_path)
+        self.assertIsNotNone(previous.get('bundle/file-4.txt', 4 * 7000, 'deflated', -1))
+        self.assertIsNone(previous.get('bundle/file-4.txt', 4 * 7000, 'deflated', 9))
+        self.assertIsNone(previous.get('bundle/file-4.txt', 4 * 7000, 'stored', -1))
+        self.assertIsNone(previous.get('bundle/file-4.txt', 4 * 7001, 'deflated', -1))
+
+        self.assertEqual(self.zip('deflated', 1, compression_level=9)[0],
+                         self.zip('deflated', 1, compression_level=9, previous=previous)[0])
+
+    def test_index_missing(self):
+        self.assertEqual({}, ZipIndex(os.path.join(self.tmpdir, 'missing.zip')).entries)
+
+    def test_arcnames_normalized_as_zipfile(self):
+        output = io.BytesIO()
+        with zipfile.ZipFile(output, 'w') as zip_file, ZipWriter(zip_file) as writer:
+            writer.write(self.files[1], './bundle/file-1.txt')
+            writer.write(self.files[2], '/bundle/./dir/../file-2.txt')
+
+        with zipfile.ZipFile(output) as zip_file:
+            self.assertEqual(['bundle/file-1.txt', 'bundle/file-2.txt'], zip_file.namelist())
@@ -1,10 +1,12 @@
-from unittest.mock import patch, MagicMock
+import json
+from unittest.mock import call, patch, MagicMock
 
 from requests import HTTPError
 
 from conductr_cli import logging_setup
+from conductr_cli.http import DEFAULT_HTTP_TIMEOUT
 from conductr_cli.control_protocol import load_bundle, stop_bundle, get_members, get_agents, \
-    run_bundle, get_bundles
+    run_bundle, get_bundles, get_bundle, SINGLE_BUNDLE_STATE_UNSUPPORTED
 from conductr_cli.test.cli_test_case import CliTestCase
 
 
@@ -315,3 +317,74 @@ class TestControlProtocol(CliTestCase):
                                                 auth=self.conductr_auth,
                                                 verify=self.server_verification_file
                                                 )
+
+
+class TestGetBundle(CliTestCase):
+    conductr_auth = ('username', 'password')
+    server_verification_file = MagicMock(name='server_verification_file')
+    bundle_id = '45e0c477d3e5ea92aa8d85c0d8f3e25c'
+    bundle_url = 'http://127.0.0.1:9005/bundles/{}'.format(bundle_id)
+    bundles_url = 'http://127.0.0.1:9005/bundles'
+    bundle = {'bundleId': bundle_id, 'bundleInstallations': []}
+    args = {
+        'dcos_mode': False,
+        'scheme': 'http',
+        'host': '127.0.0.1',
+        'port': 9005,
+        'base_path': '/',
+        'api_version': '1',
+        'conductr_auth': conductr_auth,
+        'server_verification_file': server_verification_file
+    }
+
+    def setUp(self):
+        SINGLE_BUNDLE_STATE_UNSUPPORTED.clear()
+
+    def tearDown(self):
+        SINGLE_BUNDLE_STATE_UNSUPPORTED.clear()
+
+    def single_bundle_call(self):
+        return call(False, '127.0.0.1', self.bundle_url, auth=self.conductr_auth,
+                    verify=self.server_verification_file, timeout=DEFAULT_HTTP_TIMEOUT, stream=True,
+                    headers={'Accept': 'application/json'})
+
+    def test_single_bundle(self):
+        args_mock = MagicMock(**self.args)
+        get_mock = self.respond_with(text=json.dumps(self.bundle), content_type='application/json')
+        get_bundles_mock = MagicMock()
+
+        with patch('conductr_cli.conduct_request.get', get_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock):
+            self.assertEqual(self.bundle, get_bundle(args_mock, self.bundle_id))
+
+        self.assertEqual([self.single_bundle_call()], get_mock.call_args_list)
+        get_bundles_mock.assert_not_called()
+        self.assertEqual(set(), SINGLE_BUNDLE_STATE_UNSUPPORTED)
+
+    def test_not_loaded(self):
+        args_mock = MagicMock(**self.args)
+        get_mock = self.respond_with(status_code=404)
+        get_bundles_mock = MagicMock(return_value=[])
+
+        with patch('conductr_cli.conduct_request.get', get_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock):
+            self.assertIsNone(get_bundle(args_mock, self.bundle_id))
+
+        get_bundles_mock.assert_called_once_with(args_mock)
+        self.assertEqual(set(), SINGLE_BUNDLE_STATE_UNSUPPORTED)
+
+    def test_fallback_to_all_bundles(self):
+        args_mock = MagicMock(**self.args)
+        get_mock = self.respond_with(content_type='multipart/form-data')
+        other_bundle = {'bundleId': 'c1ab77e63b722ef1d5e2bd2b4fc4d7a2'}
+        get_bundles_mock = MagicMock(return_value=[other_bundle, self.bundle])
+
+        with patch('conductr_cli.conduct_request.get', get_mock), \
+                patch('conductr_cli.control_protocol.get_bundles', get_bundles_mock):
+            self.assertEqual(self.bundle, get_bundle(args_mock, self.bundle_id))
+            self.assertEqual(self.bundle, get_bundle(args_mock, self.bundle_id))
+
+        self.assertEqual([self.single_bundle_call()], get_mock.call_args_list)
+        get_mock.return_value.close.assert_called_once_with()
+        self.assertEqual([call(args_mock), call(args_mock)], get_bundles_mock.call_args_list)
+        self.assertEqual({self.bundles_url}, SINGLE_BUNDLE_STATE_UNSUPPORTED)
@@ -19,7 +19,7 @@ from conductr_cli.exceptions import BindAddressNotFound, BundleScaleError, Condu
     SandboxImageFetchError, SandboxImageNotFoundError, JavaCallError, HostnameLookupError, JavaUnsupportedVendorError, \
     JavaUnsupportedVersionError, JavaVersionParseError, DockerValidationError, SandboxImageNotAvailableOfflineError, \
     SandboxUnsupportedOsError, SandboxUnsupportedOsArchError, LicenseLoadError, LicenseDownloadError, NOT_FOUND_ERROR, \
-    ConductBackupError
+    ConductBackupError, BundleDigestMismatchError
 from conductr_cli.resolvers import bintray_resolver, docker_offline_resolver, docker_resolver, offline_resolver, \
     stdin_resolver, uri_resolver
 
@@ -164,6 +164,25 @@ def handle_malformed_bundle(func):
     return handler
 
 
+def handle_bundle_digest_mismatch_error(func):
+    def handler(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except BundleDigestMismatchError as err:
+            log = get_logger_for_func(func)
+            log.error('Digest mismatch of {}'.format(err.file_name))
+            log.error('Expected digest {}'.format(err.expected_digest))
+            log.error('Actual digest {}'.format(err.actual_digest))
+            log.error('The file is corrupted, retrieve it again')
+            return False
+
+    # Do not change the wrapped function name,
+    # so argparse configuration can be tested.
+    handler.__name__ = func.__name__
+
+    return handler
+
+
 def handle_bundle_resolution_error(func):
     display_padding = 2
 
@@ -660,6 +679,20 @@ def argparse_version(value):
     raise argparse.ArgumentTypeError("'%s' is not a valid version number" % value)
 
 
+def argparse_size(value):
+    """
+    Parses a number of bytes with an optional K, M, G or T suffix of the binary multiples of 1024, e.g. `500M`.
+    """
+    import argparse
+    import re
+
+    match = re.match('^([0-9]+)([KMGT]?)$', value.upper())
+    if match:
+        return int(match.group(1)) * 1024 ** ' KMGT'.index(match.group(2) or ' ')
+
+    raise argparse.ArgumentTypeError("'%s' is not a valid size" % value)
+
+
 def handle_conductr_backup_error(func):
     def handler(*args, **kwargs):
         try:
@@ -0,0 +1,465 @@
+"""Zip output whose entries are compressed by a pool of threads.
+
+The entries are either all stored, all deflated, or, with the `auto` compression, stored when a sample of their
+first block shows that they hardly compress, as jars, archives and images do, and deflated otherwise.
+
+Each entry is compressed, and its CRC computed, before it is written, so its local header holds the final sizes and
+CRC. The zip is then written in a single pass, even onto outputs which can't seek, without data descriptors.
+The entries are written in the order they are added whatever the number of jobs compressing them, so the zip is the
+same for any number of jobs. zlib releases the GIL while compressing, so threads are enough to keep the cores busy.
+
+The entries are written onto the zip file through the internals of `ZipFile` which `ZipFile.write` relies on, as its
+public API only writes data which it compresses itself. Given a `ZipFile` lacking these internals, the entries are
+written through `ZipFile.open` instead, i.e. compressed one at a time by `zipfile`, and followed by data descriptors on
+outputs which can't seek.
+
+A zip may be written along with an index of the content hash of its files. Given the index of a previous zip, the
+files which haven't changed since have their compressed data copied as is from the previous zip, rather than
+compressed again, as long as they were compressed the same way. As compressing the same data the same way gives the
+same output, the zip is the same as one written from scratch.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from conductr_cli.bytes_util import natural_size
+from conductr_cli.constants import IO_CHUNK_SIZE
+from functools import partial
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+
+
+COMPRESSION_METHODS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflated': zipfile.ZIP_DEFLATED
+}
+
+COMPRESSION_METHOD_NAMES = {method: name for name, method in COMPRESSION_METHODS.items()}
+
+COMPRESSION_AUTO = 'auto'
+
+COMPRESSIONS = sorted(COMPRESSION_METHODS) + [COMPRESSION_AUTO]
+
+DEFAULT_COMPRESSION = 'stored'
+
+DEFAULT_COMPRESSION_LEVEL = zlib.Z_DEFAULT_COMPRESSION
+
+# The `auto` compression samples this many bytes from the start of each file, storing the file if the sample doesn't
+# compress to less than the given ratio of its size.
+AUTO_SAMPLE_SIZE = 64 * 1024
+AUTO_DEFLATE_MAX_RATIO = 0.9
+
+DEFAULT_JOBS = 1
+
+# The index of a zip is written next to it, under its name followed by this suffix.
+INDEX_SUFFIX = '.index'
+
+# The compressed data of an entry is kept in memory up to this size, and spilled to a temporary file beyond it.
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+# The internals of `ZipFile` through which the entries compressed ahead of the output are written.
+ZIP_FILE_INTERNALS = ['_allowZip64', '_writecheck', '_didModify', 'fp', 'filelist', 'NameToInfo']
+
+
+class ZipWriter(object):
+    """
+    Adds entries to `zip_file` the way `ZipFile.write` and `ZipFile.writestr` do, compressing the files as per the
+    given compression on up to `jobs` threads. The entries still pending are written on close.
+
+    The `stats` of the entries written are kept per compression method, i.e. their number of `entries`, their
+    `file_size` and `compress_size`, and the `seconds` spent compressing them.
+
+    If given an `index` dict, the entries of the files written are added to it, keyed by their name, so that it may be
+    saved along with the zip. If given the `previous` `ZipIndex`, the entries of the files which are unchanged since
+    are reused from the previous zip.
+    """
+
+    def __init__(self, zip_file, compression=DEFAULT_COMPRESSION, jobs=DEFAULT_JOBS,
+                 compression_level=DEFAULT_COMPRESSION_LEVEL, index=None, previous=None):
+        self.zip_file = zip_file
+        self.compression = compression
+        self.compress_type = None if compression == COMPRESSION_AUTO else COMPRESSION_METHODS[compression]
+        self.compression_level = compression_level
+        # Without the internals of `ZipFile`, the entries are neither compressed ahead of the output, nor reused
+        self.writes_compressed = writes_compressed_entries(zip_file)
+        self.index = index if self.writes_compressed else None
+        self.previous = previous if self.writes_compressed else None
+        self.jobs = jobs if self.writes_compressed else 1
+        self.executor = ThreadPoolExecutor(max_workers=jobs) if self.jobs > 1 else None
+        self.pending = deque()
+        self.stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, path, arcname):
+        # The file is opened right away, so that it may be removed before it is compressed
+        source = open(path, 'rb')
+        try:
+            st = os.fstat(source.fileno())
+            zinfo = zipfile.ZipInfo(normalize_arcname(arcname), time.localtime(st.st_mtime)[:6])
+            zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+            zinfo.file_size = st.st_size
+            zinfo.compress_type = self.compress_type
+
+            self.submit(self.compress_file, zinfo, source)
+        except BaseException:
+            source.close()
+            raise
+
+    def write_fileobj(self, zinfo, fileobj):
+        """
+        Adds the entry described by `zinfo` with the data of `fileobj`, such as a member of a tar stream. `fileobj` is
+        read right away, into memory or into a temporary file beyond `SPOOL_MAX_SIZE`, so that it may be read from
+        a stream which moves on once the entry is added.
+        """
+        source = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            shutil.copyfileobj(fileobj, source, IO_CHUNK_SIZE)
+            zinfo.file_size = source.tell()
+            zinfo.compress_type = self.compress_type
+            source.seek(0)
+
+            self.submit(self.compress_file, zinfo, source)
+        except BaseException:
+            source.close()
+            raise
+
+    def writestr(self, zinfo, data):
+        # As with `ZipFile.writestr`, the entry keeps the compression method of the given `ZipInfo`
+        if isinstance(data, str):
+            data = data.encode('UTF-8')
+
+        self.submit(self.compress_data, zinfo, data)
+
+    def compress_data(self, zinfo, data):
+        zinfo, data = compress_chunks(zinfo, [data], self.compression_level)
+        return zinfo, data, None
+
+    def compress_file(self, zinfo, source):
+        """
+        Compresses the file read from `source` as per `zinfo`, unless its entry may be reused from the previous zip.
+        Returns `zinfo` along with the compressed data and the content hash of the file, if it is indexed.
+        """
+        hex_digest = None
+
+        previous_entry = self.previous.get(zinfo.filename, zinfo.file_size, self.compression,
+                                           self.compression_level) if self.previous else None
+        if previous_entry:
+            hex_digest = file_digest(source)
+            source.seek(0)
+
+            if hex_digest == previous_entry['sha256']:
+                source.close()
+                zinfo, data = self.previous.reuse(zinfo)
+                return zinfo, data, hex_digest
+
+        digest = hashlib.sha256() if self.index is not None and hex_digest is None else None
+        zinfo, data = compress_file(zinfo, source, self.compression_level, digest)
+        return zinfo, data, hex_digest or (digest.hexdigest() if digest else None)
+
+    def submit(self, compress, zinfo, source):
+        if not self.writes_compressed:
+            self.write_uncompressed_entry(zinfo, source)
+            return
+
+        compress = partial(timed, compress)
+
+        if self.executor:
+            self.pending.append(self.executor.submit(compress, zinfo, source))
+
+            # Bounds the entries compressed ahead of the output, along with the memory and files they hold
+            while len(self.pending) > self.jobs * 2:
+                self.write_entry(*self.pending.popleft().result())
+        else:
+            self.write_entry(*compress(zinfo, source))
+
+    def write_entry(self, zinfo, data, hex_digest, seconds):
+        """
+        Writes the entry described by `zinfo`, whose CRC and sizes are known, followed by its compressed `data`.
+        """
+        zip_file = self.zip_file
+
+        if self.index is not None and hex_digest is not None:
+            self.index[zinfo.filename] = index_entry(zinfo, hex_digest, self.compression, self.compression_level)
+
+        self.add_stats(zinfo, seconds)
+
+        with data:
+            zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+            if zip64 and not zip_file._allowZip64:
+                raise zipfile.LargeZipFile('Filesize would require ZIP64 extensions')
+
+            zinfo.flag_bits = 0x00
+            if not zinfo.external_attr:
+                zinfo.external_attr = 0o600 << 16
+
+            zinfo.header_offset = zip_file.fp.tell()
+            zip_file._writecheck(zinfo)
+            zip_file._didModify = True
+
+            zip_file.fp.write(zinfo.FileHeader(zip64))
+            shutil.copyfileobj(data, zip_file.fp, IO_CHUNK_SIZE)
+
+            zip_file.start_dir = zip_file.fp.tell()
+            zip_file.filelist.append(zinfo)
+            zip_file.NameToInfo[zinfo.filename] = zinfo
+
+    def write_uncompressed_entry(self, zinfo, source):
+        """
+        Writes the entry described by `zinfo` with the data of `source` through the public `ZipFile.open`, which
+        compresses it as it is written.
+        """
+        start_time = time.perf_counter()
+
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        with source:
+            if zinfo.compress_type is None:
+                zinfo.compress_type = sample_compress_type(source)
+                source.seek(0)
+
+            # The compression level of an entry is only public from Python 3.13
+            if hasattr(zinfo, 'compress_level'):
+                zinfo.compress_level = self.compression_level
+
+            with self.zip_file.open(zinfo, 'w') as dest:
+                shutil.copyfileobj(source, dest, IO_CHUNK_SIZE)
+
+        self.add_stats(zinfo, time.perf_counter() - start_time)
+
+    def add_stats(self, zinfo, seconds):
+        stats = self.stats.setdefault(COMPRESSION_METHOD_NAMES.get(zinfo.compress_type, str(zinfo.compress_type)),
+                                      {'entries': 0, 'file_size': 0, 'compress_size': 0, 'seconds': 0.0})
+        stats['entries'] += 1
+        stats['file_size'] += zinfo.file_size
+        stats['compress_size'] += zinfo.compress_size
+        stats['seconds'] += seconds
+
+    def close(self):
+        try:
+            while self.pending:
+                self.write_entry(*self.pending.popleft().result())
+        finally:
+            self.abort()
+
+    def abort(self):
+        if self.executor:
+            for future in self.pending:
+                if not future.cancel() and not future.exception():
+                    future.result()[1].close()
+            self.pending.clear()
+            self.executor.shutdown()
+
+
+class ZipIndex(object):
+    """
+    Index of a previous zip, from which the compressed data of the unchanged files may be reused.
+    The index is empty if the zip or its index is missing, or if they don't match.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+
+        try:
+            with open(path + INDEX_SUFFIX, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+
+            with zipfile.ZipFile(path) as zip_file:
+                for zinfo in zip_file.infolist():
+                    entry = index['entries'].get(zinfo.filename)
+                    if entry is not None and entry == index_entry(zinfo, entry['sha256'], entry['compression'],
+                                                                  entry['compression_level']):
+                        self.entries[zinfo.filename] = (zinfo, entry)
+        except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile):
+            self.entries = {}
+
+    def get(self, filename, file_size, compression, compression_level):
+        """
+        Returns the index entry of the given file if it was compressed the given way, or `None` otherwise.
+        """
+        zinfo, entry = self.entries.get(filename, (None, None))
+        if entry is not None and entry['file_size'] == file_size and entry['compression'] == compression and \
+                entry['compression_level'] == compression_level:
+            return entry
+        else:
+            return None
+
+    def reuse(self, zinfo):
+        """
+        Updates `zinfo` from the entry of the same name in the previous zip, returning `zinfo` along with a copy of
+        the compressed data of the entry.
+        """
+        previous_zinfo, _ = self.entries[zinfo.filename]
+        zinfo.compress_type = previous_zinfo.compress_type
+        zinfo.CRC = previous_zinfo.CRC
+        zinfo.file_size = previous_zinfo.file_size
+        zinfo.compress_size = previous_zinfo.compress_size
+
+        # Each entry is read with its own file, so that entries may be reused from several threads at a time
+        data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        with open(self.path, 'rb') as file:
+            file.seek(previous_zinfo.header_offset)
+            header = struct.unpack(zipfile.structFileHeader, file.read(zipfile.sizeFileHeader))
+            file.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+
+            remaining = previous_zinfo.compress_size
+            while remaining > 0:
+                chunk = file.read(min(remaining, IO_CHUNK_SIZE))
+                if not chunk:
+                    raise zipfile.BadZipFile('Truncated entry {} in {}'.format(zinfo.filename, self.path))
+                data.write(chunk)
+                remaining -= len(chunk)
+
+        data.seek(0)
+        return zinfo, data
+
+
+def writes_compressed_entries(zip_file):
+    """
+    Returns whether entries compressed ahead of the output may be written onto `zip_file`, i.e. whether it has the
+    internals of `ZipFile` which `ZipWriter.write_entry` relies on.
+    """
+    return all(hasattr(zip_file, name) for name in ZIP_FILE_INTERNALS)
+
+
+def index_entry(zinfo, hex_digest, compression, compression_level):
+    return {
+        'sha256': hex_digest,
+        'compression': compression,
+        'compression_level': compression_level,
+        'compress_type': zinfo.compress_type,
+        'CRC': zinfo.CRC,
+        'file_size': zinfo.file_size,
+        'compress_size': zinfo.compress_size
+    }
+
+
+def save_index(path, index):
+    """
+    Saves the `index` filled by a `ZipWriter` next to the zip written at `path`.
+    """
+    # The index is replaced as a whole so that it never describes a zip partially
+    index_path = path + INDEX_SUFFIX
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path) or None,
+                                    prefix='{}.'.format(os.path.basename(index_path)))
+    with os.fdopen(fd, 'w', encoding='utf-8') as file:
+        json.dump({'entries': index}, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+
+def normalize_arcname(arcname):
+    """
+    Normalizes the name of a file entry as `ZipFile.write` does, i.e. without any drive, leading separator or `.` and
+    `..` components, so that e.g. `./bundle/bundle.conf` is named `bundle/bundle.conf`.
+    """
+    arcname = os.path.normpath(os.path.splitdrive(arcname)[1])
+    while arcname[0] in (os.sep, os.altsep):
+        arcname = arcname[1:]
+    return arcname
+
+
+def timed(compress, zinfo, source):
+    start_time = time.perf_counter()
+    zinfo, data, hex_digest = compress(zinfo, source)
+    return zinfo, data, hex_digest, time.perf_counter() - start_time
+
+
+def file_digest(source):
+    digest = hashlib.sha256()
+    for chunk in iter(partial(source.read, IO_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_file(zinfo, source, compression_level=DEFAULT_COMPRESSION_LEVEL, digest=None):
+    if zinfo.compress_type is None:
+        zinfo.compress_type = sample_compress_type(source)
+        source.seek(0)
+
+    if zinfo.compress_type == zipfile.ZIP_STORED:
+        # Stored files are copied from their source once their CRC is known
+        crc = 0
+        for chunk in iter(partial(source.read, IO_CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+            if digest:
+                digest.update(chunk)
+
+        zinfo.CRC = crc
+        zinfo.compress_size = zinfo.file_size
+        source.seek(0)
+        return zinfo, source
+    else:
+        with source:
+            return compress_chunks(zinfo, iter(partial(source.read, IO_CHUNK_SIZE), b''), compression_level, digest)
+
+
+def sample_compress_type(source):
+    """
+    Returns `ZIP_DEFLATED` if the first block of `source` compresses well enough, and `ZIP_STORED` otherwise.
+    The sample is compressed with the fastest level, as only its ratio matters.
+    """
+    sample = source.read(AUTO_SAMPLE_SIZE)
+    if sample and len(zlib.compress(sample, 1)) < len(sample) * AUTO_DEFLATE_MAX_RATIO:
+        return zipfile.ZIP_DEFLATED
+    else:
+        return zipfile.ZIP_STORED
+
+
+def compress_chunks(zinfo, chunks, compression_level=DEFAULT_COMPRESSION_LEVEL, digest=None):
+    """
+    Compresses the given chunks of data as per `zinfo`, updating its CRC and sizes, and `digest` if any.
+    Returns `zinfo` along with a file holding the compressed data.
+    """
+    # Same parameters as `zipfile`, so the entries are compressed as `ZipFile.write` would at the same level
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15) \
+        if zinfo.compress_type == zipfile.ZIP_DEFLATED else None
+
+    data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    crc = 0
+    file_size = 0
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        file_size += len(chunk)
+        if digest:
+            digest.update(chunk)
+        data.write(compressor.compress(chunk) if compressor else chunk)
+
+    if compressor:
+        data.write(compressor.flush())
+
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = data.tell()
+
+    data.seek(0)
+    return zinfo, data
+
+
+def stats_report(stats):
+    """
+    Returns a line per compression method of the given `ZipWriter.stats`, stating the bytes saved and time spent.
+    """
+    return [
+        '{}: {} entries, {} to {}, saved {} in {:.2f}s'.format(
+            name, entry_stats['entries'],
+            natural_size(entry_stats['file_size'], binary=True),
+            natural_size(entry_stats['compress_size'], binary=True),
+            natural_size(entry_stats['file_size'] - entry_stats['compress_size'], binary=True),
+            entry_stats['seconds'])
+        for name, entry_stats in sorted(stats.items())
+    ]
@@ -68,6 +68,7 @@ setup(
             'sandbox = conductr_cli.sandbox:run',
             'shazar = conductr_cli.shazar:run',
             'bndl = conductr_cli.bndl:run',
+            'bndl-verify = conductr_cli.bndl_verify:run',
         ],
     },
 